@@ -7,6 +7,8 @@ Modularized admin configuration for the Aperture Booking system.
 from .core import *
 from .bookings import *
 from .resources import *
+from .notifications import *
+from .audit import *
 
 # Import any remaining admin configurations from the main admin.py
 # This ensures backward compatibility while we transition to modular structure
\ No newline at end of file
@@ -0,0 +1,32 @@
+# booking/admin/audit.py
+"""
+Audit log admin configuration for the Aperture Booking system.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+from django.contrib import admin
+
+from ..models import AuditLog
+from .performance import EstimatedCountPaginator, OptimizedModelAdmin
+
+
+@admin.register(AuditLog)
+class AuditLogAdmin(OptimizedModelAdmin):
+    """Read-only view of the audit trail."""
+    list_display = ('timestamp', 'user', 'username', 'action', 'table_name', 'object_id', 'ip_address')
+    list_filter = ('action', 'timestamp')
+    search_fields = ('username', 'table_name', 'object_id', 'request_id')
+    paginator = EstimatedCountPaginator
+    keyset_ordering = ('-timestamp', '-pk')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -9,10 +9,11 @@ Licensed under the MIT License - see LICENSE file for details.
 
 from django.contrib import admin
 from ..models import Booking, BookingAttendee, ApprovalRule, BookingHistory, BookingTemplate
+from .performance import EstimatedCountPaginator, OptimizedModelAdmin
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(OptimizedModelAdmin):
     list_display = ('title', 'resource', 'user', 'start_time', 'end_time', 'status', 'checkin_status', 'is_checked_in')
     list_filter = ('status', 'resource__resource_type', 'is_recurring', 'shared_with_group', 'no_show', 'auto_checked_out')
     search_fields = ('title', 'description', 'user__username', 'resource__name')
@@ -85,19 +86,18 @@ class BookingAdmin(admin.ModelAdmin):
         self.message_user(request, f'Auto checked-out {count} bookings.')
     auto_check_out_selected.short_description = 'Auto check-out selected bookings'
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('resource', 'user', 'approved_by')
 
 
 @admin.register(BookingAttendee)
-class BookingAttendeeAdmin(admin.ModelAdmin):
+class BookingAttendeeAdmin(OptimizedModelAdmin):
     list_display = ('booking', 'user', 'is_primary', 'added_at')
+    list_select_related = ('booking__resource',)
     list_filter = ('is_primary',)
     search_fields = ('booking__title', 'user__username')
 
 
 @admin.register(ApprovalRule)
-class ApprovalRuleAdmin(admin.ModelAdmin):
+class ApprovalRuleAdmin(OptimizedModelAdmin):
     list_display = ('name', 'resource', 'approval_type', 'is_active', 'priority')
     list_filter = ('approval_type', 'is_active')
     search_fields = ('name', 'resource__name')
@@ -105,16 +105,18 @@ class ApprovalRuleAdmin(admin.ModelAdmin):
 
 
 @admin.register(BookingHistory)
-class BookingHistoryAdmin(admin.ModelAdmin):
+class BookingHistoryAdmin(OptimizedModelAdmin):
     list_display = ('booking', 'user', 'action', 'timestamp')
-    list_filter = ('action',)
+    list_select_related = ('booking__resource',)
+    list_filter = ('action', 'timestamp')
     search_fields = ('booking__title', 'user__username', 'action')
     readonly_fields = ('timestamp',)
-    date_hierarchy = 'timestamp'
+    paginator = EstimatedCountPaginator
+    keyset_ordering = ('-timestamp', '-pk')
 
 
 @admin.register(BookingTemplate)
-class BookingTemplateAdmin(admin.ModelAdmin):
+class BookingTemplateAdmin(OptimizedModelAdmin):
     list_display = ('name', 'user', 'resource', 'created_at')
     list_filter = ('resource__resource_type', 'shared_with_group')
     search_fields = ('name', 'title', 'user__username', 'resource__name')
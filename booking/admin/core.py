@@ -18,6 +18,7 @@ from ..models import (
     AboutPage, LabSettings, UserProfile, 
     Faculty, College, Department
 )
+from .performance import OptimizedModelAdmin
 
 
 class UserProfileInline(admin.StackedInline):
@@ -36,7 +37,7 @@ admin.site.register(User, UserAdmin)
 
 
 @admin.register(AboutPage)
-class AboutPageAdmin(admin.ModelAdmin):
+class AboutPageAdmin(OptimizedModelAdmin):
     list_display = ('title', 'facility_name', 'is_active', 'updated_at')
     list_filter = ('is_active',)
     search_fields = ('title', 'facility_name', 'content')
@@ -70,7 +71,7 @@ class AboutPageAdmin(admin.ModelAdmin):
 
 
 @admin.register(LabSettings)
-class LabSettingsAdmin(admin.ModelAdmin):
+class LabSettingsAdmin(OptimizedModelAdmin):
     list_display = ('lab_name', 'is_active', 'updated_at')
     list_filter = ('is_active',)
     search_fields = ('lab_name',)
@@ -93,7 +94,7 @@ class LabSettingsAdmin(admin.ModelAdmin):
 
 
 @admin.register(Faculty)
-class FacultyAdmin(admin.ModelAdmin):
+class FacultyAdmin(OptimizedModelAdmin):
     list_display = ('name', 'code', 'is_active', 'created_at')
     list_filter = ('is_active',)
     search_fields = ('name', 'code')
@@ -101,7 +102,7 @@ class FacultyAdmin(admin.ModelAdmin):
 
 
 @admin.register(College)
-class CollegeAdmin(admin.ModelAdmin):
+class CollegeAdmin(OptimizedModelAdmin):
     list_display = ('name', 'code', 'faculty', 'is_active', 'created_at')
     list_filter = ('faculty', 'is_active')
     search_fields = ('name', 'code', 'faculty__name')
@@ -109,16 +110,18 @@ class CollegeAdmin(admin.ModelAdmin):
 
 
 @admin.register(Department)
-class DepartmentAdmin(admin.ModelAdmin):
+class DepartmentAdmin(OptimizedModelAdmin):
     list_display = ('name', 'code', 'college', 'is_active', 'created_at')
+    list_select_related = ('college__faculty',)
     list_filter = ('college__faculty', 'college', 'is_active')
     search_fields = ('name', 'code', 'college__name', 'college__faculty__name')
     readonly_fields = ('created_at',)
 
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(OptimizedModelAdmin):
     list_display = ('user', 'role', 'academic_path', 'student_level', 'is_inducted')
+    list_select_related = ('faculty', 'college', 'department')
     list_filter = ('role', 'faculty', 'college', 'department', 'student_level', 'is_inducted')
     search_fields = (
         'user__username', 'user__email', 'user__first_name', 'user__last_name', 
@@ -0,0 +1,88 @@
+# booking/admin/notifications.py
+"""
+Notification admin configuration for the Aperture Booking system.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+from datetime import timedelta
+
+from django.contrib import admin
+from django.utils import timezone
+
+from ..models import Notification
+from .performance import EstimatedCountPaginator, OptimizedModelAdmin
+
+
+@admin.register(Notification)
+class NotificationAdmin(OptimizedModelAdmin):
+    list_display = ('title', 'user', 'notification_type', 'delivery_method', 'status', 'priority', 'created_at', 'retry_count')
+    list_filter = ('notification_type', 'delivery_method', 'status', 'priority', 'created_at')
+    search_fields = ('title', 'user__username', 'user__email')
+    readonly_fields = ('created_at', 'updated_at', 'sent_at', 'read_at', 'next_retry_at')
+    raw_id_fields = ('user', 'booking', 'resource', 'maintenance', 'access_request')
+    paginator = EstimatedCountPaginator
+    keyset_ordering = ('-created_at', '-pk')
+    
+    fieldsets = (
+        ('Notification Details', {
+            'fields': ('user', 'notification_type', 'title', 'message', 'priority', 'delivery_method', 'status')
+        }),
+        ('Related Objects', {
+            'fields': ('booking', 'resource', 'maintenance', 'access_request'),
+            'classes': ('collapse',)
+        }),
+        ('Delivery Information', {
+            'fields': ('sent_at', 'read_at', 'retry_count', 'next_retry_at'),
+            'classes': ('collapse',)
+        }),
+        ('Metadata', {
+            'fields': ('metadata',),
+            'classes': ('collapse',)
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        })
+    )
+    
+    actions = ['mark_as_sent', 'mark_as_read', 'retry_failed', 'send_pending', 'delete_old_notifications']
+    
+    def mark_as_sent(self, request, queryset):
+        """Mark selected notifications as sent."""
+        now = timezone.now()
+        count = queryset.filter(status__in=['pending', 'failed']).update(status='sent', sent_at=now, updated_at=now)
+        self.message_user(request, f'Marked {count} notifications as sent.')
+    mark_as_sent.short_description = 'Mark as sent'
+    
+    def mark_as_read(self, request, queryset):
+        """Mark selected notifications as read."""
+        now = timezone.now()
+        count = queryset.filter(status__in=['pending', 'sent']).update(status='read', read_at=now, updated_at=now)
+        self.message_user(request, f'Marked {count} notifications as read.')
+    mark_as_read.short_description = 'Mark as read'
+    
+    def retry_failed(self, request, queryset):
+        """Queue failed notifications for another delivery attempt."""
+        from ..notifications import notification_service
+        
+        count = queryset.filter(status='failed').update(status='pending', next_retry_at=None, updated_at=timezone.now())
+        sent_count = notification_service.send_pending_notifications()
+        self.message_user(request, f'Reset {count} failed notifications. {sent_count} notifications processed.')
+    retry_failed.short_description = 'Retry failed notifications'
+    
+    def send_pending(self, request, queryset):
+        """Send pending notifications."""
+        from ..notifications import notification_service
+        
+        sent_count = notification_service.send_pending_notifications()
+        self.message_user(request, f'Processed pending notifications. {sent_count} notifications sent.')
+    send_pending.short_description = 'Send pending notifications'
+    
+    def delete_old_notifications(self, request, queryset):
+        """Delete notifications older than 30 days."""
+        count, _ = queryset.filter(created_at__lt=timezone.now() - timedelta(days=30)).delete()
+        self.message_user(request, f'Deleted {count} notifications older than 30 days.')
+    delete_old_notifications.short_description = 'Delete notifications older than 30 days'
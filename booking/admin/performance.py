@@ -0,0 +1,298 @@
+# booking/admin/performance.py
+"""
+Changelist performance layer for the admin.
+
+``OptimizedModelAdmin`` is the base for the booking admins. It
+
+- joins every foreign key shown in ``list_display`` (nullable ones
+  included, which Django's default ``select_related()`` skips),
+- checks in DEBUG that a changelist page stays within its query budget,
+  so a per-row query fails loudly in development instead of slowly in
+  production,
+- and, for admins that opt in, replaces ``COUNT(*)`` with table
+  statistics (``EstimatedCountPaginator``) and offers keyset "Show more"
+  navigation that never uses OFFSET (``keyset_ordering``).
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import base64
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+KEYSET_VAR = 'after'
+
+
+class QueryBudgetExceeded(Exception):
+    """A changelist page ran more queries than its admin's budget allows."""
+
+
+def estimate_row_count(model, using='default'):
+    """
+    Row count of ``model``'s table from the database statistics.
+
+    Returns None where the backend keeps no usable estimate (SQLite, or a
+    PostgreSQL table that has never been analysed).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)"
+    elif connection.vendor == 'mysql':
+        sql = ("SELECT table_rows FROM information_schema.tables "
+               "WHERE table_schema = DATABASE() AND table_name = %s")
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for tables too large to ``COUNT(*)`` on every page view.
+
+    An unfiltered changelist over more than ``ESTIMATE_THRESHOLD`` rows
+    reports the planner's estimate. Filtered changelists count at most
+    ``COUNT_LIMIT`` rows; anything beyond is reached with "Show more".
+    """
+
+    ESTIMATE_THRESHOLD = 100_000
+    COUNT_LIMIT = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.ESTIMATE_THRESHOLD:
+                return estimate
+            return queryset.count()
+        return queryset.order_by()[:self.COUNT_LIMIT].count()
+
+
+def encode_cursor(obj, fields):
+    """Encode ``obj``'s values of the keyset ``fields`` for a query string."""
+    values = [field.value_to_string(obj) for field in fields]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, fields):
+    """Decode a cursor from ``encode_cursor`` back into field values."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(fields):
+            raise ValueError(cursor)
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, ValidationError) as exc:
+        raise IncorrectLookupParameters(exc) from exc
+
+
+def keyset_filter(ordering, values):
+    """
+    Rows strictly after ``values`` in ``ordering`` (``'-created_at'`` style).
+
+    Expands the row comparison ``(a, b) < (x, y)`` into
+    ``a < x OR (a = x AND b < y)`` so each branch can use an index.
+    """
+    condition = Q()
+    for position, name in enumerate(ordering):
+        column = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        branch = Q(**{f'{column}__{lookup}': values[position]})
+        for previous, value in zip(ordering[:position], values):
+            branch &= Q(**{previous.lstrip('-'): value})
+        condition |= branch
+    return condition
+
+
+class OptimizedChangeList(ChangeList):
+    """ChangeList that understands keyset cursors from ``OptimizedModelAdmin``."""
+
+    def __init__(self, request, *args, **kwargs):
+        self.keyset_next_url = None
+        super().__init__(request, *args, **kwargs)
+
+    @property
+    def keyset_ordering(self):
+        ordering = self.model_admin.keyset_ordering
+        # Column sorting and "Show all" fall back to ordinary pagination
+        if not ordering or ORDER_VAR in self.params or self.show_all:
+            return ()
+        return ordering
+
+    @cached_property
+    def keyset_fields(self):
+        opts = self.model._meta
+        return [
+            opts.pk if name.lstrip('-') == 'pk' else opts.get_field(name.lstrip('-'))
+            for name in self.model_admin.keyset_ordering
+        ]
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(KEYSET_VAR, None)
+        return lookup_params
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if not self.keyset_ordering:
+            return queryset
+        queryset = queryset.order_by(*self.keyset_ordering)
+        cursor = self.params.get(KEYSET_VAR)
+        if cursor:
+            queryset = queryset.filter(
+                keyset_filter(self.keyset_ordering, decode_cursor(cursor, self.keyset_fields))
+            )
+        return queryset
+
+    def get_results(self, request):
+        if not (self.keyset_ordering and self.params.get(KEYSET_VAR)):
+            super().get_results(request)
+        else:
+            # Past a cursor the page is just the next rows: no count, no OFFSET
+            self.page_num = 1
+            self.result_list = self.queryset[:self.list_per_page]
+            self.result_count = len(self.result_list)
+            self.full_result_count = None
+            self.show_full_result_count = False
+            self.show_admin_actions = True
+            self.can_show_all = False
+            self.multi_page = False
+            self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+
+        if self.keyset_ordering:
+            rows = list(self.result_list)
+            if len(rows) == self.list_per_page:
+                last = rows[-1]
+                cursor = encode_cursor(last, self.keyset_fields)
+                values = [getattr(last, field.attname) for field in self.keyset_fields]
+                if self.queryset.filter(keyset_filter(self.keyset_ordering, values)).exists():
+                    self.keyset_next_url = self.get_query_string({KEYSET_VAR: cursor}, [PAGE_VAR])
+
+
+class JoinedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    RelatedFieldListFilter whose choices join the relations the admin's
+    ``list_select_related`` declares below the filtered field, so choice
+    labels that read them (``College.__str__`` reads its faculty) don't
+    query per choice.
+    """
+
+    def field_choices(self, field, request, model_admin):
+        prefix = f'{self.field_path}__'
+        related = [
+            name[len(prefix):] for name in model_admin.get_list_select_related(request)
+            if name.startswith(prefix)
+        ]
+        if not related:
+            return super().field_choices(field, request, model_admin)
+
+        queryset = field.remote_field.model._default_manager.complex_filter(
+            field.get_limit_choices_to()
+        ).select_related(*related)
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        value_field = field.remote_field.get_related_field().attname
+        return [(getattr(obj, value_field), str(obj)) for obj in queryset]
+
+
+class OptimizedModelAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin base with automatic joins, a query budget and, on request,
+    estimated counts and keyset navigation.
+
+    Only the foreign keys in ``list_display`` are found automatically.
+    Relations their ``__str__`` reads (``Booking.__str__`` reads its
+    resource), and those used by display methods, are named in
+    ``list_select_related``; list filters on those foreign keys join the
+    same relations for their choices.
+    Large tables set ``paginator = EstimatedCountPaginator`` and
+    ``keyset_ordering`` (non-null columns ending in a unique one).
+    """
+
+    show_full_result_count = False
+    keyset_ordering = ()
+    list_query_budget = None
+
+    @property
+    def change_list_template(self):
+        if self.keyset_ordering:
+            return 'admin/booking/keyset_change_list.html'
+        return None
+
+    def get_changelist(self, request, **kwargs):
+        return OptimizedChangeList
+
+    def get_list_select_related(self, request):
+        if self.list_select_related is True:
+            return True
+        related = list(self.list_select_related or ())
+        for name in self.get_list_display(request):
+            if not isinstance(name, str) or any(
+                joined == name or joined.startswith(f'{name}__') for joined in related
+            ):
+                continue
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if (field.many_to_one or field.one_to_one) and field.concrete:
+                related.append(name)
+        return tuple(related)
+
+    def get_list_filter(self, request):
+        related = self.get_list_select_related(request)
+        if related is True:
+            return super().get_list_filter(request)
+        return [
+            (name, JoinedRelatedFieldListFilter)
+            if isinstance(name, str) and any(joined.startswith(f'{name}__') for joined in related)
+            else name
+            for name in super().get_list_filter(request)
+        ]
+
+    def get_list_query_budget(self, request):
+        """Most queries one changelist page may run, or None for no check."""
+        if self.list_query_budget is not None:
+            return self.list_query_budget
+        return getattr(settings, 'ADMIN_CHANGELIST_QUERY_BUDGET', 12)
+
+    def changelist_view(self, request, extra_context=None):
+        budget = self.get_list_query_budget(request)
+        if not settings.DEBUG or budget is None or request.method != 'GET':
+            return super().changelist_view(request, extra_context)
+
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        connection = connections[router.db_for_read(self.model)]
+        with connection.execute_wrapper(count):
+            response = super().changelist_view(request, extra_context)
+            if hasattr(response, 'render'):
+                response.render()
+        if len(queries) > budget:
+            raise QueryBudgetExceeded(
+                f"{self.model._meta.label} changelist ran {len(queries)} queries; "
+                f"its budget is {budget}"
+            )
+        return response
@@ -8,10 +8,12 @@ Licensed under the MIT License - see LICENSE file for details.
 """
 
 from django.contrib import admin
+from django.db.models import Count, Q
 from ..models import (
     Resource, ResourceAccess, AccessRequest, ResourceResponsible,
     ResourceChecklistItem, ChecklistItem, Maintenance
 )
+from .performance import OptimizedModelAdmin
 
 
 class ResourceChecklistItemInline(admin.TabularInline):
@@ -23,7 +25,7 @@ class ResourceChecklistItemInline(admin.TabularInline):
 
 
 @admin.register(Resource)
-class ResourceAdmin(admin.ModelAdmin):
+class ResourceAdmin(OptimizedModelAdmin):
     """Enhanced Resource admin with checklist configuration."""
     
     list_display = [
@@ -62,15 +64,21 @@ class ResourceAdmin(admin.ModelAdmin):
     
     inlines = [ResourceChecklistItemInline]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            active_checklist_items=Count('checklist_items', filter=Q(checklist_items__is_active=True))
+        )
+    
     def checklist_items_count(self, obj):
         """Show the number of active checklist items for this resource."""
-        return obj.checklist_items.filter(is_active=True).count()
+        return obj.active_checklist_items
     
     checklist_items_count.short_description = 'Checklist Items'
+    checklist_items_count.admin_order_field = 'active_checklist_items'
 
 
 @admin.register(ResourceAccess)
-class ResourceAccessAdmin(admin.ModelAdmin):
+class ResourceAccessAdmin(OptimizedModelAdmin):
     list_display = ('user', 'resource', 'granted_by', 'granted_at', 'is_active')
     list_filter = ('is_active', 'resource__resource_type')
     search_fields = ('user__username', 'user__email', 'resource__name', 'granted_by__username')
@@ -79,7 +87,7 @@ class ResourceAccessAdmin(admin.ModelAdmin):
 
 
 @admin.register(AccessRequest)
-class AccessRequestAdmin(admin.ModelAdmin):
+class AccessRequestAdmin(OptimizedModelAdmin):
     list_display = ('user', 'resource', 'status', 'created_at', 'reviewed_by', 'reviewed_at')
     list_filter = ('status', 'resource__resource_type', 'created_at')
     search_fields = ('user__username', 'user__email', 'resource__name', 'reason')
@@ -130,7 +138,7 @@ class AccessRequestAdmin(admin.ModelAdmin):
 
 
 @admin.register(ResourceResponsible)
-class ResourceResponsibleAdmin(admin.ModelAdmin):
+class ResourceResponsibleAdmin(OptimizedModelAdmin):
     list_display = ('user', 'resource', 'role_type', 'can_approve_access')
     list_filter = ('role_type', 'can_approve_access', 'resource__resource_type')
     search_fields = ('user__username', 'user__email', 'resource__name')
@@ -139,7 +147,7 @@ class ResourceResponsibleAdmin(admin.ModelAdmin):
 
 
 @admin.register(ChecklistItem)
-class ChecklistItemAdmin(admin.ModelAdmin):
+class ChecklistItemAdmin(OptimizedModelAdmin):
     list_display = ('title', 'item_type', 'is_required', 'category')
     list_filter = ('item_type', 'is_required', 'category')
     search_fields = ('title', 'description')
@@ -164,7 +172,7 @@ class ChecklistItemAdmin(admin.ModelAdmin):
 
 
 @admin.register(Maintenance)
-class MaintenanceAdmin(admin.ModelAdmin):
+class MaintenanceAdmin(OptimizedModelAdmin):
     list_display = ('resource', 'maintenance_type', 'start_time', 'status', 'priority')
     list_filter = ('maintenance_type', 'status', 'start_time', 'priority')
     search_fields = ('resource__name', 'title')
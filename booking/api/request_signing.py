@@ -9,14 +9,63 @@ Licensed under the MIT License - see LICENSE file for details.
 
 import hmac
 import hashlib
+import secrets
 import time
-import base64
 from urllib.parse import urlencode
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from rest_framework import exceptions
 from rest_framework.authentication import BaseAuthentication
 
+from booking.utils.cache_utils import SigningKeyCache
+
+# Bodies are hashed in chunks so file uploads never need a second copy
+BODY_CHUNK_SIZE = 64 * 1024
+MAX_NONCE_LENGTH = 128
+
+
+def body_digest(body):
+    """
+    Return the hex SHA-256 digest of a request body.
+    
+    Accepts bytes, a string, or a binary file-like object, which is read in
+    chunks from its current position.
+    """
+    digest = hashlib.sha256()
+    if body is None:
+        pass
+    elif isinstance(body, str):
+        digest.update(body.encode('utf-8'))
+    elif hasattr(body, 'read'):
+        for chunk in iter(lambda: body.read(BODY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    else:
+        digest.update(body)
+    return digest.hexdigest()
+
+
+def build_string_to_sign(method, path, query_string, body_sha256, timestamp, api_key_id, nonce):
+    """Build the canonical string covered by the signature."""
+    return '\n'.join([
+        method.upper(),
+        path,
+        query_string,
+        body_sha256,
+        str(timestamp),
+        api_key_id,
+        nonce,
+    ])
+
+
+def sign_string(secret, string_to_sign):
+    """HMAC-SHA256 a canonical string with the given secret."""
+    return hmac.new(
+        secret.encode('utf-8'),
+        string_to_sign.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
 
 class HMACAuthentication(BaseAuthentication):
     """
@@ -26,6 +75,13 @@ class HMACAuthentication(BaseAuthentication):
     - X-Signature: HMAC signature
     - X-Timestamp: Unix timestamp
     - X-API-Key: API key identifier
+    - X-Nonce: Unique value per request, rejected if seen again
+    - X-Content-SHA256: Hex SHA-256 of the body (optional)
+    
+    Keys are resolved from ``APISigningKey`` rows through ``SigningKeyCache``,
+    falling back to ``settings.API_SIGNING_KEYS``. When the client sends the
+    body digest, the signature is checked against it before the body is
+    hashed, so forged requests are rejected without reading large payloads.
     """
     
     def authenticate(self, request):
@@ -35,6 +91,8 @@ class HMACAuthentication(BaseAuthentication):
         signature = request.META.get('HTTP_X_SIGNATURE')
         timestamp = request.META.get('HTTP_X_TIMESTAMP')
         api_key_id = request.META.get('HTTP_X_API_KEY')
+        nonce = request.META.get('HTTP_X_NONCE')
+        claimed_digest = request.META.get('HTTP_X_CONTENT_SHA256')
         
         if not all([signature, timestamp, api_key_id]):
             return None  # Let other authentication methods handle it
@@ -44,6 +102,9 @@ class HMACAuthentication(BaseAuthentication):
         except ValueError:
             raise exceptions.AuthenticationFailed('Invalid timestamp format')
         
+        if not nonce or len(nonce) > MAX_NONCE_LENGTH:
+            raise exceptions.AuthenticationFailed('Missing or invalid request nonce')
+        
         # Check timestamp freshness (prevent replay attacks)
         current_time = int(time.time())
         max_age = getattr(settings, 'HMAC_MAX_AGE', 300)  # 5 minutes default
@@ -51,25 +112,65 @@ class HMACAuthentication(BaseAuthentication):
         if abs(current_time - timestamp) > max_age:
             raise exceptions.AuthenticationFailed('Request timestamp too old')
         
-        # Get API key and secret from settings or database
-        api_keys = getattr(settings, 'API_SIGNING_KEYS', {})
-        if api_key_id not in api_keys:
-            raise exceptions.AuthenticationFailed('Invalid API key')
-        
-        secret = api_keys[api_key_id]['secret']
-        user_id = api_keys[api_key_id].get('user_id')
+        key = self.get_signing_key(api_key_id)
         
         # Generate expected signature
         expected_signature = self.generate_signature(
-            request, secret, timestamp, api_key_id
+            request, key['secret'], timestamp, api_key_id, nonce, body_sha256=claimed_digest
         )
         
         # Compare signatures securely
         if not hmac.compare_digest(signature, expected_signature):
             raise exceptions.AuthenticationFailed('Invalid signature')
         
-        # Get user if specified
+        if claimed_digest and not hmac.compare_digest(claimed_digest, body_digest(self._get_body(request))):
+            raise exceptions.AuthenticationFailed('Body digest mismatch')
+        
+        # Only the first request carrying a nonce inside the timestamp window is accepted
+        if not cache.add(f"hmac_nonce:{api_key_id}:{nonce}", 1, timeout=2 * max_age + 1):
+            raise exceptions.AuthenticationFailed('Request nonce already used')
+        
+        if key.get('stored'):
+            self._record_usage(api_key_id)
+        
+        return (key['user'], {'api_key_id': api_key_id, 'timestamp': timestamp, 'nonce': nonce})
+    
+    def get_signing_key(self, api_key_id):
+        """
+        Resolve a key identifier to its secret and user, using the cache.
+        """
+        key = SigningKeyCache.get(api_key_id)
+        if key is None:
+            key = self._load_signing_key(api_key_id)
+            SigningKeyCache.set(api_key_id, key)
+        
+        if key['expires_at'] is not None and key['expires_at'] <= time.time():
+            raise exceptions.AuthenticationFailed('API key expired')
+        if key['user'] is not None and not key['user'].is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted')
+        return key
+    
+    def _load_signing_key(self, api_key_id):
+        """Load a key from the database or the static settings."""
+        from booking.models import APISigningKey
+        
+        stored = APISigningKey.objects.select_related('user').filter(
+            key_id=api_key_id, is_active=True
+        ).first()
+        if stored is not None:
+            return {
+                'secret': stored.secret,
+                'user': stored.user,
+                'expires_at': stored.expires_at.timestamp() if stored.expires_at else None,
+                'stored': True,
+            }
+        
+        api_keys = getattr(settings, 'API_SIGNING_KEYS', {})
+        if api_key_id not in api_keys:
+            raise exceptions.AuthenticationFailed('Invalid API key')
+        
         user = None
+        user_id = api_keys[api_key_id].get('user_id')
         if user_id:
             from django.contrib.auth.models import User
             try:
@@ -77,9 +178,27 @@ class HMACAuthentication(BaseAuthentication):
             except User.DoesNotExist:
                 raise exceptions.AuthenticationFailed('User not found')
         
-        return (user, {'api_key_id': api_key_id, 'timestamp': timestamp})
+        return {
+            'secret': api_keys[api_key_id]['secret'],
+            'user': user,
+            'expires_at': None,
+            'stored': False,
+        }
     
-    def generate_signature(self, request, secret, timestamp, api_key_id):
+    def _record_usage(self, api_key_id):
+        """Stamp ``last_used_at``, at most once per interval per key."""
+        from booking.models import APISigningKey
+        
+        interval = getattr(settings, 'HMAC_KEY_USAGE_INTERVAL', 60)
+        if cache.add(f"hmac_key_used:{api_key_id}", 1, timeout=interval):
+            APISigningKey.objects.filter(key_id=api_key_id).update(last_used_at=timezone.now())
+    
+    @staticmethod
+    def _get_body(request):
+        body = getattr(request, 'body', b'')
+        return body if body is not None else b''
+    
+    def generate_signature(self, request, secret, timestamp, api_key_id, nonce='', body_sha256=None):
         """
         Generate HMAC signature for the request.
         
@@ -87,61 +206,47 @@ class HMACAuthentication(BaseAuthentication):
         - HTTP method
         - Request path
         - Query parameters (sorted)
-        - Request body
+        - SHA-256 digest of the request body
         - Timestamp
         - API key ID
-        """
-        method = request.method.upper()
-        path = request.path
+        - Nonce
         
+        ``body_sha256`` is used in place of hashing the body when given.
+        """
         # Sort query parameters for consistent signing
         query_params = sorted(request.GET.items()) if request.GET else []
         query_string = urlencode(query_params)
         
-        # Get request body
-        body = getattr(request, 'body', b'')
-        if isinstance(body, str):
-            body = body.encode('utf-8')
-        
-        # Create signature payload
-        payload_parts = [
-            method,
-            path,
-            query_string,
-            base64.b64encode(body).decode('utf-8'),
-            str(timestamp),
-            api_key_id
-        ]
+        if body_sha256 is None:
+            body_sha256 = body_digest(self._get_body(request))
         
-        payload = '\n'.join(payload_parts)
-        
-        # Generate HMAC
-        signature = hmac.new(
-            secret.encode('utf-8'),
-            payload.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        
-        return signature
+        string_to_sign = build_string_to_sign(
+            request.method, request.path, query_string, body_sha256, timestamp, api_key_id, nonce
+        )
+        return sign_string(secret, string_to_sign)
 
 
-def generate_client_signature(method, url, body=None, api_key_id=None, secret=None, timestamp=None):
+def generate_client_signature(method, url, body=None, api_key_id=None, secret=None, timestamp=None, nonce=None):
     """
     Helper function to generate signature on client side.
     
     Args:
         method: HTTP method (GET, POST, etc.)
         url: Full URL including query parameters
-        body: Request body (bytes or string)
+        body: Request body (bytes, string or binary file; a file is read to
+            the end and must be rewound before sending)
         api_key_id: API key identifier
         secret: API secret key
         timestamp: Unix timestamp (optional, will use current time)
+        nonce: Unique request value (optional, generated if omitted)
     
     Returns:
         dict: Headers to include in request
     """
     if timestamp is None:
         timestamp = int(time.time())
+    if nonce is None:
+        nonce = secrets.token_hex(16)
     
     from urllib.parse import urlparse, parse_qs
     
@@ -159,35 +264,17 @@ def generate_client_signature(method, url, body=None, api_key_id=None, secret=No
     query_params.sort()
     query_string = urlencode(query_params)
     
-    # Prepare body
-    if body is None:
-        body = b''
-    elif isinstance(body, str):
-        body = body.encode('utf-8')
-    
-    # Create signature payload
-    payload_parts = [
-        method.upper(),
-        path,
-        query_string,
-        base64.b64encode(body).decode('utf-8'),
-        str(timestamp),
-        api_key_id
-    ]
-    
-    payload = '\n'.join(payload_parts)
-    
-    # Generate signature
-    signature = hmac.new(
-        secret.encode('utf-8'),
-        payload.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
+    body_sha256 = body_digest(body)
+    string_to_sign = build_string_to_sign(
+        method, path, query_string, body_sha256, timestamp, api_key_id, nonce
+    )
     
     return {
-        'X-Signature': signature,
+        'X-Signature': sign_string(secret, string_to_sign),
         'X-Timestamp': str(timestamp),
         'X-API-Key': api_key_id,
+        'X-Nonce': nonce,
+        'X-Content-SHA256': body_sha256,
         'Content-Type': 'application/json'
     }
 
@@ -265,21 +352,20 @@ class HMACSignatureMixin:
 
 
 # Example usage in views
-def create_signing_keys_for_user(user, key_name="default"):
+def create_signing_keys_for_user(user, key_name="default", expires_in_days=None):
     """
     Create API signing keys for a user.
     This would typically be done through an admin interface.
     """
-    import secrets
+    from booking.models import APISigningKey
     
-    api_key_id = f"labitory_{user.id}_{int(time.time())}"
-    secret = secrets.token_urlsafe(32)
+    key = APISigningKey.generate(user, name=key_name, expires_in_days=expires_in_days)
     
-    # In production, store these in database or secure configuration
-    # For now, return them for manual configuration
+    # Return the secret so it can be configured on the client
     return {
-        'api_key_id': api_key_id,
-        'secret': secret,
+        'api_key_id': key.key_id,
+        'secret': key.secret,
         'user_id': user.id,
-        'created_at': timezone.now().isoformat()
-    }
\ No newline at end of file
+        'created_at': key.created_at.isoformat(),
+        'expires_at': key.expires_at.isoformat() if key.expires_at else None,
+    }
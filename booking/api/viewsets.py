@@ -12,6 +12,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from ..models import (
     UserProfile, Resource, Booking, ApprovalRule, Maintenance, 
@@ -21,6 +22,7 @@ from ..serializers import (
     UserProfileSerializer, ResourceSerializer, BookingSerializer, 
     ApprovalRuleSerializer, MaintenanceSerializer, WaitingListEntrySerializer
 )
+from ..services.bulk_booking_service import bulk_booking_service
 from ..utils.security_utils import APIRateLimitMixin
 from ..views.modules.api import (
     IsOwnerOrManagerPermission, IsManagerPermission, IsManagerOrReadOnly, CanViewResourceCalendar
@@ -170,7 +172,7 @@ class BookingViewSet(APIRateLimitMixin, viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter bookings based on user role and query parameters."""
         user = self.request.user
-        queryset = Booking.objects.select_related('resource', 'user', 'approved_by')
+        queryset = Booking.objects.with_related()
         
         try:
             user_profile = user.userprofile
@@ -194,15 +196,27 @@ class BookingViewSet(APIRateLimitMixin, viewsets.ModelViewSet):
             try:
                 resource_id = int(resource_filter)
                 # Get all bookings for this resource (not just user's own bookings)
-                queryset = Booking.objects.filter(
-                    resource_id=resource_id
-                ).select_related('resource', 'user', 'approved_by')
+                queryset = Booking.objects.filter(resource_id=resource_id)
             except ValueError:
                 return Response({'error': 'Invalid resource ID'}, status=400)
         else:
             # If no resource specified, fall back to user's own bookings
             queryset = self.get_queryset()
         
+        # FullCalendar sends the visible range; only load bookings inside it
+        try:
+            start = parse_datetime(request.query_params.get('start', ''))
+            end = parse_datetime(request.query_params.get('end', ''))
+        except ValueError:
+            start = end = None
+        if start and end:
+            start, end = (
+                timezone.make_aware(value) if timezone.is_naive(value) else value
+                for value in (start, end)
+            )
+            queryset = queryset.overlapping(start, end)
+        queryset = queryset.for_calendar()
+        
         # Convert to FullCalendar event format
         events = []
         for booking in queryset:
@@ -412,6 +426,41 @@ class BookingViewSet(APIRateLimitMixin, viewsets.ModelViewSet):
         serializer = self.get_serializer(booking)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Approve, reject or cancel many bookings in one request."""
+        bulk_action = request.data.get('action')
+        booking_ids = request.data.get('booking_ids') or []
+
+        if bulk_action not in bulk_booking_service.ACTIONS:
+            return Response(
+                {"error": "action must be one of: approve, reject, cancel"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(booking_ids, list) or not booking_ids:
+            return Response(
+                {"error": "booking_ids must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = bulk_booking_service.execute(
+                request.user, bulk_action, booking_ids, notes=request.data.get('notes', '')
+            )
+        except PermissionError:
+            return Response(
+                {"error": "Permission denied"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        log_security_event(
+            request.user, f'booking_bulk_{bulk_action}',
+            f'{len(result["updated"])} bookings {bulk_action} via bulk API',
+            request, {'booking_ids': result['updated']}
+        )
+
+        return Response(result)
+
 
 class ApprovalRuleViewSet(APIRateLimitMixin, viewsets.ModelViewSet):
     """ViewSet for approval rules with rate limiting."""
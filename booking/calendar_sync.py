@@ -8,11 +8,16 @@ for integration with external calendar applications like Outlook, Google Calenda
 
 from datetime import datetime, timedelta
 from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils import timezone
 from django.urls import reverse
-from django.contrib.sites.models import Site
+from django.db import transaction
 import uuid
+import calendar
 import hashlib
+import hmac
+import secrets
 
 
 class ICSCalendarGenerator:
@@ -27,6 +32,7 @@ class ICSCalendarGenerator:
         if self.request:
             return self.request.build_absolute_uri('/')[:-1]  # Remove trailing slash
         try:
+            from django.contrib.sites.models import Site
             site = Site.objects.get_current()
             return f"https://{site.domain}"
         except:
@@ -34,6 +40,10 @@ class ICSCalendarGenerator:
     
     def generate_user_calendar(self, user, include_past=False, days_ahead=90):
         """Generate ICS calendar for a specific user's bookings."""
+        return self.get_user_feed(user, include_past, days_ahead).render()
+    
+    def get_user_feed(self, user, include_past=False, days_ahead=90):
+        """Build a cacheable feed of a specific user's bookings."""
         from .models import Booking
         
         # Get user's bookings
@@ -50,10 +60,15 @@ class ICSCalendarGenerator:
         end_date = now + timedelta(days=days_ahead)
         bookings_qs = bookings_qs.filter(start_time__lte=end_date)
         
-        return self._generate_ics(bookings_qs, f"My Labitory Bookings - {user.get_full_name()}")
+        return ICSFeed(self, bookings_qs, None, f"My Labitory Bookings - {user.get_full_name()}",
+                       key=f"user:{user.pk}:{int(include_past)}:{days_ahead}")
     
     def generate_resource_calendar(self, resource, days_ahead=90, include_maintenance=True):
         """Generate ICS calendar for a specific resource's bookings and maintenance."""
+        return self.get_resource_feed(resource, days_ahead, include_maintenance).render()
+    
+    def get_resource_feed(self, resource, days_ahead=90, include_maintenance=True):
+        """Build a cacheable feed of a specific resource's bookings and maintenance."""
         from .models import Booking, Maintenance
         
         # Get resource's bookings
@@ -65,7 +80,7 @@ class ICSCalendarGenerator:
             status__in=['confirmed', 'pending'],
             start_time__gte=now,
             start_time__lte=end_date
-        ).select_related('user').order_by('start_time')
+        ).select_related('resource', 'user').order_by('start_time')
         
         # Get maintenance periods if requested
         maintenance_qs = None
@@ -74,13 +89,10 @@ class ICSCalendarGenerator:
                 resource=resource,
                 start_time__gte=now,
                 start_time__lte=end_date
-            ).select_related('created_by').order_by('start_time')
+            ).select_related('resource', 'created_by').order_by('start_time')
         
-        return self._generate_ics_with_maintenance(
-            bookings_qs, 
-            maintenance_qs, 
-            f"{resource.name} - Labitory"
-        )
+        return ICSFeed(self, bookings_qs, maintenance_qs, f"{resource.name} - Labitory",
+                       key=f"resource:{resource.pk}:{days_ahead}:{int(include_maintenance)}")
     
     def _generate_ics(self, bookings_qs, calendar_name):
         """Generate the actual ICS content."""
@@ -88,7 +100,11 @@ class ICSCalendarGenerator:
     
     def _generate_ics_with_maintenance(self, bookings_qs, maintenance_qs, calendar_name):
         """Generate ICS content with both bookings and maintenance."""
-        lines = [
+        return ICSFeed(self, bookings_qs, maintenance_qs, calendar_name).render()
+    
+    def _calendar_header(self, calendar_name):
+        """Return the VCALENDAR header lines."""
+        return [
             "BEGIN:VCALENDAR",
             "VERSION:2.0",
             "PRODID:-//Labitory//Calendar Sync//EN",
@@ -99,20 +115,34 @@ class ICSCalendarGenerator:
             "X-WR-TIMEZONE:UTC",
             "X-PUBLISHED-TTL:PT1H",  # Refresh every hour
         ]
-        
-        # Add booking events
-        if bookings_qs:
-            for booking in bookings_qs:
-                lines.extend(self._booking_to_vevent(booking))
-        
-        # Add maintenance events
-        if maintenance_qs:
-            for maintenance in maintenance_qs:
-                lines.extend(self._maintenance_to_vevent(maintenance))
-        
-        lines.append("END:VCALENDAR")
-        
-        return "\r\n".join(lines)
+    
+    def _cached_vevents(self, kind, queryset, rows, render):
+        """
+        Assemble VEVENT lines for ``rows`` of ``(id, updated_at)``.
+        
+        Blocks are read from ICSFeedCache in one round trip; only items that
+        are missing or stale are loaded and rendered.
+        """
+        from .utils.cache_utils import ICSFeedCache
+        
+        stamps = {pk: updated_at.isoformat() for pk, updated_at in rows}
+        blocks = ICSFeedCache.get_blocks(kind, stamps, self.domain)
+        
+        missing = [pk for pk in stamps if pk not in blocks]
+        if missing:
+            stale_qs = queryset.filter(pk__in=missing)
+            if kind == 'booking':
+                stale_qs = stale_qs.prefetch_related('attendees')
+            fresh = {obj.pk: render(obj) for obj in stale_qs}
+            ICSFeedCache.set_blocks(
+                kind, {pk: (stamps[pk], lines) for pk, lines in fresh.items()}, self.domain
+            )
+            blocks.update(fresh)
+        
+        lines = []
+        for pk, _ in rows:
+            lines.extend(blocks.get(pk, []))
+        return lines
     
     def _booking_to_vevent(self, booking):
         """Convert a booking to VEVENT format."""
@@ -137,9 +167,10 @@ class ICSCalendarGenerator:
         if booking.description:
             description_parts.append(f"Notes: {booking.description}")
         
-        if booking.attendees.exists():
-            attendees = ", ".join([a.user.get_full_name() for a in booking.attendees.all()])
-            description_parts.append(f"Attendees: {attendees}")
+        # Uses the prefetched attendee list when the feed loaded one
+        attendees = [a.get_full_name() or a.username for a in booking.attendees.all()]
+        if attendees:
+            description_parts.append(f"Attendees: {', '.join(attendees)}")
         
         description = "\\n".join(description_parts)
         
@@ -148,8 +179,8 @@ class ICSCalendarGenerator:
         description = self._escape_ics_text(description)
         location = self._escape_ics_text(booking.resource.location)
         
-        # Generate timestamp
-        dtstamp = timezone.now().astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        # Stamp with the last modification so cached blocks stay byte-identical
+        dtstamp = (booking.updated_at or timezone.now()).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         
         # Build VEVENT
         vevent = [
@@ -230,8 +261,8 @@ class ICSCalendarGenerator:
         description = self._escape_ics_text(description)
         location = self._escape_ics_text(maintenance.resource.location)
         
-        # Generate timestamp
-        dtstamp = timezone.now().astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        # Stamp with the last modification so cached blocks stay byte-identical
+        dtstamp = (maintenance.updated_at or timezone.now()).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         
         # Build VEVENT
         vevent = [
@@ -324,33 +355,199 @@ class ICSCalendarGenerator:
         return "\r\n".join(lines)
 
 
-class CalendarTokenGenerator:
-    """Generate secure tokens for calendar subscriptions."""
+class ICSFeed:
+    """
+    A calendar feed assembled from cached VEVENT blocks.
     
-    @staticmethod
-    def generate_user_token(user):
-        """Generate a secure token for a user's calendar feed."""
-        # Create a hash based on user ID, username, and a secret
-        secret_string = f"{user.id}-{user.username}-{user.date_joined}-labitory-calendar"
-        return hashlib.sha256(secret_string.encode()).hexdigest()[:32]
+    The only query needed to identify the feed's content is a ``(id,
+    updated_at)`` listing per item type, which also yields the ETag and
+    Last-Modified validators. Full rows are loaded only for items whose
+    cached block is missing or stale.
     
-    @staticmethod
-    def verify_user_token(user, token):
-        """Verify a calendar token for a user."""
-        expected_token = CalendarTokenGenerator.generate_user_token(user)
-        return token == expected_token
+    ``key`` identifies the feed across requests, so that items leaving it
+    also move Last-Modified forward.
+    """
     
-    @staticmethod
-    def generate_resource_token(resource):
-        """Generate a secure token for a resource's calendar feed."""
-        secret_string = f"{resource.id}-{resource.name}-{resource.created_at}-labitory-resource"
-        return hashlib.sha256(secret_string.encode()).hexdigest()[:32]
+    def __init__(self, generator, bookings_qs, maintenance_qs, calendar_name, key=None):
+        self.generator = generator
+        self.bookings_qs = bookings_qs
+        self.maintenance_qs = maintenance_qs
+        self.calendar_name = calendar_name
+        self.key = key
+        self._rows = None
+    
+    @property
+    def rows(self):
+        """``(kind, queryset, [(id, updated_at), ...])`` for each item type."""
+        if self._rows is None:
+            self._rows = []
+            if self.bookings_qs is not None:
+                self._rows.append(('booking', self.bookings_qs,
+                                   list(self.bookings_qs.values_list('id', 'updated_at'))))
+            if self.maintenance_qs is not None:
+                self._rows.append(('maintenance', self.maintenance_qs,
+                                   list(self.maintenance_qs.values_list('id', 'updated_at'))))
+        return self._rows
     
+    @property
+    def etag(self):
+        """Strong validator covering the feed's items, name and domain."""
+        digest = hashlib.md5(f"{self.calendar_name}|{self.generator.domain}".encode())
+        for kind, _, rows in self.rows:
+            for pk, updated_at in rows:
+                digest.update(f"|{kind}:{pk}:{updated_at.isoformat()}".encode())
+        return f'"{digest.hexdigest()}"'
+    
+    @property
+    def last_modified(self):
+        """
+        Latest ``updated_at`` of any item in the feed, moved forward to the
+        last time an item joined or left it. None for an empty, unkeyed feed.
+        """
+        stamps = [updated_at for _, _, rows in self.rows for _, updated_at in rows]
+        if self.key is not None:
+            from .utils.cache_utils import ICSFeedCache
+            
+            membership = hashlib.md5()
+            for kind, _, rows in self.rows:
+                for pk in sorted(pk for pk, _ in rows):
+                    membership.update(f"|{kind}:{pk}".encode())
+            stamps.append(ICSFeedCache.membership_changed_at(
+                self.key, membership.hexdigest(), timezone.now()
+            ))
+        return max(stamps) if stamps else None
+    
+    def render(self):
+        """Return the ICS content for the feed."""
+        renderers = {
+            'booking': self.generator._booking_to_vevent,
+            'maintenance': self.generator._maintenance_to_vevent,
+        }
+        lines = self.generator._calendar_header(self.calendar_name)
+        for kind, queryset, rows in self.rows:
+            lines.extend(self.generator._cached_vevents(kind, queryset, rows, renderers[kind]))
+        lines.append("END:VCALENDAR")
+        
+        return "\r\n".join(lines)
+
+
+class CalendarTokenGenerator:
+    """
+    Issue, verify, rotate and revoke calendar feed tokens.
+
+    Tokens are random strings stored in CalendarFeedToken, so resolving a
+    feed URL is a single indexed lookup rather than hashing every user.
+    Tokens made by the old derived-hash scheme were imported as legacy rows
+    by migration 0028 and keep working until the owner rotates them.
+    """
+
+    # Avoid a write on every feed poll
+    LAST_USED_RESOLUTION = timedelta(minutes=15)
+
+    @staticmethod
+    def _new_token():
+        return secrets.token_urlsafe(32)
+
     @staticmethod
-    def verify_resource_token(resource, token):
+    def _active_tokens(scope, subject):
+        from .models import CalendarFeedToken
+        return CalendarFeedToken.objects.filter(
+            scope=scope, revoked_at__isnull=True, **{scope: subject}
+        )
+
+    @classmethod
+    def _get_or_create(cls, scope, subject):
+        from .models import CalendarFeedToken
+        # Prefer a freshly issued token over an imported legacy one
+        existing = cls._active_tokens(scope, subject).order_by('is_legacy', '-created_at').first()
+        if existing:
+            return existing.token
+        return CalendarFeedToken.objects.create(
+            scope=scope, token=cls._new_token(), **{scope: subject}
+        ).token
+
+    @classmethod
+    def _rotate(cls, scope, subject):
+        from .models import CalendarFeedToken
+        with transaction.atomic():
+            cls._active_tokens(scope, subject).update(revoked_at=timezone.now())
+            return CalendarFeedToken.objects.create(
+                scope=scope, token=cls._new_token(), **{scope: subject}
+            ).token
+
+    @classmethod
+    def _resolve(cls, scope, token):
+        """Return the active CalendarFeedToken for ``token``, or None."""
+        from .models import CalendarFeedToken
+
+        if not token or len(token) > 64:
+            return None
+        feed_token = CalendarFeedToken.objects.select_related(scope).filter(
+            token=token, scope=scope, revoked_at__isnull=True
+        ).first()
+        if feed_token is None or not hmac.compare_digest(feed_token.token, token):
+            return None
+
+        now = timezone.now()
+        if feed_token.last_used_at is None or now - feed_token.last_used_at > cls.LAST_USED_RESOLUTION:
+            CalendarFeedToken.objects.filter(pk=feed_token.pk).update(last_used_at=now)
+        return feed_token
+
+    @classmethod
+    def generate_user_token(cls, user):
+        """Return the user's active calendar feed token, issuing one if needed."""
+        return cls._get_or_create('user', user)
+
+    @classmethod
+    def rotate_user_token(cls, user):
+        """Revoke the user's feed tokens and issue a new one."""
+        return cls._rotate('user', user)
+
+    @classmethod
+    def revoke_user_token(cls, user):
+        """Revoke every feed token for the user. Returns the number revoked."""
+        return cls._active_tokens('user', user).update(revoked_at=timezone.now())
+
+    @classmethod
+    def resolve_user_token(cls, token):
+        """Return the active user for a feed token, or None."""
+        feed_token = cls._resolve('user', token)
+        if feed_token is None or not feed_token.user.is_active:
+            return None
+        return feed_token.user
+
+    @classmethod
+    def verify_user_token(cls, user, token):
+        """Verify a calendar token for a user."""
+        resolved = cls.resolve_user_token(token)
+        return resolved is not None and resolved.pk == user.pk
+
+    @classmethod
+    def generate_resource_token(cls, resource):
+        """Return the resource's active calendar feed token, issuing one if needed."""
+        return cls._get_or_create('resource', resource)
+
+    @classmethod
+    def rotate_resource_token(cls, resource):
+        """Revoke the resource's feed tokens and issue a new one."""
+        return cls._rotate('resource', resource)
+
+    @classmethod
+    def revoke_resource_token(cls, resource):
+        """Revoke every feed token for the resource. Returns the number revoked."""
+        return cls._active_tokens('resource', resource).update(revoked_at=timezone.now())
+
+    @classmethod
+    def resolve_resource_token(cls, token):
+        """Return the resource for a feed token, or None."""
+        feed_token = cls._resolve('resource', token)
+        return feed_token.resource if feed_token else None
+
+    @classmethod
+    def verify_resource_token(cls, resource, token):
         """Verify a calendar token for a resource."""
-        expected_token = CalendarTokenGenerator.generate_resource_token(resource)
-        return token == expected_token
+        resolved = cls.resolve_resource_token(token)
+        return resolved is not None and resolved.pk == resource.pk
 
 
 def create_ics_response(ics_content, filename="calendar.ics"):
@@ -367,4 +564,27 @@ def create_ics_feed_response(ics_content):
     response = HttpResponse(ics_content, content_type='text/calendar; charset=utf-8')
     response['Cache-Control'] = 'public, max-age=3600'  # Cache for 1 hour
     response['Access-Control-Allow-Origin'] = '*'
-    return response
\ No newline at end of file
+    return response
+
+
+def create_conditional_ics_feed_response(request, feed):
+    """
+    Create a feed response for an ICSFeed, honouring conditional GETs.
+    
+    Returns 304 Not Modified when the client's ETag or Last-Modified still
+    matches, in which case the feed is never rendered.
+    """
+    last_modified = feed.last_modified
+    last_modified_ts = calendar.timegm(last_modified.utctimetuple()) if last_modified else None
+    etag = feed.etag
+    
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+    if response is None:
+        response = create_ics_feed_response(feed.render())
+    else:
+        response['Cache-Control'] = 'public, max-age=3600'
+    
+    response['ETag'] = etag
+    if last_modified_ts is not None:
+        response['Last-Modified'] = http_date(last_modified_ts)
+    return response
@@ -8,7 +8,7 @@ interfaces for resolving them through various strategies.
 from datetime import datetime, timedelta
 from django.db.models import Q
 from django.utils import timezone
-from .models import Booking, Resource, Maintenance
+from .models import Booking, Resource, Maintenance, MaintenanceBlock
 
 
 class BookingConflict:
@@ -140,16 +140,14 @@ class ConflictDetector:
         """
         conflicts = []
         
-        # Find overlapping maintenance for the same resource
-        overlapping_maintenance = Maintenance.objects.filter(
-            resource=booking.resource,
-            blocks_booking=True,
-            start_time__lt=booking.end_time,
-            end_time__gt=booking.start_time
-        )
+        # Find maintenance blocking this resource, including maintenance on
+        # other resources that also takes this one down
+        blocks = MaintenanceBlock.objects.for_resource(booking.resource).overlapping(
+            booking.start_time, booking.end_time
+        ).select_related('maintenance')
         
-        for maintenance in overlapping_maintenance:
-            conflict = MaintenanceConflict(booking, maintenance)
+        for block in blocks:
+            conflict = MaintenanceConflict(booking, block.maintenance)
             conflicts.append(conflict)
         
         return conflicts
@@ -25,6 +25,7 @@ from ..models import (
     TwoFactorAuthentication, TwoFactorSession
 )
 from ..utils.email import get_logo_base64, get_email_branding_context
+from ..services.hierarchy_service import hierarchy_service
 
 
 
@@ -104,13 +105,24 @@ class UserRegistrationForm(EnhancedUserCreationForm):
         for field_name, field in self.fields.items():
             field.widget.attrs.update({'class': 'form-control'})
         
-        # Set up dynamic choices for college and department
+        # Set up dynamic choices for college and department. Options are
+        # rendered from the cached hierarchy tree; the querysets are only
+        # evaluated to validate a submitted choice.
+        self.fields['faculty'].choices = hierarchy_service.choices(
+            hierarchy_service.faculties(active_only=True), self.fields['faculty'].empty_label
+        )
+        self.fields['college'].choices = [('', self.fields['college'].empty_label)]
+        self.fields['department'].choices = [('', self.fields['department'].empty_label)]
+        
         if 'faculty' in self.data:
             try:
                 faculty_id = int(self.data.get('faculty'))
                 self.fields['college'].queryset = College.objects.filter(
                     faculty_id=faculty_id, is_active=True
                 ).order_by('name')
+                self.fields['college'].choices = hierarchy_service.choices(
+                    hierarchy_service.colleges(faculty_id, active_only=True), self.fields['college'].empty_label
+                )
             except (ValueError, TypeError):
                 pass
         
@@ -120,6 +132,9 @@ class UserRegistrationForm(EnhancedUserCreationForm):
                 self.fields['department'].queryset = Department.objects.filter(
                     college_id=college_id, is_active=True
                 ).order_by('name')
+                self.fields['department'].choices = hierarchy_service.choices(
+                    hierarchy_service.departments(college_id, active_only=True), self.fields['department'].empty_label
+                )
             except (ValueError, TypeError):
                 pass
 
@@ -298,16 +313,27 @@ class UserProfileForm(forms.ModelForm):
         # All validation is now handled in clean methods, so no need to set required here
         # JavaScript will handle show/hide of fields dynamically
         
-        # Set up dynamic choices for college and department
-        if self.instance and self.instance.pk and self.instance.faculty:
+        # Set up dynamic choices for college and department. Options are
+        # rendered from the cached hierarchy tree; the querysets are only
+        # evaluated to validate a submitted choice.
+        faculties = hierarchy_service.faculties()
+        colleges = hierarchy_service.colleges()
+        departments = hierarchy_service.departments()
+        if self.instance and self.instance.pk and self.instance.faculty_id:
             self.fields['college'].queryset = College.objects.filter(
-                faculty=self.instance.faculty, is_active=True
+                faculty_id=self.instance.faculty_id, is_active=True
             ).order_by('name')
+            colleges = hierarchy_service.colleges(self.instance.faculty_id, active_only=True)
             
-            if self.instance.college:
+            if self.instance.college_id:
                 self.fields['department'].queryset = Department.objects.filter(
-                    college=self.instance.college, is_active=True
+                    college_id=self.instance.college_id, is_active=True
                 ).order_by('name')
+                departments = hierarchy_service.departments(self.instance.college_id, active_only=True)
+        
+        for field_name, nodes in (('faculty', faculties), ('college', colleges), ('department', departments)):
+            field = self.fields[field_name]
+            field.choices = hierarchy_service.choices(nodes, field.empty_label)
     
     def clean_first_name(self):
         first_name = self.cleaned_data.get('first_name', '').strip()
@@ -8,6 +8,7 @@ Licensed under the MIT License - see LICENSE file for details.
 """
 
 from django import forms
+from django.contrib.auth.models import User
 from django.utils import timezone
 
 from ..models import (
@@ -297,6 +298,20 @@ class IssueFilterForm(forms.Form):
                               widget=forms.Select(attrs={'class': 'form-control'}))
     priority = forms.ChoiceField(required=False, 
                                widget=forms.Select(attrs={'class': 'form-control'}))
+    resource = forms.ModelChoiceField(queryset=Resource.objects.all(), required=False,
+                                      empty_label='All Resources',
+                                      widget=forms.Select(attrs={'class': 'form-control'}))
+    severity = forms.ChoiceField(choices=[('', 'All Severities')] + ResourceIssue.SEVERITY_CHOICES,
+                                 required=False, widget=forms.Select(attrs={'class': 'form-control'}))
+    category = forms.ChoiceField(choices=[('', 'All Categories')] + ResourceIssue.CATEGORY_CHOICES,
+                                 required=False, widget=forms.Select(attrs={'class': 'form-control'}))
+    assigned_to = forms.ModelChoiceField(
+        queryset=User.objects.filter(userprofile__role__in=['technician', 'sysadmin']).order_by('username'),
+        required=False, empty_label='Anyone',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    is_overdue = forms.BooleanField(required=False, label='Overdue only',
+                                    widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}))
 
 
 class ResourceChecklistConfigForm(forms.Form):
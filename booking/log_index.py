@@ -0,0 +1,378 @@
+# booking/log_index.py
+"""
+Incremental index of system logs for the log viewer.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+
+Log files are tailed by byte offset and parsed entries are stored in a
+SQLite database, so the viewer queries an index instead of re-reading
+files on every request:
+
+- entries are partitioned by month into ``<partition>_entries`` tables
+  indexed on time, level and source, each with an FTS5 table over the
+  message and source for full-text search;
+- every source keeps its file inode and offset (or journal cursor), so an
+  ingest run reads only what was appended since the last one. A changed
+  inode means the file was rotated: the rest of the old file is read
+  from its rotated name before the new file is started from the top;
+- partitions older than the retention period are dropped whole.
+"""
+
+import glob
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Bytes read, parsed and inserted at a time, so a large backlog never sits in memory at once
+READ_CHUNK_BYTES = 32 * 1024 * 1024
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+class LogIndex:
+    """SQLite-backed, month-partitioned store of parsed log entries."""
+
+    def __init__(self, path: str, retention_days: int = 90,
+                 backfill_bytes: int = 16 * 1024 * 1024, backfill_hours: int = 24):
+        self.path = str(path)
+        self.retention_days = retention_days
+        self.backfill_bytes = backfill_bytes
+        self.backfill_hours = backfill_hours
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the index, creating its bookkeeping tables on first use."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sources ('
+            'key TEXT PRIMARY KEY, inode INTEGER, offset INTEGER NOT NULL DEFAULT 0, '
+            'cursor TEXT, updated REAL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS partitions ('
+            'name TEXT PRIMARY KEY, start REAL NOT NULL, end REAL NOT NULL)'
+        )
+        return conn
+
+    # Partitions
+
+    @staticmethod
+    def partition_bounds(timestamp: datetime) -> Tuple[str, datetime, datetime]:
+        """Name and [start, end) of the monthly partition holding ``timestamp``."""
+        start = timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return f"p{start:%Y%m}", start, end
+
+    def _ensure_partition(self, conn: sqlite3.Connection, timestamp: datetime) -> str:
+        name, start, end = self.partition_bounds(timestamp)
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {name}_entries ('
+            'id INTEGER PRIMARY KEY, ts REAL NOT NULL, level TEXT NOT NULL, '
+            'source_key TEXT NOT NULL, source TEXT NOT NULL, message TEXT NOT NULL)'
+        )
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name}_ts ON {name}_entries (ts)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name}_level_ts ON {name}_entries (level, ts)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name}_source_ts ON {name}_entries (source_key, ts)')
+        conn.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {name}_fts USING fts5('
+            f"message, source, content='{name}_entries', content_rowid='id')"
+        )
+        conn.execute(
+            'INSERT OR IGNORE INTO partitions (name, start, end) VALUES (?, ?, ?)',
+            (name, start.timestamp(), end.timestamp())
+        )
+        return name
+
+    def _insert(self, conn: sqlite3.Connection, source_key: str, entries: Iterable) -> int:
+        """Insert LogEntry objects, grouped by partition."""
+        by_partition = {}
+        for entry in entries:
+            by_partition.setdefault(self.partition_bounds(entry.timestamp)[0], []).append(entry)
+
+        count = 0
+        for partition_entries in by_partition.values():
+            name = self._ensure_partition(conn, partition_entries[0].timestamp)
+            last_id = conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM {name}_entries').fetchone()[0]
+            conn.executemany(
+                f'INSERT INTO {name}_entries (ts, level, source_key, source, message) VALUES (?, ?, ?, ?, ?)',
+                [
+                    (e.timestamp.timestamp(), e.level.upper(), source_key, e.source, e.message)
+                    for e in partition_entries
+                ]
+            )
+            conn.execute(
+                f'INSERT INTO {name}_fts (rowid, message, source) '
+                f'SELECT id, message, source FROM {name}_entries WHERE id > ?',
+                (last_id,)
+            )
+            count += len(partition_entries)
+        return count
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Drop partitions that ended before the retention period. Returns the number dropped."""
+        cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+        conn = self.connect()
+        try:
+            names = [row[0] for row in conn.execute(
+                'SELECT name FROM partitions WHERE end <= ?', (cutoff.timestamp(),)
+            )]
+            for name in names:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute(f'DROP TABLE IF EXISTS {name}_fts')
+                conn.execute(f'DROP TABLE IF EXISTS {name}_entries')
+                conn.execute('DELETE FROM partitions WHERE name = ?', (name,))
+                conn.execute('COMMIT')
+            return len(names)
+        finally:
+            conn.close()
+
+    # Ingestion
+
+    def ingest_file(self, source_key: str, path: str,
+                    parse: Callable[[str, int], Optional[object]]) -> int:
+        """
+        Index lines appended to ``path`` since the last run.
+
+        ``parse(line, line_number)`` returns a LogEntry, or ``None`` for a
+        continuation line (e.g. a traceback), which is appended to the
+        previous entry's message. Returns the number of entries added.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return 0
+
+        conn = self.connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so concurrent runs cannot index a range twice
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT inode, offset FROM sources WHERE key = ?', (source_key,)).fetchone()
+
+            sources = []
+            if row is None:
+                offset = max(0, stat.st_size - self.backfill_bytes)
+            elif row[0] != stat.st_ino:
+                # Finish the rotated file before starting on its replacement
+                rotated = self._find_rotated(path, row[0])
+                if rotated:
+                    sources.append((rotated, row[1]))
+                offset = 0
+            elif stat.st_size < row[1]:
+                # Truncated in place (copytruncate)
+                offset = 0
+            else:
+                offset = row[1]
+            sources.append((path, offset))
+
+            count = 0
+            line_number = 0
+            # The latest entry is held back, as continuation lines may follow in the next chunk
+            pending = None
+            for source_path, start in sources:
+                for lines, end in self._read_chunks(source_path, start):
+                    entries = []
+                    for line in lines:
+                        if line.strip():
+                            entry = parse(line, line_number)
+                            if entry is not None:
+                                if pending is not None:
+                                    entries.append(pending)
+                                pending = entry
+                            elif pending is not None:
+                                pending.message += '\n' + line.rstrip()
+                        line_number += 1
+                    count += self._insert(conn, source_key, entries)
+                    if source_path == path:
+                        offset = end
+            if pending is not None:
+                count += self._insert(conn, source_key, [pending])
+            conn.execute(
+                'INSERT INTO sources (key, inode, offset, updated) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET inode = excluded.inode, offset = excluded.offset, '
+                'updated = excluded.updated',
+                (source_key, stat.st_ino, offset, datetime.now().timestamp())
+            )
+            conn.execute('COMMIT')
+            return count
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def ingest_journal(self, source_key: str, service: str,
+                       parse: Callable[[dict], Optional[object]]) -> int:
+        """Index systemd journal entries for ``service`` after the stored cursor."""
+        conn = self.connect()
+        try:
+            row = conn.execute('SELECT cursor FROM sources WHERE key = ?', (source_key,)).fetchone()
+            command = ['journalctl', '-u', service, '--no-pager', '--output=json']
+            if row and row[0]:
+                command += ['--after-cursor', row[0]]
+            else:
+                since = datetime.now() - timedelta(hours=self.backfill_hours)
+                command += ['--since', since.strftime('%Y-%m-%d %H:%M:%S')]
+
+            try:
+                result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.debug(f"journalctl unavailable for {service}: {e}")
+                return 0
+            if result.returncode != 0:
+                return 0
+
+            entries = []
+            cursor = row[0] if row else None
+            for line in result.stdout.splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                cursor = record.get('__CURSOR', cursor)
+                entry = parse(record)
+                if entry is not None:
+                    entries.append(entry)
+
+            conn.execute('BEGIN IMMEDIATE')
+            current = conn.execute('SELECT cursor FROM sources WHERE key = ?', (source_key,)).fetchone()
+            if (current[0] if current else None) != (row[0] if row else None):
+                # Another run indexed this range first
+                conn.execute('ROLLBACK')
+                return 0
+            count = self._insert(conn, source_key, entries)
+            conn.execute(
+                'INSERT INTO sources (key, cursor, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET cursor = excluded.cursor, updated = excluded.updated',
+                (source_key, cursor, datetime.now().timestamp())
+            )
+            conn.execute('COMMIT')
+            return count
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _find_rotated(path: str, inode: int) -> Optional[str]:
+        """Find the rotated copy of ``path`` that still has the old inode."""
+        for candidate in sorted(glob.glob(glob.escape(path) + '.*')):
+            try:
+                if os.stat(candidate).st_ino == inode:
+                    return candidate
+            except OSError:
+                continue
+        return None
+
+    @staticmethod
+    def _read_chunks(path: str, offset: int) -> Iterator[Tuple[List[str], int]]:
+        """
+        Complete lines from ``offset`` to the end of the file, a chunk at a
+        time, each with the offset just past its last line. A trailing
+        partial line is left for the next run.
+        """
+        with open(path, 'rb') as handle:
+            handle.seek(offset)
+            if offset:
+                # Start on a line boundary when backfilling from the middle of a file
+                handle.seek(offset - 1)
+                if handle.read(1) != b'\n':
+                    offset += len(handle.readline())
+            partial = b''
+            while True:
+                data = handle.read(READ_CHUNK_BYTES)
+                if not data:
+                    return
+                data = partial + data
+                end = data.rfind(b'\n') + 1
+                partial = data[end:]
+                if end:
+                    offset += end
+                    yield data[:end].decode('utf-8', 'replace').splitlines(), offset
+
+    # Queries
+
+    def search(self, source_key: Optional[str] = None, level: Optional[str] = None,
+               text: Optional[str] = None, since: Optional[datetime] = None,
+               until: Optional[datetime] = None, limit: int = 1000) -> List[object]:
+        """
+        Newest-first entries matching every given filter.
+
+        Only the partitions overlapping [since, until] are searched, newest
+        first, stopping once ``limit`` entries have been found. ``text``
+        matches words (or word prefixes) in the message or source.
+        """
+        from .log_viewer import LogEntry
+
+        since_ts = since.timestamp() if since else 0
+        until_ts = until.timestamp() if until else datetime.max.replace(year=9000).timestamp()
+        match = self._match_query(text) if text else None
+
+        conn = self.connect()
+        try:
+            partitions = [row[0] for row in conn.execute(
+                'SELECT name FROM partitions WHERE end > ? AND start <= ? ORDER BY start DESC',
+                (since_ts, until_ts)
+            )]
+
+            results = []
+            for name in partitions:
+                if len(results) >= limit:
+                    break
+                sql = f'SELECT e.id, e.ts, e.level, e.source, e.message FROM {name}_entries e'
+                where = ['e.ts >= ?', 'e.ts <= ?']
+                params = [since_ts, until_ts]
+                if match:
+                    sql += f' JOIN {name}_fts ON {name}_fts.rowid = e.id'
+                    where.append(f'{name}_fts MATCH ?')
+                    params.append(match)
+                if level:
+                    where.append('e.level = ?')
+                    params.append(level.upper())
+                if source_key:
+                    where.append('e.source_key = ?')
+                    params.append(source_key)
+                sql += ' WHERE ' + ' AND '.join(where) + ' ORDER BY e.ts DESC LIMIT ?'
+                params.append(limit - len(results))
+
+                for entry_id, ts, entry_level, source, message in conn.execute(sql, params):
+                    results.append(LogEntry(
+                        timestamp=datetime.fromtimestamp(ts),
+                        level=entry_level,
+                        source=source,
+                        message=message,
+                        line_number=f"{name}:{entry_id}"
+                    ))
+            return results
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _match_query(text: str) -> str:
+        """Turn free text into an FTS5 query of quoted prefix terms."""
+        terms = [term.replace('"', '""') for term in text.split()]
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def count(self) -> int:
+        """Total number of indexed entries."""
+        conn = self.connect()
+        try:
+            names = [row[0] for row in conn.execute('SELECT name FROM partitions')]
+            return sum(conn.execute(f'SELECT COUNT(*) FROM {name}_entries').fetchone()[0] for name in names)
+        finally:
+            conn.close()
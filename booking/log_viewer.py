@@ -9,9 +9,12 @@ Licensed under the MIT License - see LICENSE file for details.
 
 import os
 import re
+import sqlite3
 import subprocess
+import logging
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.core.cache import cache
 from django.contrib import admin
 from django.contrib.admin.views.main import ChangeList
 from django.http import HttpResponse, JsonResponse
@@ -22,6 +25,10 @@ from django.contrib.auth.decorators import user_passes_test
 from django.views.decorators.http import require_http_methods
 import json
 
+from .log_index import LogIndex
+
+logger = logging.getLogger(__name__)
+
 
 class LogEntry:
     """Represents a single log entry."""
@@ -51,6 +58,21 @@ class LogViewer:
     
     def __init__(self):
         self.log_sources = self._get_log_sources()
+        self._index = None
+    
+    @property
+    def index(self):
+        """The log index, or None when LOG_INDEX_ENABLED is off."""
+        if not getattr(settings, 'LOG_INDEX_ENABLED', False):
+            return None
+        path = getattr(settings, 'LOG_INDEX_PATH', None) or os.path.join(settings.BASE_DIR, 'logs', 'log_index.sqlite3')
+        if self._index is None or self._index.path != str(path):
+            self._index = LogIndex(
+                path,
+                retention_days=getattr(settings, 'LOG_INDEX_RETENTION_DAYS', 90),
+                backfill_bytes=getattr(settings, 'LOG_INDEX_BACKFILL_BYTES', 16 * 1024 * 1024),
+            )
+        return self._index
     
     def _get_log_sources(self):
         """Get all available log sources."""
@@ -237,9 +259,57 @@ class LogViewer:
     
     def get_logs(self, source=None, level=None, search=None, hours=24, max_lines=1000):
         """Get logs from specified source with filtering."""
-        logs = []
         cutoff_time = datetime.now() - timedelta(hours=hours)
         
+        index = self.index
+        if index is not None:
+            try:
+                self.refresh_index()
+                return index.search(source, level, search, since=cutoff_time, limit=max_lines)
+            except sqlite3.Error as e:
+                logger.error(f"Log index query failed, reading files directly: {e}")
+        
+        return self._read_logs(source, level, search, cutoff_time, max_lines)
+    
+    def refresh_index(self):
+        """Catch the index up with new log lines, at most once per LOG_INDEX_REFRESH_INTERVAL."""
+        interval = getattr(settings, 'LOG_INDEX_REFRESH_INTERVAL', 60)
+        if cache.add('log_index_refreshed', 1, interval):
+            self.ingest()
+    
+    def ingest(self):
+        """Index new lines from every source. Returns the number of entries added per source."""
+        index = self.index
+        if index is None:
+            return {}
+        
+        counts = {}
+        for source_key, source_config in self.log_sources.items():
+            try:
+                if source_config['type'] == 'file':
+                    counts[source_key] = index.ingest_file(
+                        source_key, source_config['path'], self._get_line_parser(source_key, source_config)
+                    )
+                elif source_config['type'] == 'systemd':
+                    counts[source_key] = index.ingest_journal(
+                        source_key, source_config['path'],
+                        lambda entry, service=source_config['path']: self._parse_journal_entry(entry, service)
+                    )
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Failed to index logs from {source_key}: {e}")
+        index.prune()
+        return counts
+    
+    def _get_line_parser(self, source_key, source_config):
+        """Line parser for a file source."""
+        if source_key == 'django_app':
+            return self._parse_django_log_line
+        return lambda line, line_number: self._parse_generic_log_line(line, line_number, source_config['name'])
+    
+    def _read_logs(self, source, level, search, cutoff_time, max_lines):
+        """Read and filter logs straight from the sources, without the index."""
+        logs = []
+        
         sources_to_read = [source] if source else list(self.log_sources.keys())
         
         for source_key in sources_to_read:
@@ -331,19 +401,12 @@ class LogViewer:
                         continue
                     
                     try:
-                        entry = json.loads(line)
-                        timestamp = datetime.fromtimestamp(int(entry.get('__REALTIME_TIMESTAMP', 0)) / 1000000)
-                        
-                        if timestamp >= cutoff_time:
-                            logs.append(LogEntry(
-                                timestamp=timestamp,
-                                level=entry.get('PRIORITY', '6') == '3' and 'ERROR' or 'INFO',
-                                source=f"systemd-{service_name}",
-                                message=entry.get('MESSAGE', ''),
-                                line_number=None
-                            ))
-                    except (json.JSONDecodeError, ValueError):
+                        log_entry = self._parse_journal_entry(json.loads(line), service_name)
+                    except json.JSONDecodeError:
                         continue
+                    
+                    if log_entry and log_entry.timestamp >= cutoff_time:
+                        logs.append(log_entry)
                         
         except Exception as e:
             logs.append(LogEntry(
@@ -355,6 +418,21 @@ class LogViewer:
         
         return logs
     
+    def _parse_journal_entry(self, entry, service_name):
+        """Parse a journalctl JSON record."""
+        try:
+            timestamp = datetime.fromtimestamp(int(entry.get('__REALTIME_TIMESTAMP', 0)) / 1000000)
+        except (TypeError, ValueError):
+            return None
+        
+        return LogEntry(
+            timestamp=timestamp,
+            level=entry.get('PRIORITY', '6') == '3' and 'ERROR' or 'INFO',
+            source=f"systemd-{service_name}",
+            message=entry.get('MESSAGE', ''),
+            line_number=None
+        )
+    
     def get_available_sources(self):
         """Get list of available log sources."""
         available = []
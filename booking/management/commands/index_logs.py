@@ -0,0 +1,28 @@
+# booking/management/commands/index_logs.py
+"""
+Management command to index new system log lines for the admin log viewer.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from ...log_viewer import log_viewer
+
+
+class Command(BaseCommand):
+    help = 'Index lines appended to the system logs since the last run'
+
+    def handle(self, *args, **options):
+        if log_viewer.index is None:
+            raise CommandError('The log index is disabled (LOG_INDEX_ENABLED is off)')
+
+        counts = log_viewer.ingest()
+        for source_key, count in sorted(counts.items()):
+            if count:
+                self.stdout.write(f'{source_key}: {count} entries')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {sum(counts.values())} log entries')
+        )
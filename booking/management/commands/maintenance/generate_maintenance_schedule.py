@@ -6,11 +6,10 @@ This command creates recommended maintenance schedules based on usage patterns,
 maintenance history, and predictive analytics.
 """
 
+from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from datetime import timedelta
-from booking.maintenance_service import maintenance_prediction_service
-from booking.models import Resource, Maintenance
+from booking.services.maintenance_schedule import maintenance_schedule_generator
+from booking.models import Resource
 
 
 class Command(BaseCommand):
@@ -38,42 +37,64 @@ class Command(BaseCommand):
             type=str,
             help='Filter by resource type'
         )
+        parser.add_argument(
+            '--created-by',
+            type=str,
+            help='Username recorded as creator of new entries (default: first superuser)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Resources to schedule per batch'
+        )
 
     def handle(self, *args, **options):
         self.stdout.write('Generating maintenance schedules...')
         
         # Get resources to schedule
         if options['resource_id']:
-            try:
-                resources = [Resource.objects.get(id=options['resource_id'])]
-            except Resource.DoesNotExist:
+            resources = Resource.objects.filter(id=options['resource_id'])
+            if not resources.exists():
                 self.stderr.write(f'Resource with ID {options["resource_id"]} not found')
                 return
         else:
             resources = Resource.objects.all()
             if options['resource_type']:
                 resources = resources.filter(resource_type__icontains=options['resource_type'])
+        resources = resources.order_by('id')
         
-        total_scheduled = 0
         months_ahead = options['months_ahead']
         create_actual = options['create_schedules']
+        created_by = None
+        if create_actual:
+            try:
+                if options['created_by']:
+                    created_by = User.objects.get(username=options['created_by'])
+                else:
+                    created_by = maintenance_schedule_generator.default_creator()
+            except (User.DoesNotExist, ValueError) as e:
+                self.stderr.write(f'Cannot create schedules: {e}')
+                return
         
-        for resource in resources:
-            self.stdout.write(f'\n--- Scheduling for {resource.name} ---')
-            
-            # Generate schedule
-            schedule = maintenance_prediction_service.generate_maintenance_schedule(
-                resource, months_ahead=months_ahead
-            )
+        result = maintenance_schedule_generator.generate(
+            resources,
+            months_ahead=months_ahead,
+            create=create_actual,
+            created_by=created_by,
+            batch_size=options['batch_size'],
+        )
+        
+        for schedule in result['schedules']:
+            self.stdout.write(f'\n--- Scheduling for {schedule["resource"].name} ---')
             
-            if not schedule:
+            if not schedule['items']:
                 self.stdout.write('  No maintenance needed based on current patterns')
                 continue
             
             # Display schedule
-            self.stdout.write(f'  Generated {len(schedule)} maintenance items:')
+            self.stdout.write(f'  Generated {len(schedule["items"])} maintenance items:')
             
-            for item in schedule:
+            for item in schedule['items']:
                 date_str = item['date'].strftime('%Y-%m-%d')
                 duration_str = self._format_duration(item['estimated_duration'])
                 priority_style = {
@@ -86,45 +107,25 @@ class Command(BaseCommand):
                     f'    {date_str}: {priority_style(item["type"].upper())} - {item["title"]} ({duration_str})'
                 )
                 
-                if create_actual:
-                    # Check if maintenance already exists for this date
-                    existing = Maintenance.objects.filter(
-                        resource=resource,
-                        start_time__date=item['date'].date(),
-                        maintenance_type=item['type']
-                    ).first()
-                    
-                    if not existing:
-                        # Create the maintenance entry
-                        end_time = item['date'] + item['estimated_duration']
-                        
-                        maintenance = Maintenance.objects.create(
-                            resource=resource,
-                            title=item['title'],
-                            description=item['description'],
-                            start_time=item['date'],
-                            end_time=end_time,
-                            maintenance_type=item['type'],
-                            priority=item['priority'],
-                            status='scheduled',
-                            is_internal=True,
-                            created_by_id=1  # System user - you might want to make this configurable
-                        )
-                        
-                        self.stdout.write(
-                            f'      {self.style.SUCCESS("✓ Created")} maintenance entry'
-                        )
-                        total_scheduled += 1
-                    else:
-                        self.stdout.write(
-                            f'      {self.style.WARNING("- Exists")} maintenance already scheduled'
-                        )
+                if item['status'] == 'duplicate':
+                    self.stdout.write(
+                        f'      {self.style.WARNING("- Exists")} maintenance already scheduled'
+                    )
+                elif item['status'] == 'rescheduled':
+                    self.stdout.write(
+                        f'      {self.style.WARNING("~ Moved")} from {item["original_date"].strftime("%Y-%m-%d %H:%M")} '
+                        f'to avoid overlapping maintenance'
+                    )
+                if create_actual and item['status'] != 'duplicate':
+                    self.stdout.write(
+                        f'      {self.style.SUCCESS("✓ Created")} maintenance entry'
+                    )
         
         # Summary
         if create_actual:
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'\nScheduling complete: {total_scheduled} new maintenance entries created'
+                    f'\nScheduling complete: {result["created"]} new maintenance entries created'
                 )
             )
         else:
@@ -153,45 +154,19 @@ class Command(BaseCommand):
         """Show scheduling statistics."""
         self.stdout.write('\n--- Scheduling Statistics ---')
         
-        now = timezone.now()
-        end_date = now + timedelta(days=months_ahead * 30)
-        
-        # Count existing scheduled maintenance
-        existing_maintenance = Maintenance.objects.filter(
-            resource__in=resources,
-            start_time__gte=now,
-            start_time__lte=end_date,
-            status='scheduled'
-        )
-        
-        by_type = {}
-        by_priority = {}
-        by_month = {}
-        
-        for maintenance in existing_maintenance:
-            # By type
-            mtype = maintenance.maintenance_type
-            by_type[mtype] = by_type.get(mtype, 0) + 1
-            
-            # By priority
-            priority = maintenance.priority
-            by_priority[priority] = by_priority.get(priority, 0) + 1
-            
-            # By month
-            month_key = maintenance.start_time.strftime('%Y-%m')
-            by_month[month_key] = by_month.get(month_key, 0) + 1
+        stats = maintenance_schedule_generator.scheduling_stats(resources, months_ahead)
         
         # Display statistics
-        self.stdout.write(f'Total scheduled maintenance in next {months_ahead} months: {existing_maintenance.count()}')
+        self.stdout.write(f'Total scheduled maintenance in next {months_ahead} months: {stats["total"]}')
         
-        if by_type:
+        if stats['by_type']:
             self.stdout.write('\nBy Type:')
-            for mtype, count in sorted(by_type.items()):
+            for mtype, count in stats['by_type']:
                 self.stdout.write(f'  {mtype.title()}: {count}')
         
-        if by_priority:
+        if stats['by_priority']:
             self.stdout.write('\nBy Priority:')
-            for priority, count in sorted(by_priority.items()):
+            for priority, count in stats['by_priority']:
                 priority_style = {
                     'high': self.style.ERROR,
                     'critical': self.style.ERROR,
@@ -202,34 +177,21 @@ class Command(BaseCommand):
                 
                 self.stdout.write(f'  {priority_style(priority.title())}: {count}')
         
-        if by_month:
+        if stats['by_month']:
             self.stdout.write('\nBy Month:')
-            for month, count in sorted(by_month.items()):
+            for month, count in stats['by_month']:
                 self.stdout.write(f'  {month}: {count}')
         
         # Resource utilization
-        resource_maintenance = {}
-        for maintenance in existing_maintenance:
-            resource = maintenance.resource
-            if resource not in resource_maintenance:
-                resource_maintenance[resource] = 0
-            resource_maintenance[resource] += 1
-        
-        if resource_maintenance:
+        if stats['by_resource']:
             self.stdout.write('\nTop Resources by Scheduled Maintenance:')
-            sorted_resources = sorted(
-                resource_maintenance.items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )
-            
-            for resource, count in sorted_resources[:5]:
-                self.stdout.write(f'  {resource.name}: {count} items')
+            for name, count in stats['by_resource'][:5]:
+                self.stdout.write(f'  {name}: {count} items')
         
         # Alert about high-maintenance resources
         high_maintenance_threshold = 5
         high_maintenance_resources = [
-            resource for resource, count in resource_maintenance.items()
+            (name, count) for name, count in stats['by_resource']
             if count >= high_maintenance_threshold
         ]
         
@@ -239,7 +201,6 @@ class Command(BaseCommand):
                     f'\nHigh-maintenance resources ({high_maintenance_threshold}+ items):'
                 )
             )
-            for resource in high_maintenance_resources:
-                count = resource_maintenance[resource]
-                self.stdout.write(f'  {resource.name}: {count} items')
-                self.stdout.write('    Consider reviewing maintenance procedures or equipment condition')
\ No newline at end of file
+            for name, count in high_maintenance_resources:
+                self.stdout.write(f'  {name}: {count} items')
+                self.stdout.write('    Consider reviewing maintenance procedures or equipment condition')
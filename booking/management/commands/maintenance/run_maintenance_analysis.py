@@ -8,7 +8,7 @@ and updates analytics data.
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from booking.maintenance_service import maintenance_prediction_service
+from booking.services.maintenance_service import maintenance_prediction_service
 from booking.models import Resource, MaintenanceAlert
 
 
@@ -26,6 +26,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Clean up old alerts after analysis'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of worker threads (defaults to MAINTENANCE_ANALYSIS_WORKERS)'
+        )
         parser.add_argument(
             '--days-ahead',
             type=int,
@@ -53,7 +58,7 @@ class Command(BaseCommand):
             # Analyze all resources
             self.stdout.write('Analyzing all resources...')
             
-            analyses = maintenance_prediction_service.analyze_all_resources()
+            analyses = maintenance_prediction_service.analyze_all_resources(workers=options['workers'])
             
             total_alerts = 0
             total_resources = len(analyses)
@@ -14,16 +14,76 @@ For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
 https://labitory.org/commercial
 """
 
-from django.core.management.base import BaseCommand
+import hashlib
+
 from django.contrib.auth.models import User
+from django.utils import timezone
 from booking.models import NotificationPreference
 from booking.notifications import notification_service
+from booking.utils.data_migrations import BaseChunkedMigration, ChunkedMigrationCommand
+
 
+class NotificationDefaultsMigration(BaseChunkedMigration):
+    """Create missing default preferences, and optionally reset changed ones, per chunk of users."""
+    
+    model = User
+    only = ['username']
+    
+    def __init__(self, preferences, reset=False, username=None, **kwargs):
+        self.preferences = preferences
+        self.reset = reset
+        self.username = username
+        self.created = 0
+        self.updated = 0
+        # Runs with other options (--reset, --sms-enabled, --push-enabled) or
+        # changed defaults do different work, so they get their own checkpoint
+        digest = hashlib.sha1(repr((sorted(preferences), reset)).encode()).hexdigest()[:12]
+        super().__init__(name=f'setup_notification_defaults:{digest}', **kwargs)
+    
+    def get_queryset(self):
+        users = User.objects.all()
+        if self.username:
+            users = users.filter(username=self.username)
+        return users
+    
+    def process_chunk(self, users, dry_run):
+        existing = {
+            (preference.user_id, preference.notification_type, preference.delivery_method): preference
+            for preference in NotificationPreference.objects.filter(user__in=users)
+        }
+        
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for user in users:
+            for notification_type, delivery_method, is_enabled in self.preferences:
+                preference = existing.get((user.pk, notification_type, delivery_method))
+                if preference is None:
+                    to_create.append(NotificationPreference(
+                        user=user,
+                        notification_type=notification_type,
+                        delivery_method=delivery_method,
+                        is_enabled=is_enabled,
+                        frequency='immediate',
+                    ))
+                elif self.reset and preference.is_enabled != is_enabled:
+                    preference.is_enabled = is_enabled
+                    preference.updated_at = now
+                    to_update.append(preference)
+        
+        if not dry_run:
+            NotificationPreference.objects.bulk_create(to_create, ignore_conflicts=True)
+            NotificationPreference.objects.bulk_update(to_update, ['is_enabled', 'updated_at'])
+        self.created += len(to_create)
+        self.updated += len(to_update)
+        return len({preference.user_id for preference in to_create + to_update})
 
-class Command(BaseCommand):
+
+class Command(ChunkedMigrationCommand):
     help = 'Setup default notification preferences for all users'
 
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
             '--user',
             type=str,
@@ -51,67 +111,43 @@ class Command(BaseCommand):
         
         # Get users to process
         if options['user']:
-            try:
-                users = [User.objects.get(username=options['user'])]
-                self.stdout.write(f"Processing user: {options['user']}")
-            except User.DoesNotExist:
+            if not User.objects.filter(username=options['user']).exists():
                 self.stderr.write(f"User '{options['user']}' not found")
                 return
+            self.stdout.write(f"Processing user: {options['user']}")
         else:
-            users = User.objects.all()
-            self.stdout.write(f"Processing all {users.count()} users")
+            self.stdout.write(f"Processing all {User.objects.count()} users")
         
         # Get default preferences
         defaults = notification_service.default_preferences
         
-        created_count = 0
-        updated_count = 0
-        
-        for user in users:
-            user_created = 0
-            user_updated = 0
-            
-            for notification_type, delivery_prefs in defaults.items():
-                for delivery_method, is_enabled in delivery_prefs.items():
-                    
-                    # Skip SMS unless explicitly enabled
-                    if delivery_method == 'sms' and not options['sms_enabled']:
-                        # Only enable SMS for emergency notifications
-                        if notification_type not in ['emergency_alert', 'safety_alert', 'evacuation_notice']:
-                            is_enabled = False
-                    
-                    # Handle push notification preference
-                    if delivery_method == 'push' and not options['push_enabled']:
+        # The defaults are the same for every user, so resolve them once
+        preferences = []
+        for notification_type, delivery_prefs in defaults.items():
+            for delivery_method, is_enabled in delivery_prefs.items():
+                
+                # Skip SMS unless explicitly enabled
+                if delivery_method == 'sms' and not options['sms_enabled']:
+                    # Only enable SMS for emergency notifications
+                    if notification_type not in ['emergency_alert', 'safety_alert', 'evacuation_notice']:
                         is_enabled = False
-                    
-                    preference, created = NotificationPreference.objects.get_or_create(
-                        user=user,
-                        notification_type=notification_type,
-                        delivery_method=delivery_method,
-                        defaults={
-                            'is_enabled': is_enabled,
-                            'frequency': 'immediate'
-                        }
-                    )
-                    
-                    if created:
-                        user_created += 1
-                        created_count += 1
-                    elif options['reset'] and preference.is_enabled != is_enabled:
-                        preference.is_enabled = is_enabled
-                        preference.save()
-                        user_updated += 1
-                        updated_count += 1
-            
-            if user_created > 0 or user_updated > 0:
-                self.stdout.write(
-                    f"  {user.username}: {user_created} created, {user_updated} updated"
-                )
+                
+                # Handle push notification preference
+                if delivery_method == 'push' and not options['push_enabled']:
+                    is_enabled = False
+                
+                preferences.append((notification_type, delivery_method, is_enabled))
+        
+        migration = NotificationDefaultsMigration(preferences, reset=options['reset'], username=options['user'])
+        # A single-user run is quick and shouldn't disturb a full run's checkpoint
+        stats = self.run_migration(migration, options, checkpoint=not options['user'])
+        created_count = migration.created
+        updated_count = migration.updated
         
         self.stdout.write("\n📊 Summary:")
         self.stdout.write(f"✓ Total preferences created: {created_count}")
         self.stdout.write(f"✓ Total preferences updated: {updated_count}")
-        self.stdout.write(f"✓ Users processed: {len(users)}")
+        self.stdout.write(f"✓ Users processed: {stats['processed']} ({stats['changed']} changed)")
         
         # Show configuration summary
         self.stdout.write("\n⚙️ Configuration Applied:")
@@ -0,0 +1,67 @@
+# booking/management/commands/prune_audit_logs.py
+"""
+Management command to prune audit tables according to retention settings.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+from django.core.management.base import BaseCommand
+from ...utils.audit_buffer import audit_buffer, prune_audit_tables
+
+
+class Command(BaseCommand):
+    help = 'Flush buffered audit events and delete audit rows past their retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be deleted without actually deleting',
+        )
+
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Override the retention period (in days) for every audit table',
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of rows deleted per statement (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if not dry_run:
+            flushed = audit_buffer.flush()
+            if audit_buffer.backend == 'redis':
+                flushed += audit_buffer.drain_redis()
+            if flushed:
+                self.stdout.write(f'Flushed {flushed} buffered audit events')
+
+        retention = None
+        if options['days'] is not None:
+            from ...utils.audit_buffer import DEFAULT_RETENTION_DAYS
+            retention = {label: options['days'] for label in DEFAULT_RETENTION_DAYS}
+
+        results = prune_audit_tables(
+            retention_days=retention,
+            batch_size=options['batch_size'],
+            dry_run=dry_run,
+        )
+
+        for label, count in results.items():
+            if dry_run:
+                self.stdout.write(
+                    self.style.WARNING(f'[DRY RUN] Would delete {count} {label} rows')
+                )
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Deleted {count} {label} rows')
+                )
@@ -0,0 +1,50 @@
+# booking/management/commands/rebuild_usage_rollups.py
+"""
+Management command to rebuild usage rollups from finished bookings.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ...models import Resource
+from ...services.usage_rollups import usage_rollup_service
+
+
+class Command(BaseCommand):
+    help = 'Recompute hourly, daily, weekly and monthly usage rollups from bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--resource',
+            type=int,
+            help='Only rebuild rollups for this resource ID',
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Only rebuild periods from this date (YYYY-MM-DD), widened to the start of its month',
+        )
+
+    def handle(self, *args, **options):
+        resource = None
+        if options['resource']:
+            try:
+                resource = Resource.objects.get(pk=options['resource'])
+            except Resource.DoesNotExist:
+                raise CommandError(f"Resource {options['resource']} does not exist")
+
+        since = None
+        if options['since']:
+            try:
+                since = timezone.make_aware(datetime.strptime(options['since'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+
+        count = usage_rollup_service.rebuild(resource=resource, since=since)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} usage rollups'))
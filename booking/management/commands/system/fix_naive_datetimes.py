@@ -14,24 +14,37 @@ For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
 https://labitory.org/commercial
 """
 
-from django.core.management.base import BaseCommand
 from django.utils import timezone
-from django.db import transaction
 from booking.models import Booking, Maintenance
+from booking.utils.data_migrations import ChunkedMigration, ChunkedMigrationCommand
 import warnings
 
 
-class Command(BaseCommand):
+class NaiveDatetimeFix(ChunkedMigration):
+    """Make naive values of ``fields`` timezone-aware."""
+    
+    def __init__(self, model, fields, **kwargs):
+        self.model = model
+        self.fields = fields
+        super().__init__(name=f'fix_naive_datetimes:{model._meta.label}', **kwargs)
+    
+    def transform(self, obj):
+        needs_fix = False
+        for field in self.fields:
+            value = getattr(obj, field)
+            if value and timezone.is_naive(value):
+                setattr(obj, field, timezone.make_aware(value))
+                needs_fix = True
+        return needs_fix
+
+
+class Command(ChunkedMigrationCommand):
     """Fix naive datetimes in the database."""
     
     help = 'Fix naive datetime fields in the database by making them timezone-aware'
     
     def add_arguments(self, parser):
-        parser.add_argument(
-            '--dry-run',
-            action='store_true',
-            help='Show what would be fixed without making changes'
-        )
+        super().add_arguments(parser)
         
         parser.add_argument(
             '--suppress-warnings',
@@ -51,85 +64,35 @@ class Command(BaseCommand):
         
         fixed_count = 0
         
-        with transaction.atomic():
-            # Fix Booking datetimes
-            self.stdout.write('Checking Booking records...')
-            bookings_to_fix = []
-            
-            for booking in Booking.objects.all():
-                needs_fix = False
-                
-                if booking.start_time and timezone.is_naive(booking.start_time):
-                    needs_fix = True
-                    if not dry_run:
-                        booking.start_time = timezone.make_aware(booking.start_time)
-                
-                if booking.end_time and timezone.is_naive(booking.end_time):
-                    needs_fix = True
-                    if not dry_run:
-                        booking.end_time = timezone.make_aware(booking.end_time)
-                
-                if needs_fix:
-                    bookings_to_fix.append(booking)
-                    if not dry_run:
-                        booking.save(update_fields=['start_time', 'end_time'])
-            
-            if bookings_to_fix:
-                self.stdout.write(
-                    self.style.WARNING(f'Found {len(bookings_to_fix)} Booking records with naive datetimes')
-                )
-                if not dry_run:
-                    self.stdout.write(
-                        self.style.SUCCESS(f'Fixed {len(bookings_to_fix)} Booking records')
-                    )
-                fixed_count += len(bookings_to_fix)
-            
-            # Fix Maintenance datetimes
-            self.stdout.write('Checking Maintenance records...')
-            maintenance_to_fix = []
+        # Each model is repaired in committed chunks and resumes where an
+        # interrupted run stopped
+        for model in (Booking, Maintenance):
+            name = model.__name__
+            self.stdout.write(f'Checking {name} records...')
+            stats = self.run_migration(NaiveDatetimeFix(model, ['start_time', 'end_time']), options)
             
-            for maintenance in Maintenance.objects.all():
-                needs_fix = False
-                
-                if maintenance.start_time and timezone.is_naive(maintenance.start_time):
-                    needs_fix = True
-                    if not dry_run:
-                        maintenance.start_time = timezone.make_aware(maintenance.start_time)
-                
-                if maintenance.end_time and timezone.is_naive(maintenance.end_time):
-                    needs_fix = True
-                    if not dry_run:
-                        maintenance.end_time = timezone.make_aware(maintenance.end_time)
-                
-                if needs_fix:
-                    maintenance_to_fix.append(maintenance)
-                    if not dry_run:
-                        maintenance.save(update_fields=['start_time', 'end_time'])
-            
-            if maintenance_to_fix:
+            if stats['changed']:
                 self.stdout.write(
-                    self.style.WARNING(f'Found {len(maintenance_to_fix)} Maintenance records with naive datetimes')
+                    self.style.WARNING(f'Found {stats["changed"]} {name} records with naive datetimes')
                 )
                 if not dry_run:
                     self.stdout.write(
-                        self.style.SUCCESS(f'Fixed {len(maintenance_to_fix)} Maintenance records')
+                        self.style.SUCCESS(f'Fixed {stats["changed"]} {name} records')
                     )
-                fixed_count += len(maintenance_to_fix)
-            
-            if dry_run and fixed_count > 0:
-                self.stdout.write(
-                    self.style.WARNING(f'DRY RUN: Would fix {fixed_count} records. Run without --dry-run to apply fixes.')
-                )
-                # Rollback transaction in dry run
-                transaction.set_rollback(True)
-            elif fixed_count == 0:
-                self.stdout.write(
-                    self.style.SUCCESS('No naive datetimes found. Database is already clean!')
-                )
-            else:
-                self.stdout.write(
-                    self.style.SUCCESS(f'Successfully fixed {fixed_count} records with naive datetimes')
-                )
+                fixed_count += stats['changed']
+        
+        if dry_run and fixed_count > 0:
+            self.stdout.write(
+                self.style.WARNING(f'DRY RUN: Would fix {fixed_count} records. Run without --dry-run to apply fixes.')
+            )
+        elif fixed_count == 0:
+            self.stdout.write(
+                self.style.SUCCESS('No naive datetimes found. Database is already clean!')
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f'Successfully fixed {fixed_count} records with naive datetimes')
+            )
         
         # Provide recommendations
         if fixed_count > 0 or dry_run:
@@ -14,9 +14,11 @@ For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
 https://labitory.org/commercial
 """
 
+from contextlib import nullcontext
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from booking.checkin_service import checkin_service
+from booking.services.checkin_service import checkin_service
 
 
 class Command(BaseCommand):
@@ -46,11 +48,17 @@ class Command(BaseCommand):
         
         total_actions = 0
         
-        if action in ['reminders', 'all']:
-            total_actions += self.process_reminders(dry_run)
-        
-        if action in ['auto-checkout', 'all']:
-            total_actions += self.process_auto_checkouts(dry_run)
+        # Dry runs change nothing, so they do not hold the sweep lock
+        with nullcontext(True) if dry_run else checkin_service.sweep_lock() as acquired:
+            if not acquired:
+                self.stdout.write(self.style.WARNING('⏳ Another check-in sweep is running - skipping'))
+                return
+            
+            if action in ['reminders', 'all']:
+                total_actions += self.process_reminders(dry_run)
+            
+            if action in ['auto-checkout', 'all']:
+                total_actions += self.process_auto_checkouts(dry_run)
         
         end_time = timezone.now()
         processing_time = (end_time - start_time).total_seconds()
@@ -6,147 +6,205 @@ Copyright (C) 2025 Labitory Contributors
 """
 
 from django.db import models
-from django.db.models import Q, Count, Prefetch, F, Sum, Avg
+from django.db.models import (
+    Q, Count, Prefetch, F, Sum, Avg, Exists, OuterRef, Subquery, Value,
+    Case, When, FloatField, ExpressionWrapper, IntegerField, DurationField, DateTimeField,
+)
+from django.db.models.functions import Cast, Coalesce
 from django.utils import timezone
 from datetime import timedelta
 
 
-class BookingManager(models.Manager):
-    """Optimized manager for Booking model with common query patterns."""
-    
-    def get_queryset(self):
-        """Base queryset with essential select_related."""
-        return super().get_queryset().select_related(
+MANAGER_ROLES = ['technician', 'sysadmin']
+
+
+class BookingQuerySet(models.QuerySet):
+    """Chainable queries for Booking.
+
+    The default manager stays a plain queryset; views opt in to joins and
+    projections with methods such as ``for_calendar()``.
+    """
+
+    def with_related(self):
+        """Join the objects most list and detail views display."""
+        return self.select_related(
             'resource',
             'user',
             'user__userprofile',
             'approved_by'
         )
-    
+
     def with_attendees(self):
         """Include attendee information."""
         from .models import BookingAttendee
-        return self.get_queryset().prefetch_related(
+        return self.prefetch_related(
             Prefetch(
                 'bookingattendee_set',
                 queryset=BookingAttendee.objects.select_related('user', 'user__userprofile')
             )
         )
-    
-    def with_billing(self):
-        """Include billing information."""
-        return self.get_queryset().select_related(
-            'billing_record',
-            'billing_record__billing_rate',
-            'billing_record__billing_period'
-        )
-    
+
+    def for_calendar(self):
+        """
+        Load only what a calendar event needs, with resource and user joined.
+
+        Joins added earlier (e.g. by ``with_related()``) are dropped, since
+        their fields would be deferred.
+        """
+        return self.select_related(None).select_related('resource', 'user').only(
+            'id', 'title', 'description', 'start_time', 'end_time', 'status',
+            'resource_id', 'resource__name',
+            'user_id', 'user__username', 'user__first_name', 'user__last_name',
+        ).order_by('start_time')
+
     def active(self):
-        """Get active bookings (approved or pending)."""
-        return self.get_queryset().filter(
-            status__in=['approved', 'pending']
-        )
-    
+        """Bookings that still hold their slot (approved or pending)."""
+        return self.filter(status__in=['approved', 'pending'])
+
+    def overlapping(self, start, end):
+        """Bookings that intersect the half-open interval [start, end)."""
+        return self.filter(start_time__lt=end, end_time__gt=start)
+
     def upcoming(self, days=7):
         """Get upcoming bookings within specified days."""
-        end_date = timezone.now() + timedelta(days=days)
+        now = timezone.now()
         return self.active().filter(
-            start_time__gte=timezone.now(),
-            start_time__lte=end_date
+            start_time__gte=now,
+            start_time__lte=now + timedelta(days=days)
         ).order_by('start_time')
-    
+
     def for_resource(self, resource):
         """Get bookings for a specific resource."""
-        return self.get_queryset().filter(resource=resource)
-    
+        return self.filter(resource=resource)
+
     def for_user(self, user):
-        """Get bookings for a specific user."""
-        return self.get_queryset().filter(
-            Q(user=user) | Q(attendees=user)
-        ).distinct()
-    
+        """Get bookings a user owns or attends."""
+        return self.filter(Q(user=user) | Q(attendees=user)).distinct()
+
     def conflicts_with(self, resource, start_time, end_time, exclude_booking=None):
         """Find bookings that conflict with given time range."""
-        queryset = self.active().filter(
-            resource=resource,
-            start_time__lt=end_time,
-            end_time__gt=start_time
-        )
+        queryset = self.active().for_resource(resource).overlapping(start_time, end_time)
         if exclude_booking:
             queryset = queryset.exclude(pk=exclude_booking.pk)
         return queryset
-    
+
     def needs_checkin_reminder(self):
         """Get bookings that need check-in reminders."""
-        reminder_time = timezone.now() + timedelta(minutes=15)
+        now = timezone.now()
         return self.filter(
             status='approved',
-            start_time__lte=reminder_time,
-            start_time__gte=timezone.now(),
+            start_time__lte=now + timedelta(minutes=15),
+            start_time__gte=now,
             check_in_reminder_sent=False,
             checked_in_at__isnull=True
         )
-    
+
     def overdue_checkout(self):
         """Get bookings that are overdue for checkout."""
-        overdue_time = timezone.now() - timedelta(minutes=15)
         return self.filter(
             checked_in_at__isnull=False,
             checked_out_at__isnull=True,
-            end_time__lt=overdue_time
+            end_time__lt=timezone.now() - timedelta(minutes=15)
         )
 
 
-class ResourceManager(models.Manager):
-    """Optimized manager for Resource model."""
-    
-    def get_queryset(self):
-        """Base queryset with common annotations."""
-        return super().get_queryset().annotate(
-            active_bookings_count=Count(
-                'bookings',
-                filter=Q(bookings__status__in=['approved', 'pending'])
-            ),
-            total_bookings_count=Count('bookings'),
-            open_issues_count=Count(
-                'issues',
-                filter=Q(issues__status__in=['open', 'in_progress'])
-            )
-        )
-    
+BookingManager = models.Manager.from_queryset(BookingQuerySet, 'BookingManager')
+
+
+class ResourceQuerySet(models.QuerySet):
+    """Chainable queries for Resource."""
+
     def active(self):
-        """Get active resources."""
-        return self.get_queryset().filter(is_active=True, is_closed=False)
-    
+        """Resources that are active and not temporarily closed."""
+        return self.filter(is_active=True, is_closed=False)
+
     def available_for_user(self, user):
-        """Get resources available for a specific user."""
+        """Active resources the user may book, mirroring Resource.is_available_for_user()."""
         from .models import UserProfile
-        
+
         try:
             user_profile = user.userprofile
         except UserProfile.DoesNotExist:
             return self.none()
-        
-        queryset = self.active()
-        
-        # Sysadmin has access to all active resources
-        if user_profile.role == 'sysadmin':
-            return queryset
-        
-        # Filter based on user requirements
-        if not user_profile.is_inducted:
+
+        queryset = self.filter(is_active=True)
+        if user_profile.role != 'sysadmin' and not user_profile.is_inducted:
             queryset = queryset.filter(requires_induction=False)
-        
-        # Remove training level filtering - now handled by specific training requirements
-        # Users can see all resources regardless of training requirements
-        
         return queryset
-    
+
+    def with_booking_counts(self):
+        """Annotate active/total booking and open issue counts."""
+        from .models import Booking, ResourceIssue
+
+        def count_of(queryset):
+            return Coalesce(Subquery(
+                queryset.filter(resource=OuterRef('pk')).order_by()
+                .values('resource').annotate(c=Count('pk')).values('c')
+            ), 0)
+
+        # Subqueries rather than joined Counts, which would multiply rows
+        return self.annotate(
+            active_bookings_count=count_of(Booking.objects.filter(status__in=['approved', 'pending'])),
+            total_bookings_count=count_of(Booking.objects.all()),
+            open_issues_count=count_of(ResourceIssue.objects.filter(status__in=['open', 'in_progress'])),
+        )
+
+    def with_progress_for(self, user):
+        """
+        Annotate the user's access and training progress on each resource.
+
+        Adds ``user_has_access_result``, ``can_view_calendar_result``,
+        ``has_pending_request``, ``has_pending_training``,
+        ``required_training_count`` and ``completed_training_count`` in the
+        same query instead of several lookups per resource.
+        """
+        from .models import AccessRequest, ResourceAccess, ResourceTrainingRequirement, UserTraining
+
+        role = getattr(getattr(user, 'userprofile', None), 'role', None)
+        now = timezone.now()
+
+        has_access = Exists(
+            ResourceAccess.objects.filter(resource=OuterRef('pk'), user=user, is_active=True)
+            .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+        )
+        granted = Value(True, output_field=models.BooleanField())
+
+        mandatory = ResourceTrainingRequirement.objects.filter(
+            resource=OuterRef('pk'), is_mandatory=True
+        ).order_by().values('resource')
+        valid_training = UserTraining.objects.filter(user=user).valid(now)
+
+        return self.annotate(
+            user_has_access_result=granted if role == 'sysadmin' else has_access,
+            can_view_calendar_result=granted if role in MANAGER_ROLES else has_access,
+            has_pending_request=Exists(
+                AccessRequest.objects.filter(resource=OuterRef('pk'), user=user, status='pending')
+            ),
+            has_pending_training=Exists(
+                UserTraining.objects.filter(
+                    user=user,
+                    status__in=['enrolled', 'in_progress'],
+                    training_course__resource_requirements__resource=OuterRef('pk'),
+                    training_course__resource_requirements__is_mandatory=True,
+                )
+            ),
+            required_training_count=Coalesce(
+                Subquery(mandatory.annotate(c=Count('pk')).values('c')), 0
+            ),
+            completed_training_count=Coalesce(
+                Subquery(
+                    mandatory.filter(
+                        training_course__in=valid_training.values('training_course')
+                    ).annotate(c=Count('pk')).values('c')
+                ), 0
+            ),
+        )
+
     def with_access_info(self):
         """Include access permission information."""
         from .models import ResourceAccess, ResourceResponsible
-        
-        return self.get_queryset().prefetch_related(
+
+        return self.prefetch_related(
             Prefetch(
                 'access_permissions',
                 queryset=ResourceAccess.objects.select_related('user', 'granted_by').filter(is_active=True)
@@ -156,118 +214,121 @@ class ResourceManager(models.Manager):
                 queryset=ResourceResponsible.objects.select_related('user', 'assigned_by').filter(is_active=True)
             )
         )
-    
+
     def with_training_requirements(self):
         """Include training requirement information."""
         from .models import ResourceTrainingRequirement
-        
-        return self.get_queryset().prefetch_related(
+
+        return self.prefetch_related(
             Prefetch(
                 'training_requirements',
                 queryset=ResourceTrainingRequirement.objects.select_related('training_course').order_by('order')
             )
         )
-    
+
     def billable(self):
         """Get billable resources."""
         return self.active().filter(is_billable=True)
-    
+
     def by_type(self, resource_type):
         """Filter resources by type."""
         return self.active().filter(resource_type=resource_type)
 
 
-class NotificationManager(models.Manager):
-    """Optimized manager for Notification model."""
-    
-    def get_queryset(self):
-        """Base queryset with essential select_related."""
-        return super().get_queryset().select_related(
-            'user',
-            'user__userprofile',
+ResourceManager = models.Manager.from_queryset(ResourceQuerySet, 'ResourceManager')
+
+
+class NotificationQuerySet(models.QuerySet):
+    """Chainable queries for Notification."""
+
+    def with_related(self):
+        """Join the objects a notification links to."""
+        return self.select_related(
             'booking',
             'booking__resource',
             'resource',
             'maintenance',
             'access_request',
-            'training_request'
+            'access_request__resource',
         )
-    
-    def unread(self):
-        """Get unread notifications."""
-        return self.get_queryset().exclude(status='read')
-    
+
     def for_user(self, user):
         """Get notifications for a specific user."""
-        return self.get_queryset().filter(user=user)
-    
+        return self.filter(user=user)
+
+    def in_app(self):
+        """Notifications shown in the web UI (one per event)."""
+        return self.filter(delivery_method='in_app')
+
+    def unread(self):
+        """Get unread notifications."""
+        return self.filter(read_at__isnull=True)
+
     def pending_delivery(self):
         """Get notifications pending delivery."""
-        return self.get_queryset().filter(
-            status='pending',
-            Q(next_retry_at__isnull=True) | Q(next_retry_at__lte=timezone.now())
+        return self.filter(
+            Q(next_retry_at__isnull=True) | Q(next_retry_at__lte=timezone.now()),
+            status='pending'
         )
-    
+
     def failed_retryable(self):
         """Get failed notifications that can be retried."""
-        return self.get_queryset().filter(
+        return self.filter(
             status='failed',
             retry_count__lt=F('max_retries'),
             next_retry_at__lte=timezone.now()
         )
-    
+
     def by_type(self, notification_type):
         """Filter notifications by type."""
-        return self.get_queryset().filter(notification_type=notification_type)
-    
+        return self.filter(notification_type=notification_type)
+
     def recent(self, days=7):
         """Get recent notifications."""
-        since = timezone.now() - timedelta(days=days)
-        return self.get_queryset().filter(created_at__gte=since)
+        return self.filter(created_at__gte=timezone.now() - timedelta(days=days))
 
 
-class AccessRequestManager(models.Manager):
-    """Optimized manager for AccessRequest model."""
-    
-    def get_queryset(self):
-        """Base queryset with essential select_related."""
-        return super().get_queryset().select_related(
+NotificationManager = models.Manager.from_queryset(NotificationQuerySet, 'NotificationManager')
+
+
+class AccessRequestQuerySet(models.QuerySet):
+    """Chainable queries for AccessRequest."""
+
+    def with_related(self):
+        """Join requester, resource and reviewer."""
+        return self.select_related(
             'resource',
             'user',
             'user__userprofile',
-            'user__userprofile__department',
-            'reviewed_by',
-            'safety_induction_confirmed_by',
-            'lab_training_confirmed_by',
-            'risk_assessment_confirmed_by'
+            'reviewed_by'
         )
-    
+
     def pending(self):
         """Get pending access requests."""
-        return self.get_queryset().filter(status='pending')
-    
+        return self.filter(status='pending')
+
     def for_resource(self, resource):
         """Get access requests for a specific resource."""
-        return self.get_queryset().filter(resource=resource)
-    
+        return self.filter(resource=resource)
+
     def for_user(self, user):
         """Get access requests for a specific user."""
-        return self.get_queryset().filter(user=user)
-    
+        return self.filter(user=user)
+
     def awaiting_prerequisites(self):
-        """Get requests waiting for prerequisite completion."""
+        """Get pending requests with prerequisites still to confirm."""
         return self.pending().filter(
-            Q(safety_induction_completed=False) |
-            Q(lab_training_completed=False) |
-            Q(risk_assessment_completed=False)
+            Q(safety_induction_confirmed=False) |
+            Q(lab_training_confirmed=False) |
+            Q(risk_assessment_confirmed=False)
         )
-    
+
     def ready_for_approval(self):
-        """Get requests that have all prerequisites completed."""
+        """Get pending requests with every prerequisite confirmed."""
         return self.pending().filter(
-            safety_induction_completed=True,
-            lab_training_completed=True,
-            risk_assessment_completed=True
+            safety_induction_confirmed=True,
+            lab_training_confirmed=True,
+            risk_assessment_confirmed=True
         )
 
 
@@ -323,6 +384,191 @@ class MaintenanceManager(models.Manager):
         )
 
 
+class MaintenanceQuerySet(models.QuerySet):
+    """Chainable queries for Maintenance."""
+
+    IMPACT_PRIORITY_MULTIPLIERS = {
+        'low': 0.5,
+        'medium': 1.0,
+        'high': 1.5,
+        'critical': 2.0,
+        'emergency': 3.0,
+    }
+
+    def with_impact(self):
+        """
+        Annotate affected booking counts, recent usage and ``impact_score``.
+
+        Affected bookings are counted through the per-resource maintenance
+        blocks, so every resource a maintenance takes down is included, and
+        the whole queryset is scored in one query.
+        """
+        from .models import Booking
+        affected = Booking.objects.filter(
+            resource__maintenance_blocks__maintenance=OuterRef('pk'),
+            start_time__lt=OuterRef('end_time'),
+            end_time__gt=OuterRef('start_time'),
+            status__in=['pending', 'approved'],
+        ).order_by().values('resource__maintenance_blocks__maintenance').annotate(
+            count=Count('pk')
+        ).values('count')
+        recent = Booking.objects.filter(
+            resource=OuterRef('resource'),
+            start_time__gte=timezone.now() - timedelta(days=30),
+        ).order_by().values('resource').annotate(count=Count('pk')).values('count')
+
+        multiplier = Case(
+            *[When(priority=priority, then=Value(value))
+              for priority, value in self.IMPACT_PRIORITY_MULTIPLIERS.items()],
+            default=Value(1.0),
+            output_field=FloatField(),
+        )
+        return self.annotate(
+            affected_bookings_count=Coalesce(Subquery(affected), 0),
+            recent_usage_count=Coalesce(Subquery(recent), 0),
+        ).annotate(
+            impact_score=ExpressionWrapper(
+                (F('affected_bookings_count') * 2.0 + F('recent_usage_count') * 0.1) * multiplier,
+                output_field=FloatField(),
+            )
+        )
+
+
+class MaintenanceBlockQuerySet(models.QuerySet):
+    """Chainable queries for per-resource maintenance blocks."""
+
+    def for_resource(self, resource):
+        return self.filter(resource=resource)
+
+    def overlapping(self, start, end):
+        """Blocks that intersect the half-open interval [start, end)."""
+        return self.filter(start_time__lt=end, end_time__gt=start)
+
+
+class ResourceIssueQuerySet(models.QuerySet):
+    """Chainable queries for resource issues and their SLA deadlines."""
+
+    def unresolved(self):
+        return self.filter(status__in=self.model.UNRESOLVED_STATUSES)
+
+    def overdue(self, now=None):
+        """Unresolved issues whose SLA deadline has passed."""
+        return self.unresolved().filter(due_at__lt=now or timezone.now())
+
+    def dashboard_stats(self, now=None):
+        """Total, open, in progress, critical and overdue counts in one query."""
+        overdue = Q(status__in=self.model.UNRESOLVED_STATUSES, due_at__lt=now or timezone.now())
+        return self.order_by().aggregate(
+            total=Count('pk'),
+            open=Count('pk', filter=Q(status='open')),
+            in_progress=Count('pk', filter=Q(status='in_progress')),
+            critical=Count('pk', filter=Q(severity='critical')),
+            overdue=Count('pk', filter=overdue),
+        )
+
+    def escalate_overdue(self, now=None):
+        """
+        Flag newly overdue issues as urgent in one UPDATE.
+
+        Each issue is escalated once; returns the number escalated.
+        """
+        now = now or timezone.now()
+        return self.overdue(now).filter(escalated_at__isnull=True).update(
+            is_urgent=True, escalated_at=now, updated_at=now
+        )
+
+
+class RiskAssessmentQuerySet(models.QuerySet):
+    """Chainable queries mirroring RiskAssessment's expiry and review properties."""
+
+    # RiskAssessment.is_due_for_review counts a month as 30 days
+    REVIEW_MONTH = timedelta(days=30)
+
+    def current(self, today=None):
+        """Active assessments that have not passed ``valid_until``."""
+        return self.filter(is_active=True, valid_until__gte=today or timezone.now().date())
+
+    def expired(self, today=None):
+        """Assessments past ``valid_until`` (``is_expired``)."""
+        return self.filter(valid_until__lt=today or timezone.now().date())
+
+    def due_for_review(self, now=None):
+        """Unapproved assessments, or those whose review period has run out (``is_due_for_review``)."""
+        review_period = ExpressionWrapper(
+            Cast('review_frequency_months', IntegerField()) * Value(self.REVIEW_MONTH),
+            output_field=DurationField(),
+        )
+        return self.alias(
+            review_due_at=ExpressionWrapper(F('approved_at') + review_period, output_field=DateTimeField())
+        ).filter(Q(approved_at__isnull=True) | Q(review_due_at__lt=now or timezone.now()))
+
+
+class CompletionQuerySet(models.QuerySet):
+    """
+    Shared expiry queries for per-user completion records.
+
+    Subclasses name the status a valid record holds and the field the
+    completion is for; records lapse once ``expires_at`` has passed.
+    """
+
+    valid_status = None
+    subject_field = None
+
+    def unexpired(self, now=None):
+        """Records without an expiry or whose expiry has not passed."""
+        return self.filter(Q(expires_at__isnull=True) | Q(expires_at__gte=now or timezone.now()))
+
+    def expired(self, now=None):
+        """Records whose expiry has passed, whatever their status (``is_expired``)."""
+        return self.filter(expires_at__lt=now or timezone.now())
+
+    def valid(self, now=None):
+        """Records that currently count as completed (``is_valid``)."""
+        return self.filter(status=self.valid_status).unexpired(now)
+
+    def lapsed(self, now=None):
+        """Records still marked valid although they have expired."""
+        return self.filter(status=self.valid_status).expired(now)
+
+    def expirable(self, now=None):
+        """
+        Lapsed records that can move to ``expired``.
+
+        Expired records are exempt from the unique (user, subject, status)
+        constraint, so a repeat lapse is expired alongside earlier ones.
+        """
+        return self.lapsed(now)
+
+
+class UserTrainingQuerySet(CompletionQuerySet):
+    """Chainable queries for training records."""
+
+    valid_status = 'completed'
+    subject_field = 'training_course'
+
+    def valid(self, now=None):
+        return super().valid(now).filter(passed=True)
+
+    def expiring_within(self, days, now=None):
+        """Valid records that expire in the next ``days`` days."""
+        now = now or timezone.now()
+        return self.valid(now).filter(expires_at__lte=now + timedelta(days=days))
+
+    def for_resource(self, resource):
+        """Records for the courses ``resource`` makes mandatory."""
+        return self.filter(
+            training_course__resource_requirements__resource=resource,
+            training_course__resource_requirements__is_mandatory=True,
+        )
+
+
+class UserRiskAssessmentQuerySet(CompletionQuerySet):
+    """Chainable queries for users' risk assessment completions."""
+
+    valid_status = 'approved'
+    subject_field = 'risk_assessment'
+
+
 class BillingRecordManager(models.Manager):
     """Optimized manager for BillingRecord model."""
     
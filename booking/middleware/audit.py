@@ -0,0 +1,24 @@
+# booking/middleware/audit.py
+"""
+Audit context middleware.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+from ..utils.acting_user import request_context
+
+
+class ActingUserMiddleware:
+    """
+    Expose the current request to audit signal handlers, so history rows
+    record who made a change rather than who owns the changed object.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_context(request):
+            return self.get_response(request)
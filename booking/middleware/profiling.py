@@ -0,0 +1,109 @@
+# booking/middleware/profiling.py
+"""
+Sampled per-request profiling middleware.
+
+A configurable share of requests is profiled. For each one we record query
+count, DB time, duplicate statements, cache hits and misses and view time.
+The numbers go to the ``booking.profiling`` logger as a single JSON line and
+can also be returned in a ``Server-Timing`` header for browser dev tools.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+
+from ..utils.query_profiling import capture_profile
+
+logger = logging.getLogger('booking.profiling')
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile a sample of requests and report them against query budgets.
+
+    Settings:
+        PROFILING_SAMPLE_RATE: Share of requests to profile (0.0 - 1.0)
+        PROFILING_SERVER_TIMING: Add a Server-Timing header to profiled responses
+        PROFILING_DEFAULT_QUERY_BUDGET: Query count above which a request is logged
+            as a warning
+        PROFILING_QUERY_BUDGETS: Per-view overrides keyed by URL name
+            (e.g. ``'booking:dashboard'``) or view path
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self._should_profile(request):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with capture_profile() as profile:
+            request._profiling_view_start = None
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        view_start = getattr(request, '_profiling_view_start', None)
+        view_time = (time.perf_counter() - view_start) if view_start else total
+        view_name = self._get_view_name(request)
+
+        payload = {
+            'event': 'request_profile',
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'view_ms': round(view_time * 1000, 2),
+            **profile.as_dict(),
+        }
+
+        budget = self._get_budget(view_name)
+        payload['query_budget'] = budget
+        if budget is not None and profile.query_count > budget:
+            logger.warning(json.dumps(payload))
+        else:
+            logger.info(json.dumps(payload))
+
+        if getattr(settings, 'PROFILING_SERVER_TIMING', False):
+            response['Server-Timing'] = self._server_timing(payload)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, '_profiling_view_start'):
+            request._profiling_view_start = time.perf_counter()
+        return None
+
+    def _should_profile(self, request):
+        rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        if rate <= 0:
+            return False
+        return rate >= 1 or random.random() < rate
+
+    def _get_view_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return None
+        return match.view_name or match._func_path
+
+    def _get_budget(self, view_name):
+        budgets = getattr(settings, 'PROFILING_QUERY_BUDGETS', {})
+        if view_name in budgets:
+            return budgets[view_name]
+        return getattr(settings, 'PROFILING_DEFAULT_QUERY_BUDGET', None)
+
+    def _server_timing(self, payload):
+        return ', '.join([
+            f'db;dur={payload["db_ms"]};desc="{payload["queries"]} queries"',
+            f'view;dur={payload["view_ms"]}',
+            f'cache;desc="{payload["cache_hits"]} hits, {payload["cache_misses"]} misses"',
+            f'total;dur={payload["total_ms"]}',
+        ])
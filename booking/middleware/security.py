@@ -208,11 +208,12 @@ class SecurityEventMiddleware(MiddlewareMixin):
         Log security events.
         """
         from ..models import SecurityEvent
+        from ..utils.audit_buffer import record_event
         
-        user = request.user if request.user.is_authenticated else None
+        user = request.user if getattr(request, 'user', None) and request.user.is_authenticated else None
         ip = self.get_client_ip(request)
         
-        SecurityEvent.objects.create(
+        record_event(SecurityEvent(
             user=user,
             event_type='suspicious_activity',
             description=f"Suspicious patterns detected: {', '.join(suspicious_activity)}",
@@ -223,7 +224,7 @@ class SecurityEventMiddleware(MiddlewareMixin):
                 'path': request.path,
                 'method': request.method,
             }
-        )
+        ))
     
     def get_client_ip(self, request):
         """Get client IP address."""
@@ -286,8 +287,9 @@ class SessionSecurityMiddleware(MiddlewareMixin):
         Log security events.
         """
         from ..models import SecurityEvent
+        from ..utils.audit_buffer import record_event
         
-        SecurityEvent.objects.create(
+        record_event(SecurityEvent(
             user=request.user if request.user.is_authenticated else None,
             event_type=event_type,
             description=f"Security event detected: {event_type}",
@@ -297,7 +299,7 @@ class SessionSecurityMiddleware(MiddlewareMixin):
                 'path': request.path,
                 'method': request.method,
             }
-        )
+        ))
     
     def get_client_ip(self, request):
         """Get client IP address."""
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import hashlib
+
+
+def import_legacy_tokens(apps, schema_editor):
+    """Store the old derived feed tokens so existing subscriptions keep working."""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    CalendarFeedToken = apps.get_model('booking', 'CalendarFeedToken')
+
+    batch = []
+    for user in User.objects.only('id', 'username', 'date_joined').iterator(chunk_size=2000):
+        secret_string = f"{user.id}-{user.username}-{user.date_joined}-labitory-calendar"
+        batch.append(CalendarFeedToken(
+            scope='user',
+            user_id=user.id,
+            token=hashlib.sha256(secret_string.encode()).hexdigest()[:32],
+            is_legacy=True,
+        ))
+        if len(batch) >= 2000:
+            CalendarFeedToken.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    CalendarFeedToken.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def reverse_func(apps, schema_editor):
+    """No-op reverse function; the table is dropped."""
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('booking', '0027_audit_event_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(help_text='Secret used in the feed URL', max_length=64, unique=True)),
+                ('scope', models.CharField(choices=[('user', 'User calendar'), ('resource', 'Resource calendar')], default='user', max_length=10)),
+                ('is_legacy', models.BooleanField(default=False, help_text='Token derived by the old hash scheme, kept so existing subscriptions keep working')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+                ('revoked_at', models.DateTimeField(blank=True, null=True)),
+                ('resource', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feed_tokens', to='booking.resource')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feed_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Calendar Feed Token',
+                'verbose_name_plural': 'Calendar Feed Tokens',
+                'indexes': [models.Index(fields=['scope', 'user', 'revoked_at'], name='booking_cal_scope_52387a_idx'), models.Index(fields=['scope', 'resource', 'revoked_at'], name='booking_cal_scope_dbd7bd_idx')],
+            },
+        ),
+        migrations.RunPython(import_legacy_tokens, reverse_func),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def import_event_links(apps, schema_editor):
+    """Link bookings to the Google events recorded by earlier successful syncs."""
+    GoogleCalendarIntegration = apps.get_model('booking', 'GoogleCalendarIntegration')
+    GoogleCalendarSyncLog = apps.get_model('booking', 'GoogleCalendarSyncLog')
+    GoogleCalendarEventLink = apps.get_model('booking', 'GoogleCalendarEventLink')
+
+    integrations = dict(GoogleCalendarIntegration.objects.values_list('user_id', 'id'))
+    logs = GoogleCalendarSyncLog.objects.filter(
+        action='created', status='success', booking__isnull=False
+    ).exclude(google_event_id='').order_by('timestamp').values_list(
+        'user_id', 'booking_id', 'google_event_id'
+    )
+
+    # Later logs win; an empty hash makes the first sync push the booking again
+    links = {}
+    for user_id, booking_id, event_id in logs.iterator(chunk_size=2000):
+        if user_id in integrations:
+            links[(integrations[user_id], booking_id)] = event_id
+
+    GoogleCalendarEventLink.objects.bulk_create([
+        GoogleCalendarEventLink(integration_id=integration_id, booking_id=booking_id, google_event_id=event_id)
+        for (integration_id, booking_id), event_id in links.items()
+    ], batch_size=2000, ignore_conflicts=True)
+
+
+def reverse_func(apps, schema_editor):
+    """No-op reverse function; the table is dropped."""
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0028_calendar_feed_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoogleCalendarEventLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('google_event_id', models.CharField(max_length=255)),
+                ('content_hash', models.CharField(blank=True, help_text='SHA-256 of the event body last pushed to Google', max_length=64)),
+                ('synced_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('booking', models.ForeignKey(blank=True, help_text='Cleared when the booking is deleted so the remote event can still be removed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='google_event_links', to='booking.booking')),
+                ('integration', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_links', to='booking.googlecalendarintegration')),
+            ],
+            options={
+                'verbose_name': 'Google Calendar Event Link',
+                'verbose_name_plural': 'Google Calendar Event Links',
+                'unique_together': {('integration', 'booking')},
+            },
+        ),
+        migrations.RunPython(import_event_links, reverse_func),
+    ]
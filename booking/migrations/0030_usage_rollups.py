@@ -0,0 +1,121 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:53
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+import django.db.models.deletion
+
+# Frozen copies of the rollup helpers in booking.services.usage_rollups
+GRANULARITIES = ('hour', 'day', 'week', 'month')
+
+
+def period_start(moment, granularity):
+    """Start of the local-time period of ``granularity`` containing ``moment``."""
+    local = timezone.localtime(moment)
+    if granularity == 'hour':
+        start = local.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    else:
+        start = local.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        if granularity == 'week':
+            start -= timedelta(days=start.weekday())
+        elif granularity == 'month':
+            start = start.replace(day=1)
+    return timezone.make_aware(start)
+
+
+def booking_counters(no_show, checked_out_at, status, start_time, end_time,
+                     actual_start_time, actual_end_time):
+    """Counter contributions of one finished booking."""
+    counts = Counter(bookings=1)
+    if no_show:
+        counts['no_show_bookings'] += 1
+    elif checked_out_at:
+        counts['completed_bookings'] += 1
+    elif status == 'cancelled':
+        counts['cancelled_bookings'] += 1
+
+    booked_minutes = int((end_time - start_time).total_seconds() // 60)
+    counts['booked_minutes'] += booked_minutes
+    if actual_start_time and actual_end_time:
+        actual_minutes = int((actual_end_time - actual_start_time).total_seconds() // 60)
+        counts['actual_minutes'] += actual_minutes
+        counts['wasted_minutes'] += max(0, booked_minutes - actual_minutes)
+    return counts
+
+
+def backfill_usage_rollups(apps, schema_editor):
+    """Roll up bookings finished before the rollups existed, since analytics read only the rollups."""
+    Booking = apps.get_model('booking', 'Booking')
+    UsageRollup = apps.get_model('booking', 'UsageRollup')
+    UserProfile = apps.get_model('booking', 'UserProfile')
+
+    profiles = {
+        user_id: (department_id, role)
+        for user_id, department_id, role in UserProfile.objects.values_list('user_id', 'department_id', 'role')
+    }
+    cells = defaultdict(Counter)
+    bookings = Booking.objects.filter(Q(checked_out_at__isnull=False) | Q(no_show=True)).values_list(
+        'resource_id', 'user_id', 'no_show', 'checked_out_at', 'status',
+        'start_time', 'end_time', 'actual_start_time', 'actual_end_time',
+    )
+    for resource_id, user_id, *fields in bookings.iterator(chunk_size=2000):
+        counts = booking_counters(*fields)
+        department_id, role = profiles.get(user_id, (None, ''))
+        for granularity in GRANULARITIES:
+            cells[(granularity, period_start(fields[3], granularity), resource_id, department_id, role)].update(counts)
+
+    UsageRollup.objects.bulk_create([
+        UsageRollup(granularity=granularity, period_start=start, resource_id=resource_id,
+                    department_id=department_id, user_type=role, **counts)
+        for (granularity, start, resource_id, department_id, role), counts in cells.items()
+    ], batch_size=2000)
+
+
+def reverse_func(apps, schema_editor):
+    """No-op reverse function; the table is dropped."""
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0029_google_calendar_event_links'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateTimeField()),
+                ('user_type', models.CharField(blank=True, help_text="Booking owner's role", max_length=20)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('completed_bookings', models.PositiveIntegerField(default=0)),
+                ('no_show_bookings', models.PositiveIntegerField(default=0)),
+                ('cancelled_bookings', models.PositiveIntegerField(default=0)),
+                ('booked_minutes', models.PositiveBigIntegerField(default=0)),
+                ('actual_minutes', models.PositiveBigIntegerField(default=0)),
+                ('wasted_minutes', models.PositiveBigIntegerField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='usage_rollups', to='booking.department')),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_rollups', to='booking.resource')),
+            ],
+            options={
+                'db_table': 'booking_usagerollup',
+                'ordering': ['granularity', 'period_start'],
+                'indexes': [models.Index(fields=['granularity', 'period_start'], name='usage_rollup_period_idx'), models.Index(fields=['resource', 'granularity', 'period_start'], name='usage_rollup_resource_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='usagerollup',
+            constraint=models.UniqueConstraint(fields=('granularity', 'period_start', 'resource', 'department', 'user_type'), name='usage_rollup_unique_cell'),
+        ),
+        migrations.AddConstraint(
+            model_name='usagerollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('granularity', 'period_start', 'resource', 'user_type'), name='usage_rollup_unique_cell_no_department'),
+        ),
+        migrations.RunPython(backfill_usage_rollups, reverse_func),
+    ]
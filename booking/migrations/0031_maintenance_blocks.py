@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def expand_maintenance_blocks(apps, schema_editor):
+    """Expand existing booking-blocking maintenance into per-resource blocks."""
+    Maintenance = apps.get_model('booking', 'Maintenance')
+    MaintenanceBlock = apps.get_model('booking', 'MaintenanceBlock')
+
+    blocks = []
+    for maintenance in Maintenance.objects.filter(blocks_booking=True).prefetch_related('affects_other_resources'):
+        resource_ids = {maintenance.resource_id}
+        resource_ids.update(resource.id for resource in maintenance.affects_other_resources.all())
+        blocks.extend(
+            MaintenanceBlock(
+                maintenance_id=maintenance.id, resource_id=resource_id,
+                start_time=maintenance.start_time, end_time=maintenance.end_time
+            )
+            for resource_id in resource_ids
+        )
+    MaintenanceBlock.objects.bulk_create(blocks, batch_size=1000)
+
+
+def reverse_func(apps, schema_editor):
+    """No-op reverse function; the table is dropped."""
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0030_usage_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('maintenance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocks', to='booking.maintenance')),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='maintenance_blocks', to='booking.resource')),
+            ],
+            options={
+                'db_table': 'booking_maintenanceblock',
+                'indexes': [models.Index(fields=['resource', 'start_time', 'end_time'], name='maintenance_block_range_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='maintenanceblock',
+            constraint=models.UniqueConstraint(fields=('maintenance', 'resource'), name='maintenance_block_unique_resource'),
+        ),
+        migrations.RunPython(expand_maintenance_blocks, reverse_func),
+    ]
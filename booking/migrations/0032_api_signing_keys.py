@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('booking', '0031_maintenance_blocks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APISigningKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_id', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('secret', models.CharField(max_length=128)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('revoked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signing_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'API Signing Key',
+                'verbose_name_plural': 'API Signing Keys',
+                'db_table': 'booking_apisigningkey',
+                'indexes': [models.Index(fields=['user', 'is_active'], name='booking_api_user_id_cb2e82_idx')],
+            },
+        ),
+    ]
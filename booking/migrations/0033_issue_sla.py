@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:10
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+# Frozen copy of ResourceIssue.SLA_DAYS
+SLA_DAYS = {
+    'critical': 1,
+    'high': 3,
+    'medium': 7,
+    'low': 14,
+}
+
+
+def backfill_due_dates(apps, schema_editor):
+    """Set SLA deadlines on existing issues with one UPDATE per severity."""
+    ResourceIssue = apps.get_model('booking', 'ResourceIssue')
+    for severity, days in SLA_DAYS.items():
+        ResourceIssue.objects.filter(severity=severity).update(due_at=F('created_at') + timedelta(days=days))
+    ResourceIssue.objects.filter(due_at__isnull=True).update(
+        due_at=F('created_at') + timedelta(days=SLA_DAYS['low'])
+    )
+
+
+def reverse_func(apps, schema_editor):
+    """No-op reverse function; the columns are dropped."""
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0032_api_signing_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourceissue',
+            name='due_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Resolution deadline from the severity SLA', null=True),
+        ),
+        migrations.AddField(
+            model_name='resourceissue',
+            name='escalated_at',
+            field=models.DateTimeField(blank=True, help_text='When the issue was escalated for breaching its SLA', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='resourceissue',
+            index=models.Index(fields=['status', 'due_at'], name='booking_res_status_b0114e_idx'),
+        ),
+        migrations.RunPython(backfill_due_dates, reverse_func),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:17
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0033_issue_sla'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataMigrationCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('last_pk', models.BigIntegerField(blank=True, help_text='Highest primary key processed', null=True)),
+                ('processed', models.BigIntegerField(default=0)),
+                ('changed', models.BigIntegerField(default=0)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Data Migration Checkpoint',
+                'verbose_name_plural': 'Data Migration Checkpoints',
+                'db_table': 'booking_datamigrationcheckpoint',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0034_data_migration_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='riskassessment',
+            index=models.Index(fields=['valid_until'], name='riskassessment_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userriskassessment',
+            index=models.Index(fields=['status', 'expires_at'], name='user_ra_status_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userriskassessment',
+            index=models.Index(fields=['risk_assessment', 'status', 'expires_at'], name='user_ra_validity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usertraining',
+            index=models.Index(fields=['status', 'expires_at'], name='training_status_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usertraining',
+            index=models.Index(fields=['training_course', 'status', 'expires_at'], name='training_validity_idx'),
+        ),
+    ]
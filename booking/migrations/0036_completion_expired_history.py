@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0035_training_expiry_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='userriskassessment',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='usertraining',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='userriskassessment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'expired'), _negated=True), fields=('user', 'risk_assessment', 'status'), name='user_ra_unique_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='usertraining',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'expired'), _negated=True), fields=('user', 'training_course', 'status'), name='user_training_unique_status'),
+        ),
+    ]
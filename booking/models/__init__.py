@@ -27,6 +27,7 @@ from .auth import (
     TwoFactorAuthentication,
     TwoFactorSession,
     APIToken,
+    APISigningKey,
     SecurityEvent,
 )
 
@@ -81,6 +82,7 @@ from .maintenance import (
     MaintenanceDocument,
     MaintenanceAlert,
     MaintenanceAnalytics,
+    MaintenanceBlock,
 )
 
 # Training models
@@ -103,6 +105,7 @@ from .system import (
     PDFExportSettings,
     UpdateInfo,
     UpdateHistory,
+    DataMigrationCheckpoint,
     BackupSchedule,
 )
 
@@ -120,11 +123,14 @@ from .calendar import (
     GoogleCalendarIntegration,
     GoogleCalendarSyncLog,
     CalendarSyncPreferences,
+    CalendarFeedToken,
+    GoogleCalendarEventLink,
 )
 
 # Analytics models
 from .analytics import (
     UsageAnalytics,
+    UsageRollup,
 )
 
 # Billing models
@@ -165,6 +171,7 @@ __all__ = [
     'TwoFactorAuthentication',
     'TwoFactorSession',
     'APIToken',
+    'APISigningKey',
     'SecurityEvent',
     # Notifications
     'NotificationPreference',
@@ -205,6 +212,7 @@ __all__ = [
     'MaintenanceDocument',
     'MaintenanceAlert',
     'MaintenanceAnalytics',
+    'MaintenanceBlock',
     # Training
     'RiskAssessment',
     'UserRiskAssessment',
@@ -218,6 +226,7 @@ __all__ = [
     'PDFExportSettings',
     'UpdateInfo',
     'UpdateHistory',
+    'DataMigrationCheckpoint',
     'BackupSchedule',
     # Tutorials
     'TutorialCategory',
@@ -228,8 +237,11 @@ __all__ = [
     'GoogleCalendarIntegration',
     'GoogleCalendarSyncLog',
     'CalendarSyncPreferences',
+    'CalendarFeedToken',
+    'GoogleCalendarEventLink',
     # Analytics
     'UsageAnalytics',
+    'UsageRollup',
     # Billing
     'BillingPeriod',
     'BillingRate',
@@ -14,6 +14,8 @@ https://aperature-booking.org/commercial
 """
 
 from django.db import models
+from django.db.models import Q
+from .core import Department
 from .resources import Resource
 
 
@@ -53,4 +55,59 @@ class UsageAnalytics(models.Model):
         ordering = ['-date']
     
     def __str__(self):
-        return f"{self.resource.name} - {self.date} (Utilization: {self.utilization_rate:.1%})"
\ No newline at end of file
+        return f"{self.resource.name} - {self.date} (Utilization: {self.utilization_rate:.1%})"
+
+
+class UsageRollup(models.Model):
+    """
+    Additive usage counters for one period, resource, department and user type.
+    
+    Rows exist at hour, day, week and month granularity and only hold sums,
+    so any range can be answered by adding rows up; ratios are derived at
+    query time.
+    """
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+    
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES)
+    period_start = models.DateTimeField()
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name='usage_rollups')
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True,
+                                   related_name='usage_rollups')
+    user_type = models.CharField(max_length=20, blank=True, help_text="Booking owner's role")
+    
+    # Counters
+    bookings = models.PositiveIntegerField(default=0)
+    completed_bookings = models.PositiveIntegerField(default=0)
+    no_show_bookings = models.PositiveIntegerField(default=0)
+    cancelled_bookings = models.PositiveIntegerField(default=0)
+    booked_minutes = models.PositiveBigIntegerField(default=0)
+    actual_minutes = models.PositiveBigIntegerField(default=0)
+    wasted_minutes = models.PositiveBigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'booking_usagerollup'
+        ordering = ['granularity', 'period_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'period_start', 'resource', 'department', 'user_type'],
+                name='usage_rollup_unique_cell',
+            ),
+            # NULL departments never collide in a plain unique constraint
+            models.UniqueConstraint(
+                fields=['granularity', 'period_start', 'resource', 'user_type'],
+                condition=Q(department__isnull=True),
+                name='usage_rollup_unique_cell_no_department',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', 'period_start'], name='usage_rollup_period_idx'),
+            models.Index(fields=['resource', 'granularity', 'period_start'], name='usage_rollup_resource_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.resource.name} - {self.granularity} {self.period_start:%Y-%m-%d %H:%M} ({self.bookings} bookings)"
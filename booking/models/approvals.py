@@ -19,8 +19,10 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
 
+from ..managers import AccessRequestQuerySet
 
-class AccessRequestManager(models.Manager):
+
+class AccessRequestManager(models.Manager.from_queryset(AccessRequestQuerySet)):
     """Custom manager for AccessRequest with improved constraint handling."""
     
     def create_request(self, user, resource, **kwargs):
@@ -225,24 +227,27 @@ class ApprovalRule(models.Model):
         
         # Check required certifications
         if 'required_certifications' in logic:
+            from django.apps import apps
+            UserTraining = apps.get_model('booking', 'UserTraining')
+            certified = UserTraining.objects.filter(
+                user=user_profile.user,
+                training_course__code__in=logic['required_certifications'],
+                status='completed',
+                passed=True
+            )
+            held = set(certified.values_list('training_course__code', flat=True))
+            current = set(certified.unexpired().values_list('training_course__code', flat=True))
             for cert_code in logic['required_certifications']:
-                try:
-                    training = UserTraining.objects.get(
-                        user=user_profile.user,
-                        training_course__code=cert_code,
-                        status='completed',
-                        passed=True
-                    )
-                    if training.is_expired:
-                        return {
-                            'approved': False, 
-                            'reason': f'Required certification {cert_code} has expired'
-                        }
-                except UserTraining.DoesNotExist:
+                if cert_code not in held:
                     return {
                         'approved': False, 
                         'reason': f'Required certification {cert_code} not found'
                     }
+                if cert_code not in current:
+                    return {
+                        'approved': False, 
+                        'reason': f'Required certification {cert_code} has expired'
+                    }
         
         # Training level checks removed - use specific training courses instead
         
@@ -1365,22 +1370,21 @@ class AccessRequest(models.Model):
         # Check training requirements
         try:
             UserTraining = apps.get_model('booking', 'UserTraining')
-            required_training = self.resource.training_requirements.filter(is_mandatory=True)
+            required_training = self.resource.training_requirements.filter(
+                is_mandatory=True
+            ).select_related('training_course')
+            valid_courses = set(
+                UserTraining.objects.filter(user=self.user).for_resource(self.resource)
+                .valid().values_list('training_course_id', flat=True)
+            )
 
             for req in required_training:
                 # Check if access type requires this training
                 if req.required_for_access_types and self.access_type not in req.required_for_access_types:
                     continue
 
-                # Check if user has completed this training
-                user_training = UserTraining.objects.filter(
-                    user=self.user,
-                    training_course=req.training_course,
-                    status='completed',
-                    passed=True
-                ).first()
-
-                if not user_training or (hasattr(user_training, 'is_expired') and user_training.is_expired):
+                # Check if user holds valid training for this course
+                if req.training_course_id not in valid_courses:
                     compliance['training_complete'] = False
                     compliance['missing_training'].append(req.training_course)
         except Exception:
@@ -1396,14 +1400,13 @@ class AccessRequest(models.Model):
                     is_active=True
                 )
 
-                for assessment in required_assessments:
-                    user_assessment = UserRiskAssessment.objects.filter(
-                        user=self.user,
-                        risk_assessment=assessment,
-                        status='approved'
-                    ).first()
+                valid_assessments = set(
+                    UserRiskAssessment.objects.filter(user=self.user, risk_assessment__in=required_assessments)
+                    .valid().values_list('risk_assessment_id', flat=True)
+                )
 
-                    if not user_assessment:
+                for assessment in required_assessments:
+                    if assessment.id not in valid_assessments:
                         compliance['risk_assessments_complete'] = False
                         compliance['missing_assessments'].append(assessment)
             except Exception:
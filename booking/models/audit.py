@@ -50,7 +50,7 @@ class AuditLog(models.Model):
     new_values = models.JSONField(default=dict, blank=True)
     
     # Context information
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     session_key = models.CharField(max_length=40, blank=True)
@@ -88,11 +88,16 @@ class AuditLog(models.Model):
                    old_values=None, new_values=None, request=None, description="", **kwargs):
         """
         Convenient method to create audit log entries.
+        
+        The entry is queued on the audit buffer and written in a batch, so
+        the returned instance may not have a primary key yet.
         """
+        from ..utils.audit_buffer import record_event
+        
         # Get user info
         username = user.username if user else "Anonymous"
         
-        # Get object info
+        # Get object info (get_for_model is served from the ContentType cache)
         content_type = None
         object_id = None
         table_name = ""
@@ -116,12 +121,11 @@ class AuditLog(models.Model):
             request_path = request.path
             session_key = request.session.session_key if hasattr(request, 'session') else ""
         
-        return cls.objects.create(
+        return record_event(cls(
             user=user,
             username=username,
             content_type=content_type,
             object_id=object_id,
-            content_object=content_object,
             action=action,
             table_name=table_name,
             field_changes=field_changes or {},
@@ -129,13 +133,13 @@ class AuditLog(models.Model):
             new_values=new_values or {},
             ip_address=ip_address,
             user_agent=user_agent,
-            session_key=session_key,
+            session_key=session_key or "",
             description=description,
             metadata=kwargs.get('metadata', {}),
             request_method=request_method,
             request_path=request_path,
             request_id=kwargs.get('request_id', ''),
-        )
+        ))
 
 
 class DataAccessLog(models.Model):
@@ -157,7 +161,7 @@ class DataAccessLog(models.Model):
     resource_id = models.CharField(max_length=255)
     
     # Access details
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     
@@ -257,7 +261,7 @@ class AdminAction(models.Model):
     target_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='admin_actions_received')
     target_username = models.CharField(max_length=150, blank=True)
     
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     
     # Action details
@@ -327,6 +331,8 @@ def log_data_access(user, resource_type, resource_id, access_type, request=None,
     """
     Log sensitive data access.
     """
+    from ..utils.audit_buffer import record_event
+    
     ip_address = None
     user_agent = ""
     
@@ -334,7 +340,7 @@ def log_data_access(user, resource_type, resource_id, access_type, request=None,
         ip_address = get_client_ip(request)
         user_agent = request.META.get('HTTP_USER_AGENT', '')
     
-    DataAccessLog.objects.create(
+    record_event(DataAccessLog(
         user=user,
         access_type=access_type,
         resource_type=resource_type,
@@ -344,7 +350,7 @@ def log_data_access(user, resource_type, resource_id, access_type, request=None,
         search_criteria=kwargs.get('search_criteria', {}),
         fields_accessed=kwargs.get('fields_accessed', []),
         purpose=kwargs.get('purpose', '')
-    )
+    ))
 
 
 def log_login_attempt(username, attempt_type, request=None, user=None, failure_reason=""):
@@ -375,11 +381,13 @@ def log_admin_action(admin_user, action_type, description, request=None, target_
     """
     Log administrative actions.
     """
+    from ..utils.audit_buffer import record_event
+    
     ip_address = None
     if request:
         ip_address = get_client_ip(request)
     
-    AdminAction.objects.create(
+    record_event(AdminAction(
         admin_user=admin_user,
         action_type=action_type,
         target_user=target_user,
@@ -390,4 +398,4 @@ def log_admin_action(admin_user, action_type, description, request=None, target_
         old_values=kwargs.get('old_values', {}),
         new_values=kwargs.get('new_values', {}),
         reason=kwargs.get('reason', '')
-    )
\ No newline at end of file
+    ))
\ No newline at end of file
@@ -215,6 +215,60 @@ class APIToken(models.Model):
         return f"{self.get_token_type_display()} for {self.user.username} ({'Revoked' if self.is_revoked else 'Active'})"
 
 
+class APISigningKey(models.Model):
+    """Shared secrets used to sign API requests with HMAC."""
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='signing_keys')
+    key_id = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=100, blank=True)
+    # The server recomputes signatures, so the secret is stored recoverably
+    secret = models.CharField(max_length=128)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'booking_apisigningkey'
+        indexes = [
+            models.Index(fields=['user', 'is_active']),
+        ]
+        verbose_name = 'API Signing Key'
+        verbose_name_plural = 'API Signing Keys'
+    
+    @classmethod
+    def generate(cls, user, name='', expires_in_days=None):
+        """Create a new signing key with a random identifier and secret."""
+        expires_at = None
+        if expires_in_days:
+            expires_at = timezone.now() + timedelta(days=expires_in_days)
+        return cls.objects.create(
+            user=user,
+            name=name,
+            key_id=f"labitory_{user.id}_{secrets.token_hex(8)}",
+            secret=secrets.token_urlsafe(32),
+            expires_at=expires_at,
+        )
+    
+    def is_expired(self):
+        """Check if the key has passed its expiry date."""
+        return self.expires_at is not None and timezone.now() > self.expires_at
+    
+    def is_valid(self):
+        """Check if the key can be used to sign requests."""
+        return self.is_active and not self.is_expired()
+    
+    def revoke(self):
+        """Revoke the key."""
+        self.is_active = False
+        self.revoked_at = timezone.now()
+        self.save()
+    
+    def __str__(self):
+        return f"{self.key_id} for {self.user.username} ({'Active' if self.is_valid() else 'Inactive'})"
+
+
 class SecurityEvent(models.Model):
     """Track security-related events for monitoring."""
     
@@ -236,7 +290,8 @@ class SecurityEvent(models.Model):
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Indexed via Meta.indexes, which retention pruning relies on
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     
     # Additional context data
     metadata = models.JSONField(default=dict, blank=True)
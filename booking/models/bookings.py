@@ -20,6 +20,9 @@ from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from ..managers import BookingManager
+from .tracking import FieldTrackerMixin
+
 
 class BookingTemplate(models.Model):
     """Templates for frequently used booking configurations."""
@@ -91,7 +94,7 @@ class BookingTemplate(models.Model):
         return False
 
 
-class Booking(models.Model):
+class Booking(FieldTrackerMixin, models.Model):
     """Individual booking records."""
     STATUS_CHOICES = [
         ('pending', 'Pending Approval'),
@@ -101,6 +104,9 @@ class Booking(models.Model):
         ('completed', 'Completed'),
     ]
     
+    # Auto-maintained timestamps are not reported as changes
+    untracked_fields = ('created_at', 'updated_at')
+    
     resource = models.ForeignKey('Resource', on_delete=models.CASCADE, related_name='bookings')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
     title = models.CharField(max_length=200)
@@ -139,6 +145,8 @@ class Booking(models.Model):
     check_in_reminder_sent = models.BooleanField(default=False)
     check_out_reminder_sent = models.BooleanField(default=False)
 
+    objects = BookingManager()
+
     class Meta:
         db_table = 'booking_booking'
         ordering = ['start_time']
@@ -583,7 +591,7 @@ class BookingHistory(models.Model):
     action = models.CharField(max_length=50)
     old_values = models.JSONField(null=True, blank=True)
     new_values = models.JSONField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     notes = models.TextField(blank=True)
 
     class Meta:
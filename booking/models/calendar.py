@@ -289,4 +289,90 @@ class CalendarSyncPreferences(models.Model):
         verbose_name_plural = "Calendar Sync Preferences"
 
     def __str__(self):
-        return f"Calendar preferences for {self.user.get_full_name() or self.user.username}"
\ No newline at end of file
+        return f"Calendar preferences for {self.user.get_full_name() or self.user.username}"
+
+
+class GoogleCalendarEventLink(models.Model):
+    """Google Calendar event pushed for a booking, with a hash of its synced content."""
+
+    integration = models.ForeignKey(
+        GoogleCalendarIntegration,
+        on_delete=models.CASCADE,
+        related_name='event_links'
+    )
+    booking = models.ForeignKey(
+        'Booking',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='google_event_links',
+        help_text="Cleared when the booking is deleted so the remote event can still be removed"
+    )
+    google_event_id = models.CharField(max_length=255)
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the event body last pushed to Google"
+    )
+    synced_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Google Calendar Event Link"
+        verbose_name_plural = "Google Calendar Event Links"
+        unique_together = ('integration', 'booking')
+
+    def __str__(self):
+        return f"Google event {self.google_event_id} for booking #{self.booking_id}"
+
+
+class CalendarFeedToken(models.Model):
+    """Secret token authorising an ICS calendar feed subscription."""
+
+    SCOPE_CHOICES = [
+        ('user', 'User calendar'),
+        ('resource', 'Resource calendar'),
+    ]
+
+    token = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="Secret used in the feed URL"
+    )
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES, default='user')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='calendar_feed_tokens'
+    )
+    resource = models.ForeignKey(
+        'Resource',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='calendar_feed_tokens'
+    )
+    is_legacy = models.BooleanField(
+        default=False,
+        help_text="Token derived by the old hash scheme, kept so existing subscriptions keep working"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Calendar Feed Token"
+        verbose_name_plural = "Calendar Feed Tokens"
+        indexes = [
+            models.Index(fields=['scope', 'user', 'revoked_at']),
+            models.Index(fields=['scope', 'resource', 'revoked_at']),
+        ]
+
+    def __str__(self):
+        subject = self.user or self.resource
+        return f"{self.get_scope_display()} feed token for {subject}"
+
+    @property
+    def is_active(self):
+        return self.revoked_at is None
@@ -17,9 +17,11 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from bisect import bisect_right
 from datetime import timedelta
 from .resources import Resource
 from .bookings import Booking
+from ..managers import MaintenanceQuerySet, MaintenanceBlockQuerySet
 
 
 class MaintenanceVendor(models.Model):
@@ -138,6 +140,8 @@ class Maintenance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MaintenanceQuerySet.as_manager()
+
     class Meta:
         db_table = 'booking_maintenance'
         ordering = ['start_time']
@@ -185,6 +189,28 @@ class Maintenance(models.Model):
             self.completed_at = timezone.now()
         
         super().save(*args, **kwargs)
+        self.sync_blocks()
+    
+    def sync_blocks(self):
+        """
+        Rewrite the per-resource blocked intervals of this maintenance.
+        
+        Called on save and whenever ``affects_other_resources`` changes, so
+        conflict and availability checks never have to expand the M2M.
+        """
+        MaintenanceBlock.objects.filter(maintenance=self).delete()
+        if not self.blocks_booking:
+            return
+        
+        resource_ids = {self.resource_id}
+        resource_ids.update(self.affects_other_resources.values_list('id', flat=True))
+        MaintenanceBlock.objects.bulk_create([
+            MaintenanceBlock(
+                maintenance=self, resource_id=resource_id,
+                start_time=self.start_time, end_time=self.end_time
+            )
+            for resource_id in resource_ids
+        ])
 
     def overlaps_with_booking(self, booking):
         """Check if maintenance overlaps with a booking."""
@@ -218,12 +244,8 @@ class Maintenance(models.Model):
     
     def get_affected_bookings(self):
         """Get bookings that are affected by this maintenance."""
-        if not self.blocks_booking:
-            return Booking.objects.none()
-        
-        affected_resources = [self.resource] + list(self.affects_other_resources.all())
         return Booking.objects.filter(
-            resource__in=affected_resources,
+            resource__in=self.blocks.values('resource'),
             start_time__lt=self.end_time,
             end_time__gt=self.start_time,
             status__in=['pending', 'approved']
@@ -231,24 +253,37 @@ class Maintenance(models.Model):
     
     def calculate_impact_score(self):
         """Calculate impact score based on affected bookings and resource importance."""
-        affected_bookings = self.get_affected_bookings().count()
-        resource_usage = self.resource.bookings.filter(
-            start_time__gte=timezone.now() - timedelta(days=30)
-        ).count()
-        
-        # Base impact on number of affected bookings and recent usage
-        impact_score = (affected_bookings * 2) + (resource_usage * 0.1)
-        
-        # Adjust for priority
-        priority_multipliers = {
-            'low': 0.5,
-            'medium': 1.0,
-            'high': 1.5,
-            'critical': 2.0,
-            'emergency': 3.0
-        }
-        
-        return impact_score * priority_multipliers.get(self.priority, 1.0)
+        return Maintenance.objects.filter(pk=self.pk).with_impact().values_list(
+            'impact_score', flat=True
+        ).get()
+
+
+class MaintenanceBlock(models.Model):
+    """
+    One resource's blocked interval for a maintenance period.
+    
+    Maintenance affecting several resources is expanded into one row per
+    resource when it is saved, so "what blocks this resource between A and
+    B" is a single indexed range lookup.
+    """
+    maintenance = models.ForeignKey(Maintenance, on_delete=models.CASCADE, related_name='blocks')
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name='maintenance_blocks')
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    
+    objects = MaintenanceBlockQuerySet.as_manager()
+    
+    class Meta:
+        db_table = 'booking_maintenanceblock'
+        constraints = [
+            models.UniqueConstraint(fields=['maintenance', 'resource'], name='maintenance_block_unique_resource'),
+        ]
+        indexes = [
+            models.Index(fields=['resource', 'start_time', 'end_time'], name='maintenance_block_range_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.resource.name} blocked by {self.maintenance.title}"
 
 
 class MaintenanceDocument(models.Model):
@@ -411,58 +446,78 @@ class MaintenanceAnalytics(models.Model):
     def calculate_metrics(self):
         """Recalculate all maintenance metrics for this resource."""
         maintenances = self.resource.maintenances.all()
-        completed_maintenances = maintenances.filter(status='completed')
+        completed = models.Q(status='completed')
+        timed = completed & models.Q(completed_at__isnull=False)
+        duration = models.ExpressionWrapper(
+            models.F('completed_at') - models.F('start_time'), output_field=models.DurationField()
+        )
         
-        if not completed_maintenances.exists():
+        # Counts, costs and downtime in one grouped query
+        stats = maintenances.aggregate(
+            total_count=models.Count('id'),
+            completed_count=models.Count('id', filter=completed),
+            preventive_count=models.Count('id', filter=models.Q(maintenance_type='preventive')),
+            corrective_count=models.Count('id', filter=models.Q(maintenance_type='corrective')),
+            emergency_count=models.Count('id', filter=models.Q(maintenance_type='emergency')),
+            total_cost=models.Sum('actual_cost', filter=completed),
+            cost_count=models.Count('actual_cost', filter=completed),
+            preventive_cost=models.Sum('actual_cost', filter=completed & models.Q(maintenance_type='preventive')),
+            total_downtime=models.Sum(duration, filter=timed),
+            timed_count=models.Count('id', filter=timed),
+        )
+        
+        if not stats['completed_count']:
             return
         
         # Cost metrics
-        costs = completed_maintenances.exclude(actual_cost__isnull=True).values_list('actual_cost', flat=True)
-        if costs:
-            self.total_maintenance_cost = sum(costs)
-            self.average_maintenance_cost = sum(costs) / len(costs)
-        
-        preventive_costs = completed_maintenances.filter(
-            maintenance_type='preventive'
-        ).exclude(actual_cost__isnull=True).aggregate(
-            total=models.Sum('actual_cost')
-        )['total'] or 0
+        if stats['cost_count']:
+            self.total_maintenance_cost = stats['total_cost']
+            self.average_maintenance_cost = stats['total_cost'] / stats['cost_count']
         
         if self.total_maintenance_cost > 0:
-            self.preventive_cost_ratio = (preventive_costs / self.total_maintenance_cost) * 100
+            self.preventive_cost_ratio = ((stats['preventive_cost'] or 0) / self.total_maintenance_cost) * 100
         
         # Frequency metrics
-        self.total_maintenance_count = maintenances.count()
-        self.preventive_maintenance_count = maintenances.filter(maintenance_type='preventive').count()
-        self.corrective_maintenance_count = maintenances.filter(maintenance_type='corrective').count()
-        self.emergency_maintenance_count = maintenances.filter(maintenance_type='emergency').count()
+        self.total_maintenance_count = stats['total_count']
+        self.preventive_maintenance_count = stats['preventive_count']
+        self.corrective_maintenance_count = stats['corrective_count']
+        self.emergency_maintenance_count = stats['emergency_count']
         
         # Time metrics
-        durations = []
-        for maintenance in completed_maintenances:
-            if maintenance.completed_at and maintenance.start_time:
-                duration = maintenance.completed_at - maintenance.start_time
-                durations.append(duration.total_seconds() / 3600)  # Convert to hours
-        
-        if durations:
-            self.total_downtime_hours = sum(durations)
-            avg_hours = sum(durations) / len(durations)
-            self.average_repair_time = timedelta(hours=avg_hours)
+        if stats['timed_count']:
+            total_hours = stats['total_downtime'].total_seconds() / 3600
+            self.total_downtime_hours = total_hours
+            self.average_repair_time = timedelta(hours=total_hours / stats['timed_count'])
         
         # Performance metrics
-        # Simple first-time fix rate calculation
-        if completed_maintenances.count() > 0:
-            repeated_issues = 0
-            for maintenance in completed_maintenances:
-                # Check if there's another maintenance within 30 days for same type of issue
-                related = completed_maintenances.filter(
-                    maintenance_type=maintenance.maintenance_type,
-                    start_time__gt=maintenance.completed_at,
-                    start_time__lt=maintenance.completed_at + timedelta(days=30)
-                ).exists()
-                if related:
-                    repeated_issues += 1
-            
-            self.first_time_fix_rate = ((completed_maintenances.count() - repeated_issues) / completed_maintenances.count()) * 100
+        repeated_issues = self._count_repeated_issues(maintenances.filter(completed))
+        self.first_time_fix_rate = (
+            (stats['completed_count'] - repeated_issues) / stats['completed_count']
+        ) * 100
+        
+        self.save()
+    
+    @staticmethod
+    def _count_repeated_issues(completed_maintenances, window=timedelta(days=30)):
+        """
+        Count maintenances followed by another of the same type within ``window``.
+        
+        Reads start and completion times once, sorted by type and start, and
+        binary-searches each type's start times instead of querying per row.
+        """
+        starts_by_type = {}
+        completions = []
+        for maintenance_type, start_time, completed_at in completed_maintenances.order_by(
+            'maintenance_type', 'start_time'
+        ).values_list('maintenance_type', 'start_time', 'completed_at'):
+            starts_by_type.setdefault(maintenance_type, []).append(start_time)
+            if completed_at:
+                completions.append((maintenance_type, completed_at))
         
-        self.save()
\ No newline at end of file
+        repeated = 0
+        for maintenance_type, completed_at in completions:
+            starts = starts_by_type[maintenance_type]
+            index = bisect_right(starts, completed_at)
+            if index < len(starts) and starts[index] < completed_at + window:
+                repeated += 1
+        return repeated
\ No newline at end of file
@@ -19,6 +19,8 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
 
+from ..managers import NotificationManager
+
 
 class NotificationPreference(models.Model):
     """User notification preferences."""
@@ -148,6 +150,8 @@ class Notification(models.Model):
     max_retries = models.PositiveIntegerField(default=3)
     next_retry_at = models.DateTimeField(null=True, blank=True)
     
+    objects = NotificationManager()
+    
     class Meta:
         db_table = 'booking_notification'
         ordering = ['-created_at']
@@ -17,6 +17,9 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from decimal import Decimal
+from datetime import timedelta
+
+from ..managers import ResourceManager, ResourceIssueQuerySet
 
 # Import UserTraining to avoid circular import issues
 from django.apps import apps
@@ -106,6 +109,8 @@ class Resource(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ResourceManager()
+    
     class Meta:
         db_table = 'booking_resource'
         ordering = ['name']
@@ -200,7 +205,9 @@ class Resource(models.Model):
         progress['stages'].append(induction_stage)
         
         # Stage 2: Equipment-Specific Training Requirements
-        required_training = ResourceTrainingRequirement.objects.filter(resource=self)
+        required_training = list(
+            ResourceTrainingRequirement.objects.filter(resource=self).select_related('training_course')
+        )
         training_completed = []
         training_pending = []
         training_records = []  # Store actual UserTraining record info
@@ -211,14 +218,21 @@ class Resource(models.Model):
         UserRiskAssessment = apps.get_model('booking', 'UserRiskAssessment')
         AccessRequest = apps.get_model('booking', 'AccessRequest')
         
+        # Load the user's records on the required courses up front; the
+        # default ordering puts the latest record for each course first
+        user_trainings = UserTraining.objects.filter(
+            user=user,
+            training_course__in=[req.training_course_id for req in required_training]
+        )
+        valid_training = {record.training_course_id: record for record in user_trainings.valid()}
+        latest_training = {}
+        for record in user_trainings:
+            latest_training.setdefault(record.training_course_id, record)
+        
         for req in required_training:
-            user_training = UserTraining.objects.filter(
-                user=user,
-                training_course=req.training_course,
-                status='completed'
-            ).first()
+            user_training = valid_training.get(req.training_course_id)
             
-            if user_training and user_training.is_valid:
+            if user_training:
                 training_completed.append(req.training_course.title)
                 training_records.append({
                     'course_title': req.training_course.title,
@@ -229,10 +243,7 @@ class Resource(models.Model):
                 })
             else:
                 # Check if there's any training record at all
-                any_training = UserTraining.objects.filter(
-                    user=user,
-                    training_course=req.training_course
-                ).first()
+                any_training = latest_training.get(req.training_course_id)
                 
                 training_pending.append(req.training_course.title)
                 training_records.append({
@@ -284,14 +295,12 @@ class Resource(models.Model):
         assessment_pending = []
         
         if risk_assessment_required:
+            valid_assessments = set(
+                UserRiskAssessment.objects.filter(user=user, risk_assessment__in=required_assessments)
+                .valid().values_list('risk_assessment_id', flat=True)
+            )
             for assessment in required_assessments:
-                user_assessment = UserRiskAssessment.objects.filter(
-                    user=user,
-                    risk_assessment=assessment,
-                    status='approved'
-                ).first()
-                
-                if user_assessment:
+                if assessment.id in valid_assessments:
                     assessment_completed.append(assessment.title)
                 else:
                     assessment_pending.append(assessment.title)
@@ -539,6 +548,16 @@ class ResourceIssue(models.Model):
         ('duplicate', 'Duplicate'),
     ]
     
+    UNRESOLVED_STATUSES = ('open', 'in_progress', 'waiting_parts')
+    
+    # Days allowed to resolve an issue of each severity
+    SLA_DAYS = {
+        'critical': 1,
+        'high': 3,
+        'medium': 7,
+        'low': 14,
+    }
+    
     CATEGORY_CHOICES = [
         ('mechanical', 'Mechanical Issue'),
         ('electrical', 'Electrical Issue'),
@@ -671,6 +690,21 @@ class ResourceIssue(models.Model):
         help_text="This issue prevents the resource from being used"
     )
     
+    # SLA tracking
+    due_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Resolution deadline from the severity SLA"
+    )
+    escalated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the issue was escalated for breaching its SLA"
+    )
+    
+    objects = ResourceIssueQuerySet.as_manager()
+    
     class Meta:
         db_table = 'booking_resourceissue'
         verbose_name = "Resource Issue"
@@ -681,6 +715,7 @@ class ResourceIssue(models.Model):
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['severity', '-created_at']),
             models.Index(fields=['assigned_to', 'status']),
+            models.Index(fields=['status', 'due_at']),
         ]
     
     def __str__(self):
@@ -693,8 +728,15 @@ class ResourceIssue(models.Model):
         elif self.status == 'closed' and not self.closed_at:
             self.closed_at = timezone.now()
         
+        self.due_at = self.calculate_due_at()
+        
         super().save(*args, **kwargs)
     
+    def calculate_due_at(self):
+        """SLA deadline for the issue's severity, counted from when it was reported."""
+        reported = self.created_at or timezone.now()
+        return reported + timedelta(days=self.SLA_DAYS.get(self.severity, self.SLA_DAYS['low']))
+    
     @property
     def age_in_days(self):
         """How many days since the issue was reported."""
@@ -702,16 +744,12 @@ class ResourceIssue(models.Model):
     
     @property
     def is_overdue(self):
-        """Check if issue is overdue based on severity."""
-        age = self.age_in_days
-        if self.severity == 'critical':
-            return age > 1  # Critical issues should be resolved within 1 day
-        elif self.severity == 'high':
-            return age > 3  # High severity within 3 days
-        elif self.severity == 'medium':
-            return age > 7  # Medium severity within 1 week
-        else:
-            return age > 14  # Low severity within 2 weeks
+        """Check if the issue is unresolved past its SLA deadline."""
+        return (
+            self.status in self.UNRESOLVED_STATUSES
+            and self.due_at is not None
+            and timezone.now() > self.due_at
+        )
     
     @property
     def time_to_resolution(self):
@@ -320,6 +320,28 @@ class UpdateHistory(models.Model):
         return None
 
 
+class DataMigrationCheckpoint(models.Model):
+    """Progress of a chunked data repair, so an interrupted run can resume."""
+    
+    name = models.CharField(max_length=200, unique=True)
+    last_pk = models.BigIntegerField(null=True, blank=True, help_text="Highest primary key processed")
+    processed = models.BigIntegerField(default=0)
+    changed = models.BigIntegerField(default=0)
+    
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'booking_datamigrationcheckpoint'
+        verbose_name = "Data Migration Checkpoint"
+        verbose_name_plural = "Data Migration Checkpoints"
+    
+    def __str__(self):
+        state = 'completed' if self.completed_at else f'at pk {self.last_pk}'
+        return f"{self.name} ({state})"
+
+
 class BackupSchedule(models.Model):
     """Model for managing automated backup schedules."""
     
@@ -0,0 +1,102 @@
+# booking/models/tracking.py
+"""
+In-memory field change tracking for models.
+
+Mix ``FieldTrackerMixin`` into a model to snapshot its field values when the
+instance is created or loaded from the database. Signal handlers and
+services can then ask what changed without re-fetching the row:
+
+    booking.has_changed('status')
+    booking.get_old_value('status')
+    booking.get_changes()  # {'status': ('pending', 'approved')}
+
+The snapshot is refreshed after ``save()`` returns, so ``post_save``
+receivers still see the changes made by that save.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+_MISSING = object()
+
+
+class FieldTrackerMixin:
+    """Track changes to concrete model fields since load or last save."""
+
+    # Field names to track; None tracks every concrete field.
+    tracked_fields = None
+
+    # Fields that never count as a change (e.g. auto-updated timestamps).
+    untracked_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reset_tracked_values()
+
+    @classmethod
+    def _get_tracked_attnames(cls):
+        cached = cls.__dict__.get('_tracked_attnames')
+        if cached is None:
+            cached = {}
+            for field in cls._meta.concrete_fields:
+                if field.primary_key or field.name in cls.untracked_fields:
+                    continue
+                if cls.tracked_fields is not None and field.name not in cls.tracked_fields:
+                    continue
+                cached[field.name] = field.attname
+            cls._tracked_attnames = cached
+        return cached
+
+    def _reset_tracked_values(self, fields=None):
+        """Snapshot current values; deferred fields are left out."""
+        attnames = self._get_tracked_attnames()
+        if fields is None:
+            self._tracked_values = {}
+            names = attnames
+        else:
+            names = [name for name in fields if name in attnames]
+        for name in names:
+            attname = attnames[name]
+            if attname in self.__dict__:
+                self._tracked_values[name] = self.__dict__[attname]
+
+    def get_old_value(self, field_name, default=None):
+        """Value of ``field_name`` when the instance was loaded or last saved."""
+        return self._tracked_values.get(field_name, default)
+
+    def has_changed(self, field_name):
+        """Whether ``field_name`` differs from its loaded value."""
+        attname = self._get_tracked_attnames().get(field_name)
+        if attname is None or attname not in self.__dict__:
+            return False
+        old = self._tracked_values.get(field_name, _MISSING)
+        if old is _MISSING:
+            return False
+        return old != self.__dict__[attname]
+
+    def get_changes(self):
+        """Return ``{field_name: (old_value, new_value)}`` for changed fields."""
+        changes = {}
+        for name, attname in self._get_tracked_attnames().items():
+            if attname not in self.__dict__:
+                continue
+            old = self._tracked_values.get(name, _MISSING)
+            new = self.__dict__[attname]
+            if old is not _MISSING and old != new:
+                changes[name] = (old, new)
+        return changes
+
+    @property
+    def changed_fields(self):
+        """Names of fields changed since load or last save."""
+        return list(self.get_changes())
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._reset_tracked_values(update_fields)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._reset_tracked_values(fields)
@@ -14,10 +14,12 @@ https://aperature-booking.org/commercial
 """
 
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
 from .resources import Resource
+from ..managers import RiskAssessmentQuerySet, UserRiskAssessmentQuerySet, UserTrainingQuerySet
 
 
 class RiskAssessment(models.Model):
@@ -67,9 +69,14 @@ class RiskAssessment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = RiskAssessmentQuerySet.as_manager()
+    
     class Meta:
         db_table = 'booking_riskassessment'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['valid_until'], name='riskassessment_expiry_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.resource.name}"
@@ -135,10 +142,23 @@ class UserRiskAssessment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UserRiskAssessmentQuerySet.as_manager()
+    
     class Meta:
         db_table = 'booking_userriskassessment'
-        unique_together = ['user', 'risk_assessment', 'status']  # Prevent duplicate active assessments
         ordering = ['-created_at']
+        constraints = [
+            # Prevent duplicate active assessments; every lapse keeps its expired record
+            models.UniqueConstraint(
+                fields=['user', 'risk_assessment', 'status'],
+                condition=~Q(status='expired'),
+                name='user_ra_unique_status',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='user_ra_status_expiry_idx'),
+            models.Index(fields=['risk_assessment', 'status', 'expires_at'], name='user_ra_validity_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.risk_assessment.title} ({self.get_status_display()})"
@@ -299,10 +319,23 @@ class UserTraining(models.Model):
     
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UserTrainingQuerySet.as_manager()
+    
     class Meta:
         db_table = 'booking_usertraining'
-        unique_together = ['user', 'training_course', 'status']  # Prevent duplicate active records
         ordering = ['-completed_at', '-enrolled_at']
+        constraints = [
+            # Prevent duplicate active records; every lapse keeps its expired record
+            models.UniqueConstraint(
+                fields=['user', 'training_course', 'status'],
+                condition=~Q(status='expired'),
+                name='user_training_unique_status',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='training_status_expiry_idx'),
+            models.Index(fields=['training_course', 'status', 'expires_at'], name='training_validity_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.training_course.title} ({self.get_status_display()})"
@@ -361,6 +394,9 @@ class UserTraining(models.Model):
 
         self.save()
 
+        if self.passed:
+            self._update_access_requests_on_completion(instructor)
+
         # Send notifications
         if send_notification:
             # Training notifications removed during system simplification
@@ -423,45 +459,5 @@ class UserTraining(models.Model):
 
     def _update_access_requests_on_completion(self, instructor=None):
         """Update related access requests when training is completed."""
-        from booking.models import AccessRequest, ResourceTrainingRequirement
-
-        training_course = self.training_course
-
-        # Get resources that require this training
-        required_resources = ResourceTrainingRequirement.objects.filter(
-            training_course=training_course,
-            is_mandatory=True
-        ).values_list('resource_id', flat=True)
-
-        # Find pending access requests for these resources
-        pending_requests = AccessRequest.objects.filter(
-            user=self.user,
-            resource_id__in=required_resources,
-            status='pending',
-            lab_training_confirmed=False
-        )
-
-        for request in pending_requests:
-            # Check if all training requirements for this resource are now met
-            all_training_met = True
-            resource_training_reqs = ResourceTrainingRequirement.objects.filter(
-                resource=request.resource,
-                is_mandatory=True
-            )
-
-            for req in resource_training_reqs:
-                # Check if user has completed this training
-                if not UserTraining.objects.filter(
-                    user=self.user,
-                    training_course=req.training_course,
-                    status='completed'
-                ).exists():
-                    all_training_met = False
-                    break
-
-            # If all training is met, confirm lab training
-            if all_training_met:
-                request.confirm_lab_training(
-                    confirmed_by=instructor or self.user,
-                    notes=f'Auto-confirmed: All required training completed including {training_course.title}'
-                )
\ No newline at end of file
+        from booking.services.training_service import training_satisfaction_service
+        training_satisfaction_service.on_trainings_completed([self], instructor)
@@ -20,7 +20,7 @@ from django.core.exceptions import ValidationError
 from datetime import timedelta
 from .resources import Resource
 from .bookings import Booking
-from .maintenance import Maintenance
+from .maintenance import MaintenanceBlock
 
 
 class WaitingListEntry(models.Model):
@@ -151,24 +151,32 @@ class WaitingListEntry(models.Model):
         desired_duration = self.desired_end_time - self.desired_start_time
         min_duration = timedelta(minutes=self.min_duration_minutes)
         
+        # Load everything that can block the window once, then test each
+        # candidate slot against it in memory
+        window_end = search_end + desired_duration
+        busy_periods = list(
+            Booking.objects.filter(
+                resource=self.resource,
+                status__in=['approved', 'pending'],
+                start_time__lt=window_end,
+                end_time__gt=search_start
+            ).values_list('start_time', 'end_time')
+        )
+        busy_periods += list(
+            MaintenanceBlock.objects.for_resource(self.resource).overlapping(
+                search_start, window_end
+            ).values_list('start_time', 'end_time')
+        )
+        
         while current_time < search_end:
             # Check for conflicts in this time slot
             slot_end = current_time + desired_duration
             
-            conflicts = Booking.objects.filter(
-                resource=self.resource,
-                status__in=['approved', 'pending'],
-                start_time__lt=slot_end,
-                end_time__gt=current_time
-            )
-            
-            maintenance_conflicts = Maintenance.objects.filter(
-                resource=self.resource,
-                start_time__lt=slot_end,
-                end_time__gt=current_time
+            has_conflict = any(
+                start < slot_end and end > current_time for start, end in busy_periods
             )
             
-            if not conflicts.exists() and not maintenance_conflicts.exists():
+            if not has_conflict:
                 # Found available slot
                 slots.append({
                     'start_time': current_time,
@@ -108,6 +108,53 @@ class NotificationService:
         
         return notifications
     
+    def create_bulk_notifications(
+        self,
+        notification_type: str,
+        entries: List[Dict[str, Any]],
+        priority: str = 'medium',
+        batch_size: int = 500
+    ) -> int:
+        """
+        Create notifications for many recipients at once.
+        
+        Each entry is a dict with ``user``, ``title``, ``message`` and optional
+        ``booking``, ``resource`` and ``metadata`` keys. Preferences for all
+        recipients are loaded in one query and rows are inserted in batches.
+        """
+        if not entries:
+            return 0
+        
+        user_ids = {entry['user'].id for entry in entries}
+        explicit = {}
+        for user_id, method in NotificationPreference.objects.filter(
+            user_id__in=user_ids,
+            notification_type=notification_type,
+            is_enabled=True
+        ).values_list('user_id', 'delivery_method'):
+            explicit.setdefault(user_id, set()).add(method)
+        
+        defaults = self.default_preferences.get(notification_type, {})
+        notifications = []
+        for entry in entries:
+            methods = set(explicit.get(entry['user'].id, ()))
+            methods.update(method for method, enabled in defaults.items() if enabled)
+            for delivery_method in sorted(methods):
+                notifications.append(Notification(
+                    user=entry['user'],
+                    notification_type=notification_type,
+                    title=entry['title'],
+                    message=entry['message'],
+                    priority=priority,
+                    delivery_method=delivery_method,
+                    booking=entry.get('booking'),
+                    resource=entry.get('resource'),
+                    metadata=entry.get('metadata') or {}
+                ))
+        
+        Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        return len(notifications)
+    
     def _get_user_preferences(self, user, notification_type: str) -> Dict[str, bool]:
         """Get user notification preferences for a specific type."""
         preferences = {}
@@ -0,0 +1,238 @@
+# booking/services/bulk_booking_service.py
+"""
+Bulk approve/reject/cancel engine for bookings.
+
+Saving bookings one at a time runs full_clean(), the post_save signal
+handlers, a history insert and notifications per row. For hundreds of
+bookings this engine instead:
+
+1. loads and validates the selection in one query,
+2. applies the status change with a single guarded UPDATE,
+3. writes BookingHistory rows with bulk_create, and
+4. once the transaction commits, runs the post_save side effects the
+   UPDATE skipped (availability and calendar feed invalidation, immediate
+   Google Calendar pushes) and fans out notifications in batches.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Booking, BookingHistory, UserProfile
+from ..utils.cache_utils import ICSFeedCache, ResourceAvailabilityCache
+
+logger = logging.getLogger(__name__)
+
+
+MANAGER_ROLES = ['technician', 'sysadmin']
+
+
+class BulkBookingService:
+    """Apply status transitions to many bookings at once."""
+
+    ACTIONS = {
+        'approve': {
+            'from_statuses': ['pending'],
+            'to_status': 'approved',
+            'managers_only': True,
+            'future_only': False,
+            'error': 'Not pending',
+        },
+        'reject': {
+            'from_statuses': ['pending'],
+            'to_status': 'rejected',
+            'managers_only': True,
+            'future_only': False,
+            'error': 'Not pending',
+        },
+        'cancel': {
+            'from_statuses': ['pending', 'approved'],
+            'to_status': 'cancelled',
+            'managers_only': False,
+            'future_only': True,
+            'error': 'Cannot be cancelled',
+        },
+    }
+
+    def is_manager(self, user: User) -> bool:
+        """Whether the user may act on other users' bookings."""
+        try:
+            return user.userprofile.role in MANAGER_ROLES
+        except UserProfile.DoesNotExist:
+            return False
+
+    def execute(self, user: User, action: str, booking_ids: Iterable,
+                notes: str = "") -> Dict[str, Any]:
+        """
+        Run a bulk action.
+
+        Returns:
+            Dict with ``updated`` (list of booking ids changed) and ``errors``
+            (list of ``{'id', 'title', 'error'}`` dicts for skipped bookings).
+        """
+        config = self.ACTIONS.get(action)
+        if config is None:
+            raise ValueError(f"Unknown bulk action: {action}")
+
+        is_manager = self.is_manager(user)
+        if config['managers_only'] and not is_manager:
+            raise PermissionError(f"Insufficient permissions to {action} bookings")
+
+        requested = self._clean_ids(booking_ids)
+        now = timezone.now()
+
+        queryset = Booking.objects.filter(pk__in=requested)
+        if not is_manager:
+            queryset = queryset.filter(user=user)
+
+        # One pass over the selection to validate every booking
+        candidates = {
+            booking.pk: booking
+            for booking in queryset.select_related('resource', 'user').only(
+                'id', 'title', 'status', 'start_time', 'end_time', 'resource_id',
+                'resource__name', 'user_id', 'user__username', 'user__email',
+                'user__first_name', 'user__last_name',
+            )
+        }
+
+        errors = [
+            {'id': pk, 'title': '', 'error': 'Not found or no permission'}
+            for pk in requested if pk not in candidates
+        ]
+        valid_ids = []
+        for booking in candidates.values():
+            if booking.status not in config['from_statuses'] or (
+                config['future_only'] and booking.start_time <= now
+            ):
+                errors.append({'id': booking.pk, 'title': booking.title, 'error': config['error']})
+            else:
+                valid_ids.append(booking.pk)
+
+        updated_ids = []
+        if valid_ids:
+            with transaction.atomic():
+                guard = Booking.objects.filter(
+                    pk__in=valid_ids, status__in=config['from_statuses']
+                )
+                if config['future_only']:
+                    guard = guard.filter(start_time__gt=now)
+
+                # Lock the rows so a concurrent change cannot slip between
+                # the guard and the UPDATE; anything no longer matching is
+                # reported as an error below.
+                updated_ids = list(guard.select_for_update().values_list('pk', flat=True))
+
+                values = {'status': config['to_status'], 'updated_at': now}
+                if action == 'approve':
+                    values.update(approved_by=user, approved_at=now)
+                Booking.objects.filter(pk__in=updated_ids).update(**values)
+
+                BookingHistory.objects.bulk_create([
+                    BookingHistory(
+                        booking_id=pk,
+                        user=user,
+                        action=config['to_status'],
+                        old_values={'status': candidates[pk].status},
+                        new_values={'status': config['to_status']},
+                        timestamp=now,
+                        notes=notes or f'Bulk {action}',
+                    )
+                    for pk in updated_ids
+                ], batch_size=500)
+
+                changed = [candidates[pk] for pk in updated_ids]
+                transaction.on_commit(lambda: self._after_commit(action, changed, user))
+
+            skipped = set(valid_ids) - set(updated_ids)
+            errors.extend(
+                {'id': pk, 'title': candidates[pk].title, 'error': 'Changed by another user'}
+                for pk in skipped
+            )
+
+        logger.info(
+            f"Bulk {action} by {user.username}: {len(updated_ids)} updated, {len(errors)} skipped"
+        )
+        return {'action': action, 'updated': updated_ids, 'errors': errors}
+
+    def _clean_ids(self, booking_ids: Iterable) -> List[int]:
+        ids = []
+        for value in booking_ids:
+            try:
+                ids.append(int(value))
+            except (TypeError, ValueError):
+                continue
+        return list(dict.fromkeys(ids))
+
+    def _after_commit(self, action: str, bookings: List[Booking], acting_user: User):
+        """
+        Run the side effects ``Booking.save`` would have triggered, then send
+        batched notifications.
+        """
+        for resource_id, date_str in {
+            (b.resource_id, b.start_time.date().isoformat()) for b in bookings
+        }:
+            ResourceAvailabilityCache.invalidate_resource_availability(resource_id, date_str)
+        ICSFeedCache.invalidate('booking', *[b.pk for b in bookings])
+
+        try:
+            from .google_calendar_sync import google_calendar_sync_engine
+            google_calendar_sync_engine.queue_immediate_syncs({b.user_id for b in bookings})
+        except Exception as e:
+            logger.error(f"Failed to queue Google Calendar syncs after bulk {action}: {e}")
+
+        try:
+            self._send_notifications(action, bookings, acting_user)
+        except Exception as e:
+            logger.error(f"Failed to send bulk {action} notifications: {e}")
+
+    def _send_notifications(self, action: str, bookings: List[Booking], acting_user: User):
+        from ..notifications import notification_service
+
+        entries = []
+        for booking in bookings:
+            when = booking.start_time.strftime("%B %d, %Y at %I:%M %p")
+            metadata = {'booking_id': booking.id, 'resource_name': booking.resource.name}
+            if action == 'approve':
+                entries.append({
+                    'user': booking.user,
+                    'title': f'Booking Confirmed: {booking.resource.name}',
+                    'message': f'Your booking "{booking.title}" has been confirmed for {when}.',
+                    'booking': booking,
+                    'metadata': metadata,
+                })
+            elif action == 'reject':
+                entries.append({
+                    'user': booking.user,
+                    'title': f'Booking Rejected: {booking.resource.name}',
+                    'message': f'Your booking "{booking.title}" for {when} has been rejected.',
+                    'booking': booking,
+                    'metadata': metadata,
+                })
+            elif action == 'cancel' and booking.user_id != acting_user.id:
+                metadata['cancelled_by'] = acting_user.get_full_name()
+                entries.append({
+                    'user': booking.user,
+                    'title': f'Booking Cancelled: {booking.resource.name}',
+                    'message': f'Your booking "{booking.title}" has been cancelled by {acting_user.get_full_name()}.',
+                    'booking': booking,
+                    'metadata': metadata,
+                })
+
+        notification_type = {
+            'approve': 'booking_confirmed',
+            'reject': 'approval_decision',
+            'cancel': 'booking_cancelled',
+        }[action]
+        priority = 'high' if action == 'cancel' else 'medium'
+        notification_service.create_bulk_notifications(notification_type, entries, priority=priority)
+
+
+# Singleton instance
+bulk_booking_service = BulkBookingService()
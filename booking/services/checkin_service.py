@@ -8,18 +8,31 @@ Licensed under the MIT License - see LICENSE file for details.
 """
 
 import logging
-from typing import List, Dict, Optional, Tuple
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Q, F, Count, Avg, Sum
+from django.db.models import Q, F, Count, Case, When, Value, FloatField
+from django.db.models.functions import Cast, Least
 from django.db import transaction
 from ..models import (
-    Booking, CheckInOutEvent, UsageAnalytics, Resource, UserProfile
+    Booking, BookingHistory, CheckInOutEvent, UsageAnalytics, UsageRollup, Resource, UserProfile
 )
 from ..notifications import notification_service
+from .usage_rollups import usage_rollup_service
+from ..utils.audit_buffer import record_event
+from ..utils.cache_utils import ICSFeedCache, ResourceAvailabilityCache, invalidate_booking_caches
 
 logger = logging.getLogger(__name__)
 
+# Assume 9 hours available per day (9 AM - 6 PM) for utilization
+AVAILABLE_MINUTES_PER_DAY = 9 * 60
+
+SWEEP_LOCK_KEY = 'checkin_sweep_lock'
+SWEEP_LOCK_TIMEOUT = 600
+
 
 class CheckInService:
     """Service for managing booking check-ins and check-outs."""
@@ -216,28 +229,80 @@ class CheckInService:
         ).select_related('resource', 'user'))
     
     def process_automatic_checkouts(self) -> int:
-        """Process automatic check-outs for overdue bookings."""
-        overdue_bookings = self.get_overdue_checkouts()
-        checked_out_count = 0
+        """
+        Process automatic check-outs for overdue bookings.
+        
+        Overdue bookings are checked out with one guarded UPDATE, so a
+        booking claimed by a concurrent sweep (or checked out by its user
+        meanwhile) is skipped. Their events are bulk-created and analytics
+        are updated once per resource.
+        """
+        now = timezone.now()
+        overdue = Booking.objects.filter(
+            end_time__lt=now - timedelta(minutes=15),
+            checked_in_at__isnull=False,
+            checked_out_at__isnull=True,
+            status__in=['approved', 'confirmed']
+        )
         
-        for booking in overdue_bookings:
+        with transaction.atomic():
+            claimed = dict(overdue.select_for_update(skip_locked=True).values_list('id', 'status'))
+            if not claimed:
+                return 0
+            overdue.filter(id__in=claimed).update(
+                checked_out_at=now,
+                actual_end_time=F('end_time'),  # Use scheduled end time for auto checkout
+                auto_checked_out=True,
+                status='completed',
+                updated_at=now,
+            )
+            # Only rows stamped by this run; the rest were taken by another sweep
+            bookings = list(Booking.objects.filter(
+                id__in=claimed, checked_out_at=now, auto_checked_out=True
+            ).select_related('resource', 'user'))
+            
+            CheckInOutEvent.objects.bulk_create([
+                CheckInOutEvent(
+                    booking=booking,
+                    event_type='auto_check_out',
+                    user_id=booking.user_id,
+                    timestamp=now,
+                    actual_time=booking.actual_end_time
+                )
+                for booking in bookings
+            ])
+            self._record_usage(bookings)
+        
+        # The UPDATE skipped Booking's post_save cache invalidation
+        ICSFeedCache.invalidate('booking', *[booking.id for booking in bookings])
+        for booking in bookings:
+            invalidate_booking_caches(
+                booking_id=booking.id, user_id=booking.user_id, resource_id=booking.resource_id
+            )
+        for resource_id, date_str in {
+            (booking.resource_id, booking.start_time.date().isoformat()) for booking in bookings
+        }:
+            ResourceAvailabilityCache.invalidate_resource_availability(resource_id, date_str)
+        for booking in bookings:
+            record_event(BookingHistory(
+                booking=booking,
+                user_id=booking.user_id,
+                action='status_changed',
+                old_values={'status': claimed[booking.id]},
+                new_values={'status': 'completed'},
+                notes='Automatic check-out',
+            ))
             try:
-                if booking.auto_check_out():
-                    checked_out_count += 1
-                    
-                    # Send notification
-                    self._send_auto_checkout_notification(booking)
-                    
-                    # Update analytics
-                    self._update_usage_analytics(booking)
-                    
+                if booking.resource.is_billable:
+                    booking._create_billing_record_if_needed()
+                self._send_auto_checkout_notification(booking)
             except Exception as e:
-                logger.error(f"Failed to auto check-out booking {booking.id}: {str(e)}")
+                logger.error(f"Failed to finish auto check-out of booking {booking.id}: {str(e)}")
         
-        if checked_out_count > 0:
-            logger.info(f"Auto checked-out {checked_out_count} overdue bookings")
+        if bookings:
+            logger.info(f"Auto checked-out {len(bookings)} overdue bookings")
         
-        return checked_out_count
+        return len(bookings)
     
     def send_checkin_reminders(self) -> int:
         """Send check-in reminders to users who should be checking in soon."""
@@ -252,24 +317,11 @@ class CheckInService:
             no_show=False,
             check_in_reminder_sent=False,
             status__in=['approved', 'confirmed']
-        ).select_related('resource', 'user')
-        
-        reminded_count = 0
-        
-        for booking in bookings_to_remind:
-            try:
-                self._send_checkin_reminder(booking)
-                booking.check_in_reminder_sent = True
-                booking.save(update_fields=['check_in_reminder_sent'])
-                reminded_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to send check-in reminder for booking {booking.id}: {str(e)}")
-        
-        if reminded_count > 0:
-            logger.info(f"Sent {reminded_count} check-in reminders")
+        )
         
-        return reminded_count
+        return self._send_reminders(
+            bookings_to_remind, 'check_in_reminder_sent', self._send_checkin_reminder, 'check-in'
+        )
     
     def send_checkout_reminders(self) -> int:
         """Send check-out reminders to users approaching their end time."""
@@ -284,64 +336,83 @@ class CheckInService:
             checked_out_at__isnull=True,
             check_out_reminder_sent=False,
             status__in=['approved', 'confirmed']
-        ).select_related('resource', 'user')
-        
-        reminded_count = 0
+        )
         
-        for booking in bookings_to_remind:
+        return self._send_reminders(
+            bookings_to_remind, 'check_out_reminder_sent', self._send_checkout_reminder, 'check-out'
+        )
+    
+    def _send_reminders(self, queryset, flag: str, send, label: str) -> int:
+        """
+        Claim reminders by setting ``flag`` in one UPDATE, then send them.
+        
+        Rows locked by a concurrent sweep are skipped, so each reminder is
+        sent once. The flag is cleared again for reminders that failed, so
+        the next sweep retries them.
+        """
+        with transaction.atomic():
+            claimed = list(queryset.select_for_update(skip_locked=True).values_list('id', flat=True))
+            if claimed:
+                queryset.filter(id__in=claimed).update(**{flag: True})
+        if not claimed:
+            return 0
+        
+        failed = []
+        for booking in Booking.objects.filter(id__in=claimed).select_related('resource', 'user'):
             try:
-                self._send_checkout_reminder(booking)
-                booking.check_out_reminder_sent = True
-                booking.save(update_fields=['check_out_reminder_sent'])
-                reminded_count += 1
-                
+                send(booking)
             except Exception as e:
-                logger.error(f"Failed to send check-out reminder for booking {booking.id}: {str(e)}")
+                failed.append(booking.id)
+                logger.error(f"Failed to send {label} reminder for booking {booking.id}: {str(e)}")
         
+        if failed:
+            Booking.objects.filter(id__in=failed).update(**{flag: False})
+        
+        reminded_count = len(claimed) - len(failed)
         if reminded_count > 0:
-            logger.info(f"Sent {reminded_count} check-out reminders")
+            logger.info(f"Sent {reminded_count} {label} reminders")
         
         return reminded_count
     
+    @contextmanager
+    def sweep_lock(self):
+        """
+        Hold the periodic sweep lock; yields False if another sweep holds it.
+        
+        The sweep steps are safe to run concurrently, the lock just keeps
+        overlapping runs from queueing up behind each other's row locks.
+        """
+        acquired = cache.add(SWEEP_LOCK_KEY, 1, SWEEP_LOCK_TIMEOUT)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                cache.delete(SWEEP_LOCK_KEY)
+    
+    def run_periodic_sweep(self) -> Optional[Dict[str, int]]:
+        """Send due reminders and auto check-out overdue bookings; None if a sweep is already running."""
+        with self.sweep_lock() as acquired:
+            if not acquired:
+                return None
+            return {
+                'checkin_reminders': self.send_checkin_reminders(),
+                'checkout_reminders': self.send_checkout_reminders(),
+                'auto_checkouts': self.process_automatic_checkouts(),
+            }
+    
     def get_usage_analytics(
         self, 
         resource: Optional[Resource] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict:
-        """Get usage analytics for resources."""
+        """Get usage analytics for resources, read from the usage rollups."""
+        end_date = end_date or timezone.now()
+        if start_date is None:
+            earliest = UsageRollup.objects.filter(granularity='month').order_by('period_start').first()
+            start_date = earliest.period_start if earliest else end_date
         
-        queryset = UsageAnalytics.objects.all()
-        
-        if resource:
-            queryset = queryset.filter(resource=resource)
-        
-        if start_date:
-            queryset = queryset.filter(date__gte=start_date.date())
-        
-        if end_date:
-            queryset = queryset.filter(date__lte=end_date.date())
-        
-        # Aggregate statistics
-        stats = queryset.aggregate(
-            total_bookings=Sum('total_bookings'),
-            completed_bookings=Sum('completed_bookings'),
-            no_show_bookings=Sum('no_show_bookings'),
-            avg_utilization=Avg('utilization_rate'),
-            avg_efficiency=Avg('efficiency_rate'),
-            avg_no_show_rate=Avg('no_show_rate'),
-            total_booked_minutes=Sum('total_booked_minutes'),
-            total_actual_minutes=Sum('total_actual_minutes'),
-            total_wasted_minutes=Sum('total_wasted_minutes')
-        )
-        
-        # Add calculated metrics
-        if stats['total_bookings']:
-            stats['completion_rate'] = (stats['completed_bookings'] / stats['total_bookings']) * 100
-        else:
-            stats['completion_rate'] = 0
-        
-        return stats
+        return usage_rollup_service.summary(start_date, end_date, resource=resource)
     
     def _can_user_checkin(self, booking: Booking, user) -> bool:
         """Check if user can check in to this booking."""
@@ -462,69 +533,71 @@ class CheckInService:
     def _update_usage_analytics(self, booking: Booking):
         """Update usage analytics for a completed booking."""
         try:
-            # Get or create analytics record for today
-            analytics, created = UsageAnalytics.objects.get_or_create(
-                resource=booking.resource,
-                date=timezone.now().date(),
-                defaults={}
-            )
-            
-            # Update booking counts
-            analytics.total_bookings = F('total_bookings') + 1
+            self._record_usage([booking])
+        except Exception as e:
+            logger.error(f"Failed to update usage analytics for booking {booking.id}: {str(e)}")
+    
+    def _record_usage(self, bookings: Iterable[Booking]):
+        """
+        Add finished bookings to today's analytics.
+        
+        The bookings are summed per resource, then each resource's row gets
+        one increment and all rows get their rates recalculated in a single
+        UPDATE. The bookings are also added to the usage rollups.
+        """
+        bookings = list(bookings)
+        totals = {}
+        for booking in bookings:
+            counts = totals.setdefault(booking.resource_id, Counter())
+            counts['total_bookings'] += 1
             
             if booking.no_show:
-                analytics.no_show_bookings = F('no_show_bookings') + 1
+                counts['no_show_bookings'] += 1
             elif booking.checked_out_at:
-                analytics.completed_bookings = F('completed_bookings') + 1
+                counts['completed_bookings'] += 1
             elif booking.status == 'cancelled':
-                analytics.cancelled_bookings = F('cancelled_bookings') + 1
+                counts['cancelled_bookings'] += 1
             
-            # Update time statistics
             booked_minutes = int(booking.duration.total_seconds() // 60)
-            analytics.total_booked_minutes = F('total_booked_minutes') + booked_minutes
+            counts['total_booked_minutes'] += booked_minutes
             
             if booking.actual_duration:
                 actual_minutes = int(booking.actual_duration.total_seconds() // 60)
-                analytics.total_actual_minutes = F('total_actual_minutes') + actual_minutes
-                
-                wasted_minutes = max(0, booked_minutes - actual_minutes)
-                analytics.total_wasted_minutes = F('total_wasted_minutes') + wasted_minutes
-            
-            analytics.save()
-            
-            # Recalculate rates (need to refresh from DB first)
-            analytics.refresh_from_db()
-            self._recalculate_analytics_rates(analytics)
-            
-        except Exception as e:
-            logger.error(f"Failed to update usage analytics for booking {booking.id}: {str(e)}")
-    
-    def _recalculate_analytics_rates(self, analytics: UsageAnalytics):
-        """Recalculate percentage rates for analytics."""
-        try:
-            # Calculate utilization rate (actual usage / total available time)
-            # Assume 9 hours available per day (9 AM - 6 PM)
-            available_minutes_per_day = 9 * 60
-            analytics.utilization_rate = min(analytics.total_actual_minutes / available_minutes_per_day, 1.0)
-            
-            # Calculate efficiency rate (actual usage / booked time)
-            if analytics.total_booked_minutes > 0:
-                analytics.efficiency_rate = analytics.total_actual_minutes / analytics.total_booked_minutes
-            else:
-                analytics.efficiency_rate = 0.0
-            
-            # Calculate no-show rate
-            if analytics.total_bookings > 0:
-                analytics.no_show_rate = analytics.no_show_bookings / analytics.total_bookings
-            else:
-                analytics.no_show_rate = 0.0
-            
-            analytics.save(update_fields=[
-                'utilization_rate', 'efficiency_rate', 'no_show_rate', 'updated_at'
-            ])
+                counts['total_actual_minutes'] += actual_minutes
+                counts['total_wasted_minutes'] += max(0, booked_minutes - actual_minutes)
+        
+        if not totals:
+            return
+        
+        today = timezone.now().date()
+        now = timezone.now()
+        with transaction.atomic():
+            UsageAnalytics.objects.bulk_create(
+                [UsageAnalytics(resource_id=resource_id, date=today) for resource_id in totals],
+                ignore_conflicts=True
+            )
+            for resource_id, counts in totals.items():
+                UsageAnalytics.objects.filter(resource_id=resource_id, date=today).update(
+                    updated_at=now, **{field: F(field) + value for field, value in counts.items()}
+                )
             
-        except Exception as e:
-            logger.error(f"Failed to recalculate analytics rates: {str(e)}")
+            # Rates read the counters written above, so they need their own statement
+            UsageAnalytics.objects.filter(resource_id__in=totals, date=today).update(
+                utilization_rate=Least(
+                    Cast('total_actual_minutes', FloatField()) / AVAILABLE_MINUTES_PER_DAY, Value(1.0)
+                ),
+                efficiency_rate=Case(
+                    When(total_booked_minutes__gt=0,
+                         then=Cast('total_actual_minutes', FloatField()) / F('total_booked_minutes')),
+                    default=Value(0.0),
+                ),
+                no_show_rate=Case(
+                    When(total_bookings__gt=0,
+                         then=Cast('no_show_bookings', FloatField()) / F('total_bookings')),
+                    default=Value(0.0),
+                ),
+            )
+            usage_rollup_service.record(bookings)
 
 
 # Global service instance
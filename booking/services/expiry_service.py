@@ -0,0 +1,112 @@
+# booking/services/expiry_service.py
+"""
+Training and risk assessment expiry sweep for the Labitory.
+
+Completed training and approved risk assessments lapse when their
+``expires_at`` passes. The daily sweep moves every lapsed record to
+``expired`` with one UPDATE per model and sends each affected user a single
+notification listing everything of theirs that expired.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, List
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import RiskAssessment, UserRiskAssessment, UserTraining
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySweepService:
+    """Expires lapsed completions in bulk and notifies their holders."""
+
+    def sweep(self, now=None, notify: bool = True) -> Dict[str, int]:
+        """
+        Expire lapsed training and risk assessment completions.
+
+        1. Read the lapsed rows of each model (ids, users and subjects).
+        2. Move them to ``expired`` with one UPDATE per model.
+        3. Send one notification per user and kind, naming every subject.
+
+        Returns counts of expired training records, expired risk
+        assessment completions, and risk assessments past ``valid_until``
+        or due for review (reported only; they have no expired status).
+        """
+        now = now or timezone.now()
+
+        with transaction.atomic():
+            trainings = list(
+                UserTraining.objects.expirable(now).order_by('user_id', 'training_course__title')
+                .values_list('pk', 'user_id', 'training_course__title')
+            )
+            assessments = list(
+                UserRiskAssessment.objects.expirable(now).order_by('user_id', 'risk_assessment__title')
+                .values_list('pk', 'user_id', 'risk_assessment__title')
+            )
+            self._expire(UserTraining, trainings, now)
+            self._expire(UserRiskAssessment, assessments, now)
+
+        if notify:
+            self._notify(
+                'training_expiring', trainings,
+                'Training Expired', 'Your certification has expired for: {subjects}. '
+                'Please enrol in renewal training to keep your resource access.',
+            )
+            self._notify(
+                'risk_assessment_expiring', assessments,
+                'Risk Assessment Expired', 'Your risk assessment completion has expired for: {subjects}. '
+                'Please complete the assessment again to keep your resource access.',
+            )
+
+        active = RiskAssessment.objects.filter(is_active=True)
+        summary = {
+            'expired_training': len(trainings),
+            'expired_assessments': len(assessments),
+            'assessments_past_validity': active.expired(now.date()).count(),
+            'assessments_due_for_review': active.due_for_review(now).count(),
+        }
+        if trainings or assessments:
+            logger.info(f"Expiry sweep: {summary}")
+        return summary
+
+    @staticmethod
+    def _expire(model, rows, now) -> int:
+        if not rows:
+            return 0
+        # Re-check lapse so a record renewed meanwhile is left alone
+        return model.objects.filter(pk__in=[pk for pk, _, _ in rows]).lapsed(now).update(
+            status='expired', updated_at=now
+        )
+
+    @staticmethod
+    def _notify(notification_type: str, rows: List[tuple], title: str, message: str) -> int:
+        from ..notifications import notification_service
+
+        subjects = defaultdict(list)
+        for _, user_id, subject in rows:
+            subjects[user_id].append(subject)
+        if not subjects:
+            return 0
+
+        users = User.objects.in_bulk(list(subjects))
+        entries = []
+        for user_id, names in subjects.items():
+            entries.append({
+                'user': users[user_id],
+                'title': f'{title}: {names[0]}' if len(names) == 1 else f'{title}: {len(names)} items',
+                'message': message.format(subjects=', '.join(names)),
+                'metadata': {'expired': names},
+            })
+        return notification_service.create_bulk_notifications(notification_type, entries, priority='medium')
+
+
+# Global service instance
+expiry_sweep_service = ExpirySweepService()
@@ -41,6 +41,65 @@ from ..models import GoogleCalendarIntegration, GoogleCalendarSyncLog, CalendarS
 logger = logging.getLogger(__name__)
 
 
+def build_event_data(booking: Booking, preferences: CalendarSyncPreferences = None) -> dict:
+    """Build Google Calendar event data from booking."""
+    # Build title
+    title_parts = []
+    if preferences and preferences.event_prefix:
+        title_parts.append(preferences.event_prefix.strip())
+
+    title_parts.append(booking.title)
+
+    if preferences and preferences.include_resource_in_title:
+        title_parts.append(f"({booking.resource.name})")
+
+    title = " ".join(title_parts)
+
+    # Build description
+    description_parts = []
+    if preferences and preferences.include_description and booking.description:
+        description_parts.append(booking.description)
+
+    description_parts.extend([
+        f"\nResource: {booking.resource.name}",
+        f"Booked by: {booking.user.get_full_name() or booking.user.username}",
+        f"Status: {booking.get_status_display()}",
+        f"\nManaged by Labitory System"
+    ])
+
+    description = "\n".join(description_parts)
+
+    # Build location
+    location = ""
+    if preferences and preferences.set_event_location:
+        location = getattr(booking.resource, 'location', '') or booking.resource.name
+
+    # Convert datetime to RFC3339 format
+    start_time = booking.start_time.isoformat()
+    end_time = booking.end_time.isoformat()
+
+    return {
+        'summary': title,
+        'description': description,
+        'location': location,
+        'start': {
+            'dateTime': start_time,
+            'timeZone': str(booking.start_time.tzinfo) or 'UTC',
+        },
+        'end': {
+            'dateTime': end_time,
+            'timeZone': str(booking.end_time.tzinfo) or 'UTC',
+        },
+        'reminders': {
+            'useDefault': True,
+        },
+        'source': {
+            'title': 'Labitory',
+            'url': f"{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'}/booking/{booking.id}/"
+        }
+    }
+
+
 class GoogleCalendarService:
     """Service for Google Calendar OAuth integration and synchronization."""
     
@@ -441,61 +500,7 @@ class GoogleCalendarService:
     
     def _build_event_data(self, booking: Booking, preferences: CalendarSyncPreferences = None) -> dict:
         """Build Google Calendar event data from booking."""
-        # Build title
-        title_parts = []
-        if preferences and preferences.event_prefix:
-            title_parts.append(preferences.event_prefix.strip())
-        
-        title_parts.append(booking.title)
-        
-        if preferences and preferences.include_resource_in_title:
-            title_parts.append(f"({booking.resource.name})")
-        
-        title = " ".join(title_parts)
-        
-        # Build description
-        description_parts = []
-        if preferences and preferences.include_description and booking.description:
-            description_parts.append(booking.description)
-        
-        description_parts.extend([
-            f"\nResource: {booking.resource.name}",
-            f"Booked by: {booking.user.get_full_name() or booking.user.username}",
-            f"Status: {booking.get_status_display()}",
-            f"\nManaged by Labitory System"
-        ])
-        
-        description = "\n".join(description_parts)
-        
-        # Build location
-        location = ""
-        if preferences and preferences.set_event_location:
-            location = getattr(booking.resource, 'location', '') or booking.resource.name
-        
-        # Convert datetime to RFC3339 format
-        start_time = booking.start_time.isoformat()
-        end_time = booking.end_time.isoformat()
-        
-        return {
-            'summary': title,
-            'description': description,
-            'location': location,
-            'start': {
-                'dateTime': start_time,
-                'timeZone': str(booking.start_time.tzinfo) or 'UTC',
-            },
-            'end': {
-                'dateTime': end_time,
-                'timeZone': str(booking.end_time.tzinfo) or 'UTC',
-            },
-            'reminders': {
-                'useDefault': True,
-            },
-            'source': {
-                'title': 'Labitory',
-                'url': f"{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'}/booking/{booking.id}/"
-            }
-        }
+        return build_event_data(booking, preferences)
     
     def disconnect_integration(self, user: User) -> bool:
         """Disconnect Google Calendar integration for a user."""
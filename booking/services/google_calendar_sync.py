@@ -0,0 +1,410 @@
+# booking/services/google_calendar_sync.py
+"""
+Background, batched and delta-based Google Calendar sync.
+
+Syncing one booking at a time from the request meant a discovery-client
+build, a sync-log lookup and an API round trip per booking. This engine
+instead runs from Celery and:
+
+1. keeps one HTTP client per integration for the life of the worker,
+2. hashes each booking's event body and only pushes bookings whose hash
+   differs from the one stored on their GoogleCalendarEventLink,
+3. sends inserts, updates and deletes through the Calendar API batch
+   endpoint, up to 50 operations per HTTP call, and
+4. backs off exponentially on 429s and 5xx responses, honouring
+   ``Retry-After``.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import (
+    Booking, CalendarSyncPreferences, GoogleCalendarEventLink, GoogleCalendarIntegration,
+    GoogleCalendarSyncLog,
+)
+from .google_calendar import build_event_data
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleCalendarSyncError(Exception):
+    """Raised when an integration cannot be synced at all."""
+
+
+class GoogleCalendarBatchClient:
+    """
+    Minimal client for the Calendar API batch endpoint.
+
+    Operations are dicts with ``id``, ``method``, ``path`` and an optional
+    JSON ``body``. ``execute`` returns ``{id: (status, body)}``.
+    """
+
+    BATCH_PATH = '/batch/calendar/v3'
+    MAX_BATCH_SIZE = 50
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+    BACKOFF_BASE = 1.0  # seconds
+    BACKOFF_MAX = 64.0  # seconds
+
+    def __init__(self, access_token: str, base_url: Optional[str] = None,
+                 max_retries: Optional[int] = None, timeout: int = 30, sleep=time.sleep):
+        self.base_url = (base_url or getattr(
+            settings, 'GOOGLE_CALENDAR_API_URL', 'https://www.googleapis.com'
+        )).rstrip('/')
+        self.max_retries = max_retries if max_retries is not None else getattr(
+            settings, 'GOOGLE_CALENDAR_SYNC_MAX_RETRIES', 5
+        )
+        self.timeout = timeout
+        self.sleep = sleep
+        self.session = requests.Session()
+        self.access_token = None
+        self.set_token(access_token)
+
+    def set_token(self, access_token: str) -> None:
+        """Use a new access token for subsequent requests."""
+        self.access_token = access_token
+        self.session.headers['Authorization'] = f'Bearer {access_token}'
+
+    @staticmethod
+    def events_path(calendar_id: str, event_id: Optional[str] = None) -> str:
+        """Return the events collection or event path for a calendar."""
+        path = f"/calendar/v3/calendars/{quote(calendar_id, safe='')}/events"
+        if event_id:
+            path += f"/{quote(event_id, safe='')}"
+        return path
+
+    def execute(self, operations: List[Dict[str, Any]]) -> Dict[str, Tuple[int, Any]]:
+        """Run operations in batches of at most MAX_BATCH_SIZE."""
+        results = {}
+        for i in range(0, len(operations), self.MAX_BATCH_SIZE):
+            results.update(self._execute_batch(operations[i:i + self.MAX_BATCH_SIZE]))
+        return results
+
+    def _execute_batch(self, operations):
+        pending = {op['id']: op for op in operations}
+        results = {}
+
+        for attempt in range(self.max_retries + 1):
+            boundary = f"batch_{uuid.uuid4().hex}"
+            response = self.session.post(
+                f"{self.base_url}{self.BATCH_PATH}",
+                data=self._encode(list(pending.values()), boundary).encode('utf-8'),
+                headers={'Content-Type': f'multipart/mixed; boundary={boundary}'},
+                timeout=self.timeout,
+            )
+
+            retry_after = None
+            if response.status_code in self.RETRY_STATUSES:
+                retry_after = response.headers.get('Retry-After')
+                for op_id in pending:
+                    results[op_id] = (response.status_code, self._json(response.text))
+            elif response.status_code != 200:
+                # The whole batch was rejected, e.g. 401 for a revoked token
+                for op_id in pending:
+                    results[op_id] = (response.status_code, self._json(response.text))
+                return results
+            else:
+                for op_id, status, headers, body in self._decode(response):
+                    if op_id not in pending:
+                        continue
+                    results[op_id] = (status, body)
+                    if self._should_retry(status, body):
+                        retry_after = retry_after or headers.get('retry-after')
+                    else:
+                        del pending[op_id]
+
+            if not pending:
+                break
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, retry_after)
+                logger.info(f"Google Calendar rate limited; retrying {len(pending)} operations in {delay:.1f}s")
+                self.sleep(delay)
+
+        return results
+
+    def _should_retry(self, status, body):
+        if status in self.RETRY_STATUSES:
+            return True
+        if status == 403 and isinstance(body, dict):
+            errors = body.get('error', {}).get('errors', [])
+            return any(error.get('reason') in self.RATE_LIMIT_REASONS for error in errors)
+        return False
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = self.BACKOFF_BASE * (2 ** attempt) + random.uniform(0, self.BACKOFF_BASE)
+        try:
+            delay = max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+        return min(delay, self.BACKOFF_MAX)
+
+    def _encode(self, operations, boundary):
+        parts = []
+        for op in operations:
+            lines = [
+                f"--{boundary}",
+                "Content-Type: application/http",
+                f"Content-ID: <{op['id']}>",
+                "",
+                f"{op['method']} {op['path']} HTTP/1.1",
+            ]
+            if op.get('body') is not None:
+                lines += ["Content-Type: application/json", "", json.dumps(op['body'])]
+            else:
+                lines += [""]
+            parts.append("\r\n".join(lines))
+        parts.append(f"--{boundary}--")
+        return "\r\n".join(parts) + "\r\n"
+
+    def _decode(self, response):
+        """Yield ``(id, status, headers, body)`` for each part of a batch response."""
+        match = re.search(r'boundary="?([^";]+)"?', response.headers.get('Content-Type', ''))
+        if not match:
+            return
+        for part in response.text.split(f"--{match.group(1)}")[1:]:
+            if part.startswith('--'):
+                break
+            outer, http = _split_head(part.lstrip('\r\n'))
+            content_id = re.search(r'Content-ID:\s*<(?:response-)?([^>]+)>', outer, re.IGNORECASE)
+            head, body = _split_head(http)
+            status_line, _, header_block = head.partition('\n')
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                continue
+            headers = {}
+            for line in header_block.splitlines():
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if content_id:
+                yield content_id.group(1), status, headers, self._json(body)
+
+    @staticmethod
+    def _json(text):
+        text = (text or '').strip()
+        if not text:
+            return None
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+
+def _split_head(text):
+    """Split an HTTP message into head and body at the first blank line."""
+    parts = re.split(r'\r?\n\r?\n', text, maxsplit=1)
+    return parts[0], (parts[1] if len(parts) > 1 else '')
+
+
+def content_hash(event_data: dict) -> str:
+    """Stable hash of an event body, used to skip unchanged bookings."""
+    return hashlib.sha256(json.dumps(event_data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class GoogleCalendarSyncEngine:
+    """Push a user's bookings to Google Calendar, sending only what changed."""
+
+    GONE_STATUSES = {404, 410}
+
+    def __init__(self, sleep=time.sleep):
+        self.sleep = sleep
+        self._clients = {}
+
+    def get_client(self, integration) -> GoogleCalendarBatchClient:
+        """Return the cached client for an integration, refreshing its token if needed."""
+        if integration.needs_refresh():
+            from .google_calendar import google_calendar_service
+            if not google_calendar_service or not google_calendar_service.refresh_access_token(integration):
+                raise GoogleCalendarSyncError("Unable to refresh access token")
+
+        base_url = getattr(settings, 'GOOGLE_CALENDAR_API_URL', 'https://www.googleapis.com')
+        key = (integration.pk, base_url)
+        client = self._clients.get(key)
+        if client is None:
+            client = GoogleCalendarBatchClient(integration.access_token, base_url, sleep=self.sleep)
+            self._clients[key] = client
+        elif client.access_token != integration.access_token:
+            client.set_token(integration.access_token)
+        return client
+
+    def get_bookings(self, integration, preferences):
+        """Bookings that should currently appear in the user's Google Calendar."""
+        statuses = ['approved']
+        if preferences is None or preferences.sync_pending_bookings:
+            statuses.append('pending')
+        if preferences is not None and preferences.sync_cancelled_bookings:
+            statuses.append('cancelled')
+
+        bookings = Booking.objects.filter(
+            user_id=integration.user_id, status__in=statuses
+        ).select_related('resource', 'user')
+        if preferences is None or preferences.sync_future_bookings_only:
+            bookings = bookings.filter(start_time__gte=timezone.now())
+        return bookings
+
+    def sync_integration(self, integration) -> Dict[str, int]:
+        """
+        Sync an integration's bookings.
+
+        Returns counts of created, updated, deleted, unchanged and failed events.
+        """
+        preferences = CalendarSyncPreferences.objects.filter(user_id=integration.user_id).first()
+        calendar_id = integration.google_calendar_id
+        now = timezone.now()
+
+        links = {}
+        stale_links = []
+        for link in integration.event_links.select_related('booking'):
+            if link.booking_id is None:
+                stale_links.append(link)
+            else:
+                links[link.booking_id] = link
+
+        operations = []
+        plans = {}
+        unchanged = 0
+        for booking in self.get_bookings(integration, preferences):
+            body = build_event_data(booking, preferences)
+            digest = content_hash(body)
+            link = links.pop(booking.pk, None)
+            if link is None:
+                op_id = f"create-{booking.pk}"
+                operations.append({'id': op_id, 'method': 'POST',
+                                   'path': GoogleCalendarBatchClient.events_path(calendar_id), 'body': body})
+            elif link.content_hash != digest:
+                op_id = f"update-{booking.pk}"
+                operations.append({'id': op_id, 'method': 'PUT',
+                                   'path': GoogleCalendarBatchClient.events_path(calendar_id, link.google_event_id),
+                                   'body': body})
+            else:
+                unchanged += 1
+                continue
+            plans[op_id] = (booking, link, body, digest)
+
+        # Links left over belong to bookings that dropped out of scope. Past
+        # bookings stay on the calendar; cancelled or rejected ones are removed.
+        stale_links += [link for link in links.values() if link.booking.start_time >= now]
+        for link in stale_links:
+            op_id = f"delete-{link.pk}"
+            operations.append({'id': op_id, 'method': 'DELETE',
+                               'path': GoogleCalendarBatchClient.events_path(calendar_id, link.google_event_id)})
+            plans[op_id] = (link.booking, link, None, None)
+
+        summary = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': unchanged, 'errors': 0}
+        if operations:
+            client = self.get_client(integration)
+            start = time.monotonic()
+            results = client.execute(operations)
+
+            # Events removed on Google's side are re-created in a second pass
+            gone = [op_id for op_id, (status, _) in results.items()
+                    if op_id.startswith('update-') and status in self.GONE_STATUSES]
+            if gone:
+                recreate, dropped_link_ids = [], []
+                for op_id in gone:
+                    booking, link, body, digest = plans.pop(op_id)
+                    del results[op_id]
+                    dropped_link_ids.append(link.pk)
+                    recreate_id = f"create-{booking.pk}"
+                    plans[recreate_id] = (booking, None, body, digest)
+                    recreate.append({'id': recreate_id, 'method': 'POST',
+                                     'path': GoogleCalendarBatchClient.events_path(calendar_id), 'body': body})
+                GoogleCalendarEventLink.objects.filter(pk__in=dropped_link_ids).delete()
+                results.update(client.execute(recreate))
+
+            self._apply_results(integration, plans, results, summary, now)
+
+            GoogleCalendarSyncLog.objects.create(
+                user_id=integration.user_id,
+                action='full_sync',
+                status='error' if summary['errors'] else 'success',
+                response_data=summary,
+                duration_ms=int((time.monotonic() - start) * 1000),
+            )
+
+        integration.last_sync = now
+        if summary['errors']:
+            integration.sync_error_count += 1
+            integration.last_error = f"{summary['errors']} bookings failed to sync"
+        else:
+            integration.sync_error_count = 0
+            integration.last_error = ''
+        integration.save(update_fields=['last_sync', 'sync_error_count', 'last_error', 'updated_at'])
+
+        logger.info(f"Google Calendar sync for user {integration.user_id}: {summary}")
+        return summary
+
+    def _apply_results(self, integration, plans, results, summary, now):
+        new_links, changed_links, removed_link_ids, error_logs = [], [], [], []
+
+        for op_id, (status, body) in results.items():
+            booking, link, event_data, digest = plans[op_id]
+            kind = op_id.split('-', 1)[0]
+
+            if kind == 'delete' and (200 <= status < 300 or status in self.GONE_STATUSES):
+                removed_link_ids.append(link.pk)
+                summary['deleted'] += 1
+            elif kind == 'create' and status == 200 and isinstance(body, dict) and body.get('id'):
+                new_links.append(GoogleCalendarEventLink(
+                    integration=integration, booking=booking, google_event_id=body['id'],
+                    content_hash=digest, synced_at=now,
+                ))
+                summary['created'] += 1
+            elif kind == 'update' and status == 200:
+                link.content_hash = digest
+                link.synced_at = now
+                changed_links.append(link)
+                summary['updated'] += 1
+            else:
+                summary['errors'] += 1
+                error_logs.append(GoogleCalendarSyncLog(
+                    user_id=integration.user_id,
+                    booking=booking,
+                    google_event_id=link.google_event_id if link else '',
+                    action={'create': 'created', 'update': 'updated', 'delete': 'deleted'}[kind],
+                    status='error',
+                    error_message=f"Google API error: {status} {json.dumps(body) if isinstance(body, dict) else body}",
+                    request_data=event_data,
+                ))
+
+        GoogleCalendarEventLink.objects.bulk_create(new_links, batch_size=500)
+        GoogleCalendarEventLink.objects.bulk_update(changed_links, ['content_hash', 'synced_at'], batch_size=500)
+        if removed_link_ids:
+            GoogleCalendarEventLink.objects.filter(pk__in=removed_link_ids).delete()
+        GoogleCalendarSyncLog.objects.bulk_create(error_logs, batch_size=500)
+
+    def queue_immediate_syncs(self, user_ids) -> int:
+        """
+        Queue a sync for every user in ``user_ids`` whose sync timing is
+        ``immediate``. Other users are picked up by the periodic run.
+        """
+        from ..tasks import sync_google_calendar
+
+        integration_ids = list(GoogleCalendarIntegration.objects.filter(
+            user_id__in=user_ids,
+            is_active=True,
+            sync_enabled=True,
+            user__calendar_sync_preferences__auto_sync_timing='immediate',
+        ).values_list('pk', flat=True))
+        for integration_id in integration_ids:
+            sync_google_calendar.delay(integration_id)
+        return len(integration_ids)
+
+
+# Global engine instance; its client cache lives for the worker process
+google_calendar_sync_engine = GoogleCalendarSyncEngine()
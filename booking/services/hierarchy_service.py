@@ -0,0 +1,164 @@
+# booking/services/hierarchy_service.py
+"""
+Academic hierarchy service for the Labitory.
+
+Profile forms, filter dropdowns and the site admin hierarchy pages all need
+the faculty → college → department tree. The service builds it with one
+query per level, counting each node's active members with a conditional
+aggregate, and keeps it in the cache until a signal reports a change.
+
+Tree nodes are plain dicts, so templates can use them like model instances
+(``college.faculty.name``).
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Count, Q
+
+from ..models import College, Department, Faculty
+from ..utils.cache_utils import HierarchyCache
+
+logger = logging.getLogger(__name__)
+
+
+NODE_FIELDS = ('id', 'name', 'code', 'is_active', 'members')
+
+
+class AcademicHierarchyService:
+    """Cached access to the academic hierarchy tree and its counts."""
+
+    def get_tree(self) -> Dict[str, Any]:
+        """Return the cached tree, building it on a miss."""
+        tree = HierarchyCache.get()
+        if tree is None:
+            tree = self.build_tree()
+            HierarchyCache.set(tree)
+        return tree
+
+    def build_tree(self) -> Dict[str, Any]:
+        """
+        Load the hierarchy with one query per level.
+
+        Returns:
+            Dict with ``faculties`` (ordered by name, each holding its
+            ``colleges`` and those their ``departments``), id indexes
+            ``faculty_index``, ``college_index`` and ``department_index``,
+            and ``stats``.
+        """
+        members = Count('userprofile', filter=Q(userprofile__user__is_active=True))
+
+        faculty_index = {}
+        for row in Faculty.objects.annotate(members=members).order_by('name').values(*NODE_FIELDS):
+            faculty_index[row['id']] = {
+                **row, 'label': row['name'], 'colleges': [],
+                'colleges_count': 0, 'departments_count': 0,
+            }
+
+        college_index = {}
+        for row in College.objects.annotate(members=members).order_by('name').values(*NODE_FIELDS, 'faculty_id'):
+            faculty = faculty_index.get(row.pop('faculty_id'))
+            if faculty is None:
+                continue
+            node = {
+                **row, 'label': f"{row['name']} ({faculty['name']})", 'faculty': faculty,
+                'departments': [], 'departments_count': 0,
+            }
+            faculty['colleges'].append(node)
+            faculty['colleges_count'] += 1
+            college_index[node['id']] = node
+
+        department_index = {}
+        for row in Department.objects.annotate(members=members).order_by('name').values(*NODE_FIELDS, 'college_id'):
+            college = college_index.get(row.pop('college_id'))
+            if college is None:
+                continue
+            node = {**row, 'label': f"{row['name']} ({college['name']})", 'college': college}
+            college['departments'].append(node)
+            college['departments_count'] += 1
+            college['faculty']['departments_count'] += 1
+            department_index[node['id']] = node
+
+        def level_stats(level, nodes):
+            return {
+                f'total_{level}': len(nodes),
+                f'active_{level}': sum(1 for node in nodes if node['is_active']),
+            }
+
+        return {
+            'faculties': list(faculty_index.values()),
+            'faculty_index': faculty_index,
+            'college_index': college_index,
+            'department_index': department_index,
+            'stats': {
+                **level_stats('faculties', faculty_index.values()),
+                **level_stats('colleges', college_index.values()),
+                **level_stats('departments', department_index.values()),
+            },
+        }
+
+    def invalidate(self) -> None:
+        """Drop the cached tree."""
+        HierarchyCache.invalidate()
+
+    def stats(self) -> Dict[str, int]:
+        """Total and active counts for each level."""
+        return self.get_tree()['stats']
+
+    def faculties(self, active_only: bool = False) -> List[Dict]:
+        """Faculties ordered by name."""
+        return [node for node in self.get_tree()['faculties'] if node['is_active'] or not active_only]
+
+    def colleges(self, faculty_id=None, active_only: bool = False) -> List[Dict]:
+        """Colleges ordered by faculty name then name, optionally of one faculty."""
+        if faculty_id is not None:
+            faculty = self.get_faculty(faculty_id)
+            faculties = [faculty] if faculty else []
+        else:
+            faculties = self.get_tree()['faculties']
+        return [
+            college for faculty in faculties for college in faculty['colleges']
+            if college['is_active'] or not active_only
+        ]
+
+    def departments(self, college_id=None, active_only: bool = False) -> List[Dict]:
+        """Departments ordered by faculty, college and name, optionally of one college."""
+        if college_id is not None:
+            college = self.get_college(college_id)
+            colleges = [college] if college else []
+        else:
+            colleges = self.colleges()
+        return [
+            department for college in colleges for department in college['departments']
+            if department['is_active'] or not active_only
+        ]
+
+    def get_faculty(self, faculty_id) -> Optional[Dict]:
+        return self._lookup('faculty_index', faculty_id)
+
+    def get_college(self, college_id) -> Optional[Dict]:
+        return self._lookup('college_index', college_id)
+
+    def get_department(self, department_id) -> Optional[Dict]:
+        return self._lookup('department_index', department_id)
+
+    def _lookup(self, index, node_id) -> Optional[Dict]:
+        try:
+            return self.get_tree()[index].get(int(node_id))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def choices(nodes: List[Dict], empty_label: Optional[str] = None) -> List[Tuple]:
+        """Form choices for ``nodes`` labelled like the models' ``__str__``."""
+        choices = [('', empty_label)] if empty_label is not None else []
+        choices.extend((node['id'], node['label']) for node in nodes)
+        return choices
+
+
+# Global service instance
+hierarchy_service = AcademicHierarchyService()
@@ -0,0 +1,284 @@
+# booking/services/maintenance_schedule.py
+"""
+Batched maintenance schedule generation.
+
+Scheduling one resource at a time costs several history queries per
+resource, then an existence check and an INSERT for each proposed item.
+The generator instead handles resources in batches. For each batch it:
+
+1. loads maintenance analytics, the last completed preventive maintenance
+   and recent booking counts with one query each,
+2. proposes items in memory with ``MaintenancePredictionService``,
+3. loads the existing maintenance and blocked intervals of the batch's
+   resources for the proposed horizon, then in memory skips duplicates
+   (same resource, day and type) and moves items that overlap a blocked
+   window to the window's end,
+4. inserts the new maintenance and its blocked intervals with
+   ``bulk_create``, and
+5. notifies booking holders only for new items that have bookings nearby.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from ..models import Booking, Maintenance, MaintenanceBlock, Resource
+from .maintenance_service import maintenance_prediction_service
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceScheduleGenerator:
+    """Propose and create maintenance schedules for many resources at once."""
+
+    BATCH_SIZE = 200
+
+    def generate(self, resources, months_ahead: int = 6, create: bool = False,
+                 created_by: Optional[User] = None, batch_size: Optional[int] = None,
+                 progress: Optional[Callable[[Dict], None]] = None) -> Dict[str, Any]:
+        """
+        Generate schedules for ``resources`` (a queryset or iterable).
+
+        Every proposed item gets a ``status``: ``new``, ``rescheduled`` (moved
+        past an overlapping maintenance window, see ``original_date``) or
+        ``duplicate``. Items are only written when ``create`` is set, with
+        ``created_by`` (default: the first superuser) as their creator.
+
+        Returns:
+            Dict with ``schedules`` (one ``{'resource', 'items'}`` per
+            resource) and ``created``, ``rescheduled`` and ``duplicates``
+            counts.
+        """
+        if create and created_by is None:
+            created_by = self.default_creator()
+        batch_size = batch_size or getattr(settings, 'MAINTENANCE_SCHEDULE_BATCH_SIZE', self.BATCH_SIZE)
+        if isinstance(resources, Resource):
+            resources = [resources]
+        resources = list(resources)
+
+        result = {'schedules': [], 'created': 0, 'rescheduled': 0, 'duplicates': 0}
+        for start in range(0, len(resources), batch_size):
+            batch = resources[start:start + batch_size]
+            self._generate_batch(batch, months_ahead, create, created_by, result)
+            if progress:
+                progress({'processed': start + len(batch), 'total': len(resources)})
+
+        logger.info(
+            f"Maintenance schedule for {len(resources)} resources: {result['created']} created, "
+            f"{result['rescheduled']} rescheduled, {result['duplicates']} duplicates"
+        )
+        return result
+
+    def default_creator(self) -> User:
+        """The user recorded as creator of generated maintenance."""
+        creator = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if creator is None:
+            raise ValueError('No active superuser to record as creator of generated maintenance')
+        return creator
+
+    def _generate_batch(self, resources, months_ahead, create, created_by, result):
+        history = maintenance_prediction_service.load_schedule_history(resources)
+        schedules = [
+            {
+                'resource': resource,
+                'items': maintenance_prediction_service.generate_maintenance_schedule(
+                    resource, months_ahead=months_ahead, history=history[resource.id]
+                ),
+            }
+            for resource in resources
+        ]
+        result['schedules'].extend(schedules)
+
+        items = [item for schedule in schedules for item in schedule['items']]
+        if not items:
+            return
+        window_start = min(item['date'] for item in items) - timedelta(days=1)
+        window_end = max(item['date'] + item['estimated_duration'] for item in items)
+        resource_ids = [resource.id for resource in resources]
+        existing, blocked = self._load_existing(resource_ids, window_start, window_end)
+
+        new_maintenance = []
+        for schedule in schedules:
+            resource = schedule['resource']
+            for item in schedule['items']:
+                key = (resource.id, timezone.localtime(item['date']).date(), item['type'])
+                if key in existing:
+                    item['status'] = 'duplicate'
+                    result['duplicates'] += 1
+                    continue
+
+                start = self._first_free_start(blocked[resource.id], item['date'], item['estimated_duration'])
+                if start != item['date']:
+                    item['original_date'], item['date'] = item['date'], start
+                    item['status'] = 'rescheduled'
+                    result['rescheduled'] += 1
+                else:
+                    item['status'] = 'new'
+                end = start + item['estimated_duration']
+                existing.add((resource.id, timezone.localtime(start).date(), item['type']))
+                blocked[resource.id].append((start, end))
+
+                if create:
+                    new_maintenance.append(Maintenance(
+                        resource=resource,
+                        title=item['title'],
+                        description=item['description'],
+                        start_time=start,
+                        end_time=end,
+                        maintenance_type=item['type'],
+                        priority=item['priority'],
+                        status=self._initial_status(start, end),
+                        is_internal=True,
+                        created_by=created_by,
+                    ))
+
+        if new_maintenance:
+            self._write(new_maintenance)
+            result['created'] += len(new_maintenance)
+
+    def _load_existing(self, resource_ids, window_start, window_end):
+        """
+        Load the existing maintenance keys and blocked intervals near the horizon.
+
+        Blocks include maintenance on other resources that also takes these
+        resources down.
+        """
+        existing = set()
+        for resource_id, start_time, maintenance_type in Maintenance.objects.filter(
+            resource_id__in=resource_ids,
+            start_time__gte=window_start,
+            start_time__lt=window_end,
+        ).values_list('resource_id', 'start_time', 'maintenance_type'):
+            existing.add((resource_id, timezone.localtime(start_time).date(), maintenance_type))
+
+        blocked = defaultdict(list)
+        for resource_id, start_time, end_time in MaintenanceBlock.objects.filter(
+            resource_id__in=resource_ids,
+            start_time__lt=window_end,
+            end_time__gt=window_start,
+        ).exclude(maintenance__status='cancelled').values_list('resource_id', 'start_time', 'end_time'):
+            blocked[resource_id].append((start_time, end_time))
+        return existing, blocked
+
+    @staticmethod
+    def _first_free_start(windows, start, duration):
+        """Push ``start`` past every window the item would overlap."""
+        moved = True
+        while moved:
+            moved = False
+            for window_start, window_end in windows:
+                if window_start < start + duration and window_end > start:
+                    start = window_end
+                    moved = True
+        return start
+
+    @staticmethod
+    def _initial_status(start, end):
+        """Mirror the status ``Maintenance.save`` derives from the dates."""
+        now = timezone.now()
+        if start <= now <= end:
+            return 'in_progress'
+        if end < now:
+            return 'overdue'
+        return 'scheduled'
+
+    def _write(self, new_maintenance: List[Maintenance]):
+        """Insert maintenance and its blocks, then notify affected users."""
+        with transaction.atomic():
+            Maintenance.objects.bulk_create(new_maintenance)
+            if any(maintenance.pk is None for maintenance in new_maintenance):
+                self._load_inserted_ids(new_maintenance)
+            MaintenanceBlock.objects.bulk_create([
+                MaintenanceBlock(
+                    maintenance=maintenance, resource_id=maintenance.resource_id,
+                    start_time=maintenance.start_time, end_time=maintenance.end_time,
+                )
+                for maintenance in new_maintenance
+            ])
+
+        # bulk_create skips post_save, so send the scheduling notification
+        # for the few items that actually have bookings around them
+        from ..notifications import maintenance_notifications
+        margin = timedelta(days=1)
+        bookings = defaultdict(list)
+        for resource_id, start_time in Booking.objects.filter(
+            resource_id__in={maintenance.resource_id for maintenance in new_maintenance},
+            start_time__gte=min(maintenance.start_time for maintenance in new_maintenance) - margin,
+            start_time__lte=max(maintenance.end_time for maintenance in new_maintenance) + margin,
+            status__in=['confirmed', 'pending'],
+        ).values_list('resource_id', 'start_time'):
+            bookings[resource_id].append(start_time)
+
+        for maintenance in new_maintenance:
+            if any(maintenance.start_time - margin <= start_time <= maintenance.end_time + margin
+                   for start_time in bookings[maintenance.resource_id]):
+                maintenance_notifications.maintenance_scheduled(maintenance)
+
+    @staticmethod
+    def _load_inserted_ids(new_maintenance: List[Maintenance]):
+        """
+        Set primary keys on backends that can't return them from bulk inserts.
+
+        Generated items are unique per resource, start and type (duplicates
+        are skipped before insert), so those identify the new rows.
+        """
+        ids = {
+            (resource_id, start_time, maintenance_type): pk
+            for pk, resource_id, start_time, maintenance_type in Maintenance.objects.filter(
+                resource_id__in={maintenance.resource_id for maintenance in new_maintenance},
+                start_time__in={maintenance.start_time for maintenance in new_maintenance},
+            ).order_by('pk').values_list('pk', 'resource_id', 'start_time', 'maintenance_type')
+        }
+        for maintenance in new_maintenance:
+            maintenance.pk = ids[(maintenance.resource_id, maintenance.start_time, maintenance.maintenance_type)]
+
+    def scheduling_stats(self, resources: Iterable, months_ahead: int = 6) -> Dict[str, Any]:
+        """
+        Summarise scheduled maintenance over the horizon with grouped aggregates.
+
+        Returns:
+            Dict with ``total`` and ``by_type``, ``by_priority``, ``by_month``
+            and ``by_resource`` lists of ``(label, count)``, the latter
+            busiest first.
+        """
+        now = timezone.now()
+        scheduled = Maintenance.objects.filter(
+            resource__in=resources,
+            start_time__gte=now,
+            start_time__lte=now + timedelta(days=months_ahead * 30),
+            status='scheduled',
+        ).order_by()
+
+        def grouped(queryset, *fields, order=None):
+            return queryset.values(*fields).annotate(count=Count('id')).order_by(order or fields[0])
+
+        by_type = [(row['maintenance_type'], row['count']) for row in grouped(scheduled, 'maintenance_type')]
+        return {
+            'total': sum(count for _, count in by_type),
+            'by_type': by_type,
+            'by_priority': [(row['priority'], row['count']) for row in grouped(scheduled, 'priority')],
+            'by_month': [
+                (row['month'].strftime('%Y-%m'), row['count'])
+                for row in grouped(scheduled.annotate(month=TruncMonth('start_time')), 'month')
+            ],
+            'by_resource': [
+                (row['resource__name'], row['count'])
+                for row in grouped(scheduled, 'resource_id', 'resource__name', order='-count')
+            ],
+        }
+
+
+# Global service instance
+maintenance_schedule_generator = MaintenanceScheduleGenerator()
@@ -1,4 +1,4 @@
-# booking/maintenance_service.py
+# booking/services/maintenance_service.py
 """
 Maintenance prediction and analytics service for the Labitory.
 
@@ -14,15 +14,19 @@ For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
 https://labitory.org/commercial
 """
 
+from django.conf import settings
+from django.db import connections
 from django.utils import timezone
-from django.db.models import Q, Count, Sum, Avg
+from django.db.models import Q, Count, Sum, Avg, Max
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
-from .models import (
+from ..models import (
     Resource, Maintenance, MaintenanceAlert, MaintenanceAnalytics, 
     MaintenanceVendor, Booking
 )
+from .usage_rollups import usage_rollup_service, period_start
 
 logger = logging.getLogger(__name__)
 
@@ -39,13 +43,43 @@ class MaintenancePredictionService:
             'vendor_response_hours': 48,  # Alert if vendor response > 48 hours
         }
     
-    def analyze_all_resources(self):
-        """Run predictive analysis for all resources."""
+    def analyze_all_resources(self, workers=None, batch_size=None):
+        """
+        Run predictive analysis for all resources.
+        
+        Resources are split into batches of ``batch_size`` and analysed on a
+        pool of ``workers`` threads. Each worker holds one database
+        connection, which it closes after its batch, so at most ``workers``
+        connections are open at once. With one worker the batches run in
+        the calling thread.
+        """
+        workers = workers or getattr(settings, 'MAINTENANCE_ANALYSIS_WORKERS', 4)
+        batch_size = batch_size or getattr(settings, 'MAINTENANCE_ANALYSIS_BATCH_SIZE', 50)
+        
+        resource_ids = list(Resource.objects.order_by('id').values_list('id', flat=True))
+        batches = [resource_ids[i:i + batch_size] for i in range(0, len(resource_ids), batch_size)]
+        
+        if workers <= 1 or len(batches) <= 1:
+            return [analysis for batch in batches for analysis in self._analyze_batch(batch)]
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='maintenance-analysis') as executor:
+            for analyses in executor.map(self._analyze_batch_in_thread, batches):
+                results.extend(analyses)
+        return results
+    
+    def _analyze_batch(self, resource_ids):
+        """Analyse one batch of resources, loading their analytics rows together."""
         results = []
+        resources = Resource.objects.filter(id__in=resource_ids).order_by('id')
+        analytics_by_resource = {
+            analytics.resource_id: analytics
+            for analytics in MaintenanceAnalytics.objects.filter(resource_id__in=resource_ids)
+        }
         
-        for resource in Resource.objects.all():
+        for resource in resources:
             try:
-                analysis = self.analyze_resource(resource)
+                analysis = self.analyze_resource(resource, analytics_by_resource.get(resource.id))
                 if analysis:
                     results.append(analysis)
             except Exception as e:
@@ -53,7 +87,14 @@ class MaintenancePredictionService:
         
         return results
     
-    def analyze_resource(self, resource):
+    def _analyze_batch_in_thread(self, resource_ids):
+        try:
+            return self._analyze_batch(resource_ids)
+        finally:
+            # Worker threads open their own connections; don't leave them behind
+            connections.close_all()
+    
+    def analyze_resource(self, resource, analytics=None):
         """Perform comprehensive analysis for a single resource."""
         analysis = {
             'resource': resource,
@@ -63,7 +104,9 @@ class MaintenancePredictionService:
         }
         
         # Get or create analytics object
-        analytics, created = MaintenanceAnalytics.objects.get_or_create(resource=resource)
+        created = False
+        if analytics is None:
+            analytics, created = MaintenanceAnalytics.objects.get_or_create(resource=resource)
         if created or not analytics.last_calculated or \
            analytics.last_calculated < timezone.now() - timedelta(hours=24):
             analytics.calculate_metrics()
@@ -97,17 +140,12 @@ class MaintenancePredictionService:
         alerts = []
         now = timezone.now()
         
-        # Check recent usage (last 4 weeks)
-        recent_bookings = resource.bookings.filter(
-            start_time__gte=now - timedelta(weeks=4),
-            status__in=['confirmed', 'completed']
-        )
-        
-        weekly_usage = defaultdict(float)
-        for booking in recent_bookings:
-            week = booking.start_time.isocalendar()[1]
-            duration_hours = (booking.end_time - booking.start_time).total_seconds() / 3600
-            weekly_usage[week] += duration_hours
+        # Check recent usage (last 4 weeks) from the weekly rollups
+        since = now - timedelta(weeks=4)
+        weekly_usage = {
+            timezone.localtime(row['period_start']).isocalendar()[1]: row['booked_minutes'] / 60
+            for row in usage_rollup_service.series('week', period_start(since, 'week'), now, resource=resource)
+        }
         
         # Check for excessive usage
         for week, hours in weekly_usage.items():
@@ -125,12 +163,12 @@ class MaintenancePredictionService:
                 alerts.append(alert)
         
         # Check for booking concentration (too many bookings in short period)
-        daily_bookings = defaultdict(int)
-        for booking in recent_bookings:
-            day = booking.start_time.date()
-            daily_bookings[day] += 1
+        daily_bookings = [
+            row['bookings']
+            for row in usage_rollup_service.series('day', period_start(since, 'day'), now, resource=resource)
+        ]
         
-        max_daily_bookings = max(daily_bookings.values()) if daily_bookings else 0
+        max_daily_bookings = max(daily_bookings, default=0)
         if max_daily_bookings > 8:  # More than 8 bookings per day
             alert = self._create_alert(
                 resource=resource,
@@ -440,16 +478,23 @@ class MaintenancePredictionService:
         
         return alert
     
-    def generate_maintenance_schedule(self, resource, months_ahead=6):
-        """Generate recommended maintenance schedule for a resource."""
+    def generate_maintenance_schedule(self, resource, months_ahead=6, history=None):
+        """
+        Generate recommended maintenance schedule for a resource.
+        
+        ``history`` holds the resource's preloaded ``analytics``,
+        ``last_preventive_at`` and ``recent_usage``; see
+        ``load_schedule_history``. Without it they are queried here.
+        """
         schedule = []
         now = timezone.now()
         end_date = now + timedelta(days=months_ahead * 30)
+        if history is None:
+            history = self.load_schedule_history([resource]).get(resource.id, {})
         
         # Get analytics for this resource
-        try:
-            analytics = resource.maintenance_analytics
-        except MaintenanceAnalytics.DoesNotExist:
+        analytics = history.get('analytics')
+        if analytics is None:
             analytics = MaintenanceAnalytics.objects.create(resource=resource)
             analytics.calculate_metrics()
         
@@ -457,13 +502,8 @@ class MaintenancePredictionService:
         if analytics.recommended_maintenance_interval:
             interval_days = analytics.recommended_maintenance_interval.days
             
-            # Find last preventive maintenance
-            last_preventive = resource.maintenances.filter(
-                maintenance_type='preventive',
-                status='completed'
-            ).order_by('-completed_at').first()
-            
-            start_date = last_preventive.completed_at if last_preventive else now
+            # Start from the last completed preventive maintenance
+            start_date = history.get('last_preventive_at') or now
             current_date = start_date + timedelta(days=interval_days)
             
             while current_date <= end_date:
@@ -478,10 +518,7 @@ class MaintenancePredictionService:
                 current_date += timedelta(days=interval_days)
         
         # Schedule inspections based on usage
-        recent_usage = resource.bookings.filter(
-            start_time__gte=now - timedelta(days=30),
-            status__in=['confirmed', 'completed']
-        ).count()
+        recent_usage = history.get('recent_usage', 0)
         
         if recent_usage > 20:  # High usage resource
             # Schedule monthly inspections
@@ -514,6 +551,43 @@ class MaintenancePredictionService:
         
         return sorted(schedule, key=lambda x: x['date'])
     
+    def load_schedule_history(self, resources):
+        """
+        Load what schedule generation needs to know about ``resources`` with
+        one query per kind of history.
+        
+        Returns:
+            Dict mapping resource id to ``analytics`` (None if missing),
+            ``last_preventive_at`` and ``recent_usage``.
+        """
+        resource_ids = [resource.id for resource in resources]
+        analytics = {
+            row.resource_id: row
+            for row in MaintenanceAnalytics.objects.filter(resource_id__in=resource_ids)
+        }
+        last_preventive = dict(
+            Maintenance.objects.filter(
+                resource_id__in=resource_ids,
+                maintenance_type='preventive',
+                status='completed'
+            ).values('resource_id').annotate(last=Max('completed_at')).values_list('resource_id', 'last')
+        )
+        recent_usage = dict(
+            Booking.objects.filter(
+                resource_id__in=resource_ids,
+                start_time__gte=timezone.now() - timedelta(days=30),
+                status__in=['confirmed', 'completed']
+            ).values('resource_id').annotate(count=Count('id')).values_list('resource_id', 'count')
+        )
+        return {
+            resource_id: {
+                'analytics': analytics.get(resource_id),
+                'last_preventive_at': last_preventive.get(resource_id),
+                'recent_usage': recent_usage.get(resource_id, 0),
+            }
+            for resource_id in resource_ids
+        }
+    
     def cleanup_old_alerts(self, days=30):
         """Clean up old, resolved alerts."""
         cutoff_date = timezone.now() - timedelta(days=days)
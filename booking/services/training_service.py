@@ -0,0 +1,281 @@
+# booking/services/training_service.py
+"""
+Training satisfaction, gap and session slot services for the Labitory.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import AccessRequest, Booking, ResourceTrainingRequirement, UserTraining
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingSatisfactionService:
+    """
+    Works out which users have finished the training their resources require.
+
+    A (user, resource) pair is satisfied when the user has a completed
+    record for every mandatory training requirement of the resource.
+    Satisfaction is computed for many pairs in one grouped query, so a
+    cohort sign-off costs the same number of queries as a single trainee.
+    """
+
+    def pending_requests(self, users=None, courses=None):
+        """Pending access requests still waiting for lab training confirmation."""
+        requests = AccessRequest.objects.filter(status='pending', lab_training_confirmed=False)
+        if users is not None:
+            requests = requests.filter(user__in=users)
+        if courses is not None:
+            requests = requests.filter(
+                resource__training_requirements__training_course__in=courses,
+                resource__training_requirements__is_mandatory=True,
+            ).distinct()
+        return requests
+
+    def satisfied(self, requests):
+        """
+        Narrow ``requests`` to those whose user has completed every
+        mandatory course of the requested resource, and none has expired.
+        """
+        required = ResourceTrainingRequirement.objects.filter(
+            resource=OuterRef('resource'), is_mandatory=True
+        ).order_by().values('resource').annotate(count=Count('pk')).values('count')
+        now = timezone.now()
+        completed = ResourceTrainingRequirement.objects.filter(
+            Q(training_course__user_completions__expires_at__isnull=True)
+            | Q(training_course__user_completions__expires_at__gte=now),
+            resource=OuterRef('resource'),
+            is_mandatory=True,
+            training_course__user_completions__user=OuterRef('user'),
+            training_course__user_completions__status='completed',
+        ).order_by().values('resource').annotate(
+            count=Count('training_course', distinct=True)
+        ).values('count')
+
+        return requests.annotate(
+            required_courses=Coalesce(Subquery(required), 0),
+            completed_courses=Coalesce(Subquery(completed), 0),
+        ).filter(required_courses__gt=0, completed_courses=F('required_courses'))
+
+    def qualified_users(self, resource, now=None) -> QuerySet:
+        """
+        Users holding valid training for every mandatory course of ``resource``.
+
+        Evaluates as one query over the training validity index instead of
+        checking ``UserTraining.is_valid`` per user and course.
+        """
+        required = ResourceTrainingRequirement.objects.filter(resource=resource, is_mandatory=True)
+        required_count = required.order_by().values('resource').annotate(count=Count('pk')).values('count')
+        holders = (
+            UserTraining.objects.valid(now)
+            .filter(training_course__in=required.values('training_course'))
+            .order_by().values('user')
+            .annotate(courses=Count('training_course', distinct=True))
+            .filter(courses=Subquery(required_count))
+        )
+        return User.objects.filter(pk__in=holders.values('user'))
+
+    def confirm_satisfied_requests(self, users=None, courses=None, confirmed_by=None, notes=None) -> int:
+        """
+        Confirm lab training on every pending request that is now satisfied.
+
+        Equivalent to ``AccessRequest.confirm_lab_training`` on each request,
+        applied in one UPDATE. Without ``confirmed_by`` each request is
+        recorded as confirmed by its own requester. Returns the number of
+        requests confirmed.
+        """
+        if notes is None:
+            notes = 'Auto-confirmed: All required training completed'
+
+        ready = self.satisfied(self.pending_requests(users, courses)).values_list('pk', flat=True)
+        count = AccessRequest.objects.filter(pk__in=list(ready)).update(
+            lab_training_confirmed=True,
+            lab_training_confirmed_by=confirmed_by if confirmed_by is not None else F('user'),
+            lab_training_confirmed_at=timezone.now(),
+            lab_training_notes=notes,
+            updated_at=timezone.now(),
+        )
+        if count:
+            logger.info(f"Confirmed lab training on {count} access requests")
+        return count
+
+    @transaction.atomic
+    def complete_trainings(self, user_trainings: Iterable[UserTraining], instructor=None, notes: str = "") -> int:
+        """
+        Mark training records completed by admin confirmation, in bulk.
+
+        Applies ``UserTraining.mark_as_completed_by_admin`` to every record
+        with one bulk UPDATE, then confirms every access request the
+        completions satisfy. Returns the number of records completed.
+        """
+        now = timezone.now()
+        if isinstance(user_trainings, QuerySet):
+            user_trainings = user_trainings.select_related('training_course')
+        records = list(user_trainings)
+        if not records:
+            return 0
+
+        for record in records:
+            self._apply_completion(record, now, instructor, notes)
+        UserTraining.objects.bulk_update(records, [
+            'status', 'completed_at', 'passed', 'instructor', 'instructor_notes', 'expires_at',
+            'certificate_number', 'certificate_issued_at', 'updated_at',
+        ])
+
+        self.on_trainings_completed(records, instructor)
+        return len(records)
+
+    def on_trainings_completed(self, records, instructor=None) -> int:
+        """Cascade completed training records to the access requests they unblock."""
+        courses = {record.training_course_id: record.training_course for record in records}
+        notes = None
+        if len(courses) == 1:
+            course, = courses.values()
+            notes = f'Auto-confirmed: All required training completed including {course.title}'
+
+        return self.confirm_satisfied_requests(
+            users={record.user_id for record in records},
+            courses=list(courses),
+            confirmed_by=instructor,
+            notes=notes,
+        )
+
+    @staticmethod
+    def _apply_completion(record, now, instructor, notes):
+        course = record.training_course
+        record.status = 'completed'
+        record.completed_at = now
+        record.passed = True  # Admin confirmation means they passed
+        record.instructor = instructor
+        record.instructor_notes = notes
+        record.updated_at = now
+        if course.valid_for_months:
+            record.expires_at = now + timedelta(days=course.valid_for_months * 30)
+        if not record.certificate_number:
+            record.certificate_number = f"{course.code}-{record.user_id}-{now.strftime('%Y%m%d')}"
+            record.certificate_issued_at = now
+
+
+class TrainingGapService:
+    """
+    Works out which mandatory courses stand between users and their pending
+    access requests.
+
+    The gaps of one user or a whole cohort, across every pending request,
+    cost two queries: the requests, then the unmet requirements of all of
+    them at once.
+    """
+
+    def missing_courses(self, users, now=None) -> List[Dict]:
+        """
+        Mandatory courses ``users`` lack valid training for, per pending request.
+
+        ``users`` is a user, an iterable of users or a queryset. Returns
+        dicts with ``user``, ``resource``, ``training_course`` and
+        ``access_request``, newest request first, then in requirement order.
+        """
+        if isinstance(users, User):
+            users = [users]
+        now = now or timezone.now()
+
+        requests = {
+            request.pk: request
+            for request in training_satisfaction_service.pending_requests(users)
+            .select_related('user', 'resource')
+        }
+        if not requests:
+            return []
+
+        holds_valid_training = UserTraining.objects.valid(now).filter(
+            user=OuterRef('requester_id'), training_course=OuterRef('training_course'),
+        )
+        unmet = (
+            ResourceTrainingRequirement.objects
+            .filter(is_mandatory=True, resource__access_requests__in=list(requests))
+            .annotate(
+                access_request_id=F('resource__access_requests'),
+                requester_id=F('resource__access_requests__user'),
+            )
+            .exclude(Exists(holds_valid_training))
+            .select_related('training_course')
+            .order_by('order', 'pk')
+        )
+
+        gaps = []
+        for requirement in unmet:
+            request = requests[requirement.access_request_id]
+            gaps.append({
+                'user': request.user,
+                'resource': request.resource,
+                'training_course': requirement.training_course,
+                'access_request': request,
+            })
+        order = {pk: position for position, pk in enumerate(requests)}
+        gaps.sort(key=lambda gap: order[gap['access_request'].pk])
+        return gaps
+
+
+class TrainingSlotFinder:
+    """
+    Finds a free session slot on a resource for scheduled training.
+
+    Candidate starts step forward from the requested time (a day at a time
+    by default). The resource's bookings over the whole horizon are read
+    once and swept in memory, instead of one overlap query per candidate.
+    """
+
+    BLOCKING_STATUSES = ('approved', 'pending')
+
+    def next_free_slot(self, resource, start: datetime, duration: timedelta,
+                       candidates: int = 30, step: timedelta = timedelta(days=1)) -> Optional[datetime]:
+        """
+        Earliest of ``start``, ``start + step``, ... free of bookings for ``duration``.
+
+        Returns None when none of the first ``candidates`` starts is free.
+        """
+        horizon_end = start + step * (candidates - 1) + duration
+        busy = self._merge(Booking.objects.filter(
+            resource=resource,
+            status__in=self.BLOCKING_STATUSES,
+            start_time__lt=horizon_end,
+            end_time__gt=start,
+        ).order_by('start_time').values_list('start_time', 'end_time'))
+
+        # Candidates move forward in time, so the busy periods are swept once
+        index = 0
+        for offset in range(candidates):
+            candidate = start + step * offset
+            while index < len(busy) and busy[index][1] <= candidate:
+                index += 1
+            if index == len(busy) or busy[index][0] >= candidate + duration:
+                return candidate
+        return None
+
+    @staticmethod
+    def _merge(intervals) -> List[List[datetime]]:
+        """Merge intervals sorted by start into disjoint busy periods."""
+        merged = []
+        for interval_start, interval_end in intervals:
+            if merged and interval_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], interval_end)
+            else:
+                merged.append([interval_start, interval_end])
+        return merged
+
+
+# Global service instances
+training_satisfaction_service = TrainingSatisfactionService()
+training_gap_service = TrainingGapService()
+training_slot_finder = TrainingSlotFinder()
@@ -0,0 +1,319 @@
+# booking/services/usage_rollups.py
+"""
+Usage rollup engine for the Labitory.
+
+This file is part of the Labitory.
+Copyright (C) 2025 Labitory Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://labitory.org/commercial
+
+Finished bookings (checked out, auto checked out or marked no-show) are
+added to ``UsageRollup`` counters at hour, day, week and month
+granularity, split by resource, the owner's department and the owner's
+role. A booking counts towards the periods containing its start time.
+
+Counters are only ever summed, so a range query reads the coarsest rows
+that tile it (whole months, then whole days, then hours at the edges)
+and ratios such as utilization are computed from the sums afterwards.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from ..models import Booking, Resource, UsageRollup, UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+GRANULARITIES = ('hour', 'day', 'week', 'month')
+
+COUNTER_FIELDS = (
+    'bookings', 'completed_bookings', 'no_show_bookings', 'cancelled_bookings',
+    'booked_minutes', 'actual_minutes', 'wasted_minutes',
+)
+
+# Assume 9 hours available per day (9 AM - 6 PM) for utilization
+AVAILABLE_MINUTES_PER_DAY = 9 * 60
+
+
+def period_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the local-time period of ``granularity`` containing ``moment``."""
+    local = timezone.localtime(moment)
+    if granularity == 'hour':
+        start = local.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    else:
+        start = local.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        if granularity == 'week':
+            start -= timedelta(days=start.weekday())
+        elif granularity == 'month':
+            start = start.replace(day=1)
+    return timezone.make_aware(start)
+
+
+def next_period(start: datetime, granularity: str) -> datetime:
+    """Start of the period after the one beginning at ``start``."""
+    naive = timezone.make_naive(start)
+    if granularity == 'hour':
+        naive += timedelta(hours=1)
+    elif granularity == 'day':
+        naive += timedelta(days=1)
+    elif granularity == 'week':
+        naive += timedelta(weeks=1)
+    else:
+        naive = (naive.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return timezone.make_aware(naive)
+
+
+def _ceil(moment: datetime, granularity: str) -> datetime:
+    start = period_start(moment, granularity)
+    return start if start == moment else next_period(start, granularity)
+
+
+def booking_counters(no_show: bool, checked_out_at, status: str, start_time, end_time,
+                     actual_start_time, actual_end_time) -> Counter:
+    """Counter contributions of one finished booking."""
+    counts = Counter(bookings=1)
+    if no_show:
+        counts['no_show_bookings'] += 1
+    elif checked_out_at:
+        counts['completed_bookings'] += 1
+    elif status == 'cancelled':
+        counts['cancelled_bookings'] += 1
+
+    booked_minutes = int((end_time - start_time).total_seconds() // 60)
+    counts['booked_minutes'] += booked_minutes
+    if actual_start_time and actual_end_time:
+        actual_minutes = int((actual_end_time - actual_start_time).total_seconds() // 60)
+        counts['actual_minutes'] += actual_minutes
+        counts['wasted_minutes'] += max(0, booked_minutes - actual_minutes)
+    return counts
+
+
+class UsageRollupService:
+    """Maintains and queries UsageRollup counters."""
+
+    BOOKING_FIELDS = (
+        'resource_id', 'user_id', 'no_show', 'checked_out_at', 'status',
+        'start_time', 'end_time', 'actual_start_time', 'actual_end_time',
+    )
+
+    # Updating
+
+    def record(self, bookings: Iterable[Booking]) -> int:
+        """
+        Add finished bookings to every granularity.
+
+        Called once per booking when it is checked out or marked no-show.
+        Returns the number of rollup cells touched.
+        """
+        rows = [tuple(getattr(booking, field) for field in self.BOOKING_FIELDS) for booking in bookings]
+        if not rows:
+            return 0
+
+        cells = self._accumulate(rows, self._profiles({row[1] for row in rows}))
+        with transaction.atomic():
+            UsageRollup.objects.bulk_create(
+                [UsageRollup(**self._cell_fields(key)) for key in cells],
+                ignore_conflicts=True
+            )
+            for key, counts in cells.items():
+                UsageRollup.objects.filter(**self._cell_lookup(key)).update(
+                    **{field: F(field) + value for field, value in counts.items()}
+                )
+        return len(cells)
+
+    def rebuild(self, resource: Optional[Resource] = None, since: Optional[datetime] = None,
+                batch_size: int = 2000) -> int:
+        """
+        Recompute rollups from bookings, replacing existing rows.
+
+        ``since`` is widened to the start of its month (and, for weekly rows,
+        to the Monday of that month's first week), so every rebuilt period
+        is complete. Returns the number of rows written.
+        """
+        bookings = Booking.objects.filter(Q(checked_out_at__isnull=False) | Q(no_show=True))
+        rollups = UsageRollup.objects.all()
+        if resource is not None:
+            bookings = bookings.filter(resource=resource)
+            rollups = rollups.filter(resource=resource)
+        bounds = {}
+        if since is not None:
+            month_start = period_start(since, 'month')
+            bounds = {granularity: month_start for granularity in GRANULARITIES}
+            bounds['week'] = period_start(month_start, 'week')
+            bookings = bookings.filter(start_time__gte=bounds['week'])
+            periods = Q()
+            for granularity, bound in bounds.items():
+                periods |= Q(granularity=granularity, period_start__gte=bound)
+            rollups = rollups.filter(periods)
+
+        with transaction.atomic():
+            rollups.delete()
+            cells = self._accumulate(
+                bookings.values_list(*self.BOOKING_FIELDS).iterator(chunk_size=batch_size),
+                self._profiles()
+            )
+            UsageRollup.objects.bulk_create(
+                [
+                    UsageRollup(**self._cell_fields(key), **counts)
+                    for key, counts in cells.items()
+                    if key[0] not in bounds or key[1] >= bounds[key[0]]
+                ],
+                batch_size=batch_size
+            )
+        logger.info(f"Rebuilt {len(cells)} usage rollups")
+        return len(cells)
+
+    @staticmethod
+    def _profiles(user_ids=None) -> Dict[int, Tuple[Optional[int], str]]:
+        """Department and role per user, for the given users or everyone."""
+        profiles = UserProfile.objects.all()
+        if user_ids is not None:
+            profiles = profiles.filter(user_id__in=user_ids)
+        return {
+            user_id: (department_id, role)
+            for user_id, department_id, role in profiles.values_list('user_id', 'department_id', 'role')
+        }
+
+    @staticmethod
+    def _accumulate(rows, profiles) -> Dict[tuple, Counter]:
+        cells = defaultdict(Counter)
+        for resource_id, user_id, *fields in rows:
+            counts = booking_counters(*fields)
+            department_id, role = profiles.get(user_id, (None, ''))
+            start_time = fields[3]
+            for granularity in GRANULARITIES:
+                key = (granularity, period_start(start_time, granularity), resource_id, department_id, role)
+                cells[key].update(counts)
+        return cells
+
+    @staticmethod
+    def _cell_fields(key) -> dict:
+        granularity, start, resource_id, department_id, role = key
+        return {
+            'granularity': granularity, 'period_start': start, 'resource_id': resource_id,
+            'department_id': department_id, 'user_type': role,
+        }
+
+    def _cell_lookup(self, key) -> dict:
+        lookup = self._cell_fields(key)
+        if lookup['department_id'] is None:
+            del lookup['department_id']
+            lookup['department__isnull'] = True
+        return lookup
+
+    # Querying
+
+    @staticmethod
+    def tile(start: datetime, end: datetime) -> List[Tuple[str, datetime, datetime]]:
+        """
+        Cover [start, end) with the fewest rollup periods.
+
+        Returns ``(granularity, from, to)`` segments: whole months in the
+        middle, whole days around them and hours at the edges. The range is
+        widened to whole hours.
+        """
+        start = period_start(start, 'hour')
+        end = _ceil(end, 'hour')
+        if start >= end:
+            return []
+
+        day_start, day_end = _ceil(start, 'day'), period_start(end, 'day')
+        if day_start >= day_end:
+            return [('hour', start, end)]
+
+        segments = [('hour', start, day_start), ('hour', day_end, end)]
+        month_start, month_end = _ceil(day_start, 'month'), period_start(day_end, 'month')
+        if month_start < month_end:
+            segments += [('day', day_start, month_start), ('day', month_end, day_end),
+                         ('month', month_start, month_end)]
+        else:
+            segments.append(('day', day_start, day_end))
+        return [segment for segment in segments if segment[1] < segment[2]]
+
+    def _filter(self, resource=None, department=None, user_type=None):
+        queryset = UsageRollup.objects.all()
+        if resource is not None:
+            queryset = queryset.filter(resource=resource)
+        if department is not None:
+            queryset = queryset.filter(department=department)
+        if user_type:
+            queryset = queryset.filter(user_type=user_type)
+        return queryset
+
+    def totals(self, start: datetime, end: datetime, resource=None, department=None,
+               user_type=None) -> Dict[str, int]:
+        """Summed counters for [start, end) in one indexed query."""
+        segments = self.tile(start, end)
+        if not segments:
+            return {field: 0 for field in COUNTER_FIELDS}
+
+        periods = Q()
+        for granularity, segment_start, segment_end in segments:
+            periods |= Q(granularity=granularity, period_start__gte=segment_start,
+                         period_start__lt=segment_end)
+        sums = self._filter(resource, department, user_type).filter(periods).aggregate(
+            **{field: Sum(field) for field in COUNTER_FIELDS}
+        )
+        return {field: sums[field] or 0 for field in COUNTER_FIELDS}
+
+    def series(self, granularity: str, start: datetime, end: datetime, resource=None,
+               department=None, user_type=None) -> List[dict]:
+        """Counters per ``granularity`` period starting in [start, end), oldest first."""
+        return list(
+            self._filter(resource, department, user_type).filter(
+                granularity=granularity, period_start__gte=start, period_start__lt=end
+            ).values('period_start').annotate(
+                **{field: Sum(field) for field in COUNTER_FIELDS}
+            ).order_by('period_start')
+        )
+
+    def summary(self, start: datetime, end: datetime, resource=None, department=None,
+                user_type=None) -> Dict:
+        """
+        Usage statistics for [start, end) with ratios computed from the sums.
+
+        Utilization is actual minutes over the available minutes of every
+        day in the range (for every active resource unless one is given),
+        so busy and quiet days are weighted by their minutes.
+        """
+        totals = self.totals(start, end, resource, department, user_type)
+        days = max(1, (timezone.localdate(end) - timezone.localdate(start)).days)
+        resource_count = 1 if resource is not None else max(1, Resource.objects.filter(is_active=True).count())
+        available_minutes = AVAILABLE_MINUTES_PER_DAY * days * resource_count
+
+        return {
+            'total_bookings': totals['bookings'],
+            'completed_bookings': totals['completed_bookings'],
+            'no_show_bookings': totals['no_show_bookings'],
+            'cancelled_bookings': totals['cancelled_bookings'],
+            'total_booked_minutes': totals['booked_minutes'],
+            'total_actual_minutes': totals['actual_minutes'],
+            'total_wasted_minutes': totals['wasted_minutes'],
+            'avg_utilization': min(totals['actual_minutes'] / available_minutes, 1.0),
+            'avg_efficiency': (
+                totals['actual_minutes'] / totals['booked_minutes'] if totals['booked_minutes'] else 0.0
+            ),
+            'avg_no_show_rate': (
+                totals['no_show_bookings'] / totals['bookings'] if totals['bookings'] else 0.0
+            ),
+            'completion_rate': (
+                totals['completed_bookings'] / totals['bookings'] * 100 if totals['bookings'] else 0
+            ),
+        }
+
+
+# Global service instance
+usage_rollup_service = UsageRollupService()
@@ -0,0 +1,294 @@
+# booking/services/user_import.py
+"""
+Bulk CSV user import engine.
+
+Creating users one row at a time runs existence checks, hierarchy lookups
+and a full password hash per row. For large cohorts this engine instead:
+
+1. streams and validates the CSV in chunks,
+2. loads the existing users of each chunk and the whole academic
+   hierarchy into dictionaries up front,
+3. hashes the shared initial password once, and
+4. writes users, profiles and notification preferences with
+   bulk_create/bulk_update per chunk.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import csv
+import logging
+import secrets
+from itertools import islice
+from typing import Any, Dict, Iterable, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import College, Department, Faculty, NotificationPreference, UserProfile
+from ..utils.cache_utils import HierarchyCache
+
+logger = logging.getLogger(__name__)
+
+
+USER_FIELDS = ['email', 'first_name', 'last_name']
+PROFILE_FIELDS = ['role', 'group', 'student_id', 'staff_number', 'student_level', 'phone']
+HIERARCHY_FIELDS = ['faculty', 'college', 'department']
+
+
+class UserImportService:
+    """Create or update users and their profiles from CSV rows."""
+
+    CHUNK_SIZE = 500
+
+    def __init__(self):
+        self.roles = {role for role, _ in UserProfile.ROLE_CHOICES}
+        self.student_levels = {level for level, _ in UserProfile.STUDENT_LEVEL_CHOICES}
+
+    def import_csv(self, csv_file, required_columns: Iterable[str] = ('username',),
+                   **options) -> Dict[str, Any]:
+        """
+        Import users from an open text-mode CSV file.
+
+        Rows are read lazily, so the file is never loaded in full. Raises
+        ``ValueError`` if the header is missing or lacks a required column.
+        """
+        reader = csv.DictReader(csv_file)
+        if not reader.fieldnames:
+            raise ValueError('CSV file is empty')
+        missing = [column for column in required_columns if column not in reader.fieldnames]
+        if missing:
+            raise ValueError(
+                f'Missing required columns: {", ".join(missing)}. '
+                f'Available columns: {", ".join(reader.fieldnames)}'
+            )
+        options.setdefault('require_email', 'email' in required_columns)
+        return self.import_rows(reader, **options)
+
+    def import_rows(self, rows: Iterable[Dict[str, str]], update_existing: bool = False,
+                    dry_run: bool = False, password: Optional[str] = None,
+                    default_role: str = 'student', require_email: bool = False,
+                    profile_defaults: Optional[Dict[str, Any]] = None,
+                    chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Import users from an iterable of CSV row dicts.
+
+        Existing users are skipped unless ``update_existing`` is set, in
+        which case non-blank cells overwrite their values. New users all get
+        ``password`` (a random one if omitted), hashed once for the whole
+        import. In ``dry_run`` mode rows are validated but nothing is written.
+
+        Returns:
+            Dict with ``created`` and ``updated`` counts and ``skipped``,
+            ``errors`` and ``warnings`` lists of ``{'row', 'username', ...}``
+            dicts. Row numbers count the header as row 1.
+        """
+        result = {
+            'created': 0,
+            'updated': 0,
+            'skipped': [],
+            'errors': [],
+            'warnings': [],
+            'dry_run': dry_run,
+        }
+        state = {
+            'password': make_password(password or secrets.token_urlsafe(16)),
+            'hierarchy': self._load_hierarchy(),
+            'seen_usernames': set(),
+            'seen_emails': {},
+            'default_role': default_role,
+            'require_email': require_email,
+            'profile_defaults': profile_defaults or {},
+        }
+
+        numbered = enumerate(rows, start=2)
+        while True:
+            chunk = list(islice(numbered, chunk_size or self.CHUNK_SIZE))
+            if not chunk:
+                break
+            self._import_chunk(chunk, update_existing, dry_run, state, result)
+
+        logger.info(
+            f"User import{' (dry run)' if dry_run else ''}: {result['created']} created, "
+            f"{result['updated']} updated, {len(result['skipped'])} skipped, {len(result['errors'])} errors"
+        )
+        return result
+
+    def _import_chunk(self, chunk, update_existing, dry_run, state, result):
+        parsed = []
+        for row_num, row in chunk:
+            username = (row.get('username') or '').strip()
+            try:
+                parsed.append((row_num, username, self._parse_row(row, username, state, result, row_num)))
+            except ValueError as e:
+                result['errors'].append({'row': row_num, 'username': username, 'error': str(e)})
+
+        usernames = [username for _, username, _ in parsed]
+        emails = [fields['email'] for _, _, (fields, _) in parsed if fields['email']]
+        existing = {
+            user.username: user
+            for user in User.objects.filter(Q(username__in=usernames) | Q(email__in=emails)).select_related('userprofile')
+        }
+        email_owners = {user.email: user.username for user in existing.values() if user.email}
+
+        new_users, new_profiles, changed_users, changed_profiles = [], [], [], []
+        for row_num, username, (user_fields, profile_fields) in parsed:
+            email = user_fields['email']
+            if email and email_owners.get(email, username) != username:
+                result['errors'].append({
+                    'row': row_num, 'username': username,
+                    'error': f'Email {email} already exists for different user',
+                })
+                continue
+            if email and state['seen_emails'].setdefault(email, username) != username:
+                result['errors'].append({
+                    'row': row_num, 'username': username,
+                    'error': f'Email {email} appears more than once in file',
+                })
+                continue
+
+            user = existing.get(username)
+            if user is None:
+                user = User(username=username, password=state['password'], **user_fields)
+                profile = UserProfile(user=user, **{**state['profile_defaults'], **profile_fields})
+                profile.role = profile.role or state['default_role']
+                new_users.append(user)
+                new_profiles.append(profile)
+                result['created'] += 1
+            elif update_existing:
+                for field, value in user_fields.items():
+                    if value:
+                        setattr(user, field, value)
+                changed_users.append(user)
+                profile = getattr(user, 'userprofile', None)
+                if profile is None:
+                    profile = UserProfile(user=user, **profile_fields)
+                    profile.role = profile.role or state['default_role']
+                    new_profiles.append(profile)
+                else:
+                    for field, value in profile_fields.items():
+                        if value:
+                            setattr(profile, field, value)
+                    changed_profiles.append(profile)
+                result['updated'] += 1
+            else:
+                result['skipped'].append({'row': row_num, 'username': username})
+
+        if not dry_run:
+            self._write_chunk(new_users, new_profiles, changed_users, changed_profiles)
+
+    def _parse_row(self, row, username, state, result, row_num):
+        """Validate a row, returning its user and profile fields."""
+        def cell(column):
+            return (row.get(column) or '').strip()
+
+        email = cell('email')
+        if not username or (state['require_email'] and not email):
+            raise ValueError('Username and email are required' if state['require_email'] else 'Missing username')
+        if username in state['seen_usernames']:
+            raise ValueError(f'Duplicate username {username} in file')
+        state['seen_usernames'].add(username)
+
+        role = cell('role').lower()
+        if role and role not in self.roles:
+            raise ValueError(f'Invalid role: {role}')
+        student_level = cell('student_level').lower()
+        if student_level and student_level not in self.student_levels:
+            raise ValueError(f'Invalid student level: {student_level}')
+
+        user_fields = {'email': email, 'first_name': cell('first_name'), 'last_name': cell('last_name')}
+        profile_fields = {
+            'role': role,
+            'group': cell('group'),
+            'student_id': cell('student_id') or None,
+            'staff_number': cell('staff_number') or None,
+            'student_level': student_level or None,
+            'phone': cell('phone'),
+        }
+        profile_fields.update(self._resolve_hierarchy(
+            cell('faculty_code'), cell('college_code'), cell('department_code'),
+            state['hierarchy'], result, row_num, username,
+        ))
+        return user_fields, profile_fields
+
+    def _load_hierarchy(self):
+        """Index faculties, colleges and departments by code."""
+        colleges, departments = {}, {}
+        for college in College.objects.order_by('pk'):
+            colleges.setdefault((college.faculty_id, college.code), college)
+            colleges.setdefault((None, college.code), college)
+        for department in Department.objects.order_by('pk'):
+            departments.setdefault((department.college_id, department.code), department)
+            departments.setdefault((None, department.code), department)
+        return {
+            'faculty': {faculty.code: faculty for faculty in Faculty.objects.all()},
+            'college': colleges,
+            'department': departments,
+        }
+
+    @staticmethod
+    def _resolve_hierarchy(faculty_code, college_code, department_code, hierarchy, result, row_num, username):
+        """
+        Look up hierarchy codes, each scoped to its parent when that was
+        found. Unknown codes are reported as warnings and left blank.
+        """
+        resolved = {}
+        parent_id = None
+        for level, code in (('faculty', faculty_code), ('college', college_code),
+                            ('department', department_code)):
+            if not code:
+                continue
+            key = code if level == 'faculty' else (parent_id, code)
+            match = hierarchy[level].get(key)
+            if match is None:
+                result['warnings'].append({
+                    'row': row_num, 'username': username,
+                    'warning': f'{level.title()} not found: {code}',
+                })
+            else:
+                resolved[level] = match
+            parent_id = match.pk if match is not None else None
+        return resolved
+
+    @transaction.atomic
+    def _write_chunk(self, new_users, new_profiles, changed_users, changed_profiles):
+        now = timezone.now()
+        if new_profiles or changed_profiles:
+            # Bulk writes skip the signals that keep member counts current
+            transaction.on_commit(HierarchyCache.invalidate)
+        if changed_users:
+            User.objects.bulk_update(changed_users, USER_FIELDS)
+        if changed_profiles:
+            for profile in changed_profiles:
+                profile.updated_at = now
+            UserProfile.objects.bulk_update(
+                changed_profiles, PROFILE_FIELDS + HIERARCHY_FIELDS + ['updated_at']
+            )
+        if not new_users and not new_profiles:
+            return
+
+        User.objects.bulk_create(new_users)
+        if any(user.pk is None for user in new_users):
+            # Backends that can't return ids from bulk inserts
+            ids = dict(User.objects.filter(
+                username__in=[user.username for user in new_users]
+            ).values_list('username', 'pk'))
+            for user in new_users:
+                user.pk = ids[user.username]
+        for profile in new_profiles:
+            profile.user_id = profile.user.pk
+        UserProfile.objects.bulk_create(new_profiles)
+
+        from ..signals import default_notification_preferences
+        NotificationPreference.objects.bulk_create(
+            [preference for user in new_users for preference in default_notification_preferences(user)],
+            ignore_conflicts=True,
+        )
+
+
+# Global service instance
+user_import_service = UserImportService()
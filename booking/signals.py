@@ -7,11 +7,26 @@ Copyright (c) 2025 Labitory Contributors
 Licensed under the MIT License - see LICENSE file for details.
 """
 
-from django.db.models.signals import post_save, post_delete
+import logging
+
+from django.core.signals import request_finished
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.db import transaction
 from django.dispatch import receiver
+from django.utils import timezone
 from django.contrib.auth.models import User
-from .models import UserProfile, Booking, BookingHistory, Maintenance, NotificationPreference, BackupSchedule
+from .models import (
+    UserProfile, Booking, BookingAttendee, BookingHistory, Maintenance, MaintenanceBlock,
+    NotificationPreference, BackupSchedule, Resource, APISigningKey, Faculty, College, Department,
+)
 from .notifications import booking_notifications, maintenance_notifications
+from .utils.acting_user import get_acting_user
+from .utils.audit_buffer import record_event, flush_audit_buffer
+from .utils.cache_utils import (
+    HierarchyCache, ICSFeedCache, ResourceAvailabilityCache, SigningKeyCache, invalidate_booking_caches,
+)
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=User)
@@ -35,10 +50,11 @@ def save_user_profile(sender, instance, **kwargs):
 @receiver(post_save, sender=Booking)
 def log_booking_changes(sender, instance, created, **kwargs):
     """Log booking creation and updates."""
+    actor = get_acting_user()
     if created:
-        BookingHistory.objects.create(
+        record_event(BookingHistory(
             booking=instance,
-            user=instance.user,
+            user=actor or instance.user,
             action='created',
             new_values={
                 'title': instance.title,
@@ -46,29 +62,50 @@ def log_booking_changes(sender, instance, created, **kwargs):
                 'end_time': instance.end_time.isoformat(),
                 'status': instance.status,
             }
-        )
+        ))
         # Send booking creation notification
         booking_notifications.booking_created(instance)
     else:
-        # Handle status changes
-        try:
-            old_booking = Booking.objects.get(pk=instance.pk)
-            if old_booking.status != instance.status:
-                if instance.status == 'confirmed':
-                    booking_notifications.booking_confirmed(instance)
-                elif instance.status == 'cancelled':
-                    # Note: We'd need to track who cancelled it for proper notification
-                    booking_notifications.booking_cancelled(instance, instance.user)
-        except Booking.DoesNotExist:
-            pass
+        # Field changes are tracked in memory, so no re-fetch is needed
+        changes = instance.get_changes()
+        if not changes:
+            return
+        
+        record_event(BookingHistory(
+            booking=instance,
+            user_id=actor.pk if actor else _history_user_id(instance, changes),
+            action='status_changed' if 'status' in changes else 'updated',
+            old_values={field: _history_value(old) for field, (old, new) in changes.items()},
+            new_values={field: _history_value(new) for field, (old, new) in changes.items()},
+        ))
+        
+        if 'status' in changes:
+            if instance.status in ('approved', 'confirmed'):
+                booking_notifications.booking_confirmed(instance)
+            elif instance.status == 'cancelled':
+                booking_notifications.booking_cancelled(instance, actor or instance.user)
+
+
+def _history_user_id(instance, changes):
+    """Best guess at who changed a booking outside a request: its approver, else its owner."""
+    if 'status' in changes and instance.status in ('approved', 'rejected') and instance.approved_by_id:
+        return instance.approved_by_id
+    return instance.user_id
+
+
+def _history_value(value):
+    """Make a tracked field value JSON-serialisable for BookingHistory."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
 
 
 @receiver(post_delete, sender=Booking)
 def log_booking_deletion(sender, instance, **kwargs):
     """Log booking deletion."""
-    BookingHistory.objects.create(
+    record_event(BookingHistory(
         booking_id=instance.id,
-        user=instance.user,
+        user=get_acting_user() or instance.user,
         action='deleted',
         old_values={
             'title': instance.title,
@@ -76,7 +113,62 @@ def log_booking_deletion(sender, instance, **kwargs):
             'end_time': instance.end_time.isoformat(),
             'status': instance.status,
         }
-    )
+    ))
+
+
+@receiver(post_save, sender=Booking)
+def invalidate_booking_cache_on_save(sender, instance, created, **kwargs):
+    """Invalidate relevant caches when a booking is saved."""
+    try:
+        changes = {} if created else instance.get_changes()
+        if not created and not changes:
+            return
+        
+        invalidate_booking_caches(
+            booking_id=instance.id,
+            user_id=instance.user_id,
+            resource_id=instance.resource_id
+        )
+        
+        # Invalidate resource availability for the booking date, and for the
+        # previous date/resource if the booking was moved
+        ResourceAvailabilityCache.invalidate_resource_availability(
+            resource_id=instance.resource_id,
+            date_str=instance.start_time.date().isoformat()
+        )
+        if 'start_time' in changes or 'resource' in changes:
+            old_start = instance.get_old_value('start_time', instance.start_time)
+            ResourceAvailabilityCache.invalidate_resource_availability(
+                resource_id=instance.get_old_value('resource', instance.resource_id),
+                date_str=old_start.date().isoformat()
+            )
+        
+    except Exception as e:
+        logger.error(f"Error invalidating booking cache: {e}")
+
+
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_cache_on_delete(sender, instance, **kwargs):
+    """Invalidate relevant caches when a booking is deleted."""
+    try:
+        invalidate_booking_caches(
+            booking_id=instance.id,
+            user_id=instance.user_id,
+            resource_id=instance.resource_id
+        )
+        ResourceAvailabilityCache.invalidate_resource_availability(
+            resource_id=instance.resource_id,
+            date_str=instance.start_time.date().isoformat()
+        )
+        
+    except Exception as e:
+        logger.error(f"Error invalidating booking cache on delete: {e}")
+
+
+@receiver(request_finished)
+def flush_audit_events(sender, **kwargs):
+    """Write audit events buffered during the request once it has finished."""
+    flush_audit_buffer()
 
 
 @receiver(post_save, sender=Maintenance)
@@ -86,8 +178,134 @@ def handle_maintenance_changes(sender, instance, created, **kwargs):
         maintenance_notifications.maintenance_scheduled(instance)
 
 
+@receiver(m2m_changed, sender=Maintenance.affects_other_resources.through)
+def sync_maintenance_blocks(sender, instance, action, reverse, pk_set, **kwargs):
+    """Re-expand maintenance blocks when the affected resources change."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        instance.sync_blocks()
+    elif pk_set:
+        for maintenance in Maintenance.objects.filter(pk__in=pk_set):
+            maintenance.sync_blocks()
+    else:
+        # Clearing from the resource side doesn't report which maintenance changed
+        MaintenanceBlock.objects.filter(resource=instance).exclude(maintenance__resource=instance).delete()
+
+
+@receiver(post_save, sender=APISigningKey)
+@receiver(post_delete, sender=APISigningKey)
+def invalidate_signing_key(sender, instance, **kwargs):
+    """Drop the cached key so revocations and expiry changes apply at once."""
+    SigningKeyCache.invalidate(instance.key_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_signing_keys(sender, instance, created, update_fields=None, **kwargs):
+    """Drop cached keys holding a copy of the user, e.g. when deactivated."""
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    for key_id in instance.signing_keys.values_list('key_id', flat=True):
+        SigningKeyCache.invalidate(key_id)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_feed_block(sender, instance, **kwargs):
+    """Drop the booking's cached calendar feed block."""
+    ICSFeedCache.invalidate('booking', instance.pk)
+
+
+@receiver(post_save, sender=Maintenance)
+@receiver(post_delete, sender=Maintenance)
+def invalidate_maintenance_feed_block(sender, instance, **kwargs):
+    """Drop the maintenance period's cached calendar feed block."""
+    ICSFeedCache.invalidate('maintenance', instance.pk)
+
+
+@receiver(post_save, sender=BookingAttendee)
+@receiver(post_delete, sender=BookingAttendee)
+def touch_booking_on_attendee_change(sender, instance, **kwargs):
+    """
+    Bump the booking's ``updated_at`` when its attendees change.
+
+    Attendees are part of the rendered feed event, so feeds must see a new
+    stamp (and ETag) for the booking.
+    """
+    Booking.objects.filter(pk=instance.booking_id).update(updated_at=timezone.now())
+    ICSFeedCache.invalidate('booking', instance.booking_id)
+
+
+# Fields of related objects that rendered feed events embed
+FEED_RESOURCE_FIELDS = ('name', 'location', 'resource_type')
+FEED_USER_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def _feed_fields(instance, fields):
+    """Current values of ``fields``, skipping deferred ones."""
+    return tuple(instance.__dict__.get(field) for field in fields)
+
+
+@receiver(post_init, sender=Resource)
+def remember_resource_feed_fields(sender, instance, **kwargs):
+    """Remember the resource's rendered feed fields as it is loaded."""
+    instance._feed_fields = _feed_fields(instance, FEED_RESOURCE_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_user_feed_fields(sender, instance, **kwargs):
+    """Remember the user's rendered feed fields as it is loaded."""
+    instance._feed_fields = _feed_fields(instance, FEED_USER_FIELDS)
+
+
+@receiver(post_save, sender=Resource)
+def touch_feed_items_on_resource_change(sender, instance, created, **kwargs):
+    """
+    Bump ``updated_at`` on the resource's bookings and maintenance when its
+    name, location or type changes, since every feed event for them shows
+    those. The new stamps re-key their cached blocks and change feed ETags.
+    """
+    fields = _feed_fields(instance, FEED_RESOURCE_FIELDS)
+    if not created and fields != instance._feed_fields:
+        now = timezone.now()
+        Booking.objects.filter(resource=instance).update(updated_at=now)
+        Maintenance.objects.filter(resource=instance).update(updated_at=now)
+    instance._feed_fields = fields
+
+
+@receiver(post_save, sender=User)
+def touch_feed_items_on_user_rename(sender, instance, created, **kwargs):
+    """
+    Bump ``updated_at`` on feed events that show the user's name: bookings
+    they attend and maintenance they created. Logins re-save the user with
+    unchanged names and are ignored.
+    """
+    fields = _feed_fields(instance, FEED_USER_FIELDS)
+    if not created and fields != instance._feed_fields:
+        now = timezone.now()
+        Booking.objects.filter(attendees=instance).update(updated_at=now)
+        Maintenance.objects.filter(created_by=instance).update(updated_at=now)
+    instance._feed_fields = fields
+
+
+@receiver(post_save, sender=Resource)
+def queue_resource_image_derivatives(sender, instance, **kwargs):
+    """Generate thumbnails for a resource image in the background."""
+    if instance.image:
+        from .utils.image_derivatives import queue_derivatives
+        name = instance.image.name
+        transaction.on_commit(lambda: queue_derivatives(name))
+
+
 def create_default_notification_preferences(user):
     """Create default notification preferences for a new user."""
+    NotificationPreference.objects.bulk_create(
+        default_notification_preferences(user), ignore_conflicts=True
+    )
+
+
+def default_notification_preferences(user):
+    """Unsaved default notification preferences for a user."""
     default_preferences = [
         ('booking_confirmed', 'email', True),
         ('booking_confirmed', 'in_app', True),
@@ -105,18 +323,15 @@ def create_default_notification_preferences(user):
         ('quota_warning', 'email', True),
     ]
     
-    preferences_to_create = []
-    for notification_type, delivery_method, is_enabled in default_preferences:
-        preferences_to_create.append(
-            NotificationPreference(
-                user=user,
-                notification_type=notification_type,
-                delivery_method=delivery_method,
-                is_enabled=is_enabled
-            )
+    return [
+        NotificationPreference(
+            user=user,
+            notification_type=notification_type,
+            delivery_method=delivery_method,
+            is_enabled=is_enabled
         )
-    
-    NotificationPreference.objects.bulk_create(preferences_to_create, ignore_conflicts=True)
+        for notification_type, delivery_method, is_enabled in default_preferences
+    ]
 
 
 @receiver(post_save, sender=BackupSchedule)
@@ -151,4 +366,60 @@ def backup_schedule_deleted(sender, instance, **kwargs):
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error removing backup schedule from scheduler: {e}")
\ No newline at end of file
+        logger.error(f"Error removing backup schedule from scheduler: {e}")
+
+
+@receiver(post_save, sender=Faculty)
+@receiver(post_delete, sender=Faculty)
+@receiver(post_save, sender=College)
+@receiver(post_delete, sender=College)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_hierarchy_tree(sender, **kwargs):
+    """Drop the cached academic hierarchy tree when any level changes."""
+    HierarchyCache.invalidate()
+
+
+def _hierarchy_placement(profile):
+    # Read loaded values only; touching deferred fields would query per instance
+    return tuple(profile.__dict__.get(field) for field in ('faculty_id', 'college_id', 'department_id'))
+
+
+@receiver(post_init, sender=UserProfile)
+def remember_hierarchy_placement(sender, instance, **kwargs):
+    """Remember where a profile sits in the hierarchy as it is loaded."""
+    instance._hierarchy_placement = _hierarchy_placement(instance)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_hierarchy_members(sender, instance, **kwargs):
+    """
+    Drop the cached tree when a profile joins, leaves or moves within the
+    hierarchy, so member counts stay current. Profiles are re-saved with
+    their user on every login, so unchanged placements are ignored.
+    """
+    placement = _hierarchy_placement(instance)
+    added_or_removed = kwargs.get('created') or kwargs['signal'] is post_delete
+    if (added_or_removed and any(placement)) or placement != instance._hierarchy_placement:
+        HierarchyCache.invalidate()
+    instance._hierarchy_placement = placement
+
+
+@receiver(post_init, sender=User)
+def remember_user_active(sender, instance, **kwargs):
+    """Remember whether a user was active as it is loaded."""
+    instance._hierarchy_active = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=User)
+def invalidate_hierarchy_on_user_active_change(sender, instance, created, **kwargs):
+    """
+    Drop the cached tree when a user is activated or deactivated, since
+    member counts only include active users. New users are counted once
+    their profile is placed in the hierarchy.
+    """
+    is_active = instance.__dict__.get('is_active')
+    if not created and is_active != instance._hierarchy_active:
+        HierarchyCache.invalidate()
+    instance._hierarchy_active = is_active
@@ -16,9 +16,8 @@ from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils import timezone
 
-from ..models import Booking, Resource, Notification, AccessRequest
+from ..models import Resource, Notification, AccessRequest
 from ..utils.cache_utils import (
-    invalidate_booking_caches, 
     invalidate_user_caches,
     ResourceAvailabilityCache,
     PermissionCache
@@ -27,52 +26,6 @@ from ..utils.cache_utils import (
 logger = logging.getLogger(__name__)
 
 
-@receiver(post_save, sender=Booking)
-def invalidate_booking_cache_on_save(sender, instance, created, **kwargs):
-    """Invalidate relevant caches when a booking is saved."""
-    try:
-        invalidate_booking_caches(
-            booking_id=instance.id,
-            user_id=instance.user_id,
-            resource_id=instance.resource_id
-        )
-        
-        # Invalidate resource availability for the booking date
-        date_str = instance.start_time.date().isoformat()
-        ResourceAvailabilityCache.invalidate_resource_availability(
-            resource_id=instance.resource_id,
-            date_str=date_str
-        )
-        
-        logger.debug(f"Invalidated caches for booking {instance.id} ({'created' if created else 'updated'})")
-        
-    except Exception as e:
-        logger.error(f"Error invalidating booking cache: {e}")
-
-
-@receiver(post_delete, sender=Booking)
-def invalidate_booking_cache_on_delete(sender, instance, **kwargs):
-    """Invalidate relevant caches when a booking is deleted."""
-    try:
-        invalidate_booking_caches(
-            booking_id=instance.id,
-            user_id=instance.user_id,
-            resource_id=instance.resource_id
-        )
-        
-        # Invalidate resource availability
-        date_str = instance.start_time.date().isoformat()
-        ResourceAvailabilityCache.invalidate_resource_availability(
-            resource_id=instance.resource_id,
-            date_str=date_str
-        )
-        
-        logger.debug(f"Invalidated caches for deleted booking {instance.id}")
-        
-    except Exception as e:
-        logger.error(f"Error invalidating booking cache on delete: {e}")
-
-
 @receiver(post_save, sender=Resource)
 def invalidate_resource_cache_on_save(sender, instance, created, **kwargs):
     """Invalidate resource-related caches when a resource is saved."""
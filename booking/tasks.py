@@ -19,6 +19,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 
 from celery import shared_task
+from celery.signals import worker_ready
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.mail import send_mail, send_mass_mail
@@ -29,7 +30,7 @@ from django.db import transaction
 # Import models
 from .models import (
     Notification, NotificationPreference, Booking, Resource, 
-    MaintenanceSchedule, EmailConfiguration, SMSConfiguration
+    EmailConfiguration, SMSConfiguration
 )
 from .services.notification_service import NotificationService
 from .services.sms_service import SMSService
@@ -304,6 +305,8 @@ def check_resource_maintenance():
     Check for resources that need maintenance and send notifications.
     """
     try:
+        from .models import MaintenanceSchedule
+        
         # Find resources that need maintenance
         now = timezone.now()
         
@@ -422,6 +425,226 @@ def backup_database():
         raise exc
 
 
+@shared_task
+def flush_audit_events():
+    """
+    Drain buffered audit and security events into the database.
+    Runs every few seconds; with the Redis backend this is the only writer.
+    """
+    from .utils.audit_buffer import audit_buffer
+    
+    written = audit_buffer.flush()
+    if audit_buffer.backend == 'redis':
+        written += audit_buffer.drain_redis()
+    
+    if written:
+        logger.info(f"Flushed {written} audit events")
+    return f"Flushed {written} audit events"
+
+
+@worker_ready.connect
+def requeue_orphaned_audit_events(**kwargs):
+    """Put back audit batches a killed worker was draining when it died."""
+    from .utils.audit_buffer import audit_buffer
+    
+    if audit_buffer.backend == 'redis':
+        try:
+            audit_buffer.requeue_orphaned_batches()
+        except Exception as e:
+            logger.error(f"Failed to re-queue orphaned audit events: {e}")
+
+
+@shared_task
+def prune_audit_logs():
+    """
+    Delete audit rows older than their configured retention period.
+    """
+    from .utils.audit_buffer import prune_audit_tables
+    
+    results = prune_audit_tables()
+    total = sum(results.values())
+    logger.info(f"Pruned {total} audit rows: {results}")
+    return f"Pruned {total} audit rows"
+
+
+@shared_task(bind=True, max_retries=3)
+def sync_google_calendar(self, integration_id: int):
+    """
+    Push one user's bookings to Google Calendar.
+    A cache lock keeps a manual "Sync now" and the periodic run from overlapping.
+    """
+    import requests
+    from django.core.cache import cache
+    from .models import GoogleCalendarIntegration
+    from .services.google_calendar_sync import google_calendar_sync_engine, GoogleCalendarSyncError
+    
+    lock_key = f"google_calendar_sync:{integration_id}"
+    if not cache.add(lock_key, 1, timeout=600):
+        return f"Sync already running for integration {integration_id}"
+    
+    try:
+        integration = GoogleCalendarIntegration.objects.get(id=integration_id)
+        if not (integration.is_active and integration.sync_enabled):
+            return f"Sync disabled for integration {integration_id}"
+        
+        summary = google_calendar_sync_engine.sync_integration(integration)
+        return f"Synced integration {integration_id}: {summary}"
+        
+    except GoogleCalendarIntegration.DoesNotExist:
+        logger.warning(f"Google Calendar integration {integration_id} not found")
+        return f"Integration {integration_id} not found"
+    except GoogleCalendarSyncError as exc:
+        logger.error(f"Google Calendar sync failed for integration {integration_id}: {exc}")
+        GoogleCalendarIntegration.objects.filter(id=integration_id).update(last_error=str(exc))
+        return f"Sync failed for integration {integration_id}: {exc}"
+    except requests.RequestException as exc:
+        logger.error(f"Google Calendar unreachable for integration {integration_id}: {exc}")
+        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+    finally:
+        cache.delete(lock_key)
+
+
+@shared_task
+def sync_google_calendars():
+    """
+    Queue Google Calendar syncs that are due under each user's sync timing.
+    Unchanged bookings are skipped by the engine, so frequent runs are cheap.
+    """
+    from django.db.models import Q
+    from .models import GoogleCalendarIntegration
+    
+    day_ago = timezone.now() - timedelta(days=1)
+    due = GoogleCalendarIntegration.objects.filter(
+        is_active=True, sync_enabled=True
+    ).filter(
+        Q(user__calendar_sync_preferences__isnull=True) |
+        Q(user__calendar_sync_preferences__auto_sync_timing__in=['immediate', 'hourly']) |
+        Q(user__calendar_sync_preferences__auto_sync_timing='daily', last_sync__isnull=True) |
+        Q(user__calendar_sync_preferences__auto_sync_timing='daily', last_sync__lt=day_ago)
+    ).values_list('id', flat=True)
+    
+    count = 0
+    for integration_id in due.iterator():
+        sync_google_calendar.delay(integration_id)
+        count += 1
+    
+    logger.info(f"Queued {count} Google Calendar syncs")
+    return f"Queued {count} Google Calendar syncs"
+
+
+@shared_task(bind=True, max_retries=3)
+def generate_image_derivatives(self, source_name: str):
+    """
+    Render the standard thumbnail sizes of an uploaded image in every output format.
+    Derivatives are content-addressed, so re-running for the same file is cheap.
+    """
+    from PIL import UnidentifiedImageError
+    from .utils.image_derivatives import generate_derivatives
+    
+    try:
+        generated = generate_derivatives(source_name)
+    except FileNotFoundError:
+        logger.warning(f"Image {source_name} no longer exists, skipping derivatives")
+        return f"Image {source_name} not found"
+    except UnidentifiedImageError:
+        logger.warning(f"{source_name} is not a readable image, skipping derivatives")
+        return f"Image {source_name} not readable"
+    except OSError as exc:
+        logger.error(f"Error generating derivatives for {source_name}: {exc}")
+        raise self.retry(exc=exc, countdown=60)
+    
+    logger.info(f"Generated {len(generated)} derivatives for {source_name}")
+    return f"Generated {len(generated)} derivatives for {source_name}"
+
+
+@shared_task
+def process_checkins():
+    """
+    Send due check-in/check-out reminders and auto check-out overdue bookings.
+    Each step claims its rows with a guarded UPDATE, so overlapping runs are safe.
+    """
+    from .services.checkin_service import checkin_service
+    
+    results = checkin_service.run_periodic_sweep()
+    if results is None:
+        return "Check-in sweep already running"
+    
+    logger.info(f"Processed check-ins: {results}")
+    return f"Processed check-ins: {results}"
+
+
+@shared_task
+def index_system_logs():
+    """
+    Index lines appended to the system logs since the last run.
+    Keeps the admin log viewer current without it reading log files.
+    """
+    from .log_viewer import log_viewer
+    
+    counts = log_viewer.ingest()
+    total = sum(counts.values())
+    if total:
+        logger.info(f"Indexed {total} log entries")
+    return f"Indexed {total} log entries"
+
+
+@shared_task
+def escalate_overdue_issues():
+    """
+    Flag unresolved resource issues that have breached their SLA as urgent.
+    Escalation is a single UPDATE and each issue is escalated only once.
+    """
+    from .models import ResourceIssue
+    
+    escalated = ResourceIssue.objects.escalate_overdue()
+    if escalated:
+        logger.warning(f"Escalated {escalated} resource issues past their SLA deadline")
+    return f"Escalated {escalated} overdue issues"
+
+
+@shared_task
+def expire_training_and_assessments():
+    """
+    Mark lapsed training and risk assessment completions as expired.
+    One UPDATE per model, then one grouped notification per affected user.
+    """
+    from .services.expiry_service import expiry_sweep_service
+    
+    summary = expiry_sweep_service.sweep()
+    return f"Expired {summary['expired_training']} training records and {summary['expired_assessments']} risk assessments"
+
+
+@shared_task(bind=True)
+def generate_maintenance_schedules(self, months_ahead: int = 12, resource_ids: Optional[List[int]] = None,
+                                   created_by_id: Optional[int] = None):
+    """
+    Create the recommended maintenance schedule for all (or the given) resources.
+    Reports PROGRESS with processed/total resource counts after each batch.
+    """
+    from .services.maintenance_schedule import maintenance_schedule_generator
+
+    resources = Resource.objects.order_by('id')
+    if resource_ids is not None:
+        resources = resources.filter(id__in=resource_ids)
+    created_by = User.objects.get(id=created_by_id) if created_by_id else None
+
+    def report(progress):
+        if not self.request.called_directly:
+            self.update_state(state='PROGRESS', meta=progress)
+
+    result = maintenance_schedule_generator.generate(
+        resources, months_ahead=months_ahead, create=True, created_by=created_by, progress=report
+    )
+    summary = {
+        'resources': len(result['schedules']),
+        'created': result['created'],
+        'rescheduled': result['rescheduled'],
+        'duplicates': result['duplicates'],
+    }
+    logger.info(f"Generated maintenance schedules: {summary}")
+    return summary
+
+
 # Task for testing Celery connectivity
 @shared_task
 def test_celery():
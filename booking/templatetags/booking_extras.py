@@ -15,6 +15,7 @@ https://aperature-booking.org/commercial
 """
 
 from django import template
+from django.urls import reverse
 from datetime import timedelta
 
 register = template.Library()
@@ -198,4 +199,18 @@ def get_checklist_fields(form, item_id):
             'order': None,
             'required': None,
             'error': str(e)
-        }
\ No newline at end of file
+        }
+
+
+@register.simple_tag
+def thumbnail_url(image, width, height, fit='crop'):
+    """
+    URL of a resized copy of an uploaded image.
+    Usage: {% thumbnail_url resource.image 600 400 %}
+    """
+    if not image:
+        return ''
+    url = reverse('booking:image_thumbnail', kwargs={
+        'width': int(width), 'height': int(height), 'path': image.name,
+    })
+    return url if fit == 'crop' else f"{url}?fit={fit}"
@@ -0,0 +1,130 @@
+"""Tests for the admin changelist performance layer."""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.admin.performance import EstimatedCountPaginator, QueryBudgetExceeded
+from booking.models import (
+    Booking, BookingAttendee, BookingHistory, College, Department, Faculty, Notification, Resource,
+    ResourceAccess,
+)
+
+
+@override_settings(DEBUG=True)
+class TestAdminPerformance(TestCase):
+    """Test derived joins, the query budget, estimated counts and keyset navigation."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='x', email='admin@lab.org')
+        self.client.force_login(self.admin)
+        now = timezone.now()
+        self.notifications = Notification.objects.bulk_create([
+            Notification(user=self.admin, notification_type='booking_reminder', title=f'Reminder {i}',
+                         message='Soon', delivery_method='email')
+            for i in range(5)
+        ])
+        # Two rows share a timestamp so the pk tiebreak is exercised
+        for notification, minutes in zip(self.notifications, (5, 4, 3, 3, 1)):
+            Notification.objects.filter(pk=notification.pk).update(created_at=now - timedelta(minutes=minutes))
+
+    def _changelist(self, model, **params):
+        return self.client.get(reverse(f'admin:booking_{model._meta.model_name}_changelist'), params)
+
+    def test_list_display_foreign_keys_are_joined(self):
+        model_admin = admin.site._registry[ResourceAccess]
+        self.assertEqual(set(model_admin.get_list_select_related(None)), {'user', 'resource', 'granted_by'})
+
+        resource = Resource.objects.create(name='Laser', resource_type='instrument', location='L1')
+        for i in range(4):
+            user = User.objects.create_user(username=f'user{i}', password='x')
+            ResourceAccess.objects.create(resource=resource, user=user, granted_by=self.admin)
+
+        with CaptureQueriesContext(connection) as few:
+            self._changelist(ResourceAccess)
+        for i in range(4, 8):
+            user = User.objects.create_user(username=f'user{i}', password='x')
+            ResourceAccess.objects.create(resource=resource, user=user, granted_by=self.admin)
+        with CaptureQueriesContext(connection) as more:
+            self._changelist(ResourceAccess)
+        self.assertEqual(len(few), len(more))
+
+    def test_booking_changelists_stay_within_budget(self):
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label != 'booking':
+                continue
+            with self.subTest(model=model.__name__):
+                self.assertEqual(self._changelist(model).status_code, 200)
+
+    def test_related_names_in_str_are_joined(self):
+        resource = Resource.objects.create(name='Laser', resource_type='instrument', location='L1')
+        faculty = Faculty.objects.create(name='Science', code='SCI')
+
+        def add_rows(first, last):
+            for i in range(first, last):
+                college = College.objects.create(name=f'College {i}', code=f'C{i}', faculty=faculty)
+                Department.objects.create(name=f'Department {i}', code=f'D{i}', college=college)
+                start = (timezone.now() + timedelta(days=i + 1)).replace(hour=10, minute=0, second=0, microsecond=0)
+                booking = Booking.objects.create(resource=resource, user=self.admin, title=f'Run {i}',
+                                                 start_time=start, end_time=start + timedelta(hours=1))
+                BookingAttendee.objects.create(booking=booking, user=self.admin)
+
+        def queries(model):
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self._changelist(model).status_code, 200)
+            return len(captured)
+
+        models = (Department, College, BookingHistory, BookingAttendee)
+        add_rows(0, 2)
+        few = {model: queries(model) for model in models}
+        add_rows(2, 6)
+        self.assertEqual({model: queries(model) for model in models}, few)
+
+    def test_budget_violations_raise(self):
+        model_admin = admin.site._registry[Notification]
+        with mock.patch.object(model_admin, 'list_query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self._changelist(Notification)
+
+    def test_keyset_navigation(self):
+        model_admin = admin.site._registry[Notification]
+        expected = [n.pk for n in sorted(
+            Notification.objects.all(), key=lambda n: (n.created_at, n.pk), reverse=True
+        )]
+
+        url = reverse('admin:booking_notification_changelist')
+        seen = []
+        with mock.patch.object(model_admin, 'list_per_page', 2):
+            response = self._changelist(Notification)
+            while True:
+                cl = response.context['cl']
+                seen.extend(n.pk for n in cl.result_list)
+                if not cl.keyset_next_url:
+                    break
+                self.assertContains(response, 'Show more')
+                response = self.client.get(url + cl.keyset_next_url)
+        self.assertEqual(seen, expected)
+
+        # Column sorting turns keyset navigation off
+        with mock.patch.object(model_admin, 'list_per_page', 2):
+            response = self._changelist(Notification, o='1')
+        self.assertIsNone(response.context['cl'].keyset_next_url)
+
+        self.assertEqual(self._changelist(Notification, after='not-a-cursor').status_code, 302)
+
+    def test_estimated_count_skips_count_star(self):
+        queryset = Notification.objects.all()
+        with mock.patch('booking.admin.performance.estimate_row_count', return_value=3_000_000):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 3_000_000)
+        self.assertEqual(len(queries), 0)
+
+        with mock.patch.object(EstimatedCountPaginator, 'COUNT_LIMIT', 3):
+            self.assertEqual(EstimatedCountPaginator(queryset.filter(status='pending'), 100).count, 3)
+        self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 5)
@@ -0,0 +1,230 @@
+"""Tests for the buffered audit event writer."""
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.apps import apps
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from booking.models import AuditLog, AdminAction, SecurityEvent
+from booking.models.audit import log_admin_action
+from booking.utils.audit_buffer import (
+    DEFAULT_RETENTION_DAYS, AuditEventBuffer, audit_buffer, deserialize_event, prune_audit_tables,
+    serialize_event, write_events,
+)
+
+
+class FakeRedis:
+    """The few list and sorted-set commands the Redis backend uses."""
+
+    def __init__(self):
+        self.lists = defaultdict(list)
+        self.zsets = defaultdict(dict)
+
+    def rpush(self, key, *values):
+        self.lists[key].extend(v.encode() if isinstance(v, str) else v for v in values)
+
+    def lmove(self, source, destination, wherefrom, whereto):
+        if not self.lists[source]:
+            return None
+        value = self.lists[source].pop(0 if wherefrom == 'LEFT' else -1)
+        if whereto == 'LEFT':
+            self.lists[destination].insert(0, value)
+        else:
+            self.lists[destination].append(value)
+        return value
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+    def zadd(self, key, mapping):
+        self.zsets[key].update(mapping)
+
+    def zrem(self, key, member):
+        self.zsets[key].pop(member, None)
+
+    def zrangebyscore(self, key, low, high):
+        return [member for member, score in self.zsets[key].items() if low <= score <= high]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def lmove(self, *args):
+        self.calls.append(args)
+
+    def execute(self):
+        return [self.client.lmove(*args) for args in self.calls]
+
+
+class TestAuditEventBuffer(TestCase):
+    """Test batching behaviour of the audit buffer."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='auditor', password='x')
+        audit_buffer.flush()
+
+    @override_settings(AUDIT_BUFFER_BACKEND='memory', AUDIT_BUFFER_MAX_SIZE=100,
+                       AUDIT_BUFFER_FLUSH_INTERVAL=3600)
+    def test_events_are_buffered_until_flush(self):
+        """Committed events stay in memory until the buffer is flushed."""
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                AuditLog.log_action(user=self.user, action='READ', description=f"event {i}")
+
+        self.assertEqual(AuditLog.objects.count(), 0)
+        self.assertEqual(audit_buffer.pending(), 5)
+
+        with self.assertNumQueries(3):  # savepoint, bulk insert, release
+            self.assertEqual(audit_buffer.flush(), 5)
+        self.assertEqual(AuditLog.objects.count(), 5)
+        self.assertEqual(audit_buffer.pending(), 0)
+
+    @override_settings(AUDIT_BUFFER_BACKEND='memory', AUDIT_BUFFER_MAX_SIZE=3,
+                       AUDIT_BUFFER_FLUSH_INTERVAL=3600)
+    def test_events_enter_the_buffer_on_commit(self):
+        """Uncommitted events wait for their transaction; rolled-back ones are dropped."""
+        buffer = AuditEventBuffer()
+        with self.captureOnCommitCallbacks(execute=True):
+            buffer.add(AuditLog(user=self.user, username='auditor', action='READ'))
+            try:
+                with transaction.atomic():
+                    buffer.add(AuditLog(user=self.user, username='rolled-back', action='READ'))
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.assertEqual(buffer.pending(), 0)
+        self.assertEqual(buffer.pending(), 1)
+
+        # Reaching the size threshold flushes
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(2):
+                buffer.add(AuditLog(user=self.user, username='auditor', action='READ'))
+        self.assertEqual(buffer.pending(), 0)
+        self.assertEqual(set(AuditLog.objects.values_list('username', flat=True)), {'auditor'})
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    @override_settings(AUDIT_BUFFER_BACKEND='memory', AUDIT_BUFFER_MAX_SIZE=100,
+                       AUDIT_BUFFER_FLUSH_INTERVAL=3600)
+    def test_threads_flush_only_their_own_events(self):
+        """A request finishing in one thread leaves other threads' events alone."""
+        buffer = AuditEventBuffer()
+        with self.captureOnCommitCallbacks(execute=True):
+            buffer.add(AuditLog(user=self.user, username='auditor', action='READ'))
+
+        flushed = []
+        thread = threading.Thread(target=lambda: flushed.append(buffer.flush()))
+        thread.start()
+        thread.join()
+        self.assertEqual(flushed, [0])
+        self.assertEqual(buffer.pending(), 1)
+
+    @override_settings(AUDIT_BUFFER_BACKEND='sync')
+    def test_admin_action_keeps_event_time(self):
+        """The timestamp recorded at event time is not overwritten on insert."""
+        log_admin_action(self.user, 'SYSTEM_CONFIG', 'Changed settings')
+        action = AdminAction.objects.get()
+        self.assertLess(timezone.now() - action.timestamp, timedelta(minutes=1))
+
+    def test_serialization_round_trip(self):
+        """Events survive the JSON encoding used by the Redis backend."""
+        event = SecurityEvent(
+            user=self.user,
+            event_type='suspicious_activity',
+            description='test',
+            ip_address='10.0.0.1',
+            metadata={'path': '/x/'},
+        )
+        restored = deserialize_event(serialize_event(event))
+        self.assertEqual(restored.user_id, self.user.id)
+        self.assertEqual(restored.metadata, {'path': '/x/'})
+        self.assertEqual(restored.timestamp, event.timestamp)
+
+    def test_bad_rows_do_not_drop_batch(self):
+        """Rows that fail to insert are skipped individually."""
+        good = AuditLog(user=self.user, username='auditor', action='READ')
+        bad = AuditLog(user=self.user, username='ghost', action=None)
+        self.assertEqual(write_events([good, bad]), 1)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+
+class TestAuditRetention(TestCase):
+    """Test retention-based pruning of audit tables."""
+
+    def test_pruned_tables_are_indexed_on_timestamp(self):
+        with connection.cursor() as cursor:
+            for label in DEFAULT_RETENTION_DAYS:
+                table = apps.get_model(label)._meta.db_table
+                constraints = connection.introspection.get_constraints(cursor, table)
+                self.assertTrue(
+                    any(c['index'] and c['columns'][:1] == ['timestamp'] for c in constraints.values()),
+                    label,
+                )
+
+    def test_prune_removes_only_expired_rows(self):
+        old = timezone.now() - timedelta(days=400)
+        write_events([
+            AuditLog(username='a', action='READ', timestamp=old),
+            AuditLog(username='b', action='READ', timestamp=old),
+            AuditLog(username='c', action='READ'),
+        ])
+
+        dry = prune_audit_tables({'booking.AuditLog': 365}, dry_run=True)
+        self.assertEqual(dry['booking.AuditLog'], 2)
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+        results = prune_audit_tables({'booking.AuditLog': 365}, batch_size=1)
+        self.assertEqual(results['booking.AuditLog'], 2)
+        self.assertEqual(list(AuditLog.objects.values_list('username', flat=True)), ['c'])
+
+
+@override_settings(AUDIT_BUFFER_BACKEND='redis')
+class TestRedisAuditBuffer(TestCase):
+    """Test that draining the Redis queue never drops a batch."""
+
+    def setUp(self):
+        self.buffer = AuditEventBuffer()
+        self.redis = FakeRedis()
+        self.buffer._redis = self.redis
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                self.buffer.add(AuditLog(username=f'user{i}', action='READ'))
+
+    def _queued(self):
+        return [deserialize_event(p).username for p in self.redis.lists[self.buffer.redis_key]]
+
+    def test_drain_writes_batches_and_releases_them(self):
+        self.assertEqual(self.buffer.drain_redis(batch_size=2), 5)
+        self.assertEqual(AuditLog.objects.count(), 5)
+        self.assertEqual(self._queued(), [])
+        self.assertFalse(any(self.redis.lists.values()))
+        self.assertEqual(self.redis.zsets[self.buffer.processing_key], {})
+
+    def test_batch_of_a_killed_worker_is_requeued(self):
+        with mock.patch('booking.utils.audit_buffer.write_events', side_effect=SystemExit):
+            with self.assertRaises(SystemExit):
+                self.buffer.drain_redis(batch_size=2)
+        # The claimed batch is neither written nor lost
+        self.assertEqual(AuditLog.objects.count(), 0)
+        self.assertEqual(self._queued(), ['user2', 'user3', 'user4'])
+
+        # A live drain's batch is left alone until its lease runs out
+        self.assertEqual(self.buffer.requeue_orphaned_batches(), 0)
+        self.assertEqual(self.buffer.requeue_orphaned_batches(lease=0), 2)
+        self.assertEqual(self._queued(), ['user0', 'user1', 'user2', 'user3', 'user4'])
+        self.assertEqual(self.buffer.drain_redis(), 5)
+
+    def test_failed_write_puts_the_batch_back(self):
+        with mock.patch('booking.utils.audit_buffer.write_events', side_effect=RuntimeError('db down')):
+            self.assertEqual(self.buffer.drain_redis(batch_size=2), 0)
+        self.assertEqual(self._queued(), ['user0', 'user1', 'user2', 'user3', 'user4'])
+        self.assertEqual(self.redis.zsets[self.buffer.processing_key], {})
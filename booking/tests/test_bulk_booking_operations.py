@@ -0,0 +1,155 @@
+"""Tests for the bulk booking operations engine."""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.models import (
+    Booking, BookingHistory, CalendarSyncPreferences, GoogleCalendarIntegration, Notification, Resource,
+)
+from booking.services.bulk_booking_service import bulk_booking_service
+from booking.utils.cache_utils import ICSFeedCache
+
+
+class BulkBookingTestMixin:
+    """Shared fixtures for bulk operation tests."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='x')
+        self.manager = User.objects.create_user(username='manager', password='x')
+        self.manager.userprofile.role = 'technician'
+        self.manager.userprofile.save()
+        self.resource = Resource.objects.create(
+            name='Microscope', resource_type='instrument', location='Lab 2'
+        )
+        self.start = (timezone.now() + timedelta(days=2)).replace(
+            hour=9, minute=0, second=0, microsecond=0
+        )
+        self.bookings = [self.make_booking(i) for i in range(5)]
+
+    def make_booking(self, day_offset, status='pending', user=None):
+        start = self.start + timedelta(days=day_offset)
+        return Booking.objects.create(
+            resource=self.resource,
+            user=user or self.owner,
+            title=f'Session {day_offset}',
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            status=status,
+        )
+
+
+class TestBulkBookingService(BulkBookingTestMixin, TestCase):
+    """Test BulkBookingService.execute."""
+
+    def test_approve_updates_all_in_constant_queries(self):
+        ids = [b.pk for b in self.bookings]
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(6):
+                result = bulk_booking_service.execute(self.manager, 'approve', ids)
+
+        self.assertEqual(sorted(result['updated']), sorted(ids))
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(
+            Booking.objects.filter(pk__in=ids, status='approved', approved_by=self.manager).count(), 5
+        )
+        self.assertEqual(BookingHistory.objects.filter(action='approved').count(), 5)
+        self.assertEqual(
+            Notification.objects.filter(
+                user=self.owner, notification_type='booking_confirmed', delivery_method='in_app'
+            ).count(), 5
+        )
+
+    def test_reject_does_not_stamp_approval(self):
+        bulk_booking_service.execute(self.manager, 'reject', [self.bookings[0].pk])
+        booking = Booking.objects.get(pk=self.bookings[0].pk)
+        self.assertEqual(booking.status, 'rejected')
+        self.assertIsNone(booking.approved_by)
+        self.assertIsNone(booking.approved_at)
+
+    def test_commit_runs_skipped_save_side_effects(self):
+        GoogleCalendarIntegration.objects.create(
+            user=self.owner, google_calendar_id='primary', access_token='token',
+            token_expires_at=timezone.now() + timedelta(hours=1),
+        )
+        CalendarSyncPreferences.objects.create(user=self.owner, auto_sync_timing='immediate')
+        ids = [b.pk for b in self.bookings[:2]]
+        cached = {pk: ('stamp', ['BEGIN:VEVENT', 'END:VEVENT']) for pk in ids}
+        ICSFeedCache.set_blocks('booking', cached, 'lab.org')
+
+        with mock.patch('booking.tasks.sync_google_calendar.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_booking_service.execute(self.manager, 'approve', ids)
+
+        self.assertEqual(ICSFeedCache.get_blocks('booking', {pk: 'stamp' for pk in ids}, 'lab.org'), {})
+        delay.assert_called_once_with(self.owner.google_calendar_integration.pk)
+
+    def test_invalid_bookings_are_reported(self):
+        approved = self.make_booking(10, status='approved')
+        ids = [self.bookings[0].pk, approved.pk, 999999]
+        result = bulk_booking_service.execute(self.manager, 'approve', ids)
+
+        self.assertEqual(result['updated'], [self.bookings[0].pk])
+        errors = {e['id']: e['error'] for e in result['errors']}
+        self.assertEqual(errors[approved.pk], 'Not pending')
+        self.assertEqual(errors[999999], 'Not found or no permission')
+
+    def test_non_managers_cannot_approve(self):
+        with self.assertRaises(PermissionError):
+            bulk_booking_service.execute(self.owner, 'approve', [self.bookings[0].pk])
+
+    def test_users_cancel_only_their_own_bookings(self):
+        other = User.objects.create_user(username='other', password='x')
+        theirs = self.make_booking(12, user=other)
+        result = bulk_booking_service.execute(
+            self.owner, 'cancel', [self.bookings[0].pk, theirs.pk]
+        )
+
+        self.assertEqual(result['updated'], [self.bookings[0].pk])
+        theirs.refresh_from_db()
+        self.assertEqual(theirs.status, 'pending')
+
+    def test_owner_cancel_sends_no_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_booking_service.execute(self.owner, 'cancel', [self.bookings[0].pk])
+        self.assertFalse(Notification.objects.filter(notification_type='booking_cancelled').exists())
+
+
+class TestBulkBookingEndpoints(BulkBookingTestMixin, TestCase):
+    """Test the view and API entry points."""
+
+    def test_view_rejects_selected_bookings(self):
+        self.client.force_login(self.manager)
+        response = self.client.post(reverse('booking:bulk_operations'), {
+            'action': 'reject',
+            'booking_ids': [b.pk for b in self.bookings[:2]],
+        })
+        self.assertRedirects(response, reverse('booking:dashboard'), fetch_redirect_response=False)
+        self.assertEqual(Booking.objects.filter(status='rejected').count(), 2)
+
+    def test_api_bulk_cancel(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        response = client.post('/api/v1/bookings/bulk/', {
+            'action': 'cancel',
+            'booking_ids': [b.pk for b in self.bookings],
+            'notes': 'Instrument down',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['updated']), 5)
+        self.assertTrue(
+            BookingHistory.objects.filter(action='cancelled', notes='Instrument down').exists()
+        )
+
+    def test_api_rejects_unknown_action(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        response = client.post('/api/v1/bookings/bulk/', {
+            'action': 'delete', 'booking_ids': [self.bookings[0].pk],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,126 @@
+"""Tests for cached, conditional ICS feed rendering."""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import parse_http_date
+from django.utils import timezone
+
+from booking.calendar_sync import CalendarTokenGenerator, ICSCalendarGenerator
+from booking.models import Booking, BookingAttendee, Maintenance, Resource
+
+
+class TestCalendarFeedCache(TestCase):
+    """Test VEVENT block caching and 304 handling for subscription feeds."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='subscriber', password='x', first_name='Sam')
+        self.guest = User.objects.create_user(username='guest', password='x', first_name='Gil')
+        self.resource = Resource.objects.create(name='Laser', resource_type='instrument', location='B2')
+        start = (timezone.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+        self.bookings = [
+            Booking.objects.create(
+                resource=self.resource, user=self.user, title=f'Run {i}',
+                start_time=start + timedelta(days=i), end_time=start + timedelta(days=i, hours=1),
+            )
+            for i in range(3)
+        ]
+        BookingAttendee.objects.create(booking=self.bookings[0], user=self.guest)
+        self.url = reverse('booking:public_calendar_feed',
+                           args=[CalendarTokenGenerator.generate_user_token(self.user)])
+
+    def test_blocks_are_reused_between_renders(self):
+        generator = ICSCalendarGenerator()
+        first = generator.generate_user_calendar(self.user)
+        self.assertIn('Attendees: Gil', first)
+
+        # One (id, updated_at) listing; every block comes from the cache
+        with self.assertNumQueries(1):
+            second = generator.generate_user_calendar(self.user)
+        self.assertEqual(first, second)
+
+    def test_only_changed_bookings_are_rerendered(self):
+        generator = ICSCalendarGenerator()
+        generator.generate_user_calendar(self.user)
+
+        booking = self.bookings[1]
+        booking.title = 'Renamed run'
+        booking.save()
+
+        # Listing, the stale row and its attendee prefetch
+        with self.assertNumQueries(3):
+            content = generator.generate_user_calendar(self.user)
+        self.assertIn('Renamed run', content)
+        self.assertIn('Run 2', content)
+
+    def test_resource_feed_includes_maintenance(self):
+        Maintenance.objects.create(
+            resource=self.resource, title='Realign optics', created_by=self.user,
+            start_time=self.bookings[2].end_time + timedelta(days=1),
+            end_time=self.bookings[2].end_time + timedelta(days=1, hours=2),
+        )
+        content = ICSCalendarGenerator().generate_resource_calendar(self.resource)
+        self.assertEqual(content.count('BEGIN:VEVENT'), 4)
+        self.assertIn('Realign optics', content)
+
+    def test_feed_returns_304_until_bookings_change(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        BookingAttendee.objects.filter(booking=self.bookings[0]).delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertNotIn(b'Attendees:', response.content)
+
+    def test_cancelled_booking_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.bookings[2].status = 'cancelled'
+        self.bookings[2].save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'Run 2', response.content)
+
+    def test_dropped_booking_moves_last_modified_forward(self):
+        first = self.client.get(self.url)['Last-Modified']
+        # A booking that stops matching the feed leaves no newer updated_at behind
+        Booking.objects.filter(pk=self.bookings[2].pk).update(
+            status='cancelled', updated_at=self.bookings[0].updated_at
+        )
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(minutes=5)):
+            response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(parse_http_date(response['Last-Modified']), parse_http_date(first))
+
+    def test_resource_rename_rerenders_its_events(self):
+        etag = self.client.get(self.url)['ETag']
+        self.resource.name = 'Laser 2'
+        self.resource.location = 'B3'
+        self.resource.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Resource: Laser 2', response.content)
+        self.assertNotIn(b'LOCATION:B2', response.content)
+
+    def test_attendee_rename_rerenders_their_events(self):
+        etag = self.client.get(self.url)['ETag']
+        self.guest.first_name = 'Gail'
+        self.guest.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Attendees: Gail', response.content)
+
+    def test_login_does_not_touch_feed_events(self):
+        stamp = Booking.objects.get(pk=self.bookings[0].pk).updated_at
+        self.client.login(username='guest', password='x')
+        self.assertEqual(Booking.objects.get(pk=self.bookings[0].pk).updated_at, stamp)
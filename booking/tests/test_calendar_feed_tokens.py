@@ -0,0 +1,81 @@
+"""Tests for calendar feed token storage and lookup."""
+import hashlib
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.calendar_sync import CalendarTokenGenerator
+from booking.models import Booking, CalendarFeedToken, Resource
+
+
+class TestCalendarFeedTokens(TestCase):
+    """Test the token store behind public ICS feeds."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='subscriber', password='x')
+        self.other = User.objects.create_user(username='other', password='x')
+
+    def test_token_is_stable_until_rotated(self):
+        token = CalendarTokenGenerator.generate_user_token(self.user)
+        self.assertEqual(CalendarTokenGenerator.generate_user_token(self.user), token)
+
+        new_token = CalendarTokenGenerator.rotate_user_token(self.user)
+        self.assertNotEqual(new_token, token)
+        self.assertIsNone(CalendarTokenGenerator.resolve_user_token(token))
+        self.assertEqual(CalendarTokenGenerator.resolve_user_token(new_token), self.user)
+
+    def test_verify_user_token_checks_owner(self):
+        token = CalendarTokenGenerator.generate_user_token(self.user)
+        self.assertTrue(CalendarTokenGenerator.verify_user_token(self.user, token))
+        self.assertFalse(CalendarTokenGenerator.verify_user_token(self.other, token))
+
+    def test_revoked_and_inactive_tokens_are_rejected(self):
+        token = CalendarTokenGenerator.generate_user_token(self.user)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(CalendarTokenGenerator.resolve_user_token(token))
+
+        resource = Resource.objects.create(name='Cryostat', resource_type='instrument', location='B1')
+        resource_token = CalendarTokenGenerator.generate_resource_token(resource)
+        self.assertTrue(CalendarTokenGenerator.verify_resource_token(resource, resource_token))
+        self.assertEqual(CalendarTokenGenerator.revoke_resource_token(resource), 1)
+        self.assertIsNone(CalendarTokenGenerator.resolve_resource_token(resource_token))
+
+    def test_legacy_token_keeps_working(self):
+        legacy = hashlib.sha256(
+            f"{self.user.id}-{self.user.username}-{self.user.date_joined}-labitory-calendar".encode()
+        ).hexdigest()[:32]
+        CalendarFeedToken.objects.create(user=self.user, token=legacy, is_legacy=True)
+
+        self.assertEqual(CalendarTokenGenerator.resolve_user_token(legacy), self.user)
+        # The imported token stays the displayed one until the user rotates it
+        self.assertEqual(CalendarTokenGenerator.generate_user_token(self.user), legacy)
+
+    def test_public_feed_resolves_token(self):
+        start = (timezone.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+        resource = Resource.objects.create(name='Laser', resource_type='instrument', location='B2')
+        Booking.objects.create(
+            resource=resource, user=self.user, title='Alignment',
+            start_time=start, end_time=start + timedelta(hours=1),
+        )
+        for i in range(20):
+            User.objects.create_user(username=f'bulk{i}', password='x')
+        token = CalendarTokenGenerator.generate_user_token(self.user)
+
+        response = self.client.get(reverse('booking:public_calendar_feed', args=[token]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Alignment', response.content)
+
+        response = self.client.get(reverse('booking:public_calendar_feed', args=['not-a-token']))
+        self.assertEqual(response.status_code, 403)
+
+    def test_regenerate_view_rotates_token(self):
+        token = CalendarTokenGenerator.generate_user_token(self.user)
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('booking:regenerate_calendar_token'))
+        self.assertRedirects(response, reverse('booking:calendar_sync_settings'),
+                             fetch_redirect_response=False)
+        self.assertIsNone(CalendarTokenGenerator.resolve_user_token(token))
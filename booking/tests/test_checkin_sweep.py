@@ -0,0 +1,109 @@
+"""Tests for the set-based check-in/check-out sweep."""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.models import Booking, CheckInOutEvent, Resource, UsageAnalytics
+from booking.services.checkin_service import CheckInService, SWEEP_LOCK_KEY
+from booking.utils.cache_utils import ResourceAvailabilityCache
+
+
+class TestCheckInSweep(TestCase):
+    """Test claiming, bulk event creation and per-resource analytics."""
+
+    def setUp(self):
+        cache.clear()
+        self.service = CheckInService()
+        self.user = User.objects.create_user(username='operator', password='x')
+        self.resource = Resource.objects.create(name='Confocal', resource_type='instrument', location='C3')
+        self.tomorrow = (timezone.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def _book(self, count, start_offset, **fields):
+        """Create bookings, then move them to ``now + start_offset`` (validation forbids past slots)."""
+        bookings = [
+            Booking.objects.create(
+                resource=self.resource, user=self.user, title=f'Scan {i}', status='approved',
+                start_time=self.tomorrow + timedelta(hours=i), end_time=self.tomorrow + timedelta(hours=i + 1),
+            )
+            for i in range(count)
+        ]
+        start = timezone.now() + start_offset
+        for booking in bookings:
+            Booking.objects.filter(pk=booking.pk).update(
+                start_time=start, end_time=start + timedelta(hours=1), **fields
+            )
+        return [booking.pk for booking in bookings]
+
+    def test_overdue_bookings_are_checked_out_in_bulk(self):
+        start = timezone.now() - timedelta(hours=2)
+        ids = self._book(3, -timedelta(hours=2), checked_in_at=start, actual_start_time=start)
+
+        self.assertEqual(self.service.process_automatic_checkouts(), 3)
+
+        bookings = Booking.objects.filter(pk__in=ids)
+        self.assertTrue(all(b.status == 'completed' and b.auto_checked_out for b in bookings))
+        self.assertTrue(all(b.actual_end_time == b.end_time for b in bookings))
+        self.assertEqual(CheckInOutEvent.objects.filter(event_type='auto_check_out').count(), 3)
+
+        analytics = UsageAnalytics.objects.get(resource=self.resource)
+        self.assertEqual((analytics.total_bookings, analytics.completed_bookings), (3, 3))
+        self.assertEqual(analytics.total_booked_minutes, 180)
+        self.assertAlmostEqual(analytics.efficiency_rate, 1.0, places=2)
+        self.assertAlmostEqual(analytics.utilization_rate, 180 / 540, places=2)
+
+    def test_auto_checkout_invalidates_availability(self):
+        start = timezone.now() - timedelta(hours=2)
+        self._book(2, -timedelta(hours=2), checked_in_at=start, actual_start_time=start)
+        day = start.date().isoformat()
+        ResourceAvailabilityCache.set_availability(self.resource.pk, day, {'slots': []})
+
+        with mock.patch('booking.services.checkin_service.invalidate_booking_caches') as invalidate:
+            self.service.process_automatic_checkouts()
+        self.assertEqual(invalidate.call_count, 2)
+        self.assertIsNone(ResourceAvailabilityCache.get_availability(self.resource.pk, day))
+
+    def test_sweep_is_idempotent(self):
+        start = timezone.now() - timedelta(hours=2)
+        self._book(2, -timedelta(hours=2), checked_in_at=start, actual_start_time=start)
+        self.service.process_automatic_checkouts()
+
+        self.assertEqual(self.service.process_automatic_checkouts(), 0)
+        self.assertEqual(CheckInOutEvent.objects.count(), 2)
+        self.assertEqual(UsageAnalytics.objects.get(resource=self.resource).total_bookings, 2)
+
+    def test_reminders_are_claimed_once(self):
+        self._book(3, timedelta(minutes=10))
+
+        with mock.patch.object(CheckInService, '_send_checkin_reminder') as send:
+            self.assertEqual(self.service.send_checkin_reminders(), 3)
+            self.assertEqual(self.service.send_checkin_reminders(), 0)
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(Booking.objects.filter(check_in_reminder_sent=True).count(), 3)
+
+    def test_failed_reminders_are_retried(self):
+        ids = self._book(2, timedelta(minutes=10))
+
+        def send(booking):
+            if booking.pk == ids[0]:
+                raise RuntimeError('mail server down')
+
+        with mock.patch.object(CheckInService, '_send_checkin_reminder', side_effect=send):
+            self.assertEqual(self.service.send_checkin_reminders(), 1)
+        self.assertFalse(Booking.objects.get(pk=ids[0]).check_in_reminder_sent)
+
+        with mock.patch.object(CheckInService, '_send_checkin_reminder') as retry:
+            self.assertEqual(self.service.send_checkin_reminders(), 1)
+        self.assertEqual(retry.call_args[0][0].pk, ids[0])
+
+    def test_overlapping_sweep_is_skipped(self):
+        cache.add(SWEEP_LOCK_KEY, 1)
+        self.assertIsNone(self.service.run_periodic_sweep())
+        cache.delete(SWEEP_LOCK_KEY)
+        self.assertEqual(
+            self.service.run_periodic_sweep(),
+            {'checkin_reminders': 0, 'checkout_reminders': 0, 'auto_checkouts': 0}
+        )
@@ -0,0 +1,129 @@
+"""Tests for the chunked, resumable data migration framework."""
+import io
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.management.commands.notifications.setup_notification_defaults import (
+    Command as SetupNotificationDefaultsCommand,
+)
+from booking.management.commands.system.fix_naive_datetimes import (
+    Command as FixNaiveDatetimesCommand, NaiveDatetimeFix,
+)
+from booking.models import Booking, DataMigrationCheckpoint, NotificationPreference, Resource
+from booking.utils.data_migrations import ChunkedMigration
+
+
+class UppercaseLocations(ChunkedMigration):
+    model = Resource
+    fields = ['location']
+
+    def __init__(self, fail_after=None, **kwargs):
+        self.fail_after = fail_after
+        self.chunks_seen = 0
+        super().__init__(**kwargs)
+
+    def process_chunk(self, objects, dry_run):
+        self.chunks_seen += 1
+        changed = super().process_chunk(objects, dry_run)
+        if self.chunks_seen == self.fail_after:
+            raise RuntimeError('interrupted')
+        return changed
+
+    def transform(self, obj):
+        if obj.location.isupper():
+            return False
+        obj.location = obj.location.upper()
+        return True
+
+
+class TestChunkedMigration(TestCase):
+    """Test keyset chunking, checkpoints, resumption and the ported commands."""
+
+    def setUp(self):
+        self.resources = [
+            Resource.objects.create(name=f'R{i}', resource_type='equipment', location=f'lab {i}')
+            for i in range(7)
+        ]
+
+    def _upper_count(self):
+        return sum(location.isupper() for location in Resource.objects.values_list('location', flat=True))
+
+    def test_interrupted_run_resumes_after_last_committed_chunk(self):
+        with self.assertRaises(RuntimeError):
+            UppercaseLocations(fail_after=2, chunk_size=3).run()
+
+        checkpoint = DataMigrationCheckpoint.objects.get()
+        self.assertEqual((checkpoint.last_pk, checkpoint.processed), (self.resources[2].pk, 3))
+        # The failed second chunk was rolled back with its checkpoint
+        self.assertEqual(self._upper_count(), 3)
+
+        progress = []
+        resumed = UppercaseLocations(chunk_size=3)
+        stats = resumed.run(progress=progress.append)
+        self.assertTrue(stats['resumed'])
+        self.assertEqual(resumed.chunks_seen, 2)
+        self.assertEqual((stats['processed'], stats['changed'], stats['total']), (7, 7, 7))
+        self.assertEqual([entry['processed'] for entry in progress], [6, 7])
+        self.assertEqual(self._upper_count(), 7)
+        self.assertIsNotNone(DataMigrationCheckpoint.objects.get().completed_at)
+
+        # A completed migration starts over on the next run
+        again = UppercaseLocations(chunk_size=3)
+        self.assertEqual(again.run()['changed'], 0)
+        self.assertEqual(again.chunks_seen, 3)
+
+    def test_dry_run_writes_nothing(self):
+        stats = UppercaseLocations(chunk_size=4).run(dry_run=True)
+        self.assertEqual(stats['changed'], 7)
+        self.assertEqual(self._upper_count(), 0)
+        self.assertFalse(DataMigrationCheckpoint.objects.exists())
+
+    def test_naive_datetimes_are_made_aware(self):
+        booking = Booking(start_time=datetime(2025, 3, 1, 9), end_time=timezone.now())
+        self.assertTrue(NaiveDatetimeFix(Booking, ['start_time', 'end_time']).transform(booking))
+        self.assertTrue(timezone.is_aware(booking.start_time))
+
+        out = io.StringIO()
+        call_command(FixNaiveDatetimesCommand(), '--chunk-size=2', stdout=out)
+        self.assertIn('Database is already clean', out.getvalue())
+        self.assertEqual(DataMigrationCheckpoint.objects.filter(completed_at__isnull=False).count(), 2)
+
+    def test_notification_defaults_are_created_and_reset_in_chunks(self):
+        users = [User.objects.create_user(username=f'u{i}', password='x') for i in range(3)]
+        NotificationPreference.objects.all().delete()
+        NotificationPreference.objects.create(
+            user=users[0], notification_type='booking_confirmed', delivery_method='email', is_enabled=False
+        )
+
+        call_command(SetupNotificationDefaultsCommand(), '--chunk-size=2', stdout=io.StringIO())
+        per_user = NotificationPreference.objects.filter(user=users[1]).count()
+        self.assertGreater(per_user, 0)
+        self.assertEqual(NotificationPreference.objects.count(), 3 * per_user)
+        self.assertFalse(NotificationPreference.objects.get(
+            user=users[0], notification_type='booking_confirmed', delivery_method='email').is_enabled)
+
+        call_command(SetupNotificationDefaultsCommand(), '--reset', '--user=u0', stdout=io.StringIO())
+        self.assertTrue(NotificationPreference.objects.get(
+            user=users[0], notification_type='booking_confirmed', delivery_method='email').is_enabled)
+
+    def test_notification_defaults_checkpoint_depends_on_options(self):
+        User.objects.create_user(username='u0', password='x')
+        call_command(SetupNotificationDefaultsCommand(), stdout=io.StringIO())
+        call_command(SetupNotificationDefaultsCommand(), '--reset', stdout=io.StringIO())
+        call_command(SetupNotificationDefaultsCommand(), '--reset', '--sms-enabled', stdout=io.StringIO())
+        call_command(SetupNotificationDefaultsCommand(), '--reset', '--sms-enabled', stdout=io.StringIO())
+        names = DataMigrationCheckpoint.objects.values_list('name', flat=True)
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name.startswith('setup_notification_defaults:') for name in names))
+
+    def test_repairs_must_implement_transform(self):
+        class Incomplete(ChunkedMigration):
+            model = Resource
+            fields = ['location']
+
+        with self.assertRaises(TypeError):
+            Incomplete()
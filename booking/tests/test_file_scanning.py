@@ -0,0 +1,175 @@
+"""Tests for streamed, pooled ClamAV scanning, run against a fake clamd."""
+import io
+import socketserver
+import struct
+import threading
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from booking.utils.clamav import get_clamav_pool
+from booking.utils.file_validation import FileDigest, FileValidator, validate_document_file
+
+EICAR = b'X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*'
+
+
+class FakeClamd(socketserver.BaseRequestHandler):
+    """Implements IDSESSION and INSTREAM the way clamd does."""
+
+    def _read(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise EOFError
+            data += chunk
+        return data
+
+    def _command(self):
+        command = b''
+        while not command.endswith(b'\0'):
+            command += self._read(1)
+        return command[1:-1]
+
+    def handle(self):
+        state = self.server.state
+        state['connections'] += 1
+        try:
+            if self._command() != b'IDSESSION':
+                return
+            request_id = 0
+            while True:
+                command = self._command()
+                request_id += 1
+                if command == b'END':
+                    return
+                if command != b'INSTREAM':
+                    self.request.sendall(f'{request_id}: UNKNOWN COMMAND ERROR\0'.encode())
+                    return
+                payload = b''
+                while True:
+                    length = struct.unpack('!L', self._read(4))[0]
+                    if not length:
+                        break
+                    state['chunk_sizes'].append(length)
+                    payload += self._read(length)
+                state['scans'] += 1
+                if EICAR in payload:
+                    reply = f'{request_id}: stream: Eicar-Test-Signature FOUND\0'
+                else:
+                    reply = f'{request_id}: stream: OK\0'
+                self.request.sendall(reply.encode())
+                if state['hang_up']:
+                    return
+        except EOFError:
+            pass
+        finally:
+            self.request.close()
+            state['closed'].set()
+
+
+class CountingBytesIO(io.BytesIO):
+    """Counts the bytes read, to check how many passes validation makes."""
+
+    bytes_read = 0
+
+    def read(self, *args):
+        chunk = super().read(*args)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class FakeClamdServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+
+class TestFileScanning(TestCase):
+    """Test chunked INSTREAM scanning, connection reuse and verdict caching."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeClamdServer(('127.0.0.1', 0), FakeClamd)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        get_clamav_pool().close()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.server.state = {'connections': 0, 'scans': 0, 'chunk_sizes': [], 'hang_up': False,
+                             'closed': threading.Event()}
+        self.settings_override = override_settings(
+            CLAMAV_ENABLED=True, CLAMAV_SOCKET_PATH='', CLAMAV_TCP_HOST='127.0.0.1',
+            CLAMAV_TCP_PORT=self.server.server_address[1], CLAMAV_CHUNK_SIZE=4096,
+        )
+        self.settings_override.enable()
+        get_clamav_pool().close()
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    def _upload(self, content, name='manual.txt'):
+        return SimpleUploadedFile(name, content, content_type='text/plain')
+
+    def _validator(self):
+        return FileValidator(allowed_types=['text/plain'], max_size=10 * 1024 * 1024)
+
+    def test_files_are_streamed_in_fixed_chunks_on_one_connection(self):
+        for i in range(3):
+            result = self._validator().validate(self._upload(f'manual {i}\n'.encode() * 5000))
+            self.assertTrue(result['valid'], result['errors'])
+
+        state = self.server.state
+        self.assertEqual((state['scans'], state['connections']), (3, 1))
+        self.assertEqual(max(state['chunk_sizes']), 4096)
+
+    def test_infected_upload_is_rejected(self):
+        with self.assertRaisesMessage(ValidationError, 'Eicar-Test-Signature'):
+            validate_document_file(self._upload(EICAR))
+
+    def test_reupload_of_same_content_skips_scan(self):
+        content = b'Operating manual\n' * 10000
+        first = self._validator().validate(self._upload(content))
+        second = self._validator().validate(self._upload(content, name='manual-copy.txt'))
+        self.assertTrue(second['valid'])
+        self.assertEqual(first['file_info']['sha256'], second['file_info']['sha256'])
+        self.assertEqual(self.server.state['scans'], 1)
+
+    def test_closed_pooled_connection_is_replaced(self):
+        self.server.state['hang_up'] = True
+        self._validator().validate(self._upload(b'first'))
+        self.assertTrue(self.server.state['closed'].wait(5))
+        result = self._validator().validate(self._upload(b'second'))
+        self.assertTrue(result['valid'])
+        self.assertEqual((self.server.state['scans'], self.server.state['connections']), (2, 2))
+
+    def test_unreachable_clamd_does_not_block_uploads(self):
+        with override_settings(CLAMAV_TCP_PORT=1):
+            result = self._validator().validate(self._upload(b'plain text'))
+        self.assertTrue(result['valid'])
+
+    def test_digest_is_collected_in_one_pass(self):
+        upload = self._upload(b'a' * 10000 + b'b' * 10000)
+        digest = FileDigest.from_file(upload, chunk_size=1024)
+        self.assertEqual((len(digest.header), digest.size), (8192, 20000))
+        self.assertEqual(upload.tell(), 0)
+
+    def _bytes_read_by_validation(self, upload):
+        upload.file = CountingBytesIO(upload.file.getvalue())
+        self.assertTrue(self._validator().validate(upload)['valid'])
+        return upload.file.bytes_read
+
+    def test_upload_is_streamed_only_on_cache_miss(self):
+        content = b'Operating manual\n' * 10000
+        miss = self._bytes_read_by_validation(self._upload(content))
+        hit = self._bytes_read_by_validation(self._upload(content, name='manual-copy.txt'))
+        # Miss: digest pass plus the clamd stream; hit: digest pass only
+        self.assertEqual((miss, hit), (2 * len(content), len(content)))
+        self.assertEqual(self.server.state['scans'], 1)
@@ -0,0 +1,170 @@
+"""Tests for the batched Google Calendar sync engine, run against a local HTTP stub."""
+import json
+import re
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import Booking, GoogleCalendarIntegration, GoogleCalendarEventLink, Resource
+from booking.services.google_calendar_sync import GoogleCalendarSyncEngine
+
+
+class CalendarBatchStub(BaseHTTPRequestHandler):
+    """Answers Calendar API batch requests the way Google does."""
+
+    server_version = 'CalendarStub/1.0'
+
+    def do_POST(self):
+        state = self.server.state
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        boundary = re.search(r'boundary=(\S+)', self.headers['Content-Type']).group(1)
+        requests = []
+        for part in body.split(f'--{boundary}')[1:-1]:
+            content_id = re.search(r'Content-ID: <([^>]+)>', part).group(1)
+            method, path = re.search(r'^(GET|POST|PUT|DELETE) (\S+) HTTP/1.1', part, re.M).groups()
+            requests.append((content_id, method, path))
+        state['batches'].append(requests)
+
+        if state['throttle']:
+            state['throttle'] -= 1
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+
+        out_boundary = 'batch_stub'
+        parts = []
+        for content_id, method, path in requests:
+            event_id = path.rsplit('/', 1)[-1]
+            if event_id in state['gone']:
+                status, payload = '404 Not Found', {'error': {'code': 404}}
+            elif method == 'POST':
+                state['next_id'] += 1
+                status, payload = '200 OK', {'id': f"evt{state['next_id']}"}
+            elif method == 'PUT':
+                status, payload = '200 OK', {'id': event_id}
+            else:
+                status, payload = '204 No Content', None
+            parts.append(
+                f'--{out_boundary}\r\nContent-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id}>\r\n\r\n'
+                f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n'
+                f'{json.dumps(payload) if payload else ""}\r\n'
+            )
+        response = (''.join(parts) + f'--{out_boundary}--\r\n').encode()
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/mixed; boundary={out_boundary}')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestGoogleCalendarSync(TestCase):
+    """Test delta detection, batching and backoff."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), CalendarBatchStub)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.api_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.state = {'batches': [], 'throttle': 0, 'gone': set(), 'next_id': 0}
+        self.settings_override = override_settings(GOOGLE_CALENDAR_API_URL=self.api_url)
+        self.settings_override.enable()
+        self.sleeps = []
+        self.engine = GoogleCalendarSyncEngine(sleep=self.sleeps.append)
+
+        self.user = User.objects.create_user(username='synced', password='x')
+        self.integration = GoogleCalendarIntegration.objects.create(
+            user=self.user, access_token='token', refresh_token='refresh',
+            token_expires_at=timezone.now() + timedelta(hours=1),
+        )
+        self.resource = Resource.objects.create(name='Microscope', resource_type='instrument', location='L1')
+        self.day = (timezone.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    def _book(self, count, status='approved'):
+        return [
+            Booking.objects.create(
+                resource=self.resource, user=self.user, title=f'Session {i}', status=status,
+                start_time=self.day + timedelta(days=i // 8, hours=i % 8),
+                end_time=self.day + timedelta(days=i // 8, hours=i % 8 + 1),
+            )
+            for i in range(count)
+        ]
+
+    def test_only_changed_bookings_are_pushed(self):
+        bookings = self._book(3)
+
+        summary = self.engine.sync_integration(self.integration)
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(len(self.server.state['batches']), 1)
+        self.assertEqual(GoogleCalendarEventLink.objects.filter(integration=self.integration).count(), 3)
+
+        # Nothing changed, so no HTTP call at all
+        summary = self.engine.sync_integration(self.integration)
+        self.assertEqual((summary['unchanged'], len(self.server.state['batches'])), (3, 1))
+
+        bookings[0].title = 'Renamed session'
+        bookings[0].save()
+        bookings[1].status = 'cancelled'
+        bookings[1].save()
+        summary = self.engine.sync_integration(self.integration)
+        self.assertEqual((summary['updated'], summary['deleted'], summary['unchanged']), (1, 1, 1))
+        self.assertEqual(sorted(method for _, method, _ in self.server.state['batches'][-1]), ['DELETE', 'PUT'])
+
+    def test_operations_are_batched_fifty_per_call(self):
+        self._book(51)
+        summary = self.engine.sync_integration(self.integration)
+        self.assertEqual(summary['created'], 51)
+        self.assertEqual([len(batch) for batch in self.server.state['batches']], [50, 1])
+
+    def test_rate_limited_batches_back_off_and_retry(self):
+        self._book(2)
+        self.server.state['throttle'] = 2
+        summary = self.engine.sync_integration(self.integration)
+        self.assertEqual(summary['created'], 2)
+        self.assertEqual(len(self.server.state['batches']), 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertLess(self.sleeps[0], self.sleeps[1] + 1)
+
+    def test_events_deleted_on_google_are_recreated(self):
+        self._book(1)
+        self.engine.sync_integration(self.integration)
+        link = GoogleCalendarEventLink.objects.get()
+        link.content_hash = 'outdated'
+        link.save()
+        self.server.state['gone'].add(link.google_event_id)
+
+        summary = self.engine.sync_integration(self.integration)
+        self.assertEqual((summary['created'], summary['errors']), (1, 0))
+        self.assertNotEqual(GoogleCalendarEventLink.objects.get().google_event_id, link.google_event_id)
+
+    def test_client_is_reused_per_integration(self):
+        self.assertIs(self.engine.get_client(self.integration), self.engine.get_client(self.integration))
+
+    def test_sync_now_queues_background_task(self):
+        self.client.force_login(self.user)
+        with mock.patch('booking.tasks.sync_google_calendar.delay') as delay:
+            response = self.client.get(reverse('booking:google_calendar_sync'))
+        self.assertEqual(response.status_code, 302)
+        delay.assert_called_once_with(self.integration.id)
@@ -0,0 +1,122 @@
+"""Tests for the cached academic hierarchy tree and the views that read it."""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from booking.forms import UserProfileForm
+from booking.models import College, Department, Faculty, UserProfile
+from booking.services.hierarchy_service import AcademicHierarchyService
+
+
+class TestHierarchyService(TestCase):
+    """Test tree building, caching, invalidation and constraint-backed writes."""
+
+    def setUp(self):
+        cache.clear()
+        self.service = AcademicHierarchyService()
+        self.science = Faculty.objects.create(name='Science', code='SCI')
+        self.arts = Faculty.objects.create(name='Arts', code='ART', is_active=False)
+        self.chemistry = College.objects.create(name='Chemistry', code='CHEM', faculty=self.science)
+        self.physics = College.objects.create(name='Physics', code='PHYS', faculty=self.science)
+        self.analytical = Department.objects.create(name='Analytical', code='ANA', college=self.chemistry)
+        self.organic = Department.objects.create(name='Organic', code='ORG', college=self.chemistry, is_active=False)
+
+        self.admin = User.objects.create_user(username='admin', password='x', is_staff=True)
+        self.student = User.objects.create_user(username='student', password='x')
+        UserProfile.objects.filter(user=self.student).update(
+            faculty=self.science, college=self.chemistry, department=self.analytical
+        )
+        cache.clear()
+
+    def test_tree_is_built_with_one_query_per_level_and_cached(self):
+        with CaptureQueriesContext(connection) as queries:
+            tree = self.service.get_tree()
+        self.assertEqual(len(queries), 3)
+
+        self.assertEqual([faculty['name'] for faculty in tree['faculties']], ['Arts', 'Science'])
+        science = self.service.get_faculty(self.science.id)
+        self.assertEqual((science['colleges_count'], science['departments_count'], science['members']), (2, 2, 1))
+        self.assertEqual(self.service.get_department(self.analytical.id)['college']['faculty']['code'], 'SCI')
+        self.assertEqual(self.service.stats(), {
+            'total_faculties': 2, 'active_faculties': 1,
+            'total_colleges': 2, 'active_colleges': 2,
+            'total_departments': 2, 'active_departments': 1,
+        })
+
+        with self.assertNumQueries(0):
+            self.assertEqual([node['name'] for node in self.service.departments(self.chemistry.id, active_only=True)],
+                             ['Analytical'])
+
+    def test_changes_invalidate_the_tree(self):
+        self.service.get_tree()
+        College.objects.create(name='Biology', code='BIO', faculty=self.science)
+        self.assertEqual(self.service.get_faculty(self.science.id)['colleges_count'], 3)
+
+        # Re-saving a profile in place (as every login does) keeps the cache
+        profile = UserProfile.objects.get(user=self.student)
+        profile.save()
+        with self.assertNumQueries(0):
+            self.service.get_tree()
+
+        profile.department = None
+        profile.save()
+        self.assertEqual(self.service.get_department(self.analytical.id)['members'], 0)
+
+    def test_user_deactivation_invalidates_member_counts(self):
+        self.assertEqual(self.service.get_department(self.analytical.id)['members'], 1)
+
+        # Logins save the user without touching is_active
+        self.client.login(username='student', password='x')
+        with self.assertNumQueries(0):
+            self.service.get_tree()
+
+        self.student.is_active = False
+        self.student.save()
+        self.assertEqual(self.service.get_department(self.analytical.id)['members'], 0)
+
+    def test_admin_views_read_the_tree(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('booking:site_admin_academic_hierarchy'))
+        self.assertEqual(response.context['stats']['total_colleges'], 2)
+        self.assertContains(response, 'Chemistry')
+
+        response = self.client.get(reverse('booking:site_admin_faculty_delete', args=[self.science.id]))
+        self.assertEqual((response.context['colleges_count'], response.context['departments_count']), (2, 2))
+
+        response = self.client.get(reverse('booking:ajax_load_departments'), {'college_id': self.chemistry.id})
+        self.assertEqual(response.json(), {'departments': [{'id': self.analytical.id, 'name': 'Analytical'}]})
+
+    def test_duplicates_are_rejected_by_constraints(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('booking:site_admin_college_create'), {
+            'name': 'Chemistry', 'code': 'NEW', 'faculty': self.science.id, 'is_active': 'on',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'A college with this name already exists in this faculty.')
+
+        response = self.client.post(reverse('booking:site_admin_department_edit', args=[self.organic.id]), {
+            'name': 'Organic', 'code': 'ana', 'college': self.chemistry.id,
+        })
+        self.assertContains(response, 'A department with this code already exists in this college.')
+        self.organic.refresh_from_db()
+        self.assertEqual(self.organic.code, 'ORG')
+
+        response = self.client.post(reverse('booking:site_admin_faculty_create'), {'name': 'Law', 'code': 'law'})
+        self.assertRedirects(response, reverse('booking:site_admin_faculties'))
+        self.assertTrue(Faculty.objects.filter(code='LAW').exists())
+
+    def test_profile_form_renders_choices_from_the_tree(self):
+        profile = UserProfile.objects.select_related('user').get(user=self.student)
+        self.service.get_tree()
+        with self.assertNumQueries(0):
+            form = UserProfileForm(instance=profile)
+            choices = list(form.fields['department'].choices)
+        self.assertEqual(choices, [('', '---------'), (self.analytical.id, 'Analytical (Chemistry)')])
+
+        form = UserProfileForm(instance=profile, data={'faculty': self.science.id, 'college': self.physics.id})
+        form.is_valid()
+        self.assertNotIn('college', form.errors)
+        self.assertEqual(form.cleaned_data['college'], self.physics)
@@ -0,0 +1,109 @@
+"""Tests for the image derivative pipeline and thumbnail endpoint."""
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from booking.models import Resource
+from booking.utils.image_derivatives import (
+    DERIVATIVE_FORMATS, decode_image, generate_derivatives, render_derivative,
+)
+from booking.utils.image_processing import ImageProcessingConfig
+
+
+def make_jpeg(size=(2000, 1500), color=(200, 30, 30)):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, format='JPEG')
+    return output.getvalue()
+
+
+class TestImageDerivatives(TestCase):
+    """Test derivative rendering, storage and serving."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.source = default_storage.save('resources/2025/01/laser.jpg', ContentFile(make_jpeg()))
+        self.user = User.objects.create_user(username='viewer', password='x')
+
+    def test_jpeg_is_decoded_at_reduced_scale(self):
+        self.assertEqual(decode_image(make_jpeg(), 300).size, (500, 375))
+
+        thumb = Image.open(io.BytesIO(render_derivative(make_jpeg(), (300, 200), 'webp')))
+        self.assertEqual((thumb.format, thumb.size), ('WEBP', (300, 200)))
+
+    def test_derivatives_are_shared_by_identical_content(self):
+        generated = generate_derivatives(self.source)
+        self.assertEqual(
+            len(generated), len(ImageProcessingConfig.THUMBNAIL_SIZES) * len(DERIVATIVE_FORMATS)
+        )
+        self.assertTrue(all(default_storage.exists(name) for name in generated.values()))
+
+        copy = default_storage.save('resources/2025/01/laser-copy.jpg', ContentFile(make_jpeg()))
+        with mock.patch('booking.utils.image_derivatives.encode_image') as encode:
+            self.assertEqual(generate_derivatives(copy), generated)
+        encode.assert_not_called()
+
+    def test_thumbnail_endpoint_renders_and_revalidates(self):
+        self.client.force_login(self.user)
+        url = reverse('booking:image_thumbnail', kwargs={'width': 800, 'height': 600, 'path': self.source})
+
+        response = self.client.get(url, HTTP_ACCEPT='image/webp,image/*')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+        self.assertIn('Accept', response['Vary'])
+        image = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(image.size, (800, 600))
+
+        response = self.client.get(url, HTTP_ACCEPT='image/webp,image/*',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url + '?fit=contain&format=jpeg')
+        image = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual((image.format, image.size), ('JPEG', (800, 600)))
+
+    def test_thumbnail_endpoint_rejects_bad_requests(self):
+        self.client.force_login(self.user)
+        default_storage.save('risk_assessments/secret.jpg', ContentFile(make_jpeg()))
+        for kwargs in [
+            {'width': 600, 'height': 400, 'path': 'risk_assessments/secret.jpg'},
+            {'width': 5000, 'height': 90, 'path': self.source},
+            {'width': 601, 'height': 400, 'path': self.source},
+            {'width': 600, 'height': 400, 'path': 'resources/missing.jpg'},
+        ]:
+            response = self.client.get(reverse('booking:image_thumbnail', kwargs=kwargs))
+            self.assertEqual(response.status_code, 404)
+
+    def test_saving_resource_image_queues_derivatives(self):
+        resource = Resource.objects.create(name='Laser', resource_type='instrument', location='B2')
+        resource.image.name = self.source
+        with mock.patch('booking.tasks.generate_image_derivatives.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                resource.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                resource.save()
+        delay.assert_called_once_with(self.source)
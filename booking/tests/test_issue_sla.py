@@ -0,0 +1,85 @@
+"""Tests for SLA deadlines and overdue tracking of resource issues."""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import Resource, ResourceIssue, UserProfile
+from booking.tasks import escalate_overdue_issues
+
+
+class TestIssueSLA(TestCase):
+    """Test deadline calculation, SQL overdue queries and escalation."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='tech', password='x')
+        UserProfile.objects.filter(user=self.user).update(role='technician')
+        self.resource = Resource.objects.create(name='Centrifuge', resource_type='equipment', location='B1')
+
+    def _issue(self, severity, days_old, status='open'):
+        issue = ResourceIssue.objects.create(
+            resource=self.resource, reported_by=self.user, title='Noise', description='Rattling',
+            severity=severity, status=status,
+        )
+        created = timezone.now() - timedelta(days=days_old)
+        # Re-save with the backdated report time so the deadline follows it
+        ResourceIssue.objects.filter(pk=issue.pk).update(created_at=created)
+        issue.refresh_from_db()
+        issue.save()
+        return issue
+
+    def test_deadline_follows_severity(self):
+        issue = self._issue('high', 0)
+        self.assertEqual(issue.due_at, issue.created_at + timedelta(days=3))
+
+        issue.severity = 'critical'
+        issue.save()
+        self.assertEqual(issue.due_at, issue.created_at + timedelta(days=1))
+
+    def test_overdue_runs_in_sql_and_matches_property(self):
+        late_critical = self._issue('critical', 2)
+        late_low = self._issue('low', 15, status='in_progress')
+        self._issue('medium', 2)
+        self._issue('high', 10, status='resolved')
+
+        overdue = set(ResourceIssue.objects.overdue())
+        self.assertEqual(overdue, {late_critical, late_low})
+        self.assertEqual({issue for issue in ResourceIssue.objects.all() if issue.is_overdue}, overdue)
+
+    def test_dashboard_stats_come_from_one_query(self):
+        self._issue('critical', 2)
+        self._issue('critical', 0, status='in_progress')
+        self._issue('low', 1)
+        self._issue('high', 10, status='closed')
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = ResourceIssue.objects.dashboard_stats()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(stats, {'total': 4, 'open': 2, 'in_progress': 1, 'critical': 2, 'overdue': 1})
+
+    def test_dashboard_filters_overdue(self):
+        late = self._issue('critical', 3)
+        self._issue('low', 1)
+        self.client.login(username='tech', password='x')
+
+        response = self.client.get(reverse('booking:issues_dashboard'), {'is_overdue': 'on'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['issues']), [late])
+        self.assertEqual(response.context['stats']['overdue'], 1)
+
+    def test_breaching_issues_are_escalated_once(self):
+        late = self._issue('critical', 2)
+        on_time = self._issue('low', 1)
+
+        self.assertEqual(escalate_overdue_issues(), 'Escalated 1 overdue issues')
+        late.refresh_from_db()
+        on_time.refresh_from_db()
+        self.assertTrue(late.is_urgent)
+        self.assertIsNotNone(late.escalated_at)
+        self.assertFalse(on_time.is_urgent)
+
+        self.assertEqual(ResourceIssue.objects.escalate_overdue(), 0)
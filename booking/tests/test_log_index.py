@@ -0,0 +1,144 @@
+"""Tests for the incremental system log index."""
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from booking.log_index import LogIndex
+from booking.log_viewer import LogViewer
+
+
+class TestLogIndex(TestCase):
+    """Test offset tailing, rotation, partitioning and search."""
+
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.tmp, 'error.log')
+        self.settings_override = override_settings(
+            LOG_INDEX_ENABLED=True, LOG_INDEX_PATH=os.path.join(self.tmp, 'index.sqlite3')
+        )
+        self.settings_override.enable()
+        self.viewer = LogViewer()
+        self.viewer.log_sources = {
+            'error_nginx': {'name': 'Nginx Error Log', 'path': self.log_path, 'type': 'file'},
+            'django_app': {'name': 'Django', 'path': os.path.join(self.tmp, 'django.log'), 'type': 'file'},
+        }
+        self.now = datetime.now().replace(microsecond=0)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _append(self, *lines, path=None):
+        with open(path or self.log_path, 'a') as handle:
+            for line in lines:
+                handle.write(line + '\n')
+
+    def _line(self, minutes_ago, level, message):
+        timestamp = self.now - timedelta(minutes=minutes_ago)
+        return f"{timestamp:%Y-%m-%d %H:%M:%S} [{level}] {message}"
+
+    def test_only_appended_lines_are_read(self):
+        self._append(self._line(5, 'error', 'upstream timed out'), self._line(4, 'warn', 'slow client'))
+        self.assertEqual(self.viewer.ingest()['error_nginx'], 2)
+
+        self._append(self._line(1, 'error', 'connect() failed'))
+        with open(self.log_path, 'a') as handle:
+            handle.write('partial line without newline')
+        self.assertEqual(self.viewer.ingest()['error_nginx'], 1)
+        self.assertEqual(self.viewer.ingest()['error_nginx'], 0)
+        self.assertEqual(self.viewer.index.count(), 3)
+
+    def test_rotated_file_is_finished_before_new_one(self):
+        self._append(self._line(10, 'error', 'before rotation'))
+        self.viewer.ingest()
+        self._append(self._line(9, 'error', 'written just before rotation'))
+        os.rename(self.log_path, self.log_path + '.1')
+        self._append(self._line(1, 'error', 'after rotation'))
+
+        self.assertEqual(self.viewer.ingest()['error_nginx'], 2)
+        messages = [entry.message for entry in self.viewer.index.search()]
+        self.assertEqual(messages, ['after rotation', 'written just before rotation', 'before rotation'])
+
+    def test_rotated_backlog_larger_than_a_chunk_is_read_to_the_end(self):
+        self._append(self._line(30, 'error', 'first'))
+        self.viewer.ingest()
+        backlog = [self._line(20 - i, 'error', f'backlog {i}') for i in range(10)]
+        self._append(*backlog)
+        os.rename(self.log_path, self.log_path + '.1')
+        self._append(self._line(1, 'error', 'after rotation'))
+
+        with mock.patch('booking.log_index.READ_CHUNK_BYTES', len(backlog[0]) * 2 + 5):
+            self.assertEqual(self.viewer.ingest()['error_nginx'], 11)
+        self.assertEqual(self.viewer.index.count(), 12)
+
+    def test_continuation_lines_across_chunks_stay_with_their_entry(self):
+        django_log = self.viewer.log_sources['django_app']['path']
+        self._append(
+            f"{self.now:%Y-%m-%d %H:%M:%S},123 ERROR django.request: Internal Server Error: /book/",
+            'Traceback (most recent call last):',
+            '  File "views.py", line 10, in book',
+            'ValueError: bad slot',
+            path=django_log,
+        )
+        with mock.patch('booking.log_index.READ_CHUNK_BYTES', 16):
+            self.viewer.ingest()
+        entry, = self.viewer.index.search(source_key='django_app')
+        self.assertTrue(entry.message.endswith('ValueError: bad slot'))
+
+    def test_search_by_level_text_and_time(self):
+        self._append(
+            self._line(60 * 30, 'error', 'disk quota exceeded'),
+            self._line(30, 'error', 'upstream timed out while reading'),
+            self._line(20, 'warn', 'upstream buffering to temporary file'),
+            self._line(10, 'error', 'no live upstreams'),
+        )
+        self.viewer.ingest()
+        index = self.viewer.index
+
+        self.assertEqual(len(index.search(level='error')), 3)
+        self.assertEqual(len(index.search(text='upstr')), 3)
+        self.assertEqual(
+            [e.message for e in index.search(level='ERROR', text='upstream', since=self.now - timedelta(minutes=25))],
+            ['no live upstreams']
+        )
+        self.assertEqual(len(index.search(limit=2)), 2)
+        self.assertEqual(len(index.search(text='"quota')), 1)
+
+    def test_entries_are_partitioned_by_month_and_pruned(self):
+        old = self.now - timedelta(days=150)
+        self._append(f"{old:%Y-%m-%d %H:%M:%S} [error] ancient failure", self._line(1, 'error', 'recent failure'))
+        self.viewer.ingest()
+
+        self.assertEqual([e.message for e in self.viewer.index.search()], ['recent failure'])
+        self.assertEqual(self.viewer.index.count(), 1)
+
+    def test_tracebacks_are_kept_with_their_entry(self):
+        django_log = self.viewer.log_sources['django_app']['path']
+        self._append(
+            f"{self.now:%Y-%m-%d %H:%M:%S},123 ERROR django.request: Internal Server Error: /book/",
+            'Traceback (most recent call last):',
+            '  File "views.py", line 10, in book',
+            'ValueError: bad slot',
+            path=django_log,
+        )
+        self.viewer.ingest()
+        entry, = self.viewer.index.search(source_key='django_app')
+        self.assertEqual(entry.source, 'django.request')
+        self.assertTrue(entry.message.endswith('ValueError: bad slot'))
+
+    def test_get_logs_queries_index_without_reading_files(self):
+        self._append(self._line(5, 'error', 'upstream timed out'))
+        self.assertEqual(len(self.viewer.get_logs(search='timed')), 1)
+
+        # Refreshes are throttled; in between, requests only query the index
+        self._append(self._line(1, 'error', 'another timeout'))
+        with mock.patch.object(LogIndex, 'ingest_file') as ingest_file:
+            logs = self.viewer.get_logs(level='ERROR', hours=1)
+        ingest_file.assert_not_called()
+        self.assertEqual([log.message for log in logs], ['upstream timed out'])
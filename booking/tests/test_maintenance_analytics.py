@@ -0,0 +1,83 @@
+"""Tests for database-side maintenance metrics and batched resource analysis."""
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.models import Maintenance, MaintenanceAnalytics, Resource
+from booking.services.maintenance_service import MaintenancePredictionService
+
+
+class TestMaintenanceAnalytics(TestCase):
+    """Test aggregate metrics, repeat detection and the batched analysis."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='engineer', password='x')
+        self.resource = Resource.objects.create(name='NMR', resource_type='instrument', location='L1')
+        self.base = timezone.now() - timedelta(days=200)
+
+    def _maintenance(self, day, hours, maintenance_type='corrective', cost=None, status='completed'):
+        start = self.base + timedelta(days=day)
+        maintenance = Maintenance.objects.create(
+            resource=self.resource, title='Service', created_by=self.user, maintenance_type=maintenance_type,
+            start_time=start, end_time=start + timedelta(hours=hours), actual_cost=cost,
+        )
+        Maintenance.objects.filter(pk=maintenance.pk).update(
+            status=status, completed_at=start + timedelta(hours=hours) if status == 'completed' else None
+        )
+        return maintenance
+
+    def test_metrics_are_aggregated_in_constant_queries(self):
+        self._maintenance(0, 2, 'preventive', Decimal('300'))
+        self._maintenance(10, 4, 'corrective', Decimal('100'))
+        self._maintenance(25, 6, 'corrective')               # repeat of day 10
+        self._maintenance(90, 2, 'corrective', Decimal('200'))
+        self._maintenance(100, 3, 'emergency', status='scheduled')
+        analytics = MaintenanceAnalytics.objects.create(resource=self.resource)
+
+        with CaptureQueriesContext(connection) as queries:
+            analytics.calculate_metrics()
+        self.assertLessEqual(len(queries), 4)
+
+        analytics.refresh_from_db()
+        self.assertEqual(analytics.total_maintenance_cost, Decimal('600'))
+        self.assertEqual(analytics.average_maintenance_cost, Decimal('200'))
+        self.assertEqual(analytics.preventive_cost_ratio, Decimal('50'))
+        self.assertEqual(
+            (analytics.total_maintenance_count, analytics.preventive_maintenance_count,
+             analytics.corrective_maintenance_count, analytics.emergency_maintenance_count),
+            (5, 1, 3, 1)
+        )
+        self.assertEqual(analytics.total_downtime_hours, Decimal('14'))
+        self.assertEqual(analytics.average_repair_time, timedelta(hours=3.5))
+        self.assertEqual(analytics.first_time_fix_rate, Decimal('75'))
+
+    def test_repeats_only_match_same_type_within_window(self):
+        self._maintenance(0, 1, 'corrective')
+        self._maintenance(5, 1, 'calibration')
+        self._maintenance(40, 1, 'corrective')
+        completed = self.resource.maintenances.filter(status='completed')
+        self.assertEqual(MaintenanceAnalytics._count_repeated_issues(completed), 0)
+
+        self._maintenance(60, 1, 'corrective')
+        self.assertEqual(MaintenanceAnalytics._count_repeated_issues(completed), 1)
+
+    def test_all_resources_are_analysed_in_batches(self):
+        for i in range(4):
+            Resource.objects.create(name=f'Spare {i}', resource_type='instrument', location='L2')
+        service = MaintenancePredictionService()
+
+        analyses = service.analyze_all_resources(workers=1, batch_size=2)
+        self.assertEqual(len(analyses), 5)
+        self.assertEqual(MaintenanceAnalytics.objects.count(), 5)
+
+        with mock.patch.object(MaintenancePredictionService, '_analyze_batch_in_thread',
+                               side_effect=lambda ids: [{'resource_id': i} for i in ids]) as run:
+            analyses = service.analyze_all_resources(workers=3, batch_size=2)
+        self.assertEqual([len(call.args[0]) for call in run.call_args_list], [2, 2, 1])
+        self.assertEqual(len(analyses), 5)
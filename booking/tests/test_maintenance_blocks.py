@@ -0,0 +1,100 @@
+"""Tests for the per-resource maintenance blocking index."""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.conflicts import ConflictDetector
+from booking.models import Booking, Maintenance, MaintenanceBlock, Resource, WaitingListEntry
+from booking.waiting_list import WaitingListService
+
+
+class TestMaintenanceBlocks(TestCase):
+    """Test block expansion and its use by conflict, availability and impact code."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='facilities', password='x')
+        self.chiller = Resource.objects.create(name='Chiller', resource_type='equipment', location='Plant')
+        self.nmr = Resource.objects.create(name='NMR', resource_type='instrument', location='L1')
+        self.ms = Resource.objects.create(name='Mass spec', resource_type='instrument', location='L1')
+        self.start = (timezone.now() + timedelta(days=2)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def _maintenance(self, resource, hours=4, **fields):
+        return Maintenance.objects.create(
+            resource=resource, title='Shutdown', created_by=self.user,
+            start_time=self.start, end_time=self.start + timedelta(hours=hours), **fields
+        )
+
+    def _booking(self, resource, offset_hours=1):
+        start = self.start + timedelta(hours=offset_hours)
+        return Booking(resource=resource, user=self.user, title='Run', start_time=start,
+                       end_time=start + timedelta(hours=1))
+
+    def test_affected_resources_are_expanded_into_blocks(self):
+        shutdown = self._maintenance(self.chiller)
+        shutdown.affects_other_resources.add(self.nmr, self.ms)
+        self.assertEqual(
+            set(MaintenanceBlock.objects.values_list('resource_id', flat=True)),
+            {self.chiller.id, self.nmr.id, self.ms.id}
+        )
+
+        shutdown.affects_other_resources.remove(self.ms)
+        shutdown.end_time += timedelta(hours=2)
+        shutdown.save()
+        self.assertEqual(
+            sorted(MaintenanceBlock.objects.values_list('resource_id', 'end_time')),
+            [(self.chiller.id, shutdown.end_time), (self.nmr.id, shutdown.end_time)]
+        )
+
+        shutdown.blocks_booking = False
+        shutdown.save()
+        self.assertFalse(MaintenanceBlock.objects.exists())
+
+    def test_conflicts_include_maintenance_on_other_resources(self):
+        shutdown = self._maintenance(self.chiller)
+        self.nmr.affected_by_maintenance.add(shutdown)
+
+        conflicts = ConflictDetector.check_maintenance_conflicts(self._booking(self.nmr))
+        self.assertEqual([conflict.maintenance for conflict in conflicts], [shutdown])
+        self.assertEqual(ConflictDetector.check_maintenance_conflicts(self._booking(self.ms)), [])
+        self.assertEqual(ConflictDetector.check_maintenance_conflicts(self._booking(self.nmr, 5)), [])
+
+    def test_waiting_list_slots_skip_blocked_intervals(self):
+        shutdown = self._maintenance(self.chiller)
+        shutdown.affects_other_resources.add(self.nmr)
+        entry = WaitingListEntry.objects.create(
+            user=self.user, resource=self.nmr, title='Run',
+            desired_start_time=self.start - timedelta(hours=1), desired_end_time=self.start,
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            slots = entry.find_available_slots(days_ahead=1)
+        self.assertLessEqual(len(queries), 2)
+        starts = {slot['start_time'] for slot in slots}
+        self.assertIn(self.start - timedelta(hours=1), starts)
+        self.assertNotIn(self.start, starts)
+        self.assertIn(self.start + timedelta(hours=4), starts)
+
+        free = WaitingListService().check_availability_for_waiting_list(self.nmr)
+        self.assertFalse(any(start < shutdown.end_time and end > shutdown.start_time for start, end in free))
+
+    def test_impact_scores_are_computed_in_one_query(self):
+        shutdown = self._maintenance(self.chiller, priority='critical')
+        shutdown.affects_other_resources.add(self.nmr, self.ms)
+        service = self._maintenance(self.nmr, priority='low')
+        for resource in (self.nmr, self.ms):
+            Booking.objects.bulk_create([self._booking(resource, 0), self._booking(resource, 2)])
+
+        with CaptureQueriesContext(connection) as queries:
+            scores = dict(Maintenance.objects.with_impact().values_list('pk', 'impact_score'))
+        self.assertEqual(len(queries), 1)
+
+        # 4 affected bookings across both instruments, plus recent usage of the chiller (none)
+        self.assertAlmostEqual(scores[shutdown.pk], 4 * 2 * 2.0)
+        # 2 affected bookings on the NMR and 2 recent NMR bookings
+        self.assertAlmostEqual(scores[service.pk], (2 * 2 + 2 * 0.1) * 0.5)
+        self.assertAlmostEqual(service.calculate_impact_score(), scores[service.pk])
+        self.assertEqual(shutdown.get_affected_bookings().count(), 4)
@@ -0,0 +1,129 @@
+"""Tests for batched maintenance schedule generation."""
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.management.commands.maintenance.generate_maintenance_schedule import (
+    Command as GenerateScheduleCommand,
+)
+from booking.models import Booking, Maintenance, MaintenanceAnalytics, MaintenanceBlock, Resource
+from booking.services.maintenance_schedule import MaintenanceScheduleGenerator
+from booking.tasks import generate_maintenance_schedules
+
+
+class TestMaintenanceSchedule(TestCase):
+    """Test in-memory duplicate/overlap handling, bulk inserts and grouped stats."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='x', email='admin@lab.org')
+        self.generator = MaintenanceScheduleGenerator()
+        self.resource = self._resource('Microscope')
+
+    def _resource(self, name):
+        resource = Resource.objects.create(name=name, resource_type='instrument', location='L2')
+        MaintenanceAnalytics.objects.create(resource=resource, recommended_maintenance_interval=timedelta(days=90))
+        return resource
+
+    def _maintenance(self, resource, start, hours=4, **fields):
+        return Maintenance.objects.create(
+            resource=resource, title='Existing', created_by=self.admin,
+            start_time=start, end_time=start + timedelta(hours=hours), **fields
+        )
+
+    def test_quarterly_items_are_created_with_blocks(self):
+        result = self.generator.generate(Resource.objects.all(), months_ahead=12, create=True)
+
+        self.assertEqual(result['created'], 4)
+        created = Maintenance.objects.filter(resource=self.resource, maintenance_type='preventive')
+        self.assertEqual(created.count(), 4)
+        self.assertEqual(set(created.values_list('status', flat=True)), {'scheduled'})
+        self.assertEqual(created.get(pk=created[0].pk).created_by, self.admin)
+        self.assertEqual(MaintenanceBlock.objects.filter(resource=self.resource).count(), 4)
+
+        # A second run recognises everything it created
+        again = self.generator.generate(Resource.objects.all(), months_ahead=12, create=True)
+        self.assertEqual((again['created'], again['duplicates']), (0, 4))
+
+    def test_ids_are_reloaded_when_bulk_insert_returns_none(self):
+        # MySQL can't return ids from bulk inserts
+        features = type(connection.features)
+        with mock.patch.object(features, 'can_return_rows_from_bulk_insert', new_callable=mock.PropertyMock,
+                               return_value=False), \
+                mock.patch('booking.notifications.maintenance_notifications.maintenance_scheduled'):
+            result = self.generator.generate(Resource.objects.all(), months_ahead=12, create=True)
+
+        self.assertEqual(result['created'], 4)
+        self.assertEqual(
+            set(MaintenanceBlock.objects.values_list('maintenance_id', flat=True)),
+            set(Maintenance.objects.values_list('pk', flat=True)),
+        )
+
+    def test_query_count_does_not_grow_with_resources(self):
+        def run(count, prefix):
+            resources = [self._resource(f'{prefix}{i}') for i in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                self.generator.generate(resources, months_ahead=12, create=True, created_by=self.admin)
+            return len(queries)
+
+        self.assertEqual(run(2, 'a'), run(6, 'b'))
+        self.assertEqual(Maintenance.objects.count(), 32)
+
+    def test_duplicates_are_skipped_and_overlaps_moved(self):
+        now = timezone.now()
+        self._maintenance(self.resource, now + timedelta(days=90), maintenance_type='preventive')
+        other = self._resource('Chiller')
+        shutdown = self._maintenance(other, now + timedelta(days=180) - timedelta(hours=1), hours=3)
+        shutdown.affects_other_resources.add(self.resource)
+
+        result = self.generator.generate([self.resource], months_ahead=12, create=True)
+        items = result['schedules'][0]['items']
+        self.assertEqual([item['status'] for item in items], ['duplicate', 'rescheduled', 'new', 'new'])
+        self.assertEqual(items[1]['date'], shutdown.end_time)
+        self.assertTrue(Maintenance.objects.filter(resource=self.resource, start_time=shutdown.end_time).exists())
+        self.assertEqual(result['created'], 3)
+
+    def test_preview_writes_nothing(self):
+        result = self.generator.generate(Resource.objects.all(), months_ahead=12)
+        self.assertEqual(len(result['schedules'][0]['items']), 4)
+        self.assertFalse(Maintenance.objects.exists())
+
+    def test_booking_holders_are_notified(self):
+        start = timezone.now() + timedelta(days=270, hours=2)
+        # Skip booking validation; only the stored interval matters here
+        Booking.objects.bulk_create([Booking(resource=self.resource, user=self.admin, title='Imaging',
+                                             start_time=start, end_time=start + timedelta(hours=1))])
+
+        with mock.patch('booking.notifications.maintenance_notifications.maintenance_scheduled') as notify:
+            self.generator.generate([self.resource], months_ahead=12, create=True)
+        self.assertEqual(notify.call_count, 1)
+        self.assertEqual(notify.call_args[0][0].start_time.date(), (start - timedelta(hours=2)).date())
+
+    def test_stats_are_grouped(self):
+        now = timezone.now()
+        self._maintenance(self.resource, now + timedelta(days=3), maintenance_type='inspection', priority='low')
+        self._maintenance(self.resource, now + timedelta(days=5), maintenance_type='inspection', priority='high')
+        self._maintenance(self._resource('Chiller'), now + timedelta(days=4), maintenance_type='calibration')
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.generator.scheduling_stats(Resource.objects.all(), months_ahead=1)
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['by_type'], [('calibration', 1), ('inspection', 2)])
+        self.assertEqual(stats['by_resource'], [('Microscope', 2), ('Chiller', 1)])
+        self.assertEqual(sum(count for _, count in stats['by_month']), 3)
+
+    def test_command_and_task(self):
+        out = io.StringIO()
+        call_command(GenerateScheduleCommand(), '--create-schedules', '--months-ahead=12', stdout=out)
+        self.assertIn('Scheduling complete: 4 new maintenance entries created', out.getvalue())
+        self.assertIn('Total scheduled maintenance in next 12 months: 4', out.getvalue())
+
+        summary = generate_maintenance_schedules(months_ahead=12)
+        self.assertEqual((summary['created'], summary['duplicates']), (0, 4))
@@ -0,0 +1,113 @@
+"""Tests for the chainable model queryset API."""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import (
+    AccessRequest, Booking, Notification, Resource, ResourceAccess,
+    ResourceTrainingRequirement, TrainingCourse, UserTraining,
+)
+
+
+class TestBookingQuerySet(TestCase):
+    """Test Booking.objects chainable methods."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='booker', password='x', first_name='Ada')
+        self.resource = Resource.objects.create(
+            name='Spectrometer', resource_type='instrument', location='Lab 3'
+        )
+        self.start = (timezone.now() + timedelta(days=1)).replace(
+            hour=9, minute=0, second=0, microsecond=0
+        )
+        for hour, status in [(0, 'approved'), (2, 'pending'), (4, 'cancelled')]:
+            start = self.start + timedelta(hours=hour)
+            Booking.objects.create(
+                resource=self.resource, user=self.user, title=f'Run {hour}',
+                start_time=start, end_time=start + timedelta(hours=1), status=status,
+            )
+
+    def test_active_and_overlapping_chain(self):
+        window = Booking.objects.active().overlapping(
+            self.start + timedelta(minutes=30), self.start + timedelta(hours=5)
+        )
+        self.assertEqual(sorted(window.values_list('title', flat=True)), ['Run 0', 'Run 2'])
+
+    def test_for_calendar_avoids_per_row_queries(self):
+        with self.assertNumQueries(1):
+            events = [
+                (b.title, b.resource.name, b.user.get_full_name())
+                for b in Booking.objects.for_calendar()
+            ]
+        self.assertEqual(len(events), 3)
+
+    def test_for_calendar_drops_earlier_joins(self):
+        titles = [b.title for b in Booking.objects.with_related().for_calendar()]
+        self.assertEqual(len(titles), 3)
+
+    def test_calendar_api_without_resource(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/v1/bookings/calendar/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+
+
+class TestResourceQuerySet(TestCase):
+    """Test Resource.objects chainable methods."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='learner', password='x')
+        self.admin = User.objects.create_user(username='tech', password='x')
+        self.course = TrainingCourse.objects.create(
+            title='Laser safety', code='LS-1', description='x', duration_hours=1,
+            created_by=self.admin,
+        )
+        self.laser = Resource.objects.create(name='Laser', resource_type='instrument', location='A')
+        self.scope = Resource.objects.create(name='Scope', resource_type='instrument', location='B')
+        ResourceTrainingRequirement.objects.create(resource=self.laser, training_course=self.course)
+        ResourceAccess.objects.create(resource=self.scope, user=self.user, granted_by=self.admin)
+        UserTraining.objects.create(user=self.user, training_course=self.course, status='in_progress')
+        AccessRequest.objects.create(
+            resource=self.laser, user=self.user, justification='Research'
+        )
+
+    def test_with_progress_for_annotates_user_state(self):
+        resources = {r.name: r for r in Resource.objects.with_progress_for(self.user)}
+
+        self.assertFalse(resources['Laser'].user_has_access_result)
+        self.assertTrue(resources['Laser'].has_pending_request)
+        self.assertTrue(resources['Laser'].has_pending_training)
+        self.assertEqual(resources['Laser'].required_training_count, 1)
+        self.assertEqual(resources['Laser'].completed_training_count, 0)
+
+        self.assertTrue(resources['Scope'].user_has_access_result)
+        self.assertTrue(resources['Scope'].can_view_calendar_result)
+        self.assertFalse(resources['Scope'].has_pending_request)
+        self.assertEqual(resources['Scope'].required_training_count, 0)
+
+    def test_resources_list_query_count_is_flat(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(reverse('booking:resources_list'))
+        for i in range(5):
+            Resource.objects.create(name=f'Extra {i}', resource_type='instrument', location='C')
+        with self.assertNumQueries(len(before)):
+            response = self.client.get(reverse('booking:resources_list'))
+        self.assertEqual(response.status_code, 200)
+
+
+class TestNotificationQuerySet(TestCase):
+    """Test Notification.objects chainable methods."""
+
+    def test_pending_delivery_respects_retry_time(self):
+        user = User.objects.create_user(username='notified', password='x')
+        common = dict(user=user, notification_type='booking_confirmed', title='t',
+                      message='m', delivery_method='email')
+        due = Notification.objects.create(**common)
+        Notification.objects.create(next_retry_at=timezone.now() + timedelta(hours=1), **common)
+        self.assertEqual(list(Notification.objects.for_user(user).pending_delivery()), [due])
@@ -0,0 +1,132 @@
+"""Tests for in-memory field change tracking on models."""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.middleware.audit import ActingUserMiddleware
+from booking.models import Booking, BookingHistory, Resource
+from booking.utils.acting_user import acting_as
+from booking.utils.cache_utils import ResourceAvailabilityCache
+
+
+class TestBookingChangeTracking(TestCase):
+    """Test FieldTrackerMixin behaviour on Booking."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='tracker', password='x')
+        self.resource = Resource.objects.create(
+            name='Confocal', resource_type='instrument', location='Lab 1'
+        )
+        start = (timezone.now() + timedelta(days=1)).replace(
+            hour=10, minute=0, second=0, microsecond=0
+        )
+        self.booking = Booking.objects.create(
+            resource=self.resource,
+            user=self.user,
+            title='Imaging',
+            start_time=start,
+            end_time=start + timedelta(hours=2),
+        )
+
+    def test_loaded_instance_has_no_changes(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        self.assertFalse(booking.has_changed('status'))
+        self.assertEqual(booking.get_changes(), {})
+
+    def test_changes_are_reported(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.status = 'approved'
+        self.assertTrue(booking.has_changed('status'))
+        self.assertEqual(booking.get_old_value('status'), 'pending')
+        self.assertEqual(booking.get_changes(), {'status': ('pending', 'approved')})
+
+    def test_snapshot_resets_after_save(self):
+        self.booking.status = 'approved'
+        self.booking.save()
+        self.assertFalse(self.booking.has_changed('status'))
+
+    def test_deferred_fields_are_ignored(self):
+        booking = Booking.objects.only('id', 'status').get(pk=self.booking.pk)
+        self.assertEqual(booking.get_changes(), {})
+        self.assertFalse(booking.has_changed('title'))
+
+    def test_update_does_not_refetch_booking(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.title = 'Live imaging'
+        with CaptureQueriesContext(connection) as ctx:
+            booking.save()
+        booking_selects = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "booking_booking"' in q['sql']
+        ]
+        self.assertEqual(booking_selects, [])
+
+    def test_status_change_is_recorded_in_history(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.status = 'cancelled'
+        booking.save()
+
+        entry = BookingHistory.objects.filter(booking=booking, action='status_changed').get()
+        self.assertEqual(entry.old_values, {'status': 'pending'})
+        self.assertEqual(entry.new_values, {'status': 'cancelled'})
+
+    def test_save_without_changes_writes_no_history(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        before = BookingHistory.objects.count()
+        booking.save()
+        self.assertEqual(BookingHistory.objects.count(), before)
+
+    def test_history_records_the_acting_user(self):
+        technician = User.objects.create_user(username='tech', password='x')
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.status = 'approved'
+        with acting_as(technician):
+            booking.save()
+
+        entry = BookingHistory.objects.filter(booking=booking, action='status_changed').get()
+        self.assertEqual(entry.user, technician)
+
+    def test_history_records_the_request_user(self):
+        technician = User.objects.create_user(username='tech', password='x')
+        request = RequestFactory().post('/')
+        request.user = technician
+
+        def view(request):
+            booking = Booking.objects.get(pk=self.booking.pk)
+            booking.title = 'Live imaging'
+            booking.save()
+            return HttpResponse()
+
+        ActingUserMiddleware(view)(request)
+        entry = BookingHistory.objects.filter(booking=self.booking, action='updated').get()
+        self.assertEqual(entry.user, technician)
+
+    def test_approval_outside_a_request_is_attributed_to_the_approver(self):
+        technician = User.objects.create_user(username='tech', password='x')
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.status = 'approved'
+        booking.approved_by = technician
+        booking.save()
+
+        entry = BookingHistory.objects.filter(booking=booking, action='status_changed').get()
+        self.assertEqual(entry.user, technician)
+
+    def test_moving_a_booking_invalidates_both_days(self):
+        old_day = self.booking.start_time.date().isoformat()
+        new_start = self.booking.start_time + timedelta(days=1)
+        new_day = new_start.date().isoformat()
+        for day in (old_day, new_day):
+            ResourceAvailabilityCache.set_availability(self.resource.pk, day, {'slots': []})
+
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.start_time = new_start
+        booking.end_time = new_start + timedelta(hours=2)
+        booking.save()
+
+        self.assertIsNone(ResourceAvailabilityCache.get_availability(self.resource.pk, old_day))
+        self.assertIsNone(ResourceAvailabilityCache.get_availability(self.resource.pk, new_day))
@@ -0,0 +1,76 @@
+"""Tests for request profiling and query budgets."""
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings, modify_settings
+
+from booking.utils.query_profiling import (
+    QueryBudgetExceeded, capture_profile, normalize_sql, query_budget,
+)
+
+
+class TestQueryProfiling(TestCase):
+    """Test the profile collector and budget helpers."""
+
+    def test_normalize_sql_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            normalize_sql('SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\' LIMIT 21'),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?',
+        )
+
+    def test_profile_counts_queries_and_duplicates(self):
+        User.objects.create_user(username='a', password='x')
+        with capture_profile() as profile:
+            for _ in range(3):
+                User.objects.filter(username='a').exists()
+        self.assertEqual(profile.query_count, 3)
+        self.assertEqual(profile.duplicates()[0]['count'], 3)
+
+    def test_profile_counts_cache_hits_and_misses(self):
+        cache.set('profiling-test', 1)
+        with capture_profile() as profile:
+            cache.get('profiling-test')
+            cache.get('profiling-missing')
+            cache.get_many(['profiling-test', 'profiling-missing'])
+        self.assertEqual((profile.cache_hits, profile.cache_misses), (2, 2))
+
+    def test_query_budget_raises_when_exceeded(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1):
+                User.objects.count()
+                User.objects.count()
+
+    def test_query_budget_decorator(self):
+        @query_budget(3, max_duplicates=1)
+        def lookups():
+            User.objects.count()
+            User.objects.exists()
+
+        lookups()
+
+
+@override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_SERVER_TIMING=True,
+                   PROFILING_DEFAULT_QUERY_BUDGET=0)
+@modify_settings(MIDDLEWARE={'prepend': 'booking.middleware.profiling.RequestProfilingMiddleware'})
+class TestRequestProfilingMiddleware(TestCase):
+    """Test the sampled profiling middleware."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='profiled', password='x')
+        self.client.force_login(self.user)
+
+    def test_profiled_response_has_server_timing_and_log(self):
+        with self.assertLogs('booking.profiling', level='WARNING') as logs:
+            response = self.client.get('/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        payload = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(payload['path'], '/')
+        self.assertGreater(payload['queries'], 0)
+        self.assertIn('view_ms', payload)
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_untouched(self):
+        response = self.client.get('/')
+        self.assertNotIn('Server-Timing', response)
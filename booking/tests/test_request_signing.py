@@ -0,0 +1,115 @@
+"""Tests for database-backed HMAC request signing."""
+import io
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import exceptions
+
+from booking.api.request_signing import HMACAuthentication, body_digest, generate_client_signature
+from booking.models import APISigningKey
+from booking.utils.cache_utils import SigningKeyCache
+
+
+class TestRequestSigning(TestCase):
+    """Test key resolution, body digests and nonce replay protection."""
+
+    url = 'http://testserver/api/v1/bookings/?b=2&a=1'
+
+    def setUp(self):
+        cache.clear()
+        SigningKeyCache.local().clear()
+        self.user = User.objects.create_user(username='logger', password='x')
+        self.key = APISigningKey.generate(self.user, name='Data logger')
+        self.auth = HMACAuthentication()
+
+    def _request(self, body=b'{"reading": 1}', key=None, send_digest=True, **sign_kwargs):
+        key = key or self.key
+        headers = generate_client_signature(
+            'POST', self.url, body=body, api_key_id=key.key_id, secret=key.secret, **sign_kwargs
+        )
+        if not send_digest:
+            del headers['X-Content-SHA256']
+        meta = {f"HTTP_{name.upper().replace('-', '_')}": value
+                for name, value in headers.items() if name != 'Content-Type'}
+        return RequestFactory().post(self.url, data=body, content_type='application/json', **meta)
+
+    def test_signed_request_authenticates_from_cache(self):
+        user, auth = self.auth.authenticate(self._request())
+        self.assertEqual((user, auth['api_key_id']), (self.user, self.key.key_id))
+
+        with CaptureQueriesContext(connection) as queries:
+            user, _ = self.auth.authenticate(self._request(send_digest=False))
+        self.assertEqual(user, self.user)
+        self.assertEqual(len(queries), 0)
+
+        # A new process has an empty LRU but still avoids the database
+        SigningKeyCache.local().clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.auth.authenticate(self._request())
+        self.assertEqual(len(queries), 0)
+
+    def test_replayed_nonce_is_rejected(self):
+        request = self._request(nonce='fixed')
+        self.auth.authenticate(request)
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'nonce already used'):
+            self.auth.authenticate(self._request(nonce='fixed'))
+
+    def test_body_is_covered_by_digest(self):
+        request = self._request()
+        request._body = b'{"reading": 999}'
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'Body digest mismatch'):
+            self.auth.authenticate(request)
+
+        request = self._request(send_digest=False)
+        request._body = b'{"reading": 999}'
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'Invalid signature'):
+            self.auth.authenticate(request)
+
+    def test_file_bodies_are_hashed_in_chunks(self):
+        payload = b'x' * (200 * 1024)
+        self.assertEqual(body_digest(io.BytesIO(payload)), body_digest(payload))
+
+        user, _ = self.auth.authenticate(self._request(body=payload))
+        self.assertEqual(user, self.user)
+
+    def test_revoked_and_expired_keys_are_rejected_immediately(self):
+        self.auth.authenticate(self._request())
+        self.key.revoke()
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'Invalid API key'):
+            self.auth.authenticate(self._request())
+
+        expired = APISigningKey.generate(self.user, expires_in_days=30)
+        self.auth.authenticate(self._request(key=expired))
+        expired.expires_at = timezone.now() - timedelta(minutes=1)
+        expired.save()
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'API key expired'):
+            self.auth.authenticate(self._request(key=expired))
+
+    def test_deactivated_user_is_rejected(self):
+        self.auth.authenticate(self._request())
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'User inactive'):
+            self.auth.authenticate(self._request())
+
+    def test_usage_is_stamped_once_per_interval(self):
+        for _ in range(3):
+            self.auth.authenticate(self._request())
+        self.key.refresh_from_db()
+        self.assertIsNotNone(self.key.last_used_at)
+
+        APISigningKey.objects.filter(pk=self.key.pk).update(last_used_at=None)
+        self.auth.authenticate(self._request())
+        self.key.refresh_from_db()
+        self.assertIsNone(self.key.last_used_at)
+
+    def test_settings_keys_still_work(self):
+        static = APISigningKey(key_id='static', secret='s3cret')
+        with override_settings(API_SIGNING_KEYS={'static': {'secret': 's3cret', 'user_id': self.user.id}}):
+            user, _ = self.auth.authenticate(self._request(key=static))
+        self.assertEqual(user, self.user)
@@ -33,6 +33,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'booking.middleware.audit.ActingUserMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -136,6 +137,9 @@ LAB_BOOKING_ADVANCE_DAYS = 30
 BOOKING_DURATION_LIMIT_HOURS = 24
 BOOKING_REMINDER_HOURS = [24, 2]
 
+# Write audit events immediately so tests can assert on them
+AUDIT_BUFFER_BACKEND = 'sync'
+
 # Backup settings
 BACKUP_ROOT = BASE_DIR / 'test_backups'
 BACKUP_RETENTION_DAYS = 30
@@ -0,0 +1,78 @@
+"""Tests for the set-based training completion cascade."""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from booking.models import AccessRequest, Resource, ResourceTrainingRequirement, TrainingCourse, UserTraining
+from booking.services.training_service import training_satisfaction_service
+
+
+class TestTrainingCascade(TestCase):
+    """Test satisfaction checks, bulk confirmation and cohort sign-off."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='trainer', password='x')
+        self.induction = self._course('IND', 'Lab induction')
+        self.laser = self._course('LAS', 'Laser safety')
+        self.confocal = Resource.objects.create(name='Confocal', resource_type='instrument', location='C1')
+        self.balance = Resource.objects.create(name='Balance', resource_type='equipment', location='C2')
+        for course in (self.induction, self.laser):
+            ResourceTrainingRequirement.objects.create(resource=self.confocal, training_course=course)
+        ResourceTrainingRequirement.objects.create(resource=self.balance, training_course=self.induction)
+
+    def _course(self, code, title):
+        return TrainingCourse.objects.create(
+            code=code, title=title, description=title, duration_hours=2, created_by=self.admin
+        )
+
+    def _trainee(self, name):
+        user = User.objects.create_user(username=name, password='x')
+        for resource in (self.confocal, self.balance):
+            AccessRequest.objects.create(resource=resource, user=user, justification='Research')
+        return user
+
+    def _enrol(self, user, course, status='enrolled'):
+        # certificate_number is unique even when blank, so give each record its own
+        return UserTraining.objects.create(
+            user=user, training_course=course, status=status, certificate_number=f'{course.code}-{user.pk}'
+        )
+
+    def test_request_is_confirmed_only_when_every_mandatory_course_is_done(self):
+        user = self._trainee('ana')
+        self._enrol(user, self.induction).mark_as_completed_by_admin(instructor=self.admin)
+
+        confirmed = dict(AccessRequest.objects.values_list('resource__name', 'lab_training_confirmed'))
+        self.assertEqual(confirmed, {'Balance': True, 'Confocal': False})
+        balance = AccessRequest.objects.get(resource=self.balance)
+        self.assertEqual(balance.lab_training_confirmed_by, self.admin)
+        self.assertIn('Lab induction', balance.lab_training_notes)
+
+        self._enrol(user, self.laser).complete_training(theory_score=95)
+        confocal = AccessRequest.objects.get(resource=self.confocal)
+        self.assertTrue(confocal.lab_training_confirmed)
+        self.assertEqual(confocal.lab_training_confirmed_by, user)
+
+    def test_optional_requirements_are_ignored(self):
+        ResourceTrainingRequirement.objects.filter(training_course=self.laser).update(is_mandatory=False)
+        user = self._trainee('ben')
+        self._enrol(user, self.induction).mark_as_completed_by_admin()
+        self.assertEqual(AccessRequest.objects.filter(lab_training_confirmed=True).count(), 2)
+
+    def test_cohort_sign_off_runs_in_constant_queries(self):
+        def sign_off(count, prefix):
+            trainees = [self._trainee(f'{prefix}{i}') for i in range(count)]
+            for user in trainees:
+                self._enrol(user, self.laser, status='completed')
+            records = [self._enrol(user, self.induction) for user in trainees]
+            with CaptureQueriesContext(connection) as queries:
+                completed = training_satisfaction_service.complete_trainings(
+                    UserTraining.objects.filter(pk__in=[record.pk for record in records]),
+                    instructor=self.admin, notes='Induction session'
+                )
+            self.assertEqual(completed, count)
+            return len(queries)
+
+        self.assertEqual(sign_off(3, 'small'), sign_off(20, 'large'))
+        self.assertEqual(AccessRequest.objects.filter(lab_training_confirmed=True).count(), 46)
+        self.assertFalse(UserTraining.objects.filter(training_course=self.induction).exclude(status='completed'))
@@ -0,0 +1,175 @@
+"""Tests for queryset-level training/risk assessment validity and the expiry sweep."""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.models import (
+    Notification, Resource, ResourceTrainingRequirement, RiskAssessment, TrainingCourse,
+    UserRiskAssessment, UserTraining,
+)
+from booking.services.expiry_service import ExpirySweepService
+from booking.services.training_service import training_satisfaction_service
+from booking.tasks import expire_training_and_assessments
+
+
+class TestTrainingExpiry(TestCase):
+    """Test that the querysets agree with the properties and the sweep expires in bulk."""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.admin = User.objects.create_user(username='admin', password='x')
+        self.resource = Resource.objects.create(name='Laser', resource_type='instrument', location='L1')
+        self.safety = self._course('SAF', 'Laser safety')
+        self.optics = self._course('OPT', 'Optics')
+        for course in (self.safety, self.optics):
+            ResourceTrainingRequirement.objects.create(resource=self.resource, training_course=course)
+        self.assessment = self._assessment('Class 4 laser', approved_at=self.now)
+
+    def _course(self, code, title):
+        return TrainingCourse.objects.create(
+            code=code, title=title, description=title, duration_hours=1, created_by=self.admin
+        )
+
+    def _assessment(self, title, **fields):
+        fields.setdefault('valid_until', date.today() + timedelta(days=365))
+        return RiskAssessment.objects.create(
+            title=title, resource=self.resource, description=title, created_by=self.admin, **fields
+        )
+
+    def _training(self, user, course, status='completed', passed=True, expires_in=None):
+        expires_at = self.now + timedelta(days=expires_in) if expires_in is not None else None
+        return UserTraining.objects.create(
+            user=user, training_course=course, status=status, passed=passed, expires_at=expires_at,
+            certificate_number=f'{course.code}-{user.pk}-{status}',
+        )
+
+    def _user(self, name):
+        return User.objects.create_user(username=name, password='x')
+
+    def test_querysets_match_properties(self):
+        user = self._user('ada')
+        other = self._user('bob')
+        records = [
+            self._training(user, self.safety, expires_in=30),
+            self._training(user, self.optics, expires_in=-1),
+            self._training(other, self.safety, expires_in=None),
+            self._training(other, self.optics, passed=False),
+            self._training(other, self.optics, status='enrolled', expires_in=-5),
+        ]
+        self.assertEqual(set(UserTraining.objects.valid()), {r for r in records if r.is_valid})
+        self.assertEqual(set(UserTraining.objects.expired()), {r for r in records if r.is_expired})
+
+        completions = [
+            UserRiskAssessment.objects.create(user=user, risk_assessment=self.assessment, status='approved',
+                                              expires_at=self.now - timedelta(hours=1)),
+            UserRiskAssessment.objects.create(user=other, risk_assessment=self.assessment, status='approved'),
+        ]
+        self.assertEqual(set(UserRiskAssessment.objects.valid()), {c for c in completions if c.is_valid})
+
+        assessments = [
+            self.assessment,
+            self._assessment('Unapproved'),
+            self._assessment('Lapsed', approved_at=self.now - timedelta(days=100), review_frequency_months=3,
+                             valid_until=date.today() - timedelta(days=1)),
+            self._assessment('Yearly', approved_at=self.now - timedelta(days=100), review_frequency_months=12),
+        ]
+        self.assertEqual(set(RiskAssessment.objects.due_for_review()),
+                         {a for a in assessments if a.is_due_for_review})
+        self.assertEqual(set(RiskAssessment.objects.expired()), {a for a in assessments if a.is_expired})
+
+    def test_sweep_expires_with_one_update_per_model(self):
+        users = [self._user(f'user{i}') for i in range(3)]
+        for user in users:
+            self._training(user, self.safety, expires_in=-1)
+            self._training(user, self.optics, expires_in=-2)
+            UserRiskAssessment.objects.create(user=user, risk_assessment=self.assessment, status='approved',
+                                              expires_at=self.now - timedelta(days=1))
+        current = self._training(self._user('current'), self.safety, expires_in=10)
+        # An older expired record for the same course is kept alongside the new lapse
+        earlier = self._training(users[0], self.safety, status='expired')
+        UserTraining.objects.filter(pk=earlier.pk).update(expires_at=self.now - timedelta(days=400))
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = ExpirySweepService().sweep()
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+
+        self.assertEqual((summary['expired_training'], summary['expired_assessments']), (6, 3))
+        self.assertEqual(UserTraining.objects.filter(status='expired').count(), 7)
+        self.assertTrue(UserTraining.objects.filter(pk=earlier.pk, status='expired').exists())
+        self.assertFalse(UserTraining.objects.filter(status='completed', expires_at__lt=self.now).exists())
+        self.assertFalse(UserRiskAssessment.objects.filter(status='approved').exists())
+        current.refresh_from_db()
+        self.assertEqual(current.status, 'completed')
+
+        # One grouped email per user and kind
+        emails = Notification.objects.filter(delivery_method='email', notification_type='training_expiring')
+        self.assertEqual(emails.count(), 3)
+        self.assertEqual(emails.get(user=users[1]).metadata['expired'], ['Laser safety', 'Optics'])
+
+        self.assertEqual(ExpirySweepService().sweep()['expired_training'], 0)
+
+    def test_second_lapse_is_swept_and_history_kept(self):
+        user = self._user('ada')
+        first = self._training(user, self.safety, expires_in=-10)
+        ExpirySweepService().sweep(notify=False)
+
+        renewed = UserTraining.objects.create(
+            user=user, training_course=self.safety, status='completed', passed=True,
+            expires_at=self.now - timedelta(days=1), certificate_number='SAF-renewed',
+        )
+        self.assertEqual(ExpirySweepService().sweep(notify=False)['expired_training'], 1)
+        self.assertEqual(set(UserTraining.objects.filter(user=user, status='expired')), {first, renewed})
+
+    def test_active_records_stay_unique(self):
+        user = self._user('ada')
+        self._training(user, self.safety)
+        with self.assertRaises(IntegrityError):
+            UserTraining.objects.create(user=user, training_course=self.safety, status='completed',
+                                        certificate_number='SAF-duplicate')
+
+    def test_approval_progress_uses_valid_training(self):
+        user = self._user('ada')
+        self._training(user, self.safety, expires_in=30)
+        self._training(user, self.optics, expires_in=-1)
+        self.resource.requires_risk_assessment = True
+        self.resource.save()
+        UserRiskAssessment.objects.create(user=user, risk_assessment=self.assessment, status='approved',
+                                          expires_at=self.now - timedelta(days=1))
+
+        progress = self.resource.get_approval_progress(user)
+        stages = {stage['key']: stage for stage in progress['stages']}
+        self.assertEqual(stages['training']['details']['completed'], ['Laser safety'])
+        self.assertEqual(stages['training']['details']['pending'], ['Optics'])
+        self.assertEqual(stages['risk_assessment']['details']['pending'], ['Class 4 laser'])
+
+        def progress_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.resource.get_approval_progress(user)
+            return len(queries)
+
+        before = progress_queries()
+        ResourceTrainingRequirement.objects.create(resource=self.resource,
+                                                   training_course=self._course('EXT', 'Extraction'))
+        self.assertEqual(progress_queries(), before)
+
+    def test_qualified_users_is_one_query(self):
+        ada, bob, cy = self._user('ada'), self._user('bob'), self._user('cy')
+        for user in (ada, bob):
+            self._training(user, self.safety, expires_in=30)
+        self._training(ada, self.optics)
+        self._training(bob, self.optics, expires_in=-1)
+        self._training(cy, self.safety)
+
+        with self.assertNumQueries(1):
+            qualified = list(training_satisfaction_service.qualified_users(self.resource))
+        self.assertEqual(qualified, [ada])
+
+    def test_task_reports_counts(self):
+        self._training(self._user('ada'), self.safety, expires_in=-1)
+        self.assertEqual(expire_training_and_assessments(),
+                         'Expired 1 training records and 0 risk assessments')
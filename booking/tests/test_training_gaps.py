@@ -0,0 +1,149 @@
+"""Tests for set-based training gaps and in-memory session slot finding."""
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.models import (
+    AccessRequest, Booking, Resource, ResourceTrainingRequirement, TrainingCourse, UserTraining,
+)
+from booking.services.training_service import training_gap_service, training_slot_finder
+
+
+class TestTrainingGaps(TestCase):
+    """Test missing-course computation for users and cohorts."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='trainer', password='x')
+        self.induction = self._course('IND', 'Lab induction')
+        self.laser = self._course('LAS', 'Laser safety')
+        self.optics = self._course('OPT', 'Optics')
+        self.confocal = Resource.objects.create(name='Confocal', resource_type='instrument', location='C1')
+        self.balance = Resource.objects.create(name='Balance', resource_type='equipment', location='C2')
+        for order, course in enumerate((self.induction, self.laser)):
+            ResourceTrainingRequirement.objects.create(resource=self.confocal, training_course=course, order=order)
+        ResourceTrainingRequirement.objects.create(resource=self.confocal, training_course=self.optics,
+                                                   is_mandatory=False)
+        ResourceTrainingRequirement.objects.create(resource=self.balance, training_course=self.induction)
+
+    def _course(self, code, title):
+        return TrainingCourse.objects.create(
+            code=code, title=title, description=title, duration_hours=2, created_by=self.admin
+        )
+
+    def _trainee(self, name):
+        user = User.objects.create_user(username=name, password='x')
+        for resource in (self.confocal, self.balance):
+            AccessRequest.objects.create(resource=resource, user=user, justification='Research')
+        return user
+
+    def _complete(self, user, course, expires_in=None):
+        expires_at = timezone.now() + timedelta(days=expires_in) if expires_in is not None else None
+        return UserTraining.objects.create(
+            user=user, training_course=course, status='completed', passed=True, expires_at=expires_at,
+            certificate_number=f'{course.code}-{user.pk}',
+        )
+
+    @staticmethod
+    def _summary(gaps):
+        return [(gap['user'].username, gap['resource'].name, gap['training_course'].code) for gap in gaps]
+
+    def test_missing_courses_for_a_user(self):
+        user = self._trainee('ana')
+        self._complete(user, self.laser, expires_in=-1)
+
+        with self.assertNumQueries(2):
+            gaps = training_gap_service.missing_courses(user)
+        self.assertEqual(self._summary(gaps), [
+            ('ana', 'Balance', 'IND'),
+            ('ana', 'Confocal', 'IND'),
+            ('ana', 'Confocal', 'LAS'),
+        ])
+        self.assertEqual(gaps[0]['access_request'].resource, self.balance)
+
+        self._complete(user, self.induction)
+        self.assertEqual(self._summary(training_gap_service.missing_courses(user)),
+                         [('ana', 'Confocal', 'LAS')])
+
+    def test_cohort_gaps_cost_two_queries(self):
+        cohort = [self._trainee(f'user{i}') for i in range(6)]
+        for user in cohort[::2]:
+            self._complete(user, self.induction)
+        AccessRequest.objects.filter(user=cohort[1], resource=self.confocal).update(lab_training_confirmed=True)
+
+        with self.assertNumQueries(2):
+            gaps = training_gap_service.missing_courses(User.objects.filter(pk__in=[u.pk for u in cohort]))
+
+        expected = set()
+        for user in cohort:
+            for access_request in AccessRequest.objects.filter(user=user, lab_training_confirmed=False):
+                for requirement in access_request.resource.training_requirements.filter(is_mandatory=True):
+                    if not UserTraining.objects.filter(user=user, training_course=requirement.training_course).valid().exists():
+                        expected.add((user.username, access_request.resource.name, requirement.training_course.code))
+        self.assertEqual(set(self._summary(gaps)), expected)
+        self.assertEqual(len(gaps), len(expected))
+
+    def test_no_pending_requests(self):
+        user = User.objects.create_user(username='idle', password='x')
+        with self.assertNumQueries(1):
+            self.assertEqual(training_gap_service.missing_courses(user), [])
+
+
+class TestTrainingSlotFinder(TestCase):
+    """Test that slot finding reads bookings once and matches per-day probing."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', password='x')
+        self.resource = Resource.objects.create(name='Confocal', resource_type='instrument', location='C1')
+        self.start = timezone.make_aware(datetime(2031, 3, 3, 10, 0))
+        self.duration = timedelta(hours=2)
+
+    def _book(self, day, start_hour, hours, status='approved'):
+        start = self.start.replace(hour=start_hour) + timedelta(days=day)
+        return Booking(resource=self.resource, user=self.user, title='Run', status=status,
+                       start_time=start, end_time=start + timedelta(hours=hours))
+
+    def _probe(self, candidates, step):
+        """The old one-query-per-candidate search, as a reference."""
+        for offset in range(candidates):
+            candidate = self.start + step * offset
+            if not Booking.objects.filter(
+                resource=self.resource, status__in=['approved', 'pending'],
+                start_time__lt=candidate + self.duration, end_time__gt=candidate,
+            ).exists():
+                return candidate
+        return None
+
+    def test_matches_per_day_probing_in_one_query(self):
+        Booking.objects.bulk_create([
+            self._book(0, 9, 2),
+            self._book(0, 11, 3),  # Touches the first booking; merged into one busy period
+            self._book(1, 11, 1, status='pending'),
+            self._book(2, 8, 1),
+            self._book(2, 11, 1, status='cancelled'),
+            self._book(3, 12, 1),
+        ])
+        with self.assertNumQueries(1):
+            slot = training_slot_finder.next_free_slot(self.resource, self.start, self.duration)
+        self.assertEqual(slot, self.start + timedelta(days=2))
+        self.assertEqual(slot, self._probe(30, timedelta(days=1)))
+
+        with self.assertNumQueries(1):
+            hourly = training_slot_finder.next_free_slot(
+                self.resource, self.start, self.duration, candidates=168, step=timedelta(hours=1)
+            )
+        self.assertEqual(hourly, self.start + timedelta(hours=4))
+        self.assertEqual(hourly, self._probe(168, timedelta(hours=1)))
+
+    def test_free_start_is_returned_unchanged(self):
+        Booking.objects.bulk_create([self._book(0, 12, 1)])
+        self.assertEqual(training_slot_finder.next_free_slot(self.resource, self.start, self.duration),
+                         self.start)
+
+    def test_fully_booked_horizon(self):
+        Booking.objects.bulk_create([self._book(day, 0, 24) for day in range(3)])
+        self.assertIsNone(training_slot_finder.next_free_slot(self.resource, self.start, self.duration,
+                                                              candidates=3))
+        self.assertEqual(training_slot_finder.next_free_slot(self.resource, self.start, self.duration,
+                                                             candidates=4), self.start + timedelta(days=3))
@@ -0,0 +1,142 @@
+"""Tests for the multi-granularity usage rollups."""
+from datetime import datetime, timedelta
+from importlib import import_module
+
+from django.apps import apps
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.models import Booking, Department, Faculty, College, Resource, UsageRollup, UserProfile
+from booking.services.checkin_service import CheckInService
+from booking.services.maintenance_service import MaintenancePredictionService
+from booking.services.usage_rollups import UsageRollupService, period_start
+
+
+class TestUsageRollups(TestCase):
+    """Test incremental updates, rebuilds, range tiling and weighted ratios."""
+
+    def setUp(self):
+        self.service = UsageRollupService()
+        faculty = Faculty.objects.create(name='Science', code='SCI')
+        college = College.objects.create(name='Chemistry', code='CHEM', faculty=faculty)
+        self.department = Department.objects.create(name='Analytical', code='ANA', college=college)
+        self.user = User.objects.create_user(username='analyst', password='x')
+        UserProfile.objects.filter(user=self.user).update(department=self.department, role='researcher')
+        self.resource = Resource.objects.create(name='HPLC', resource_type='instrument', location='B2')
+        self.tomorrow = (timezone.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def _finish(self, start, minutes=60, used=60, no_show=False):
+        """Create a booking, then move it to ``start`` and mark it finished."""
+        booking = Booking.objects.create(
+            resource=self.resource, user=self.user, title='Run', status='approved',
+            start_time=self.tomorrow, end_time=self.tomorrow + timedelta(hours=1),
+        )
+        fields = {'start_time': start, 'end_time': start + timedelta(minutes=minutes), 'status': 'completed'}
+        if no_show:
+            fields['no_show'] = True
+        else:
+            fields.update(
+                checked_in_at=start, actual_start_time=start,
+                checked_out_at=start + timedelta(minutes=used), actual_end_time=start + timedelta(minutes=used),
+            )
+        Booking.objects.filter(pk=booking.pk).update(**fields)
+        return Booking.objects.get(pk=booking.pk)
+
+    def _local(self, *args):
+        return timezone.make_aware(datetime(*args))
+
+    def test_record_updates_every_granularity(self):
+        start = self._local(2025, 3, 12, 10)
+        self.service.record([self._finish(start, used=45), self._finish(start + timedelta(minutes=90))])
+
+        for granularity in ('hour', 'day', 'week', 'month'):
+            rows = UsageRollup.objects.filter(granularity=granularity)
+            self.assertEqual(sum(row.bookings for row in rows), 2, granularity)
+        cell = UsageRollup.objects.get(granularity='day')
+        self.assertEqual(cell.period_start, self._local(2025, 3, 12))
+        self.assertEqual((cell.department, cell.user_type), (self.department, 'researcher'))
+        self.assertEqual((cell.booked_minutes, cell.actual_minutes, cell.wasted_minutes), (120, 105, 15))
+        self.assertEqual(UsageRollup.objects.get(granularity='week').period_start, self._local(2025, 3, 10))
+
+    def test_summary_weights_ratios_by_minutes(self):
+        # One busy day and one idle no-show day: efficiency is 240 / 300,
+        # not the mean of the daily ratios (1.0 and 0.0)
+        day = self._local(2025, 3, 12, 9)
+        self.service.record([self._finish(day, minutes=240, used=240),
+                             self._finish(day + timedelta(days=1), minutes=60, no_show=True)])
+
+        summary = self.service.summary(self._local(2025, 3, 12), self._local(2025, 3, 14), resource=self.resource)
+        self.assertEqual((summary['total_bookings'], summary['no_show_bookings']), (2, 1))
+        self.assertAlmostEqual(summary['avg_efficiency'], 240 / 300)
+        self.assertAlmostEqual(summary['avg_utilization'], 240 / (2 * 540))
+        self.assertEqual(summary['completion_rate'], 50)
+
+    def test_ranges_are_tiled_with_coarsest_rows(self):
+        segments = self.service.tile(self._local(2025, 1, 30, 22, 30), self._local(2025, 4, 2, 3))
+        self.assertEqual(segments, [
+            ('hour', self._local(2025, 1, 30, 22), self._local(2025, 1, 31)),
+            ('hour', self._local(2025, 4, 2), self._local(2025, 4, 2, 3)),
+            ('day', self._local(2025, 1, 31), self._local(2025, 2, 1)),
+            ('day', self._local(2025, 4, 1), self._local(2025, 4, 2)),
+            ('month', self._local(2025, 2, 1), self._local(2025, 4, 1)),
+        ])
+
+        starts = [self._local(2025, 1, 30, 23), self._local(2025, 2, 14, 10), self._local(2025, 4, 2, 2),
+                  self._local(2025, 4, 2, 5)]
+        self.service.record([self._finish(start) for start in starts])
+        totals = self.service.totals(self._local(2025, 1, 30, 22, 30), self._local(2025, 4, 2, 3))
+        self.assertEqual(totals['bookings'], 3)
+
+    def test_rebuild_matches_incremental_updates(self):
+        bookings = [self._finish(self._local(2025, 2, 27, 9) + timedelta(days=i, hours=i % 3), used=30 + i)
+                    for i in range(6)]
+        self.service.record(bookings)
+        incremental = sorted(UsageRollup.objects.values_list(
+            'granularity', 'period_start', 'bookings', 'booked_minutes', 'actual_minutes'))
+
+        self.assertEqual(self.service.rebuild(), len(incremental))
+        rebuilt = sorted(UsageRollup.objects.values_list(
+            'granularity', 'period_start', 'bookings', 'booked_minutes', 'actual_minutes'))
+        self.assertEqual(rebuilt, incremental)
+
+        # A partial rebuild from mid-March keeps February's month and the
+        # week straddling both months intact
+        self.service.rebuild(since=self._local(2025, 3, 15))
+        self.assertEqual(sorted(UsageRollup.objects.values_list(
+            'granularity', 'period_start', 'bookings', 'booked_minutes', 'actual_minutes')), incremental)
+
+    def test_migration_backfills_existing_bookings(self):
+        self.service.record([self._finish(self._local(2025, 2, 27, 9) + timedelta(days=i), used=40)
+                             for i in range(4)])
+        self._finish(self._local(2025, 3, 4, 11), no_show=True)
+        self.service.record([Booking.objects.latest('pk')])
+        recorded = sorted(UsageRollup.objects.values_list(
+            'granularity', 'period_start', 'department', 'user_type', 'bookings', 'no_show_bookings',
+            'booked_minutes', 'actual_minutes', 'wasted_minutes'))
+
+        UsageRollup.objects.all().delete()
+        import_module('booking.migrations.0030_usage_rollups').backfill_usage_rollups(apps, None)
+        self.assertEqual(sorted(UsageRollup.objects.values_list(
+            'granularity', 'period_start', 'department', 'user_type', 'bookings', 'no_show_bookings',
+            'booked_minutes', 'actual_minutes', 'wasted_minutes')), recorded)
+
+    def test_checkout_records_rollups(self):
+        booking = self._finish(timezone.now() - timedelta(hours=1))
+        CheckInService()._update_usage_analytics(booking)
+
+        analytics = CheckInService().get_usage_analytics(resource=self.resource)
+        self.assertEqual((analytics['total_bookings'], analytics['completed_bookings']), (1, 1))
+
+    def test_maintenance_predictor_reads_weekly_rollups(self):
+        monday = period_start(timezone.now() - timedelta(weeks=1), 'week')
+        self.service.record([
+            self._finish(monday + timedelta(days=day, hours=8), minutes=540, used=540) for day in range(5)
+        ])
+
+        predictor = MaintenancePredictionService()
+        predictor._create_alert = lambda **alert: alert
+        alerts = predictor._analyze_usage_patterns(self.resource)
+        self.assertEqual([alert['actual_value'] for alert in alerts], [45.0])
+        self.assertEqual(alerts[0]['title'], f"High Usage Week {monday.isocalendar()[1]}")
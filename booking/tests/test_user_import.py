@@ -0,0 +1,113 @@
+"""Tests for the bulk CSV user import engine."""
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from booking.management.commands.admin.import_users_csv import Command as ImportUsersCommand
+from booking.models import College, Department, Faculty, NotificationPreference, UserProfile
+from booking.services.user_import import UserImportService
+
+HEADER = 'username,email,first_name,last_name,role,faculty_code,college_code,department_code\n'
+
+
+class TestUserImport(TestCase):
+    """Test validation, bulk writes, dry runs and the command and view."""
+
+    def setUp(self):
+        self.service = UserImportService()
+        faculty = Faculty.objects.create(name='Science', code='SCI')
+        college = College.objects.create(name='Chemistry', code='CHEM', faculty=faculty)
+        self.department = Department.objects.create(name='Analytical', code='ANA', college=college)
+
+    def _csv(self, *lines):
+        return io.StringIO(HEADER + ''.join(f'{line}\n' for line in lines))
+
+    def _students(self, count, prefix='s'):
+        return [f'{prefix}{i},{prefix}{i}@uni.ac.uk,Stu,Dent{i},student,SCI,CHEM,ANA' for i in range(count)]
+
+    def test_users_and_profiles_are_created_in_bulk(self):
+        with mock.patch('booking.services.user_import.make_password', wraps=make_password) as hasher:
+            result = self.service.import_csv(self._csv(*self._students(3)), password='Welcome1!',
+                                             profile_defaults={'is_inducted': True})
+        self.assertEqual(hasher.call_count, 1)
+        self.assertEqual((result['created'], result['errors']), (3, []))
+
+        user = User.objects.get(username='s1')
+        self.assertTrue(user.check_password('Welcome1!'))
+        profile = user.userprofile
+        self.assertEqual((profile.role, profile.department, profile.is_inducted), ('student', self.department, True))
+        self.assertEqual(profile.college, self.department.college)
+        self.assertTrue(NotificationPreference.objects.filter(user=user).exists())
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def run(count, prefix):
+            with CaptureQueriesContext(connection) as queries:
+                self.service.import_csv(self._csv(*self._students(count, prefix)), password='x')
+            return len(queries)
+
+        self.assertEqual(run(3, 'a'), run(10, 'b'))
+        self.assertEqual(UserProfile.objects.filter(role='student').count(), 13)
+
+    def test_rows_are_reported_individually(self):
+        User.objects.create_user(username='taken', email='taken@uni.ac.uk', password='x')
+        result = self.service.import_csv(self._csv(
+            'ok,ok@uni.ac.uk,A,B,student,,,',
+            'ok,other@uni.ac.uk,A,B,student,,,',            # duplicate username in file
+            'thief,taken@uni.ac.uk,A,B,student,,,',         # email of another user
+            'bad,bad@uni.ac.uk,A,B,wizard,,,',              # invalid role
+            'lost,lost@uni.ac.uk,A,B,student,SCI,CHEM,XYZ',  # unknown department
+            'taken,taken@uni.ac.uk,A,B,student,,,',
+        ), chunk_size=2)
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([(error['row'], error['username']) for error in result['errors']],
+                         [(3, 'ok'), (5, 'bad'), (4, 'thief')])
+        self.assertEqual(result['warnings'][0]['warning'], 'Department not found: XYZ')
+        self.assertEqual(result['skipped'], [{'row': 7, 'username': 'taken'}])
+        self.assertIsNone(User.objects.get(username='lost').userprofile.department)
+
+    def test_update_existing_keeps_blank_cells(self):
+        user = User.objects.create_user(username='pat', email='pat@uni.ac.uk', first_name='Pat', password='x')
+        result = self.service.import_csv(self._csv('pat,,,Lee,researcher,SCI,,'), update_existing=True)
+
+        self.assertEqual(result['updated'], 1)
+        user.refresh_from_db()
+        self.assertEqual((user.email, user.first_name, user.last_name), ('pat@uni.ac.uk', 'Pat', 'Lee'))
+        self.assertEqual(user.userprofile.role, 'researcher')
+        self.assertTrue(user.check_password('x'))
+
+    def test_dry_run_writes_nothing(self):
+        users = User.objects.count()
+        result = self.service.import_csv(self._csv(*self._students(5)), dry_run=True)
+        self.assertEqual(result['created'], 5)
+        self.assertEqual(User.objects.count(), users)
+
+    def test_command_imports_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(self._csv(*self._students(2)).getvalue())
+        self.addCleanup(os.remove, handle.name)
+
+        out = io.StringIO()
+        call_command(ImportUsersCommand(), handle.name, '--default-password=Start123!', stdout=out)
+        self.assertIn('Created: 2 users', out.getvalue())
+        self.assertTrue(User.objects.get(username='s0').userprofile.email_verified)
+
+    def test_web_import_reports_existing_users(self):
+        admin = User.objects.create_user(username='labadmin', password='x', is_staff=True)
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile('users.csv', self._csv('new,new@uni.ac.uk,N,U,,,,', 'labadmin,,,,,,,').getvalue().encode())
+
+        data = self.client.post(reverse('booking:lab_admin_users_bulk_import'), {'csv_file': upload}).json()
+        self.assertEqual((data['success'], data['created']), (True, 1))
+        self.assertEqual(data['errors'], ['Row 3: User labadmin already exists'])
+        self.assertEqual(User.objects.get(username='new').userprofile.role, 'researcher')
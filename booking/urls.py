@@ -29,6 +29,7 @@ urlpatterns = [
     path('resources/<int:resource_id>/', views.resource_detail_view, name='resource_detail'),
     path('resources/<int:resource_id>/request-access/', views.request_resource_access_view, name='request_resource_access'),
     path('resources/<int:resource_id>/upload-risk-assessment/', views.upload_risk_assessment_view, name='upload_risk_assessment'),
+    path('thumbnails/<int:width>x<int:height>/<path:path>', views.image_thumbnail_view, name='image_thumbnail'),
     path('verify-email/<uuid:token>/', views.verify_email_view, name='verify_email'),
     path('resend-verification/', views.resend_verification_view, name='resend_verification'),
     
@@ -194,6 +195,7 @@ urlpatterns = [
     path('calendar/export/', calendar.export_my_calendar_view, name='export_my_calendar'),
     path('calendar/feed/<str:token>/', calendar.my_calendar_feed_view, name='my_calendar_feed'),
     path('calendar/public/<str:token>/', calendar.public_calendar_feed_view, name='public_calendar_feed'),
+    path('calendar/token/regenerate/', calendar.regenerate_calendar_token_view, name='regenerate_calendar_token'),
     path('calendar/resource/<int:resource_id>/export/', calendar.export_resource_calendar_view, name='export_resource_calendar'),
     path('calendar/sync-settings/', calendar.calendar_sync_settings_view, name='calendar_sync_settings'),
     
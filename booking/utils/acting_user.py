@@ -0,0 +1,58 @@
+# booking/utils/acting_user.py
+"""
+Who is making the current change, for audit trails.
+
+Model signal handlers only see the instance being saved, so they can't tell
+the booking's owner from the technician who approved it. ``ActingUserMiddleware``
+remembers the current request, and ``get_acting_user()`` returns its
+authenticated user. The request itself is stored rather than its user, so
+users authenticated later by DRF (token or session auth in the view) are
+seen too.
+
+Code running outside a request (tasks, commands) can name the actor:
+
+    with acting_as(technician):
+        booking.save()
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_request: ContextVar = ContextVar('booking_current_request', default=None)
+_acting_user: ContextVar = ContextVar('booking_acting_user', default=None)
+
+
+def get_acting_user():
+    """The user making the current change, or None if it isn't known."""
+    user = _acting_user.get()
+    if user is not None:
+        return user
+    request = _current_request.get()
+    user = getattr(request, 'user', None) if request is not None else None
+    if user is not None and user.is_authenticated:
+        return user
+    return None
+
+
+@contextmanager
+def acting_as(user):
+    """Attribute changes made inside the block to ``user``."""
+    token = _acting_user.set(user)
+    try:
+        yield user
+    finally:
+        _acting_user.reset(token)
+
+
+@contextmanager
+def request_context(request):
+    """Make ``request`` the source of the acting user inside the block."""
+    token = _current_request.set(request)
+    try:
+        yield request
+    finally:
+        _current_request.reset(token)
@@ -0,0 +1,351 @@
+# booking/utils/audit_buffer.py
+"""
+Buffered, batched writer for audit and security events.
+
+Audit rows (AuditLog, DataAccessLog, AdminAction, SecurityEvent,
+BookingHistory) used to be written with one INSERT per event inside the
+request. This module collects unsaved model instances and writes them with
+``bulk_create`` once a size or age threshold is reached, when the request
+finishes, or when the process exits.
+
+Buffered events are queued with ``transaction.on_commit``: an event only
+enters the buffer once the transaction that recorded it has committed, so
+the rows it references exist when it is written, and events recorded in a
+transaction that rolls back are discarded with it.
+
+Backends (``AUDIT_BUFFER_BACKEND``):
+    - ``sync``: write immediately, inside the caller's transaction (the
+      default; durable without extra infrastructure)
+    - ``redis``: events are pushed to a Redis list on commit and drained
+      by the ``flush_audit_events`` Celery task, so they survive worker
+      restarts and crashes. A drain moves each batch to its own processing
+      list and deletes that only once the rows are written; processing
+      lists left behind by a killed worker are put back on the queue
+    - ``memory``: per-thread buffer, flushed at request end and at exit;
+      events still buffered when a process crashes are lost
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import atexit
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 5  # seconds
+DEFAULT_REDIS_KEY = 'labitory:audit:events'
+# Seconds a drain may hold a batch before it is presumed dead and the batch
+# re-queued; far longer than writing one batch takes
+DEFAULT_REDIS_LEASE = 600
+
+# Days to keep each audit table before pruning
+DEFAULT_RETENTION_DAYS = {
+    'booking.AuditLog': 365,
+    'booking.DataAccessLog': 365,
+    'booking.AdminAction': 730,
+    'booking.SecurityEvent': 365,
+    'booking.LoginAttempt': 180,
+}
+
+
+def _get_setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+class _EventEncoder(DjangoJSONEncoder):
+    """JSON encoder that keeps full microsecond precision on datetimes."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def serialize_event(instance) -> str:
+    """Serialize an unsaved model instance to a JSON payload."""
+    fields = {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if not field.primary_key
+    }
+    return json.dumps(
+        {'model': instance._meta.label, 'fields': fields},
+        cls=_EventEncoder,
+    )
+
+
+def deserialize_event(payload):
+    """Rebuild an unsaved model instance from a JSON payload."""
+    if isinstance(payload, bytes):
+        payload = payload.decode('utf-8')
+    data = json.loads(payload)
+    model = apps.get_model(data['model'])
+    fields = {}
+    for field in model._meta.concrete_fields:
+        if field.attname in data['fields']:
+            fields[field.attname] = field.to_python(data['fields'][field.attname])
+    return model(**fields)
+
+
+def write_events(instances: List) -> int:
+    """
+    Insert audit instances grouped by model with ``bulk_create``.
+
+    If a batch fails (e.g. a row references an object that was rolled
+    back), rows are retried one by one so a single bad event does not
+    drop the rest of the batch.
+    """
+    by_model: Dict[type, List] = defaultdict(list)
+    for instance in instances:
+        by_model[type(instance)].append(instance)
+
+    written = 0
+    for model, rows in by_model.items():
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(rows, batch_size=500)
+            written += len(rows)
+        except IntegrityError:
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        row.save(force_insert=True)
+                    written += 1
+                except IntegrityError as e:
+                    logger.error(f"Dropped {model.__name__} audit event: {e}")
+    return written
+
+
+class AuditEventBuffer:
+    """
+    Batches audit event inserts.
+
+    The in-memory buffer is per thread, so a request only ever flushes the
+    events it recorded itself.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._redis = None
+
+    @property
+    def backend(self) -> str:
+        return _get_setting('AUDIT_BUFFER_BACKEND', 'sync')
+
+    @property
+    def max_size(self) -> int:
+        return _get_setting('AUDIT_BUFFER_MAX_SIZE', DEFAULT_MAX_SIZE)
+
+    @property
+    def flush_interval(self) -> float:
+        return _get_setting('AUDIT_BUFFER_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+    @property
+    def redis_key(self) -> str:
+        return _get_setting('AUDIT_BUFFER_REDIS_KEY', DEFAULT_REDIS_KEY)
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            url = _get_setting(
+                'AUDIT_BUFFER_REDIS_URL',
+                _get_setting('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+            )
+            self._redis = redis.from_url(url)
+        return self._redis
+
+    @property
+    def _events(self) -> List:
+        if not hasattr(self._local, 'events'):
+            self._local.events = []
+            self._local.oldest = None
+        return self._local.events
+
+    def add(self, instance):
+        """Queue an unsaved audit model instance for writing."""
+        backend = self.backend
+
+        if backend == 'sync':
+            write_events([instance])
+            return instance
+
+        # Outside a transaction this runs at once; inside one, only on commit
+        transaction.on_commit(partial(self._enqueue, backend, instance))
+        return instance
+
+    def _enqueue(self, backend: str, instance):
+        if backend == 'redis':
+            try:
+                self._get_redis().rpush(self.redis_key, serialize_event(instance))
+            except Exception as e:
+                logger.error(f"Redis audit buffer unavailable, writing directly: {e}")
+                write_events([instance])
+            return
+
+        events = self._events
+        if self._local.oldest is None:
+            self._local.oldest = time.monotonic()
+        events.append(instance)
+        if (len(events) >= self.max_size
+                or time.monotonic() - self._local.oldest >= self.flush_interval):
+            self.flush()
+
+    def pending(self) -> int:
+        """Number of events waiting in this thread's buffer."""
+        return len(self._events)
+
+    def flush(self) -> int:
+        """Write all events buffered by this thread."""
+        events = self._events
+        if not events:
+            return 0
+        self._local.events, self._local.oldest = [], None
+        try:
+            return write_events(events)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(events)} audit events: {e}")
+            self._local.events[:0] = events
+            self._local.oldest = time.monotonic()
+            return 0
+
+    @property
+    def processing_key(self) -> str:
+        """Sorted set of processing lists, scored by when they were claimed."""
+        return f"{self.redis_key}:processing"
+
+    def drain_redis(self, batch_size: int = 1000) -> int:
+        """
+        Move events from the Redis list into the database.
+
+        Each batch is moved atomically into a processing list, which is only
+        deleted after the rows are written. A worker killed in between
+        leaves the list behind for ``requeue_orphaned_batches``.
+        """
+        client = self._get_redis()
+        self.requeue_orphaned_batches()
+        written = 0
+        while True:
+            batch_key = f"{self.processing_key}:{uuid.uuid4().hex}"
+            client.zadd(self.processing_key, {batch_key: time.time()})
+            pipe = client.pipeline(transaction=True)
+            for _ in range(batch_size):
+                pipe.lmove(self.redis_key, batch_key, 'LEFT', 'RIGHT')
+            payloads = [payload for payload in pipe.execute() if payload is not None]
+            if not payloads:
+                client.zrem(self.processing_key, batch_key)
+                break
+            try:
+                written += write_events([deserialize_event(p) for p in payloads])
+            except Exception as e:
+                self._requeue(batch_key)
+                logger.error(f"Failed to drain audit events from Redis: {e}")
+                break
+            client.delete(batch_key)
+            client.zrem(self.processing_key, batch_key)
+            if len(payloads) < batch_size:
+                break
+        return written
+
+    def requeue_orphaned_batches(self, lease: Optional[float] = None) -> int:
+        """
+        Put batches held longer than the lease back at the head of the queue.
+
+        Run before each drain and when a worker starts. A batch whose
+        drain is merely slow may be written twice, never lost.
+        """
+        client = self._get_redis()
+        lease = lease if lease is not None else _get_setting('AUDIT_BUFFER_REDIS_LEASE', DEFAULT_REDIS_LEASE)
+        requeued = 0
+        for batch_key in client.zrangebyscore(self.processing_key, 0, time.time() - lease):
+            requeued += self._requeue(batch_key)
+        if requeued:
+            logger.warning(f"Re-queued {requeued} audit events from interrupted drains")
+        return requeued
+
+    def _requeue(self, batch_key) -> int:
+        """Move a processing list back to the head of the queue, keeping its order."""
+        client = self._get_redis()
+        moved = 0
+        while client.lmove(batch_key, self.redis_key, 'RIGHT', 'LEFT') is not None:
+            moved += 1
+        client.zrem(self.processing_key, batch_key)
+        return moved
+
+
+audit_buffer = AuditEventBuffer()
+
+
+def record_event(instance):
+    """Queue an audit model instance; returns the (unsaved) instance."""
+    return audit_buffer.add(instance)
+
+
+def flush_audit_buffer(**kwargs) -> int:
+    """Flush the calling thread's buffer (request_finished receiver / atexit)."""
+    try:
+        return audit_buffer.flush()
+    except Exception as e:
+        logger.error(f"Audit buffer flush failed: {e}")
+        return 0
+
+
+atexit.register(flush_audit_buffer)
+
+
+def prune_audit_tables(retention_days: Optional[Dict[str, int]] = None,
+                       batch_size: int = 5000, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Delete audit rows older than their retention period.
+
+    Rows are removed in primary-key batches over the ``timestamp`` index so
+    each DELETE stays short and does not lock the table for long.
+
+    Returns:
+        Dict mapping model label to number of rows deleted (or that would be).
+    """
+    retention = dict(DEFAULT_RETENTION_DAYS)
+    retention.update(_get_setting('AUDIT_RETENTION_DAYS', {}))
+    if retention_days:
+        retention.update(retention_days)
+
+    results = {}
+    now = timezone.now()
+    for label, days in retention.items():
+        if not days:
+            continue
+        model = apps.get_model(label)
+        expired = model.objects.filter(timestamp__lt=now - timedelta(days=days))
+
+        if dry_run:
+            results[label] = expired.count()
+            continue
+
+        deleted = 0
+        while True:
+            ids = list(expired.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            count, _ = model.objects.filter(pk__in=ids).delete()
+            deleted += count
+        results[label] = deleted
+        if deleted:
+            logger.info(f"Pruned {deleted} {label} rows older than {days} days")
+    return results
@@ -12,6 +12,9 @@ Licensed under the MIT License - see LICENSE file for details.
 
 import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from typing import Optional, Any, Callable, List, Dict
 from django.core.cache import cache
@@ -172,6 +175,202 @@ class QueryCache:
         return cache.get(f"{cls.CACHE_PREFIX}:{cache_key}")
 
 
+class ICSFeedCache:
+    """
+    Cache of pre-rendered VEVENT blocks for calendar feeds.
+
+    Each booking or maintenance item is stored once under its own key together
+    with the ``updated_at`` stamp and domain it was rendered for, so a block is
+    reused by every feed that contains it until the item changes.
+    """
+
+    CACHE_PREFIX = "ics_vevent"
+    CACHE_TIMEOUT = 86400  # 24 hours
+
+    @classmethod
+    def get_cache_key(cls, kind: str, obj_id: int) -> str:
+        """Generate cache key for a rendered event block."""
+        return f"{cls.CACHE_PREFIX}:{kind}:{obj_id}"
+
+    @classmethod
+    def get_blocks(cls, kind: str, stamps: Dict[int, str], domain: str) -> Dict[int, List[str]]:
+        """Return cached blocks whose stamp and domain still match."""
+        keys = {cls.get_cache_key(kind, obj_id): obj_id for obj_id in stamps}
+        blocks = {}
+        for key, entry in cache.get_many(list(keys)).items():
+            obj_id = keys[key]
+            if entry.get('stamp') == stamps[obj_id] and entry.get('domain') == domain:
+                blocks[obj_id] = entry['lines']
+        return blocks
+
+    @classmethod
+    def set_blocks(cls, kind: str, blocks: Dict[int, tuple], domain: str) -> None:
+        """Store rendered blocks given as ``{obj_id: (stamp, lines)}``."""
+        cache.set_many({
+            cls.get_cache_key(kind, obj_id): {'stamp': stamp, 'domain': domain, 'lines': lines}
+            for obj_id, (stamp, lines) in blocks.items()
+        }, cls.CACHE_TIMEOUT)
+
+    @classmethod
+    def invalidate(cls, kind: str, *obj_ids: int) -> None:
+        """Drop cached blocks for the given items."""
+        cache.delete_many([cls.get_cache_key(kind, obj_id) for obj_id in obj_ids])
+
+    MEMBERSHIP_PREFIX = "ics_feed_membership"
+    MEMBERSHIP_TIMEOUT = 86400 * 30  # 30 days
+
+    @classmethod
+    def membership_changed_at(cls, feed_key: str, digest: str, now):
+        """
+        When the feed's set of items, summarised by ``digest``, was first seen.
+
+        Items dropping out of a feed leave no ``updated_at`` behind, so the
+        time of the last membership change is remembered here instead. An
+        evicted entry reports ``now``, which only costs clients a refetch.
+        """
+        cache_key = f"{cls.MEMBERSHIP_PREFIX}:{feed_key}"
+        entry = cache.get(cache_key)
+        if entry and entry.get('digest') == digest:
+            return entry['since']
+        cache.set(cache_key, {'digest': digest, 'since': now}, cls.MEMBERSHIP_TIMEOUT)
+        return now
+
+
+class LocalLRUCache:
+    """
+    Small thread-safe LRU with per-entry expiry, held in process memory.
+
+    Used in front of the shared cache for hot lookups where a network round
+    trip per request is noticeable; entries live for seconds, so changes made
+    by other processes are picked up quickly without explicit invalidation.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Drop a cached value."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached value."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SigningKeyCache:
+    """
+    Two-level cache of resolved HMAC signing keys.
+
+    Each entry holds the key's secret, its user and expiry, so a signed
+    request is authenticated without touching the database. Lookups try the
+    in-process LRU first, then the shared cache.
+    """
+
+    CACHE_PREFIX = "hmac_key"
+
+    _local = None
+
+    @classmethod
+    def get_cache_key(cls, key_id: str) -> str:
+        """Generate cache key for a signing key."""
+        return f"{cls.CACHE_PREFIX}:{key_id}"
+
+    @classmethod
+    def local(cls) -> LocalLRUCache:
+        """Return the process-wide LRU, created on first use from settings."""
+        if cls._local is None:
+            cls._local = LocalLRUCache(
+                maxsize=getattr(settings, 'HMAC_KEY_LRU_SIZE', 256),
+                ttl=getattr(settings, 'HMAC_KEY_LRU_TTL', 5),
+            )
+        return cls._local
+
+    @classmethod
+    def get(cls, key_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a key, or None on a miss."""
+        cache_key = cls.get_cache_key(key_id)
+        entry = cls.local().get(cache_key)
+        if entry is None:
+            entry = cache.get(cache_key)
+            if entry is not None:
+                cls.local().set(cache_key, entry)
+        return entry
+
+    @classmethod
+    def set(cls, key_id: str, entry: Dict[str, Any]) -> None:
+        """Cache a resolved key in both levels."""
+        cache_key = cls.get_cache_key(key_id)
+        cache.set(cache_key, entry, getattr(settings, 'HMAC_KEY_CACHE_TIMEOUT', 300))
+        cls.local().set(cache_key, entry)
+
+    @classmethod
+    def invalidate(cls, key_id: str) -> None:
+        """Drop a key so the next request reloads it."""
+        cache_key = cls.get_cache_key(key_id)
+        cache.delete(cache_key)
+        cls.local().delete(cache_key)
+
+
+class HierarchyCache:
+    """
+    Cache of the academic hierarchy tree (faculty → college → department).
+
+    The whole tree is one entry: it is small, rarely changes and is read by
+    every hierarchy dropdown. Signals drop it when the hierarchy or a
+    profile's place in it changes.
+    """
+
+    CACHE_PREFIX = "academic_hierarchy"
+
+    @classmethod
+    def get_cache_key(cls) -> str:
+        """Generate cache key for the hierarchy tree."""
+        return f"{cls.CACHE_PREFIX}:tree"
+
+    @classmethod
+    def get(cls) -> Optional[Dict[str, Any]]:
+        """Return the cached tree, or None on a miss."""
+        return cache.get(cls.get_cache_key())
+
+    @classmethod
+    def set(cls, tree: Dict[str, Any]) -> None:
+        """Cache the tree."""
+        cache.set(cls.get_cache_key(), tree, getattr(settings, 'HIERARCHY_CACHE_TIMEOUT', 3600))
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop the tree so the next read rebuilds it."""
+        cache.delete(cls.get_cache_key())
+
+
 def invalidate_related_caches(model_name: str, obj_id: int, related_fields: List[str] = None) -> None:
     """
     Invalidate caches related to a specific model instance.
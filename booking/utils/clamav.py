@@ -0,0 +1,226 @@
+"""
+Pooled ClamAV client.
+
+Speaks the clamd protocol directly over a Unix or TCP socket:
+
+- connections are opened in ``IDSESSION`` mode so one socket can carry
+  many scans, and idle connections are kept in a small pool for reuse;
+- files are sent with ``INSTREAM`` as length-prefixed chunks read from
+  the upload, so nothing is copied to a temporary file or read whole
+  into memory.
+
+clamd drops a session after its ``IdleTimeout`` (30s by default), so a
+pooled connection that has been idle longer than ``CLAMAV_IDLE_TIMEOUT``
+or that the server has already closed is discarded instead of reused.
+"""
+
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 30
+DEFAULT_IDLE_TIMEOUT = 20
+
+
+class ClamAVError(Exception):
+    """Raised when clamd cannot be reached or returns an error."""
+    pass
+
+
+class ClamdConnection:
+    """A single clamd socket in IDSESSION mode."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.sock_timeout = sock.gettimeout()
+        self.next_id = 1
+        self.last_used = time.monotonic()
+        self._buffer = b''
+        self.sock.sendall(b'zIDSESSION\0')
+
+    def is_usable(self, idle_timeout: float) -> bool:
+        """Whether the connection is fresh enough and still open on the server side."""
+        if time.monotonic() - self.last_used > idle_timeout:
+            return False
+        try:
+            self.sock.setblocking(False)
+            try:
+                # Pending bytes or EOF both mean clamd has ended the session
+                self.sock.recv(1, socket.MSG_PEEK)
+                return False
+            finally:
+                self.sock.settimeout(self.sock_timeout)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+
+    def instream(self, chunks: Iterable[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[str]:
+        """
+        Scan a stream of bytes.
+
+        Returns the signature name if clamd found something, ``None`` if the
+        stream is clean. Input chunks larger than ``chunk_size`` are split.
+        """
+        request_id = self.next_id
+        self.next_id += 1
+        try:
+            self.sock.sendall(b'zINSTREAM\0')
+            for chunk in chunks:
+                for offset in range(0, len(chunk), chunk_size):
+                    piece = chunk[offset:offset + chunk_size]
+                    self.sock.sendall(struct.pack('!L', len(piece)) + piece)
+            self.sock.sendall(struct.pack('!L', 0))
+        except OSError as e:
+            # clamd replies and hangs up early when StreamMaxLength is exceeded
+            reply = self._read_reply_or_none()
+            raise ClamAVError(reply or f"Could not stream to clamd: {e}")
+        reply = self._read_reply()
+        self.last_used = time.monotonic()
+        return self._parse_reply(reply, request_id)
+
+    def close(self) -> None:
+        try:
+            self.sock.sendall(b'zEND\0')
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def _read_reply(self) -> str:
+        while b'\0' not in self._buffer:
+            data = self.sock.recv(4096)
+            if not data:
+                raise ClamAVError("clamd closed the connection")
+            self._buffer += data
+        reply, self._buffer = self._buffer.split(b'\0', 1)
+        return reply.decode('utf-8', 'replace')
+
+    def _read_reply_or_none(self) -> Optional[str]:
+        try:
+            return self._read_reply()
+        except (OSError, ClamAVError):
+            return None
+
+    @staticmethod
+    def _parse_reply(reply: str, request_id: int) -> Optional[str]:
+        prefix = f"{request_id}: "
+        if not reply.startswith(prefix):
+            raise ClamAVError(f"Unexpected clamd reply: {reply}")
+        result = reply[len(prefix):]
+        if result.endswith('ERROR'):
+            raise ClamAVError(result)
+        if result.endswith(' FOUND'):
+            return result[:-len(' FOUND')].split(': ', 1)[-1]
+        if result.endswith('OK'):
+            return None
+        raise ClamAVError(f"Unexpected clamd reply: {reply}")
+
+
+class ClamAVPool:
+    """Thread-safe pool of clamd connections."""
+
+    def __init__(self, socket_path: Optional[str] = None, host: str = 'localhost',
+                 port: int = 3310, timeout: float = DEFAULT_TIMEOUT,
+                 max_size: int = DEFAULT_POOL_SIZE, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle: List[ClamdConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> ClamdConnection:
+        try:
+            if self.socket_path and os.path.exists(self.socket_path):
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+            else:
+                sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            return ClamdConnection(sock)
+        except OSError as e:
+            raise ClamAVError(f"Could not connect to clamd: {e}")
+
+    def acquire(self) -> ClamdConnection:
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return self._connect()
+            if connection.is_usable(self.idle_timeout):
+                return connection
+            connection.close()
+
+    def release(self, connection: ClamdConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is only returned to the pool if the scan succeeded."""
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            connection.close()
+            raise
+        else:
+            self.release(connection)
+
+    def scan(self, chunks: Iterable[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[str]:
+        """Scan a stream on a pooled connection. Returns the signature name or ``None``."""
+        with self.connection() as connection:
+            return connection.instream(chunks, chunk_size)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+_pool = None
+_pool_config = None
+_pool_lock = threading.Lock()
+
+
+def get_clamav_pool() -> ClamAVPool:
+    """Process-wide pool for the configured clamd, rebuilt if the settings change."""
+    global _pool, _pool_config
+    config = (
+        getattr(settings, 'CLAMAV_SOCKET_PATH', None),
+        getattr(settings, 'CLAMAV_TCP_HOST', 'localhost'),
+        getattr(settings, 'CLAMAV_TCP_PORT', 3310),
+        getattr(settings, 'CLAMAV_TIMEOUT', DEFAULT_TIMEOUT),
+        getattr(settings, 'CLAMAV_POOL_SIZE', DEFAULT_POOL_SIZE),
+        getattr(settings, 'CLAMAV_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT),
+    )
+    with _pool_lock:
+        if _pool is None or _pool_config != config:
+            if _pool is not None:
+                _pool.close()
+            socket_path, host, port, timeout, max_size, idle_timeout = config
+            _pool = ClamAVPool(socket_path=socket_path, host=host, port=port, timeout=timeout,
+                               max_size=max_size, idle_timeout=idle_timeout)
+            _pool_config = config
+        return _pool
@@ -0,0 +1,213 @@
+# booking/utils/data_migrations.py
+"""
+Chunked, resumable data repairs for large tables.
+
+Repair commands used to iterate ``Model.objects.all()`` and ``save()`` each
+row, which loads the whole table and runs model validation and signals per
+row. A ``ChunkedMigration`` instead:
+
+1. walks the table in primary key order with keyset pagination
+   (``pk > last_pk``), so every chunk is an indexed range scan,
+2. applies each chunk with ``bulk_update`` inside a transaction,
+3. stores the last primary key in a ``DataMigrationCheckpoint`` in the same
+   transaction, so an interrupted run resumes after the last written chunk,
+4. optionally sleeps between chunks to limit load on a live database, and
+5. reports progress after every chunk.
+
+This file is part of Labitory.
+Copyright (c) 2025 Labitory Contributors
+Licensed under the MIT License - see LICENSE file for details.
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class BaseChunkedMigration(ABC):
+    """
+    Base class for a chunked repair over one model.
+
+    Subclasses set ``model`` and implement ``process_chunk``. Repairs that
+    only update rows should subclass ``ChunkedMigration`` instead.
+    """
+
+    model = None
+    fields: List[str] = []
+    # Columns to load besides the primary key; defaults to ``fields``, and an
+    # empty list loads every column
+    only: Optional[List[str]] = None
+    chunk_size = DEFAULT_CHUNK_SIZE
+
+    def __init__(self, name: Optional[str] = None, chunk_size: Optional[int] = None):
+        self.name = name or f"{type(self).__name__}:{self.model._meta.label}"
+        if chunk_size:
+            self.chunk_size = chunk_size
+
+    def get_queryset(self):
+        """Rows to visit. Filters here narrow the scan, not the checkpoint."""
+        return self.model._default_manager.all()
+
+    @abstractmethod
+    def process_chunk(self, objects: List, dry_run: bool) -> int:
+        """Apply the repair to one chunk and return the number of rows changed."""
+
+    def chunks(self, after_pk=None):
+        """Yield lists of rows in primary key order, starting after ``after_pk``."""
+        queryset = self.get_queryset().order_by('pk')
+        columns = self.only if self.only is not None else self.fields
+        if columns:
+            queryset = queryset.only('pk', *columns)
+        while True:
+            page = queryset if after_pk is None else queryset.filter(pk__gt=after_pk)
+            objects = list(page[:self.chunk_size])
+            if not objects:
+                return
+            yield objects
+            after_pk = objects[-1].pk
+
+    def run(self, dry_run: bool = False, restart: bool = False, throttle: float = 0,
+            checkpoint: bool = True, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Run the repair to completion.
+
+        Resumes from the stored checkpoint unless ``restart`` is set or the
+        previous run completed. Dry runs neither write rows nor move the
+        checkpoint. ``throttle`` is the pause in seconds between chunks.
+
+        Returns:
+            Dict with ``processed``, ``changed``, ``last_pk``, ``total``,
+            ``resumed`` and ``elapsed`` (seconds).
+        """
+        from booking.models import DataMigrationCheckpoint
+
+        state = None
+        if checkpoint and not dry_run:
+            state, _ = DataMigrationCheckpoint.objects.get_or_create(name=self.name)
+            if restart or state.completed_at is not None:
+                state.last_pk = None
+                state.processed = state.changed = 0
+                state.started_at = timezone.now()
+                state.completed_at = None
+                state.save()
+
+        last_pk = state.last_pk if state else None
+        stats = {
+            'processed': state.processed if state else 0,
+            'changed': state.changed if state else 0,
+            'last_pk': last_pk,
+            'resumed': last_pk is not None,
+        }
+        remaining = self.get_queryset()
+        if last_pk is not None:
+            remaining = remaining.filter(pk__gt=last_pk)
+        stats['total'] = stats['processed'] + remaining.count()
+
+        started = time.monotonic()
+        for objects in self.chunks(after_pk=last_pk):
+            with transaction.atomic():
+                changed = self.process_chunk(objects, dry_run)
+                stats['processed'] += len(objects)
+                stats['changed'] += changed
+                stats['last_pk'] = objects[-1].pk
+                if state is not None:
+                    state.last_pk = stats['last_pk']
+                    state.processed = stats['processed']
+                    state.changed = stats['changed']
+                    state.save(update_fields=['last_pk', 'processed', 'changed', 'updated_at'])
+
+            stats['elapsed'] = time.monotonic() - started
+            if progress:
+                progress(dict(stats))
+            if throttle:
+                time.sleep(throttle)
+
+        stats['elapsed'] = time.monotonic() - started
+        if state is not None:
+            state.completed_at = timezone.now()
+            state.save(update_fields=['completed_at', 'updated_at'])
+        logger.info(
+            f"{self.name}{' (dry run)' if dry_run else ''}: {stats['changed']} of "
+            f"{stats['processed']} rows changed in {stats['elapsed']:.1f}s"
+        )
+        return stats
+
+
+class ChunkedMigration(BaseChunkedMigration):
+    """
+    A chunked repair that updates ``fields`` on each row.
+
+    Subclasses set ``model`` and ``fields`` and implement ``transform``.
+    """
+
+    @abstractmethod
+    def transform(self, obj) -> bool:
+        """Modify ``obj`` in place; return True if it needs writing."""
+
+    def process_chunk(self, objects: List, dry_run: bool) -> int:
+        """Update the rows ``transform`` changed and return how many there were."""
+        changed = [obj for obj in objects if self.transform(obj)]
+        if changed and not dry_run:
+            self.model._default_manager.bulk_update(changed, self.fields)
+        return len(changed)
+
+
+class ChunkedMigrationCommand(BaseCommand):
+    """Management command base adding the common chunked-repair options."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be changed without writing anything'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows per chunk (default: {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--throttle',
+            type=float,
+            default=0,
+            help='Seconds to pause between chunks'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the saved checkpoint and start from the beginning'
+        )
+
+    def run_migration(self, migration: BaseChunkedMigration, options, checkpoint: bool = True) -> Dict:
+        """Run ``migration`` with the command's options, printing progress."""
+        if options['chunk_size']:
+            migration.chunk_size = options['chunk_size']
+
+        def report(stats):
+            percent = 100 * stats['processed'] / stats['total'] if stats['total'] else 100
+            self.stdout.write(
+                f"  {migration.name}: {stats['processed']}/{stats['total']} rows "
+                f"({percent:.0f}%), {stats['changed']} changed"
+            )
+
+        stats = migration.run(
+            dry_run=options['dry_run'],
+            restart=options['restart'],
+            throttle=options['throttle'],
+            checkpoint=checkpoint,
+            progress=report if options.get('verbosity', 1) >= 1 else None,
+        )
+        if stats['resumed']:
+            self.stdout.write(f"  Resumed {migration.name} from checkpoint")
+        return stats
@@ -6,14 +6,23 @@ This module provides comprehensive file validation including:
 - File size limits
 - Security scanning for malicious content
 - Custom Django validators for model fields
+
+Uploads are read in chunks: one pass hashes the content and keeps the
+header used for MIME sniffing and signature checks. Virus scanning streams
+the file to clamd (see ``booking.utils.clamav``) and the verdict is cached
+by content hash, so re-uploading an identical file skips the scan. The
+hash has to be known before the cache lookup, so a cache miss costs a
+second pass to stream the file; hashing during the stream instead would
+send every upload to clamd, cached or not.
 """
 
 import os
-import tempfile
+import hashlib
 import mimetypes
 from typing import List, Dict, Tuple, Optional, Union
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import UploadedFile
 from django.utils.translation import gettext_lazy as _
 
@@ -23,11 +32,7 @@ try:
 except ImportError:
     HAS_MAGIC = False
 
-try:
-    import clamd
-    HAS_CLAMD = True
-except ImportError:
-    HAS_CLAMD = False
+from .clamav import ClamAVError, DEFAULT_CHUNK_SIZE, get_clamav_pool
 
 import logging
 logger = logging.getLogger(__name__)
@@ -105,6 +110,47 @@ class FileValidationConfig:
         b'%PDF-1.',  # PDF with potential JavaScript
     ]
 
+    # Bytes kept from the start of a file for MIME sniffing and signature checks
+    HEADER_SIZE = 8192
+
+    # Virus scan verdicts are cached by content hash
+    VERDICT_CACHE_PREFIX = 'clamav_verdict'
+    VERDICT_CACHE_TIMEOUT = 86400  # Re-scan daily to pick up new signatures
+
+
+class FileDigest:
+    """Header bytes and SHA-256 of a file, collected in one chunked pass."""
+
+    def __init__(self, header: bytes, sha256: str, size: int):
+        self.header = header
+        self.sha256 = sha256
+        self.size = size
+
+    @classmethod
+    def from_file(cls, file, chunk_size: int = DEFAULT_CHUNK_SIZE) -> 'FileDigest':
+        digest = hashlib.sha256()
+        header = b''
+        size = 0
+        for chunk in iter_chunks(file, chunk_size):
+            if len(header) < FileValidationConfig.HEADER_SIZE:
+                header += chunk[:FileValidationConfig.HEADER_SIZE - len(header)]
+            digest.update(chunk)
+            size += len(chunk)
+        return cls(header, digest.hexdigest(), size)
+
+
+def iter_chunks(file, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield a file's content from the start in chunks, leaving it rewound."""
+    file.seek(0)
+    try:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file.seek(0)
+
 
 class FileValidator:
     """Main file validation class."""
@@ -159,8 +205,13 @@ class FileValidator:
                 results['valid'] = False
                 results['errors'].extend(size_result['errors'])
             
+            # One pass for the sniffing header and the verdict cache key;
+            # only a verdict-cache miss reads the file again, to stream it
+            digest = FileDigest.from_file(file)
+            results['file_info']['sha256'] = digest.sha256
+            
             # MIME type validation
-            mime_result = self._validate_mime_type(file)
+            mime_result = self._validate_mime_type(file, digest.header)
             if not mime_result['valid']:
                 results['valid'] = False
                 results['errors'].extend(mime_result['errors'])
@@ -169,15 +220,15 @@ class FileValidator:
             
             # Content security validation
             if self.enable_content_scan:
-                content_result = self._validate_content_security(file)
+                content_result = self._validate_content_security(file, digest.header)
                 if not content_result['valid']:
                     results['valid'] = False
                     results['errors'].extend(content_result['errors'])
                 results['warnings'].extend(content_result.get('warnings', []))
             
-            # Virus scanning
-            if self.enable_virus_scan:
-                virus_result = self._scan_for_viruses(file)
+            # Virus scanning; rejected files are not worth streaming to clamd
+            if self.enable_virus_scan and results['valid']:
+                virus_result = self._scan_for_viruses(file, digest.sha256)
                 if not virus_result['valid']:
                     results['valid'] = False
                     results['errors'].extend(virus_result['errors'])
@@ -205,19 +256,18 @@ class FileValidator:
         
         return {'valid': True, 'errors': []}
     
-    def _validate_mime_type(self, file: UploadedFile) -> Dict[str, Union[bool, str, List[str]]]:
+    def _validate_mime_type(self, file: UploadedFile,
+                            header: Optional[bytes] = None) -> Dict[str, Union[bool, str, List[str]]]:
         """Validate MIME type using multiple methods."""
         detected_mime = None
         
         # Method 1: Use python-magic if available
         if HAS_MAGIC:
             try:
-                # Reset file pointer
-                file.seek(0)
-                file_header = file.read(2048)
-                file.seek(0)
+                if header is None:
+                    header = self._read_header(file)
                 
-                detected_mime = magic.from_buffer(file_header, mime=True)
+                detected_mime = magic.from_buffer(header[:2048], mime=True)
             except Exception as e:
                 logger.warning(f"python-magic MIME detection failed: {e}")
         
@@ -248,16 +298,15 @@ class FileValidator:
             'errors': []
         }
     
-    def _validate_content_security(self, file: UploadedFile) -> Dict[str, Union[bool, List[str]]]:
+    def _validate_content_security(self, file: UploadedFile,
+                                   header: Optional[bytes] = None) -> Dict[str, Union[bool, List[str]]]:
         """Scan file content for security threats."""
         errors = []
         warnings = []
         
         try:
-            # Reset file pointer
-            file.seek(0)
-            content = file.read(8192)  # Read first 8KB for signature detection
-            file.seek(0)
+            # First 8KB for signature detection
+            content = header if header is not None else self._read_header(file)
             
             # Check for dangerous file signatures
             for signature in FileValidationConfig.DANGEROUS_SIGNATURES:
@@ -296,56 +345,51 @@ class FileValidator:
             'warnings': warnings
         }
     
-    def _scan_for_viruses(self, file: UploadedFile) -> Dict[str, Union[bool, List[str]]]:
-        """Scan file for viruses using ClamAV."""
-        if not HAS_CLAMD:
-            logger.warning("ClamAV not available, skipping virus scan")
+    def _scan_for_viruses(self, file: UploadedFile,
+                          sha256: Optional[str] = None) -> Dict[str, Union[bool, List[str]]]:
+        """
+        Scan file for viruses using ClamAV.
+        
+        The file is streamed to clamd with INSTREAM on a pooled connection.
+        Verdicts are cached by content hash; scan failures are logged and do
+        not fail validation. The hash is taken in a separate pass before the
+        lookup (pass ``sha256`` to reuse one), so a cache hit never touches
+        clamd and only a miss reads the file a second time.
+        """
+        if not getattr(settings, 'CLAMAV_ENABLED', False):
             return {'valid': True, 'errors': []}
         
-        try:
-            # Connect to ClamAV daemon
-            cd = clamd.ClamdUnixSocket()
-            
-            # Test connection
-            if not cd.ping():
-                logger.warning("ClamAV daemon not responding")
-                return {'valid': True, 'errors': []}
-            
-            # Create temporary file for scanning
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                file.seek(0)
-                temp_file.write(file.read())
-                temp_file_path = temp_file.name
-                file.seek(0)
-            
+        if sha256 is None:
+            sha256 = FileDigest.from_file(file).sha256
+        cache_key = f"{FileValidationConfig.VERDICT_CACHE_PREFIX}:{sha256}"
+        
+        # '' is a cached clean verdict, anything else the signature found
+        signature = cache.get(cache_key)
+        if signature is None:
+            chunk_size = getattr(settings, 'CLAMAV_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
             try:
-                # Scan the file
-                scan_result = cd.scan(temp_file_path)
-                
-                if scan_result is None:
-                    return {'valid': True, 'errors': []}
-                
-                # Check results
-                for file_path, result in scan_result.items():
-                    if result[0] == 'FOUND':
-                        return {
-                            'valid': False,
-                            'errors': [f"Virus detected: {result[1]}"]
-                        }
-                        
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(temp_file_path)
-                except OSError:
-                    pass
-            
-            return {'valid': True, 'errors': []}
-            
-        except Exception as e:
-            logger.error(f"Virus scan failed: {e}")
-            # Don't fail validation if virus scanning fails
-            return {'valid': True, 'errors': []}
+                signature = get_clamav_pool().scan(iter_chunks(file, chunk_size), chunk_size) or ''
+            except ClamAVError as e:
+                logger.error(f"Virus scan failed: {e}")
+                return {'valid': True, 'errors': []}
+            cache.set(cache_key, signature, getattr(
+                settings, 'CLAMAV_VERDICT_CACHE_TIMEOUT', FileValidationConfig.VERDICT_CACHE_TIMEOUT
+            ))
+        
+        if signature:
+            return {
+                'valid': False,
+                'errors': [f"Virus detected: {signature}"]
+            }
+        return {'valid': True, 'errors': []}
+    
+    @staticmethod
+    def _read_header(file: UploadedFile) -> bytes:
+        """Read the first bytes of a file, leaving it rewound."""
+        file.seek(0)
+        header = file.read(FileValidationConfig.HEADER_SIZE)
+        file.seek(0)
+        return header
     
     @staticmethod
     def _format_size(size_bytes: int) -> str:
@@ -0,0 +1,211 @@
+"""
+Image derivative pipeline.
+
+Derivatives (resized copies in JPEG, WebP and, where Pillow supports it,
+AVIF) are stored under a key derived from the source file's content hash:
+
+    derivatives/<ab>/<sha256>/<width>x<height>[c].<ext>
+
+so identical uploads share derivatives and a derivative never goes stale.
+The standard THUMBNAIL_SIZES are generated in the background by the
+``generate_image_derivatives`` Celery task when an image is saved; the
+other sizes in get_allowed_sizes() are rendered on first request by the
+thumbnail endpoint and then served from storage. Other sizes are refused,
+so clients can't fill storage with one derivative per width and height.
+
+Downscaling avoids full-resolution work where it can: JPEGs are decoded
+at a reduced scale with ``Image.draft()``, other formats are shrunk with
+the fast ``Image.reduce()`` box filter, and only the last step of at most
+2x uses LANCZOS.
+"""
+
+import hashlib
+import io
+import logging
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .image_processing import ImageProcessingConfig, downscale
+
+logger = logging.getLogger(__name__)
+
+
+AVIF_AVAILABLE = features.check('avif')
+
+# Output formats: Pillow format, file extension, MIME type
+DERIVATIVE_FORMATS = {
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+}
+if AVIF_AVAILABLE:
+    DERIVATIVE_FORMATS['avif'] = ('AVIF', 'avif', 'image/avif')
+
+DERIVATIVE_ROOT = 'derivatives'
+
+# Sizes templates ask for beyond THUMBNAIL_SIZES
+EXTRA_DERIVATIVE_SIZES = (
+    (80, 80),  # Admin resource list
+    (600, 400),  # Resource cards
+)
+
+SOURCE_KEY_CACHE_PREFIX = 'image_source_key'
+SOURCE_KEY_CACHE_TIMEOUT = 86400 * 7  # Stored names never change content
+
+
+def get_source_prefixes() -> Tuple[str, ...]:
+    """Upload directories whose images may be resized."""
+    return tuple(getattr(settings, 'IMAGE_DERIVATIVE_SOURCE_PREFIXES', (
+        'resources/', 'about_page/', 'avatars/', 'issue_reports/',
+    )))
+
+
+def get_allowed_sizes() -> frozenset:
+    """``(width, height)`` pairs the thumbnail endpoint will render."""
+    sizes = getattr(settings, 'IMAGE_DERIVATIVE_SIZES', None)
+    if sizes is None:
+        sizes = (*ImageProcessingConfig.THUMBNAIL_SIZES.values(), *EXTRA_DERIVATIVE_SIZES)
+    return frozenset(tuple(size) for size in sizes)
+
+
+def content_key(data: bytes) -> str:
+    """SHA-256 of the source bytes, used to address its derivatives."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def derivative_name(key: str, width: int, height: int, fmt: str, crop: bool = True) -> str:
+    """Storage name of a derivative."""
+    ext = DERIVATIVE_FORMATS[fmt][1]
+    return f"{DERIVATIVE_ROOT}/{key[:2]}/{key}/{width}x{height}{'c' if crop else ''}.{ext}"
+
+
+def decode_image(data: bytes, longest: int) -> Image.Image:
+    """
+    Decode ``data`` at no less than ``longest`` pixels on its shorter side.
+
+    JPEGs are decoded by libjpeg at 1/2, 1/4 or 1/8 scale where that is
+    still large enough. A square request is used so EXIF rotation cannot
+    leave the image too small.
+    """
+    image = Image.open(io.BytesIO(data))
+    if image.format == 'JPEG':
+        image.draft('RGB', (longest, longest))
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode in ('RGBA', 'LA', 'P'):
+        return image.convert('RGBA')
+    if image.mode not in ('RGB', 'L'):
+        return image.convert('RGB')
+    return image
+
+
+def encode_image(image: Image.Image, fmt: str,
+                 quality: int = ImageProcessingConfig.DEFAULT_JPEG_QUALITY) -> bytes:
+    """Encode a derivative; no optimize pass, since derivatives are many and small."""
+    pil_format = DERIVATIVE_FORMATS[fmt][0]
+    output = io.BytesIO()
+    if pil_format == 'JPEG':
+        if image.mode == 'RGBA':
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        image.save(output, format='JPEG', quality=quality, progressive=True)
+    elif pil_format == 'WEBP':
+        image.save(output, format='WEBP', quality=ImageProcessingConfig.DEFAULT_WEBP_QUALITY, method=4)
+    else:
+        image.save(output, format=pil_format, quality=ImageProcessingConfig.DEFAULT_WEBP_QUALITY, speed=8)
+    return output.getvalue()
+
+
+def render_derivative(data: bytes, size: Tuple[int, int], fmt: str, crop: bool = True) -> bytes:
+    """Decode ``data`` and encode one derivative."""
+    return encode_image(downscale(decode_image(data, max(size)), size, crop), fmt)
+
+
+def _read_source(source_name: str) -> bytes:
+    with default_storage.open(source_name, 'rb') as source:
+        return source.read()
+
+
+def _source_cache_key(source_name: str) -> str:
+    return f"{SOURCE_KEY_CACHE_PREFIX}:{hashlib.md5(source_name.encode()).hexdigest()}"
+
+
+def get_cached_source_key(source_name: str) -> Optional[str]:
+    """Content hash of a source file if it has been computed before."""
+    return cache.get(_source_cache_key(source_name))
+
+
+def get_source_key(source_name: str, data: Optional[bytes] = None) -> str:
+    """Content hash of a stored source file, cached by name."""
+    key = get_cached_source_key(source_name)
+    if key is None:
+        key = content_key(data if data is not None else _read_source(source_name))
+        cache.set(_source_cache_key(source_name), key, SOURCE_KEY_CACHE_TIMEOUT)
+    return key
+
+
+def get_or_create_derivative(source_name: str, size: Tuple[int, int], fmt: str,
+                             crop: bool = True) -> Tuple[str, str]:
+    """
+    Return ``(storage_name, key)`` for a derivative, rendering it if missing.
+    """
+    data = None
+    key = get_cached_source_key(source_name)
+    if key is None:
+        data = _read_source(source_name)
+        key = get_source_key(source_name, data)
+
+    name = derivative_name(key, size[0], size[1], fmt, crop)
+    if not default_storage.exists(name):
+        if data is None:
+            data = _read_source(source_name)
+        default_storage.save(name, ContentFile(render_derivative(data, size, fmt, crop)))
+    return name, key
+
+
+def generate_derivatives(source_name: str) -> Dict[str, str]:
+    """
+    Render the standard THUMBNAIL_SIZES in every output format.
+
+    The source is read and hashed once; derivatives that already exist for
+    the same content are skipped. Returns ``{'<size>.<fmt>': storage_name}``.
+    """
+    data = _read_source(source_name)
+    key = get_source_key(source_name, data)
+
+    image = None
+    generated = {}
+    for size_name, size in ImageProcessingConfig.THUMBNAIL_SIZES.items():
+        crop = size_name != 'preview'
+        thumb = None
+        for fmt in DERIVATIVE_FORMATS:
+            name = derivative_name(key, size[0], size[1], fmt, crop)
+            generated[f"{size_name}.{fmt}"] = name
+            if default_storage.exists(name):
+                continue
+            if image is None:
+                # One decode, scaled for the largest standard size
+                longest = max(max(s) for s in ImageProcessingConfig.THUMBNAIL_SIZES.values())
+                image = decode_image(data, longest)
+            if thumb is None:
+                thumb = downscale(image, size, crop)
+            default_storage.save(name, ContentFile(encode_image(thumb, fmt)))
+    return generated
+
+
+def queue_derivatives(source_name: str) -> None:
+    """Queue background derivative generation for a stored image, once per name."""
+    if not source_name or not cache.add(f"image_derivatives_queued:{source_name}", 1, SOURCE_KEY_CACHE_TIMEOUT):
+        return
+    try:
+        from ..tasks import generate_image_derivatives
+        generate_image_derivatives.delay(source_name)
+    except Exception as e:
+        # Thumbnails are still rendered on demand by the thumbnail endpoint
+        cache.delete(f"image_derivatives_queued:{source_name}")
+        logger.warning(f"Could not queue image derivatives for {source_name}: {e}")
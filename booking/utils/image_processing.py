@@ -56,6 +56,31 @@ class ImageProcessingConfig:
     }
 
 
+def downscale(image: Image.Image, size: Tuple[int, int], crop: bool = True) -> Image.Image:
+    """
+    Resize ``image`` to ``size``, cropping to fill it or fitting inside it.
+
+    Cheap integer reductions bring the image to within 2x of the target
+    before the final LANCZOS pass.
+    """
+    width, height = size
+    if crop:
+        scale = max(width / image.width, height / image.height)
+    else:
+        scale = min(width / image.width, height / image.height)
+
+    factor = int(1 / (2 * scale)) if scale < 0.5 else 1
+    if factor > 1:
+        image = image.reduce(factor)
+    elif not crop:
+        image = image.copy()  # thumbnail() resizes in place
+
+    if crop:
+        return ImageOps.fit(image, size, Resampling.LANCZOS)
+    image.thumbnail(size, Resampling.LANCZOS)
+    return image
+
+
 class ImageProcessor:
     """Main image processing class."""
     
@@ -242,15 +267,8 @@ class ImageProcessor:
         
         for size_name, (width, height) in ImageProcessingConfig.THUMBNAIL_SIZES.items():
             try:
-                # Create thumbnail
-                thumb = image.copy()
-                
-                if size_name == 'preview':
-                    # Maintain aspect ratio for preview
-                    thumb.thumbnail((width, height), Resampling.LANCZOS)
-                else:
-                    # Square thumbnails
-                    thumb = ImageOps.fit(thumb, (width, height), Resampling.LANCZOS)
+                # Square thumbnails; previews maintain aspect ratio
+                thumb = downscale(image, (width, height), crop=(size_name != 'preview'))
                 
                 # Save thumbnail
                 output = io.BytesIO()
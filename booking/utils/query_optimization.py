@@ -14,6 +14,8 @@ from functools import wraps
 from typing import Optional, Dict, Any, List
 import logging
 
+from ..middleware.profiling import RequestProfilingMiddleware
+
 logger = logging.getLogger('booking.query_optimization')
 
 
@@ -32,16 +34,10 @@ class OptimizedQuerySets:
         """
         from ..models import Booking, BookingAttendee, BookingHistory, CheckInOutEvent
         
-        queryset = Booking.objects.select_related(
-            'resource',
-            'resource__college',
-            'resource__college__faculty',
-            'user',
-            'user__userprofile',
+        queryset = Booking.objects.with_related().select_related(
             'user__userprofile__department',
             'user__userprofile__college',
             'user__userprofile__faculty',
-            'approved_by',
             'approved_by__userprofile',
             'template_used',
             'billing_record',
@@ -171,27 +167,18 @@ class OptimizedQuerySets:
         """
         from ..models import Notification
         
-        queryset = Notification.objects.select_related(
+        queryset = Notification.objects.with_related().select_related(
             'user',
             'user__userprofile',
-            'booking',
-            'booking__resource',
-            'resource',
-            'maintenance',
             'maintenance__resource',
-            'access_request',
-            'access_request__resource',
             'access_request__user',
-            'training_request',
-            'training_request__resource',
-            'training_request__user',
         )
         
         if user:
-            queryset = queryset.filter(user=user)
+            queryset = queryset.for_user(user)
         
         if unread_only:
-            queryset = queryset.filter(status__in=['pending', 'sent']).exclude(status='read')
+            queryset = queryset.unread()
         
         return queryset.order_by('-created_at')
     
@@ -302,44 +289,8 @@ class OptimizedQuerySets:
         return queryset
 
 
-class QueryOptimizationMiddleware:
-    """Middleware to detect and log N+1 queries in development."""
-    
-    def __init__(self, get_response):
-        self.get_response = get_response
-    
-    def __call__(self, request):
-        # Only enable in development
-        from django.conf import settings
-        if settings.DEBUG:
-            from django.db import connection
-            from django.db import reset_queries
-            
-            reset_queries()
-            response = self.get_response(request)
-            
-            # Log if too many queries
-            num_queries = len(connection.queries)
-            if num_queries > 10:
-                logger.warning(
-                    f"High query count detected: {num_queries} queries for {request.path}"
-                )
-                
-                # In development, log duplicate queries
-                query_counts = {}
-                for query in connection.queries:
-                    sql = query['sql']
-                    # Normalize SQL for comparison
-                    normalized = ' '.join(sql.split())[:100]
-                    query_counts[normalized] = query_counts.get(normalized, 0) + 1
-                
-                duplicates = {k: v for k, v in query_counts.items() if v > 1}
-                if duplicates:
-                    logger.warning(f"Duplicate queries detected: {duplicates}")
-        else:
-            response = self.get_response(request)
-        
-        return response
+class QueryOptimizationMiddleware(RequestProfilingMiddleware):
+    """Kept for existing MIDDLEWARE entries; see booking.middleware.profiling."""
 
 
 class PaginationMixin:
@@ -524,7 +475,7 @@ class DatabaseConnectionPool:
 
 # Export optimized managers for models
 class OptimizedBookingManager:
-    """Optimized manager for Booking model."""
+    """Shortcuts onto the Booking queryset API (see booking.managers)."""
     
     @staticmethod
     def get_queryset():
@@ -535,16 +486,9 @@ class OptimizedBookingManager:
         """Get bookings optimized for calendar view."""
         from ..models import Booking
         
-        return Booking.objects.select_related(
-            'resource',
-            'user',
-            'user__userprofile'
-        ).filter(
-            resource_id=resource_id,
-            start_time__lte=end_date,
-            end_time__gte=start_date,
-            status__in=['approved', 'pending']
-        ).order_by('start_time')
+        return Booking.objects.filter(resource_id=resource_id).active().overlapping(
+            start_date, end_date
+        ).for_calendar()
     
     @staticmethod
     def for_user_dashboard(user):
@@ -552,13 +496,10 @@ class OptimizedBookingManager:
         from ..models import Booking
         from django.utils import timezone
         
-        return Booking.objects.select_related(
-            'resource',
-            'approved_by'
-        ).filter(
+        return Booking.objects.filter(
             user=user,
             end_time__gte=timezone.now()
-        ).order_by('start_time')[:10]  # Limit to next 10 bookings
+        ).select_related('resource', 'approved_by').order_by('start_time')[:10]  # Limit to next 10 bookings
 
 
 # Utility function to analyze query performance
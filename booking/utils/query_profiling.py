@@ -0,0 +1,223 @@
+"""
+Per-request query and cache profiling for the Labitory.
+
+``capture_profile()`` records every SQL statement run on any database
+connection inside the block, along with cache hits and misses. It hooks
+``connection.execute_wrapper`` rather than ``connection.queries``, so it
+works with DEBUG off and is cheap enough to sample in production.
+
+The same collector backs ``query_budget``, a context manager and decorator
+that fails a test when a block or view runs more queries than allowed:
+
+    with query_budget(5):
+        client.get('/bookings/')
+
+    @query_budget(12)
+    def test_dashboard(self):
+        ...
+
+This file is part of the Labitory.
+Copyright (C) 2025 Labitory Contributors
+"""
+
+import hashlib
+import re
+import time
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from django.core.cache import caches
+from django.db import connections
+
+_current_profile: ContextVar[Optional['RequestProfile']] = ContextVar(
+    'booking_request_profile', default=None
+)
+
+_MISS = object()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_SAVEPOINT = re.compile(r'^(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT) "?\w+"?', re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a statement to its shape so repeated queries compare equal.
+
+    Literals and parameter placeholders become ``?`` and ``IN`` lists of any
+    length collapse to ``(...)``.
+    """
+    sql = ' '.join(sql.split())
+    sql = _SAVEPOINT.sub(lambda m: f'{m.group(1).upper()} ?', sql)
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return sql
+
+
+def fingerprint_sql(normalized_sql: str) -> str:
+    """Short stable identifier for a normalised statement."""
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()[:12]
+
+
+class RequestProfile:
+    """Queries, DB time and cache activity collected for one block of work."""
+
+    def __init__(self):
+        self.queries = []  # (sql, seconds)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def query_count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def db_time(self) -> float:
+        """Total time spent in the database, in seconds."""
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self, min_count: int = 2, limit: int = 5) -> List[Dict]:
+        """Statements run at least ``min_count`` times, most repeated first."""
+        counts = Counter()
+        for sql, _ in self.queries:
+            counts[normalize_sql(sql)] += 1
+        return [
+            {'fingerprint': fingerprint_sql(sql), 'count': count, 'sql': sql[:200]}
+            for sql, count in counts.most_common()
+            if count >= min_count and not sql.startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+        ][:limit]
+
+    def as_dict(self) -> Dict:
+        return {
+            'queries': self.query_count,
+            'db_ms': round(self.db_time * 1000, 2),
+            'duplicates': self.duplicates(),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+def _instrument_cache_backend(backend_cls):
+    """Count hits and misses on a cache backend class while a profile is active."""
+    if backend_cls.__dict__.get('_profiling_instrumented'):
+        return
+
+    original_get = backend_cls.get
+    original_get_many = backend_cls.get_many
+
+    def get(self, key, default=None, *args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None or profile._cache_depth:
+            return original_get(self, key, default, *args, **kwargs)
+        profile._cache_depth += 1
+        try:
+            value = original_get(self, key, _MISS, *args, **kwargs)
+        finally:
+            profile._cache_depth -= 1
+        if value is _MISS:
+            profile.cache_misses += 1
+            return default
+        profile.cache_hits += 1
+        return value
+
+    def get_many(self, keys, *args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None or profile._cache_depth:
+            return original_get_many(self, keys, *args, **kwargs)
+        keys = list(keys)
+        # BaseCache.get_many() calls get() per key; don't count those twice
+        profile._cache_depth += 1
+        try:
+            found = original_get_many(self, keys, *args, **kwargs)
+        finally:
+            profile._cache_depth -= 1
+        profile.cache_hits += len(found)
+        profile.cache_misses += len(keys) - len(found)
+        return found
+
+    backend_cls.get = get
+    backend_cls.get_many = get_many
+    backend_cls._profiling_instrumented = True
+
+
+def instrument_caches():
+    """Instrument every configured cache backend. Safe to call repeatedly."""
+    for alias in caches.settings:
+        _instrument_cache_backend(type(caches[alias]))
+
+
+@contextmanager
+def capture_profile():
+    """Collect a RequestProfile for everything run inside the block."""
+    instrument_caches()
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more queries than its budget allows."""
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail when the wrapped block or function exceeds a query budget.
+
+    Args:
+        max_queries: Maximum number of SQL statements allowed
+        max_duplicates: Optional cap on repeats of any single statement,
+            which catches N+1 loops even when the total is within budget
+    """
+
+    def __init__(self, max_queries: int, max_duplicates: Optional[int] = None):
+        self.max_queries = max_queries
+        self.max_duplicates = max_duplicates
+        self.profile = None
+
+    def __enter__(self):
+        self._capture = capture_profile()
+        self.profile = self._capture.__enter__()
+        return self.profile
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._capture.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+
+        profile = self.profile
+        problems = []
+        if profile.query_count > self.max_queries:
+            problems.append(f"{profile.query_count} queries executed, budget is {self.max_queries}")
+        if self.max_duplicates is not None:
+            worst = profile.duplicates(min_count=self.max_duplicates + 1, limit=1)
+            if worst:
+                problems.append(
+                    f"statement repeated {worst[0]['count']} times, "
+                    f"limit is {self.max_duplicates}: {worst[0]['sql']}"
+                )
+        if problems:
+            listing = '\n'.join(
+                f"{i}. {' '.join(sql.split())[:200]}" for i, (sql, _) in enumerate(profile.queries, 1)
+            )
+            raise QueryBudgetExceeded('; '.join(problems) + f"\nCaptured queries were:\n{listing}")
+        return False
@@ -63,6 +63,7 @@ __all__ = [
     
     # Resource views
     'resources_list_view',
+    'image_thumbnail_view',
     'resource_detail_view',
     'request_resource_access_view',
     'upload_risk_assessment_view',
@@ -35,6 +35,7 @@ from ...models import (
 from ...forms import (
     AccessRequestReviewForm, RiskAssessmentForm, UserRiskAssessmentForm
 )
+from ...services.training_service import training_satisfaction_service, training_slot_finder
 # Removed licensing requirement - all features now available
 
 
@@ -1041,7 +1042,7 @@ def access_requests_view(request):
     from django.core.paginator import Paginator
     
     # Start with all access requests
-    access_requests = AccessRequest.objects.select_related('user', 'resource', 'reviewed_by')
+    access_requests = AccessRequest.objects.with_related()
     
     # Apply filters
     status_filter = request.GET.get('status')
@@ -1108,17 +1109,10 @@ def _update_access_requests_after_risk_assessment_approval(assessment, reviewed_
         )
 
         # Check if user has approved assessments for all required ones
-        all_assessments_approved = True
-        for req_assessment in required_assessments:
-            has_approved = UserRiskAssessment.objects.filter(
-                user=user,
-                risk_assessment=req_assessment,
-                status='approved'
-            ).exists()
-
-            if not has_approved:
-                all_assessments_approved = False
-                break
+        approved = UserRiskAssessment.objects.filter(
+            user=user, risk_assessment__in=required_assessments
+        ).valid().values('risk_assessment').distinct().count()
+        all_assessments_approved = approved == required_assessments.count()
 
         # If all required assessments are approved, confirm the risk assessment prerequisite
         if all_assessments_approved:
@@ -1193,15 +1187,14 @@ def lab_admin_access_requests_view(request):
                     from ...models.training import UserTraining
                     pending_training = UserTraining.objects.filter(
                         user=access_request.user,
-                        training_course__resource_trainings__resource=access_request.resource,
+                        training_course__resource_requirements__resource=access_request.resource,
                         status__in=['enrolled', 'in_progress', 'failed']
                     )
-
-                    for user_training in pending_training:
-                        user_training.mark_as_completed_by_admin(
-                            instructor=request.user,
-                            notes=f"Training confirmed by {request.user.get_full_name()} for resource access. {notes}".strip()
-                        )
+                    training_satisfaction_service.complete_trainings(
+                        pending_training,
+                        instructor=request.user,
+                        notes=f"Training confirmed by {request.user.get_full_name()} for resource access. {notes}".strip()
+                    )
 
                     messages.success(request, f'Lab training confirmed for {access_request.user.get_full_name()}', extra_tags='persistent-alert')
                 except Exception as e:
@@ -1269,35 +1262,16 @@ def lab_admin_access_requests_view(request):
                             
                             training_end_time = training_datetime + timedelta(hours=duration_hours)
                             
-                            # Check for booking conflicts
-                            conflicts = Booking.objects.filter(
-                                resource=access_request.resource,
-                                status__in=['approved', 'pending'],
-                                start_time__lt=training_end_time,
-                                end_time__gt=training_datetime
+                            # One read of the week's bookings finds the first free hour
+                            free_slot = training_slot_finder.next_free_slot(
+                                access_request.resource, training_datetime, timedelta(hours=duration_hours),
+                                candidates=168, step=timedelta(hours=1)
                             )
-                            
-                            if conflicts.exists():
-                                # Find next available slot
-                                next_slot = None
-                                for hour_offset in range(1, 168):  # Check next week
-                                    test_start = training_datetime + timedelta(hours=hour_offset)
-                                    test_end = test_start + timedelta(hours=duration_hours)
-                                    
-                                    test_conflicts = Booking.objects.filter(
-                                        resource=access_request.resource,
-                                        status__in=['approved', 'pending'],
-                                        start_time__lt=test_end,
-                                        end_time__gt=test_start
-                                    )
-                                    
-                                    if not test_conflicts.exists():
-                                        next_slot = test_start
-                                        break
-                                
+
+                            if free_slot != training_datetime:
                                 conflict_msg = f'The requested time slot conflicts with existing bookings.'
-                                if next_slot:
-                                    conflict_msg += f' Next available slot: {next_slot.strftime("%B %d, %Y at %I:%M %p")}'
+                                if free_slot:
+                                    conflict_msg += f' Next available slot: {free_slot.strftime("%B %d, %Y at %I:%M %p")}'
                                 
                                 messages.warning(request, conflict_msg, extra_tags='persistent-alert')
                                 # Reset to pending status and clear training_date
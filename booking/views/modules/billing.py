@@ -31,6 +31,7 @@ from booking.models import (
     Resource, Department, UserProfile
 )
 from booking.forms.billing import BillingRateForm
+from booking.services.hierarchy_service import hierarchy_service
 
 
 def is_lab_admin(user):
@@ -262,7 +263,7 @@ def billing_records(request):
     
     # Get filter options
     periods = BillingPeriod.objects.order_by('-start_date')
-    departments = Department.objects.order_by('name')
+    departments = sorted(hierarchy_service.departments(), key=lambda department: department['name'])
     resources = Resource.objects.filter(is_billable=True).order_by('name')
     
     context = {
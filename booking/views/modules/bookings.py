@@ -32,6 +32,7 @@ from ...forms import (
     CreateBookingFromTemplateForm, SaveAsTemplateForm
 )
 from ...recurring import RecurringBookingGenerator
+from ...services.bulk_booking_service import bulk_booking_service
 
 
 @login_required
@@ -638,74 +639,37 @@ def bulk_booking_operations_view(request):
             return redirect('booking:dashboard')
         
         try:
-            user_profile = request.user.userprofile
+            request.user.userprofile
         except UserProfile.DoesNotExist:
             messages.error(request, 'User profile not found.')
             return redirect('booking:dashboard')
         
-        # Get bookings that user has permission to modify
-        if user_profile.role in ['technician', 'sysadmin']:
-            bookings = Booking.objects.filter(pk__in=booking_ids)
-        else:
-            bookings = Booking.objects.filter(pk__in=booking_ids, user=request.user)
-        
-        if not bookings.exists():
-            messages.error(request, 'No bookings found or you do not have permission to modify them.')
+        past_tense = {'cancel': 'cancelled', 'approve': 'approved', 'reject': 'rejected'}
+        if action not in past_tense:
+            messages.error(request, 'Invalid action or insufficient permissions.')
             return redirect('booking:dashboard')
         
-        success_count = 0
-        error_count = 0
-        errors = []
-        
-        if action == 'cancel':
-            for booking in bookings:
-                if booking.can_be_cancelled:
-                    booking.status = 'cancelled'
-                    booking.save()
-                    success_count += 1
-                else:
-                    error_count += 1
-                    errors.append(f'{booking.title} - Cannot be cancelled')
-            
-            if success_count > 0:
-                messages.success(request, f'Successfully cancelled {success_count} booking(s).')
-            if error_count > 0:
-                messages.warning(request, f'{error_count} booking(s) could not be cancelled: {", ".join(errors[:3])}')
+        try:
+            result = bulk_booking_service.execute(request.user, action, booking_ids)
+        except PermissionError:
+            messages.error(request, 'Invalid action or insufficient permissions.')
+            return redirect('booking:dashboard')
         
-        elif action == 'approve' and user_profile.role in ['technician', 'sysadmin']:
-            for booking in bookings:
-                if booking.status == 'pending':
-                    booking.status = 'approved'
-                    booking.approved_by = request.user
-                    booking.approved_at = timezone.now()
-                    booking.save()
-                    success_count += 1
-                else:
-                    error_count += 1
-                    errors.append(f'{booking.title} - Not pending')
-            
-            if success_count > 0:
-                messages.success(request, f'Successfully approved {success_count} booking(s).')
-            if error_count > 0:
-                messages.warning(request, f'{error_count} booking(s) could not be approved: {", ".join(errors[:3])}')
+        success_count = len(result['updated'])
+        missing = [e for e in result['errors'] if not e['title']]
+        errors = [f"{e['title']} - {e['error']}" for e in result['errors'] if e['title']]
         
-        elif action == 'reject' and user_profile.role in ['technician', 'sysadmin']:
-            for booking in bookings:
-                if booking.status == 'pending':
-                    booking.status = 'rejected'
-                    booking.save()
-                    success_count += 1
-                else:
-                    error_count += 1
-                    errors.append(f'{booking.title} - Not pending')
-            
-            if success_count > 0:
-                messages.success(request, f'Successfully rejected {success_count} booking(s).')
-            if error_count > 0:
-                messages.warning(request, f'{error_count} booking(s) could not be rejected: {", ".join(errors[:3])}')
+        if not success_count and not errors and missing:
+            messages.error(request, 'No bookings found or you do not have permission to modify them.')
+            return redirect('booking:dashboard')
         
-        else:
-            messages.error(request, 'Invalid action or insufficient permissions.')
+        if success_count > 0:
+            messages.success(request, f'Successfully {past_tense[action]} {success_count} booking(s).')
+        if errors:
+            messages.warning(
+                request,
+                f'{len(errors)} booking(s) could not be {past_tense[action]}: {", ".join(errors[:3])}'
+            )
     
     return redirect('booking:dashboard')
 
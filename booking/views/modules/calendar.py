@@ -17,11 +17,9 @@ https://aperture-booking.org/commercial
 import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.models import User
 from django.contrib import messages
 from django.http import HttpResponse
 from django.urls import reverse
-from django.utils import timezone
 from django.db.models import Q
 
 from ...models import Resource
@@ -57,7 +55,7 @@ def export_my_calendar_view(request):
 @login_required
 def my_calendar_feed_view(request, token):
     """Provide ICS calendar feed for subscription (with token authentication)."""
-    from booking.calendar_sync import ICSCalendarGenerator, CalendarTokenGenerator, create_ics_feed_response
+    from booking.calendar_sync import ICSCalendarGenerator, CalendarTokenGenerator, create_conditional_ics_feed_response
     
     # Verify token
     if not CalendarTokenGenerator.verify_user_token(request.user, token):
@@ -67,30 +65,23 @@ def my_calendar_feed_view(request, token):
     include_past = request.GET.get('include_past', 'false').lower() == 'true'
     days_ahead = int(request.GET.get('days_ahead', '90'))
     
-    # Generate ICS
+    # Assemble from cached event blocks; unchanged feeds answer 304
     generator = ICSCalendarGenerator(request)
-    ics_content = generator.generate_user_calendar(
+    feed = generator.get_user_feed(
         user=request.user,
         include_past=include_past,
         days_ahead=days_ahead
     )
     
-    return create_ics_feed_response(ics_content)
+    return create_conditional_ics_feed_response(request, feed)
 
 
 def public_calendar_feed_view(request, token):
     """Provide public ICS calendar feed for subscription (token-based, no login required)."""
-    from booking.calendar_sync import ICSCalendarGenerator, CalendarTokenGenerator, create_ics_feed_response
-    from django.contrib.auth.models import User
-    
-    # Find user by token - optimized to avoid N+1 query
-    user = None
-    # Get all active users in a single query with minimal fields
-    users = User.objects.filter(is_active=True).only('id', 'username', 'date_joined')
-    for u in users:
-        if CalendarTokenGenerator.verify_user_token(u, token):
-            user = u
-            break
+    from booking.calendar_sync import ICSCalendarGenerator, CalendarTokenGenerator, create_conditional_ics_feed_response
+    
+    # Single indexed lookup on the token table
+    user = CalendarTokenGenerator.resolve_user_token(token)
     
     if not user:
         return HttpResponse("Invalid token", status=403)
@@ -99,15 +90,15 @@ def public_calendar_feed_view(request, token):
     include_past = request.GET.get('include_past', 'false').lower() == 'true'
     days_ahead = int(request.GET.get('days_ahead', '90'))
     
-    # Generate ICS
+    # Assemble from cached event blocks; unchanged feeds answer 304
     generator = ICSCalendarGenerator(request)
-    ics_content = generator.generate_user_calendar(
+    feed = generator.get_user_feed(
         user=user,
         include_past=include_past,
         days_ahead=days_ahead
     )
     
-    return create_ics_feed_response(ics_content)
+    return create_conditional_ics_feed_response(request, feed)
 
 
 @login_required
@@ -172,6 +163,21 @@ def calendar_sync_settings_view(request):
     return render(request, 'booking/calendar_sync_settings.html', context)
 
 
+@login_required
+def regenerate_calendar_token_view(request):
+    """Revoke the user's calendar feed token and issue a new one."""
+    from booking.calendar_sync import CalendarTokenGenerator
+    
+    if request.method == 'POST':
+        CalendarTokenGenerator.rotate_user_token(request.user)
+        messages.success(
+            request,
+            'Your calendar feed URL has been regenerated. Update any calendar apps subscribed to the old URL.'
+        )
+    
+    return redirect('booking:calendar_sync_settings')
+
+
 @login_required
 def google_calendar_auth_view(request):
     """Initiate Google Calendar OAuth flow."""
@@ -262,67 +268,28 @@ def google_calendar_settings_view(request):
 
 @login_required
 def google_calendar_sync_view(request):
-    """Manually trigger Google Calendar sync."""
-    from ..services.google_calendar import google_calendar_service
-    from ..models import GoogleCalendarIntegration
+    """Queue a background Google Calendar sync."""
+    from ...models import GoogleCalendarIntegration
+    from ...tasks import sync_google_calendar
     
     try:
         integration = GoogleCalendarIntegration.objects.get(user=request.user)
         
-        if not integration.can_sync():
+        if not integration.is_active or not integration.sync_enabled:
             messages.error(request, 'Google Calendar sync is not available. Please check your connection.')
             return redirect('booking:calendar_sync_settings')
         
-        # Get user's future bookings
-        from ..models import Booking
-        bookings = Booking.objects.filter(
-            user=request.user,
-            start_time__gte=timezone.now(),
-            status__in=['confirmed', 'pending']
-        ).order_by('start_time')
-        
-        sync_count = 0
-        error_count = 0
-        
-        for booking in bookings:
-            # Check if booking already has a Google event
-            existing_log = booking.googlecalendarsynclog_set.filter(
-                user=request.user,
-                action='created',
-                status='success'
-            ).first()
-            
-            if existing_log:
-                # Update existing event
-                success = google_calendar_service.update_calendar_event(
-                    integration, booking, existing_log.google_event_id
-                )
-            else:
-                # Create new event
-                event_id = google_calendar_service.create_calendar_event(integration, booking)
-                success = event_id is not None
-            
-            if success:
-                sync_count += 1
-            else:
-                error_count += 1
-        
-        # Update last sync time
-        integration.last_sync = timezone.now()
-        integration.save()
-        
-        if error_count == 0:
-            messages.success(request, f'Successfully synced {sync_count} bookings to Google Calendar.')
-        else:
-            messages.warning(
-                request, 
-                f'Synced {sync_count} bookings successfully, but {error_count} failed. Check sync logs for details.'
-            )
+        # Only changed bookings are pushed, in batched API calls, by a worker
+        sync_google_calendar.delay(integration.id)
+        messages.success(
+            request,
+            'Sync started. Your bookings will appear in Google Calendar shortly.'
+        )
         
     except GoogleCalendarIntegration.DoesNotExist:
         messages.error(request, 'Google Calendar is not connected. Please connect first.')
     except Exception as e:
-        logger.error(f"Error syncing Google Calendar for user {request.user.username}: {e}")
+        logger.error(f"Error queuing Google Calendar sync for user {request.user.username}: {e}")
         messages.error(request, f'Error syncing with Google Calendar: {e}')
     
     return redirect('booking:calendar_sync_settings')
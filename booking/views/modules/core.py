@@ -27,6 +27,7 @@ from ...models import (
     WaitingListEntry, Faculty, College, Department
 )
 from booking.forms import UserProfileForm, AboutPageEditForm
+from ...services.hierarchy_service import hierarchy_service
 
 
 @login_required
@@ -38,20 +39,16 @@ def dashboard_view(request):
         # Get user's upcoming bookings
         upcoming_bookings = Booking.objects.filter(
             user=request.user,
-            start_time__gt=timezone.now(),
-            status__in=['pending', 'approved']
-        ).order_by('start_time')[:5]
+            start_time__gt=timezone.now()
+        ).active().select_related('resource').order_by('start_time')[:5]
         
         # Get recent notifications
-        recent_notifications = Notification.objects.filter(
-            user=request.user
-        ).order_by('-created_at')[:5]
+        recent_notifications = Notification.objects.for_user(
+            request.user
+        ).with_related().order_by('-created_at')[:5]
         
         # Get available resources count
-        available_resources_count = 0
-        for resource in Resource.objects.filter(is_active=True):
-            if resource.is_available_for_user(user_profile):
-                available_resources_count += 1
+        available_resources_count = Resource.objects.available_for_user(request.user).count()
         
         # Get waiting list entries
         waiting_list_entries = WaitingListEntry.objects.filter(
@@ -132,7 +129,7 @@ def calendar_view(request):
     user_bookings = Booking.objects.filter(
         base_query,
         status__in=['pending', 'approved', 'in_progress']
-    ).distinct()
+    ).distinct().for_calendar()
     
     # If user is a manager, show all bookings (with resource filter if applicable)
     try:
@@ -141,7 +138,7 @@ def calendar_view(request):
             filter_kwargs = {'status__in': ['pending', 'approved', 'in_progress']}
             if resource_id:
                 filter_kwargs['resource_id'] = resource_id
-            all_bookings = Booking.objects.filter(**filter_kwargs)
+            all_bookings = Booking.objects.filter(**filter_kwargs).for_calendar()
         else:
             all_bookings = user_bookings
     except UserProfile.DoesNotExist:
@@ -237,7 +234,10 @@ def ajax_load_colleges(request):
     faculty_id = request.GET.get('faculty_id')
     colleges = []
     if faculty_id:
-        colleges = list(College.objects.filter(faculty_id=faculty_id, is_active=True).order_by('name').values('id', 'name'))
+        colleges = [
+            {'id': college['id'], 'name': college['name']}
+            for college in hierarchy_service.colleges(faculty_id, active_only=True)
+        ]
     return JsonResponse({'colleges': colleges})
 
 
@@ -247,7 +247,10 @@ def ajax_load_departments(request):
     college_id = request.GET.get('college_id')
     departments = []
     if college_id:
-        departments = list(Department.objects.filter(college_id=college_id, is_active=True).order_by('name').values('id', 'name'))
+        departments = [
+            {'id': department['id'], 'name': department['name']}
+            for department in hierarchy_service.departments(college_id, active_only=True)
+        ]
     return JsonResponse({'departments': departments})
 
 
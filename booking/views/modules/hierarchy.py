@@ -17,43 +17,45 @@ https://aperture-booking.org/commercial
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.db import IntegrityError, transaction
 from django.db.models import Q, Count
 from django.core.paginator import Paginator
 
 from ...models import Faculty, College, Department
+from ...services.hierarchy_service import hierarchy_service
+
+
+def _save_unique(obj):
+    """Save ``obj``, returning False if the database rejects it as a duplicate."""
+    try:
+        with transaction.atomic():
+            obj.save()
+    except IntegrityError:
+        return False
+    return True
+
+
+def _duplicate_message(queryset, name, code, noun, scope=''):
+    """
+    Name the clashing field of a rejected save. Only runs after an
+    ``IntegrityError``, so successful saves need no duplicate pre-checks.
+    """
+    for field, value in (('name', name), ('code', code)):
+        if queryset.filter(**{field: value}).exists():
+            return f'A {noun} with this {field} already exists{scope}.'
+    return f'The {noun} could not be saved, please try again.'
 
 
 @login_required
 @user_passes_test(lambda u: u.is_staff)
 def site_admin_academic_hierarchy_view(request):
     """Academic hierarchy management dashboard."""
-    faculties = Faculty.objects.annotate(
-        colleges_count=Count('colleges'),
-        departments_count=Count('colleges__departments')
-    ).order_by('name')
-    
-    colleges = College.objects.select_related('faculty').annotate(
-        departments_count=Count('departments')
-    ).order_by('faculty__name', 'name')
-    
-    departments = Department.objects.select_related('college__faculty').order_by(
-        'college__faculty__name', 'college__name', 'name'
-    )
-    
-    stats = {
-        'total_faculties': Faculty.objects.count(),
-        'active_faculties': Faculty.objects.filter(is_active=True).count(),
-        'total_colleges': College.objects.count(),
-        'active_colleges': College.objects.filter(is_active=True).count(),
-        'total_departments': Department.objects.count(),
-        'active_departments': Department.objects.filter(is_active=True).count(),
-    }
-    
+    # Counts and overview lists all come from the cached hierarchy tree
     return render(request, 'booking/site_admin_academic_hierarchy.html', {
-        'faculties': faculties[:10],  # Show first 10 for overview
-        'colleges': colleges[:10],    # Show first 10 for overview
-        'departments': departments[:10],  # Show first 10 for overview
-        'stats': stats,
+        'faculties': hierarchy_service.faculties()[:10],  # Show first 10 for overview
+        'colleges': hierarchy_service.colleges()[:10],    # Show first 10 for overview
+        'departments': hierarchy_service.departments()[:10],  # Show first 10 for overview
+        'stats': hierarchy_service.stats(),
     })
 
 
@@ -100,25 +102,17 @@ def site_admin_faculty_create_view(request):
                 'action': 'Create',
             })
         
-        if Faculty.objects.filter(name=name).exists():
-            messages.error(request, 'A faculty with this name already exists.')
-            return render(request, 'booking/site_admin_faculty_form.html', {
-                'faculty': None,
-                'action': 'Create',
-            })
-        
-        if Faculty.objects.filter(code=code).exists():
-            messages.error(request, 'A faculty with this code already exists.')
-            return render(request, 'booking/site_admin_faculty_form.html', {
-                'faculty': None,
-                'action': 'Create',
-            })
-        
-        faculty = Faculty.objects.create(
+        faculty = Faculty(
             name=name,
             code=code,
             is_active=is_active
         )
+        if not _save_unique(faculty):
+            messages.error(request, _duplicate_message(Faculty.objects.all(), name, code, 'faculty'))
+            return render(request, 'booking/site_admin_faculty_form.html', {
+                'faculty': None,
+                'action': 'Create',
+            })
         
         messages.success(request, f'Faculty "{faculty.name}" created successfully.')
         return redirect('booking:site_admin_faculties')
@@ -147,27 +141,19 @@ def site_admin_faculty_edit_view(request, faculty_id):
                 'action': 'Edit',
             })
         
-        # Check for duplicate name (excluding current faculty)
-        if Faculty.objects.filter(name=name).exclude(id=faculty.id).exists():
-            messages.error(request, 'A faculty with this name already exists.')
-            return render(request, 'booking/site_admin_faculty_form.html', {
-                'faculty': faculty,
-                'action': 'Edit',
-            })
-        
-        # Check for duplicate code (excluding current faculty)
-        if Faculty.objects.filter(code=code).exclude(id=faculty.id).exists():
-            messages.error(request, 'A faculty with this code already exists.')
+        faculty.name = name
+        faculty.code = code
+        faculty.is_active = is_active
+        if not _save_unique(faculty):
+            messages.error(request, _duplicate_message(
+                Faculty.objects.exclude(id=faculty.id), name, code, 'faculty'
+            ))
+            faculty.refresh_from_db()
             return render(request, 'booking/site_admin_faculty_form.html', {
                 'faculty': faculty,
                 'action': 'Edit',
             })
         
-        faculty.name = name
-        faculty.code = code
-        faculty.is_active = is_active
-        faculty.save()
-        
         messages.success(request, f'Faculty "{faculty.name}" updated successfully.')
         return redirect('booking:site_admin_faculties')
     
@@ -194,13 +180,12 @@ def site_admin_faculty_delete_view(request, faculty_id):
         return redirect('booking:site_admin_faculties')
     
     # Get related data for confirmation
-    colleges_count = faculty.colleges.count()
-    departments_count = Department.objects.filter(college__faculty=faculty).count()
+    node = hierarchy_service.get_faculty(faculty.id) or {}
     
     return render(request, 'booking/site_admin_faculty_confirm_delete.html', {
         'faculty': faculty,
-        'colleges_count': colleges_count,
-        'departments_count': departments_count,
+        'colleges_count': node.get('colleges_count', 0),
+        'departments_count': node.get('departments_count', 0),
     })
 
 
@@ -216,10 +201,10 @@ def site_admin_colleges_view(request):
     faculty_id = request.GET.get('faculty')
     selected_faculty_obj = None
     if faculty_id:
-        try:
-            selected_faculty_obj = Faculty.objects.get(id=faculty_id)
-            colleges = colleges.filter(faculty_id=faculty_id)
-        except Faculty.DoesNotExist:
+        selected_faculty_obj = hierarchy_service.get_faculty(faculty_id)
+        if selected_faculty_obj:
+            colleges = colleges.filter(faculty_id=selected_faculty_obj['id'])
+        else:
             faculty_id = None
     
     # Search functionality
@@ -236,7 +221,7 @@ def site_admin_colleges_view(request):
     page = request.GET.get('page')
     colleges = paginator.get_page(page)
     
-    faculties = Faculty.objects.filter(is_active=True).order_by('name')
+    faculties = hierarchy_service.faculties(active_only=True)
     
     return render(request, 'booking/site_admin_colleges.html', {
         'colleges': colleges,
@@ -251,7 +236,7 @@ def site_admin_colleges_view(request):
 @user_passes_test(lambda u: u.is_staff)
 def site_admin_college_create_view(request):
     """Create new college."""
-    faculties = Faculty.objects.filter(is_active=True).order_by('name')
+    faculties = hierarchy_service.faculties(active_only=True)
     
     if request.method == 'POST':
         name = request.POST.get('name', '').strip()
@@ -267,9 +252,8 @@ def site_admin_college_create_view(request):
                 'action': 'Create',
             })
         
-        try:
-            faculty = Faculty.objects.get(id=faculty_id)
-        except Faculty.DoesNotExist:
+        faculty = hierarchy_service.get_faculty(faculty_id)
+        if faculty is None:
             messages.error(request, 'Selected faculty does not exist.')
             return render(request, 'booking/site_admin_college_form.html', {
                 'college': None,
@@ -277,31 +261,22 @@ def site_admin_college_create_view(request):
                 'action': 'Create',
             })
         
-        # Check for duplicate name within faculty
-        if College.objects.filter(faculty=faculty, name=name).exists():
-            messages.error(request, 'A college with this name already exists in this faculty.')
-            return render(request, 'booking/site_admin_college_form.html', {
-                'college': None,
-                'faculties': faculties,
-                'action': 'Create',
-            })
-        
-        # Check for duplicate code within faculty
-        if College.objects.filter(faculty=faculty, code=code).exists():
-            messages.error(request, 'A college with this code already exists in this faculty.')
+        college = College(
+            name=name,
+            code=code,
+            faculty_id=faculty['id'],
+            is_active=is_active
+        )
+        if not _save_unique(college):
+            messages.error(request, _duplicate_message(
+                College.objects.filter(faculty_id=faculty['id']), name, code, 'college', ' in this faculty'
+            ))
             return render(request, 'booking/site_admin_college_form.html', {
                 'college': None,
                 'faculties': faculties,
                 'action': 'Create',
             })
         
-        college = College.objects.create(
-            name=name,
-            code=code,
-            faculty=faculty,
-            is_active=is_active
-        )
-        
         messages.success(request, f'College "{college.name}" created successfully.')
         return redirect('booking:site_admin_colleges')
     
@@ -316,8 +291,8 @@ def site_admin_college_create_view(request):
 @user_passes_test(lambda u: u.is_staff)
 def site_admin_college_edit_view(request, college_id):
     """Edit existing college."""
-    college = get_object_or_404(College, id=college_id)
-    faculties = Faculty.objects.filter(is_active=True).order_by('name')
+    college = get_object_or_404(College.objects.select_related('faculty'), id=college_id)
+    faculties = hierarchy_service.faculties(active_only=True)
     
     if request.method == 'POST':
         name = request.POST.get('name', '').strip()
@@ -333,9 +308,8 @@ def site_admin_college_edit_view(request, college_id):
                 'action': 'Edit',
             })
         
-        try:
-            faculty = Faculty.objects.get(id=faculty_id)
-        except Faculty.DoesNotExist:
+        faculty = hierarchy_service.get_faculty(faculty_id)
+        if faculty is None:
             messages.error(request, 'Selected faculty does not exist.')
             return render(request, 'booking/site_admin_college_form.html', {
                 'college': college,
@@ -343,30 +317,22 @@ def site_admin_college_edit_view(request, college_id):
                 'action': 'Edit',
             })
         
-        # Check for duplicate name within faculty (excluding current college)
-        if College.objects.filter(faculty=faculty, name=name).exclude(id=college.id).exists():
-            messages.error(request, 'A college with this name already exists in this faculty.')
-            return render(request, 'booking/site_admin_college_form.html', {
-                'college': college,
-                'faculties': faculties,
-                'action': 'Edit',
-            })
-        
-        # Check for duplicate code within faculty (excluding current college)
-        if College.objects.filter(faculty=faculty, code=code).exclude(id=college.id).exists():
-            messages.error(request, 'A college with this code already exists in this faculty.')
+        college.name = name
+        college.code = code
+        college.faculty_id = faculty['id']
+        college.is_active = is_active
+        if not _save_unique(college):
+            messages.error(request, _duplicate_message(
+                College.objects.filter(faculty_id=faculty['id']).exclude(id=college.id),
+                name, code, 'college', ' in this faculty'
+            ))
+            college.refresh_from_db()
             return render(request, 'booking/site_admin_college_form.html', {
                 'college': college,
                 'faculties': faculties,
                 'action': 'Edit',
             })
         
-        college.name = name
-        college.code = code
-        college.faculty = faculty
-        college.is_active = is_active
-        college.save()
-        
         messages.success(request, f'College "{college.name}" updated successfully.')
         return redirect('booking:site_admin_colleges')
     
@@ -394,11 +360,11 @@ def site_admin_college_delete_view(request, college_id):
         return redirect('booking:site_admin_colleges')
     
     # Get related data for confirmation
-    departments_count = college.departments.count()
+    node = hierarchy_service.get_college(college.id) or {}
     
     return render(request, 'booking/site_admin_college_confirm_delete.html', {
         'college': college,
-        'departments_count': departments_count,
+        'departments_count': node.get('departments_count', 0),
     })
 
 
@@ -414,20 +380,20 @@ def site_admin_departments_view(request):
     faculty_id = request.GET.get('faculty')
     selected_faculty_obj = None
     if faculty_id:
-        try:
-            selected_faculty_obj = Faculty.objects.get(id=faculty_id)
-            departments = departments.filter(college__faculty_id=faculty_id)
-        except Faculty.DoesNotExist:
+        selected_faculty_obj = hierarchy_service.get_faculty(faculty_id)
+        if selected_faculty_obj:
+            departments = departments.filter(college__faculty_id=selected_faculty_obj['id'])
+        else:
             faculty_id = None
     
     # Filter by college
     college_id = request.GET.get('college')
     selected_college_obj = None
     if college_id:
-        try:
-            selected_college_obj = College.objects.get(id=college_id)
-            departments = departments.filter(college_id=college_id)
-        except College.DoesNotExist:
+        selected_college_obj = hierarchy_service.get_college(college_id)
+        if selected_college_obj:
+            departments = departments.filter(college_id=selected_college_obj['id'])
+        else:
             college_id = None
     
     # Search functionality
@@ -445,8 +411,8 @@ def site_admin_departments_view(request):
     page = request.GET.get('page')
     departments = paginator.get_page(page)
     
-    faculties = Faculty.objects.filter(is_active=True).order_by('name')
-    colleges = College.objects.filter(is_active=True).select_related('faculty').order_by('faculty__name', 'name')
+    faculties = hierarchy_service.faculties(active_only=True)
+    colleges = hierarchy_service.colleges(active_only=True)
     
     return render(request, 'booking/site_admin_departments.html', {
         'departments': departments,
@@ -464,7 +430,7 @@ def site_admin_departments_view(request):
 @user_passes_test(lambda u: u.is_staff)
 def site_admin_department_create_view(request):
     """Create new department."""
-    colleges = College.objects.filter(is_active=True).select_related('faculty').order_by('faculty__name', 'name')
+    colleges = hierarchy_service.colleges(active_only=True)
     
     if request.method == 'POST':
         name = request.POST.get('name', '').strip()
@@ -480,9 +446,8 @@ def site_admin_department_create_view(request):
                 'action': 'Create',
             })
         
-        try:
-            college = College.objects.get(id=college_id)
-        except College.DoesNotExist:
+        college = hierarchy_service.get_college(college_id)
+        if college is None:
             messages.error(request, 'Selected college does not exist.')
             return render(request, 'booking/site_admin_department_form.html', {
                 'department': None,
@@ -490,31 +455,22 @@ def site_admin_department_create_view(request):
                 'action': 'Create',
             })
         
-        # Check for duplicate name within college
-        if Department.objects.filter(college=college, name=name).exists():
-            messages.error(request, 'A department with this name already exists in this college.')
-            return render(request, 'booking/site_admin_department_form.html', {
-                'department': None,
-                'colleges': colleges,
-                'action': 'Create',
-            })
-        
-        # Check for duplicate code within college
-        if Department.objects.filter(college=college, code=code).exists():
-            messages.error(request, 'A department with this code already exists in this college.')
+        department = Department(
+            name=name,
+            code=code,
+            college_id=college['id'],
+            is_active=is_active
+        )
+        if not _save_unique(department):
+            messages.error(request, _duplicate_message(
+                Department.objects.filter(college_id=college['id']), name, code, 'department', ' in this college'
+            ))
             return render(request, 'booking/site_admin_department_form.html', {
                 'department': None,
                 'colleges': colleges,
                 'action': 'Create',
             })
         
-        department = Department.objects.create(
-            name=name,
-            code=code,
-            college=college,
-            is_active=is_active
-        )
-        
         messages.success(request, f'Department "{department.name}" created successfully.')
         return redirect('booking:site_admin_departments')
     
@@ -529,8 +485,8 @@ def site_admin_department_create_view(request):
 @user_passes_test(lambda u: u.is_staff)
 def site_admin_department_edit_view(request, department_id):
     """Edit existing department."""
-    department = get_object_or_404(Department, id=department_id)
-    colleges = College.objects.filter(is_active=True).select_related('faculty').order_by('faculty__name', 'name')
+    department = get_object_or_404(Department.objects.select_related('college'), id=department_id)
+    colleges = hierarchy_service.colleges(active_only=True)
     
     if request.method == 'POST':
         name = request.POST.get('name', '').strip()
@@ -546,9 +502,8 @@ def site_admin_department_edit_view(request, department_id):
                 'action': 'Edit',
             })
         
-        try:
-            college = College.objects.get(id=college_id)
-        except College.DoesNotExist:
+        college = hierarchy_service.get_college(college_id)
+        if college is None:
             messages.error(request, 'Selected college does not exist.')
             return render(request, 'booking/site_admin_department_form.html', {
                 'department': department,
@@ -556,30 +511,22 @@ def site_admin_department_edit_view(request, department_id):
                 'action': 'Edit',
             })
         
-        # Check for duplicate name within college (excluding current department)
-        if Department.objects.filter(college=college, name=name).exclude(id=department.id).exists():
-            messages.error(request, 'A department with this name already exists in this college.')
-            return render(request, 'booking/site_admin_department_form.html', {
-                'department': department,
-                'colleges': colleges,
-                'action': 'Edit',
-            })
-        
-        # Check for duplicate code within college (excluding current department)
-        if Department.objects.filter(college=college, code=code).exclude(id=department.id).exists():
-            messages.error(request, 'A department with this code already exists in this college.')
+        department.name = name
+        department.code = code
+        department.college_id = college['id']
+        department.is_active = is_active
+        if not _save_unique(department):
+            messages.error(request, _duplicate_message(
+                Department.objects.filter(college_id=college['id']).exclude(id=department.id),
+                name, code, 'department', ' in this college'
+            ))
+            department.refresh_from_db()
             return render(request, 'booking/site_admin_department_form.html', {
                 'department': department,
                 'colleges': colleges,
                 'action': 'Edit',
             })
         
-        department.name = name
-        department.code = code
-        department.college = college
-        department.is_active = is_active
-        department.save()
-        
         messages.success(request, f'Department "{department.name}" updated successfully.')
         return redirect('booking:site_admin_departments')
     
@@ -84,21 +84,14 @@ def issues_dashboard(request):
         if filter_form.cleaned_data.get('assigned_to'):
             issues = issues.filter(assigned_to=filter_form.cleaned_data['assigned_to'])
         if filter_form.cleaned_data.get('is_overdue'):
-            # Filter for overdue issues (this would need a more complex query)
-            pass
+            issues = issues.overdue()
         if filter_form.cleaned_data.get('date_from'):
             issues = issues.filter(created_at__gte=filter_form.cleaned_data['date_from'])
         if filter_form.cleaned_data.get('date_to'):
             issues = issues.filter(created_at__lte=filter_form.cleaned_data['date_to'])
     
     # Statistics
-    stats = {
-        'total': issues.count(),
-        'open': issues.filter(status='open').count(),
-        'in_progress': issues.filter(status='in_progress').count(),
-        'critical': issues.filter(severity='critical').count(),
-        'overdue': sum(1 for issue in issues if issue.is_overdue),
-    }
+    stats = issues.dashboard_stats()
     
     # Pagination
     paginator = Paginator(issues, 25)
@@ -46,6 +46,7 @@ from ...forms import (
 # Removed licensing requirement - all features now available
 # from ...services.licensing import require_license_feature
 from ...notifications import notification_service
+from ...services.training_service import training_satisfaction_service, training_slot_finder
 
 
 def is_lab_admin(user):
@@ -164,15 +165,14 @@ def lab_admin_access_requests_view(request):
                     from ...models.training import UserTraining
                     pending_training = UserTraining.objects.filter(
                         user=access_request.user,
-                        training_course__resource_trainings__resource=access_request.resource,
+                        training_course__resource_requirements__resource=access_request.resource,
                         status__in=['enrolled', 'in_progress', 'failed']
                     )
-
-                    for user_training in pending_training:
-                        user_training.mark_as_completed_by_admin(
-                            instructor=request.user,
-                            notes=f"Training confirmed by {request.user.get_full_name()} for resource access. {notes}".strip()
-                        )
+                    training_satisfaction_service.complete_trainings(
+                        pending_training,
+                        instructor=request.user,
+                        notes=f"Training confirmed by {request.user.get_full_name()} for resource access. {notes}".strip()
+                    )
 
                     messages.success(request, f'Lab training confirmed for {access_request.user.get_full_name()}', extra_tags='persistent-alert')
                 except Exception as e:
@@ -295,35 +295,16 @@ def lab_admin_access_requests_view(request):
 
                             training_end_time = training_datetime + timedelta(hours=duration_hours)
 
-                            # Check for booking conflicts
-                            conflicts = Booking.objects.filter(
-                                resource=access_request.resource,
-                                status__in=['approved', 'pending'],
-                                start_time__lt=training_end_time,
-                                end_time__gt=training_datetime
+                            # One read of the week's bookings finds the first free hour
+                            free_slot = training_slot_finder.next_free_slot(
+                                access_request.resource, training_datetime, timedelta(hours=duration_hours),
+                                candidates=168, step=timedelta(hours=1)
                             )
 
-                            if conflicts.exists():
-                                # Find next available slot
-                                next_slot = None
-                                for hour_offset in range(1, 168):  # Check next week
-                                    test_start = training_datetime + timedelta(hours=hour_offset)
-                                    test_end = test_start + timedelta(hours=duration_hours)
-
-                                    test_conflicts = Booking.objects.filter(
-                                        resource=access_request.resource,
-                                        status__in=['approved', 'pending'],
-                                        start_time__lt=test_end,
-                                        end_time__gt=test_start
-                                    )
-
-                                    if not test_conflicts.exists():
-                                        next_slot = test_start
-                                        break
-
+                            if free_slot != training_datetime:
                                 conflict_msg = f'The requested time slot conflicts with existing bookings.'
-                                if next_slot:
-                                    conflict_msg += f' Next available slot: {next_slot.strftime("%B %d, %Y at %I:%M %p")}'
+                                if free_slot:
+                                    conflict_msg += f' Next available slot: {free_slot.strftime("%B %d, %Y at %I:%M %p")}'
 
                                 messages.warning(request, conflict_msg, extra_tags='persistent-alert')
                                 # Reset to pending status and clear training_date
@@ -492,40 +473,18 @@ def lab_admin_training_view(request):
 
                     # Find associated resource (from training course requirements)
                     resource = None
-                    training_requirements = user_training.training_course.resource_requirements.all()
-                    if training_requirements.exists():
-                        resource = training_requirements.first().resource
+                    requirement = user_training.training_course.resource_requirements.select_related('resource').first()
+                    if requirement:
+                        resource = requirement.resource
 
                     if resource:
-                        # Check for booking conflicts
-                        conflicts = Booking.objects.filter(
-                            resource=resource,
-                            status__in=['approved', 'pending'],
-                            start_time__lt=session_end_time,
-                            end_time__gt=session_datetime
-                        )
-
-                        if conflicts.exists():
-                            # Find next available slot
-                            next_slot = None
-                            for day_offset in range(1, 30):  # Check next month
-                                test_start = session_datetime + timedelta(days=day_offset)
-                                test_end = test_start + training_duration
-
-                                test_conflicts = Booking.objects.filter(
-                                    resource=resource,
-                                    status__in=['approved', 'pending'],
-                                    start_time__lt=test_end,
-                                    end_time__gt=test_start
-                                )
-
-                                if not test_conflicts.exists():
-                                    next_slot = test_start
-                                    break
+                        # One read of the horizon's bookings finds the first free day
+                        free_slot = training_slot_finder.next_free_slot(resource, session_datetime, training_duration)
 
+                        if free_slot != session_datetime:
                             conflict_msg = f'The requested date conflicts with existing bookings for {resource.name}.'
-                            if next_slot:
-                                conflict_msg += f' Next available date: {next_slot.strftime("%B %d, %Y")}'
+                            if free_slot:
+                                conflict_msg += f' Next available date: {free_slot.strftime("%B %d, %Y")}'
 
                             messages.warning(request, conflict_msg, extra_tags='persistent-alert')
                         else:
@@ -1216,9 +1175,8 @@ def lab_admin_users_bulk_import_view(request):
         return JsonResponse({'success': False, 'error': 'Method not allowed'})
 
     try:
-        import csv
         from io import StringIO
-        from booking.models import UserProfile
+        from booking.services.user_import import user_import_service
 
         csv_file = request.FILES.get('csv_file')
         if not csv_file:
@@ -1238,116 +1196,39 @@ def lab_admin_users_bulk_import_view(request):
             except:
                 return JsonResponse({'success': False, 'error': 'Unable to decode file. Please ensure it\'s a valid UTF-8 or Latin-1 encoded CSV file.'})
 
-        # Parse CSV
+        # Rows are parsed lazily and written in batches; new users share one
+        # random initial password, hashed once, and must reset it to log in
         try:
-            csv_reader = csv.DictReader(StringIO(file_data))
-            rows = list(csv_reader)
-        except Exception as e:
+            result = user_import_service.import_csv(
+                StringIO(file_data, newline=''),
+                update_existing=request.POST.get('update_existing') == 'on',
+                dry_run=request.POST.get('dry_run') == 'on',
+                default_role='researcher',
+            )
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+        except csv.Error as e:
             return JsonResponse({'success': False, 'error': f'Invalid CSV format: {str(e)}'})
 
-        if not rows:
+        if not (result['created'] or result['updated'] or result['skipped'] or result['errors']):
             return JsonResponse({'success': False, 'error': 'CSV file is empty or has no data rows'})
 
-        # Check required columns
-        required_columns = ['username']
-        first_row = rows[0]
-        missing_columns = [col for col in required_columns if col not in first_row]
-        if missing_columns:
-            return JsonResponse({
-                'success': False,
-                'error': f'Missing required columns: {", ".join(missing_columns)}. Available columns: {", ".join(first_row.keys())}'
-            })
-
-        created = 0
-        updated = 0
-        errors = []
-        row_num = 1  # Start from 1 (header is row 0)
-
-        for row in rows:
-            row_num += 1
-            try:
-                username = row.get('username', '').strip()
-                if not username:
-                    errors.append(f'Row {row_num}: Missing username')
-                    continue
-
-                email = row.get('email', '').strip()
-                first_name = row.get('first_name', '').strip()
-                last_name = row.get('last_name', '').strip()
-                role = row.get('role', 'researcher').strip()
-
-                if User.objects.filter(username=username).exists():
-                    if request.POST.get('update_existing') == 'on':
-                        user = User.objects.get(username=username)
-
-                        # Update user fields
-                        if email:
-                            user.email = email
-                        if first_name:
-                            user.first_name = first_name
-                        if last_name:
-                            user.last_name = last_name
-                        user.save()
-
-                        # Update or create profile
-                        if hasattr(user, 'userprofile'):
-                            if role:
-                                user.userprofile.role = role
-                                user.userprofile.save()
-                        else:
-                            UserProfile.objects.create(
-                                user=user,
-                                role=role,
-                            )
-
-                        updated += 1
-                    else:
-                        errors.append(f'Row {row_num}: User {username} already exists')
-                else:
-                    # Create new user
-                    from django.contrib.auth.models import make_password
-                    import secrets
-                    import string
-
-                    # Generate random password
-                    password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
-
-                    user = User.objects.create_user(
-                        username=username,
-                        email=email,
-                        password=password,
-                        first_name=first_name,
-                        last_name=last_name,
-                    )
-
-                    # Create user profile (use get_or_create to avoid duplicates)
-                    profile, created_profile = UserProfile.objects.get_or_create(
-                        user=user,
-                        defaults={
-                            'role': role,
-                            'phone': '',  # Default empty phone
-                            'is_inducted': False,
-                            'email_verified': False,
-                        }
-                    )
-
-                    # If profile existed, update the role
-                    if not created_profile and role:
-                        profile.role = role
-                        profile.save()
-
-                    created += 1
-
-            except Exception as e:
-                errors.append(f'Row {row_num}: Error processing - {str(e)}')
+        errors = [f"Row {error['row']}: {error['error']}" for error in result['errors']]
+        errors.extend(f"Row {skipped['row']}: User {skipped['username']} already exists"
+                      for skipped in result['skipped'])
 
         # Prepare response
         response_data = {
             'success': True,
-            'created': created,
-            'updated': updated,
+            'created': result['created'],
+            'updated': result['updated'],
+            'dry_run': result['dry_run'],
         }
 
+        if result['warnings']:
+            response_data['warnings'] = [f"Row {warning['row']}: {warning['warning']}"
+                                         for warning in result['warnings']]
+
         if errors:
             response_data['errors'] = errors
             response_data['message'] = f'Processed with {len(errors)} error(s)'
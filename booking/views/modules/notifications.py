@@ -41,27 +41,17 @@ def notifications_list(request):
     
     # Get user's notifications, ordered by most recent first
     # Only show in-app notifications to avoid duplicates from multiple delivery methods
-    notifications = Notification.objects.filter(
-        user=request.user, 
-        delivery_method='in_app'
-    ).order_by('-created_at')[:50]
+    in_app = Notification.objects.for_user(request.user).in_app()
+    notifications = in_app.with_related().order_by('-created_at')[:50]
     
     # Count unread notifications (not marked as read)
     # Only count in-app notifications to avoid duplicates
-    unread_count = Notification.objects.filter(
-        user=request.user, 
-        delivery_method='in_app',
-        read_at__isnull=True
-    ).count()
+    unread_count = in_app.unread().count()
     
     # Mark notifications as read when viewing the list
     # Only mark in-app notifications as read
     if request.method == 'GET':
-        Notification.objects.filter(
-            user=request.user,
-            delivery_method='in_app',
-            read_at__isnull=True
-        ).update(read_at=timezone.now(), status='read')
+        in_app.unread().update(read_at=timezone.now(), status='read')
     
     return render(request, 'booking/notifications.html', {
         'notifications': notifications,
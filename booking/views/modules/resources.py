@@ -20,7 +20,7 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 from django.core.exceptions import ValidationError
 from django.db.models import Q, Count
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, JsonResponse
 from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
@@ -45,31 +45,10 @@ def is_lab_admin(user):
 @login_required
 def resources_list_view(request):
     """View to display all available resources with access control."""
-    resources = Resource.objects.filter(is_active=True).order_by('resource_type', 'name')
-    
-    # Add access information for each resource
-    for resource in resources:
-        resource.user_has_access_result = resource.user_has_access(request.user)
-        resource.can_view_calendar_result = resource.can_user_view_calendar(request.user)
-        
-        # Check if user has pending access request
-        resource.has_pending_request = AccessRequest.objects.filter(
-            resource=resource,
-            user=request.user,
-            status='pending'
-        ).exists()
-        
-        # Check if user has pending training (only if resource requires training)
-        from ...models.training import UserTraining
-        resource.has_pending_training = False
-        if resource.training_requirements.filter(is_mandatory=True).exists():
-            # Check if user has pending training for any required courses
-            resource.has_pending_training = UserTraining.objects.filter(
-                user=request.user,
-                training_course__resource_requirements__resource=resource,
-                training_course__resource_requirements__is_mandatory=True,
-                status__in=['enrolled', 'in_progress']
-            ).exists()
+    # Access, pending request and training flags are annotated in one query
+    resources = Resource.objects.filter(is_active=True).with_progress_for(
+        request.user
+    ).order_by('resource_type', 'name')
     
     return render(request, 'booking/resources_list.html', {
         'resources': resources,
@@ -156,10 +135,8 @@ def resource_detail_view(request, resource_id):
     
     # Check required risk assessments for this resource
     required_risk_assessments = RiskAssessment.objects.filter(
-        resource=resource,
-        is_active=True,
-        valid_until__gte=timezone.now().date()
-    ).order_by('risk_level', 'title')
+        resource=resource
+    ).current().order_by('risk_level', 'title')
     
     # Check user's status for each required risk assessment
     user_risk_assessments = {}
@@ -591,4 +568,71 @@ def upload_risk_assessment_view(request, resource_id):
         'form': form,
     }
 
-    return render(request, 'booking/upload_risk_assessment.html', context)
\ No newline at end of file
+    return render(request, 'booking/upload_risk_assessment.html', context)
+
+
+def _preferred_image_format(accept):
+    """Pick the smallest derivative format the client accepts."""
+    from ...utils.image_derivatives import DERIVATIVE_FORMATS
+
+    for fmt in ('avif', 'webp'):
+        if fmt in DERIVATIVE_FORMATS and DERIVATIVE_FORMATS[fmt][2] in accept:
+            return fmt
+    return 'jpeg'
+
+
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def image_thumbnail_view(request, width, height, path):
+    """
+    Serve a resized copy of an uploaded image.
+
+    The derivative is rendered and stored on first request and served from
+    storage afterwards. Only sizes from get_allowed_sizes() are served.
+    ``?fit=contain`` keeps the aspect ratio instead of
+    cropping, and ``?format=`` overrides negotiation on the Accept header.
+    """
+    from django.core.exceptions import SuspiciousFileOperation
+    from django.core.files.storage import default_storage
+    from django.utils.cache import get_conditional_response, patch_vary_headers
+    from PIL import UnidentifiedImageError
+    from ...utils.image_derivatives import (
+        DERIVATIVE_FORMATS, get_allowed_sizes,
+        get_cached_source_key, get_or_create_derivative, get_source_prefixes,
+    )
+
+    if (width, height) not in get_allowed_sizes():
+        raise Http404("Unsupported thumbnail size")
+    if not path.startswith(get_source_prefixes()) or '..' in path.split('/'):
+        raise Http404("Image not found")
+
+    crop = request.GET.get('fit', 'crop') != 'contain'
+    fmt = request.GET.get('format') or _preferred_image_format(request.META.get('HTTP_ACCEPT', ''))
+    if fmt not in DERIVATIVE_FORMATS:
+        raise Http404("Unsupported image format")
+
+    variant = f"{width}x{height}{'c' if crop else ''}-{fmt}"
+
+    def finalize(response, key):
+        response['ETag'] = f'"{key[:20]}-{variant}"'
+        # The source name never changes content, so the derivative never changes;
+        # it sits behind a login, so shared caches must not keep it
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        if 'format' not in request.GET:
+            patch_vary_headers(response, ['Accept'])
+        return response
+
+    # Revalidation needs no storage access once the source hash is known
+    key = get_cached_source_key(path)
+    if key:
+        not_modified = get_conditional_response(request, etag=f'"{key[:20]}-{variant}"')
+        if not_modified is not None:
+            return finalize(not_modified, key)
+
+    try:
+        name, key = get_or_create_derivative(path, (width, height), fmt, crop)
+    except (FileNotFoundError, SuspiciousFileOperation, UnidentifiedImageError):
+        raise Http404("Image not found")
+
+    response = FileResponse(default_storage.open(name, 'rb'), content_type=DERIVATIVE_FORMATS[fmt][2])
+    return finalize(response, key)
@@ -29,6 +29,9 @@ from ...models import (
     ResourceTrainingRequirement, ResourceResponsible
 )
 from ...forms import ResourceResponsibleForm
+from ...services.training_service import (
+    training_gap_service, training_satisfaction_service, training_slot_finder
+)
 
 
 def is_lab_admin(user):
@@ -50,11 +53,7 @@ def training_dashboard_view(request):
     
     available_courses = TrainingCourse.objects.filter(is_active=True).count()
     
-    expiring_soon = UserTraining.objects.filter(
-        user=request.user,
-        status='completed',
-        expires_at__lte=timezone.now() + timedelta(days=30)
-    ).count()
+    expiring_soon = UserTraining.objects.filter(user=request.user).expiring_within(30).count()
     
     # User's training progress
     my_training = UserTraining.objects.filter(
@@ -136,35 +135,8 @@ def training_and_inductions_view(request):
         status__in=['enrolled', 'in_progress', 'scheduled']
     ).select_related('training_course')
 
-    # Get required training from resource access requests
-    training_from_access_requests = []
-    pending_access_requests = AccessRequest.objects.filter(
-        user=request.user,
-        status='pending',
-        lab_training_confirmed=False
-    ).select_related('resource')
-
-    for access_request in pending_access_requests:
-        resource = access_request.resource
-        # Check if resource has training requirements
-        training_reqs = resource.training_requirements.filter(
-            is_mandatory=True
-        ).select_related('training_course')
-
-        for req in training_reqs:
-            # Check if user already has this training
-            has_training = UserTraining.objects.filter(
-                user=request.user,
-                training_course=req.training_course,
-                status='completed'
-            ).exists()
-
-            if not has_training:
-                training_from_access_requests.append({
-                    'resource': resource,
-                    'training_course': req.training_course,
-                    'access_request': access_request
-                })
+    # Missing mandatory courses across all pending access requests
+    training_from_access_requests = training_gap_service.missing_courses(request.user)
 
     # Get risk assessment requirements
     risk_assessments = UserRiskAssessment.objects.filter(
@@ -314,41 +286,19 @@ def lab_admin_training_view(request):
                     
                     # Find associated resource (from training course requirements)
                     resource = None
-                    training_requirements = user_training.training_course.resource_requirements.all()
-                    if training_requirements.exists():
-                        resource = training_requirements.first().resource
+                    requirement = user_training.training_course.resource_requirements.select_related('resource').first()
+                    if requirement:
+                        resource = requirement.resource
                     
                     if resource:
-                        # Check for booking conflicts
-                        conflicts = Booking.objects.filter(
-                            resource=resource,
-                            status__in=['approved', 'pending'],
-                            start_time__lt=session_end_time,
-                            end_time__gt=session_datetime
-                        )
-                        
-                        if conflicts.exists():
-                            # Find next available slot
-                            next_slot = None
-                            for day_offset in range(1, 30):  # Check next month
-                                test_start = session_datetime + timedelta(days=day_offset)
-                                test_end = test_start + training_duration
-                                
-                                test_conflicts = Booking.objects.filter(
-                                    resource=resource,
-                                    status__in=['approved', 'pending'],
-                                    start_time__lt=test_end,
-                                    end_time__gt=test_start
-                                )
-                                
-                                if not test_conflicts.exists():
-                                    next_slot = test_start
-                                    break
-                            
+                        # One read of the horizon's bookings finds the first free day
+                        free_slot = training_slot_finder.next_free_slot(resource, session_datetime, training_duration)
+
+                        if free_slot != session_datetime:
                             conflict_msg = f'The requested date conflicts with existing bookings for {resource.name}.'
-                            if next_slot:
-                                conflict_msg += f' Next available date: {next_slot.strftime("%B %d, %Y")}'
-                            
+                            if free_slot:
+                                conflict_msg += f' Next available date: {free_slot.strftime("%B %d, %Y")}'
+
                             messages.warning(request, conflict_msg, extra_tags='persistent-alert')
                         else:
                             # No conflicts, create the booking
@@ -414,6 +364,20 @@ def lab_admin_training_view(request):
 
             messages.success(request, f'Training marked as completed for {user_training.user.get_full_name()}')
 
+        elif action == 'complete_user_trainings':
+            # Cohort sign-off: complete every selected enrolment at once
+            user_trainings = UserTraining.objects.filter(
+                id__in=request.POST.getlist('user_training_ids'),
+                status__in=['enrolled', 'in_progress', 'scheduled']
+            )
+            completed = training_satisfaction_service.complete_trainings(
+                user_trainings,
+                instructor=request.user,
+                notes=f'Training marked complete by {request.user.get_full_name()}'
+            )
+
+            messages.success(request, f'Training marked as completed for {completed} trainees')
+
         # Legacy training scheduling removed - now handled through UserTraining model
 
         elif action == 'cancel_user_training':
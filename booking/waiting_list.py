@@ -15,7 +15,7 @@ from django.db.models import Q
 from django.db import transaction
 from .models import (
     WaitingListEntry, WaitingListNotification, Booking, 
-    Resource, UserProfile
+    Resource, UserProfile, MaintenanceBlock
 )
 from .notifications import notification_service
 
@@ -99,13 +99,10 @@ class WaitingListService:
             start_time__lte=future_limit
         ).order_by('start_time')
         
-        # Get maintenance windows
-        from .models import Maintenance
-        maintenance_windows = Maintenance.objects.filter(
-            resource=resource,
-            blocks_booking=True,
-            start_time__gte=now,
-            start_time__lte=future_limit
+        # Get maintenance windows, including maintenance elsewhere that
+        # takes this resource down
+        maintenance_windows = MaintenanceBlock.objects.for_resource(resource).overlapping(
+            now, future_limit
         ).order_by('start_time')
         
         # Combine and sort all blocked time periods
@@ -58,6 +58,13 @@ def authenticated_client(client, user):
     return client
 
 
+@pytest.fixture
+def query_budget(db):
+    """Fail a block that runs too many queries: ``with query_budget(5): ...``"""
+    from booking.utils.query_profiling import query_budget
+    return query_budget
+
+
 @pytest.fixture
 def api_client():
     """Create an API test client."""
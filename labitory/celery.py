@@ -57,6 +57,41 @@ app.conf.beat_schedule = {
         'schedule': 1800.0,  # Every 30 minutes
         'options': {'queue': 'maintenance'}
     },
+    'flush-audit-events': {
+        'task': 'booking.tasks.flush_audit_events',
+        'schedule': 10.0,  # Every 10 seconds
+        'options': {'queue': 'maintenance'}
+    },
+    'prune-audit-logs': {
+        'task': 'booking.tasks.prune_audit_logs',
+        'schedule': 86400.0,  # Daily
+        'options': {'queue': 'maintenance'}
+    },
+    'sync-google-calendars': {
+        'task': 'booking.tasks.sync_google_calendars',
+        'schedule': 3600.0,  # Every hour
+        'options': {'queue': 'celery'}
+    },
+    'process-checkins': {
+        'task': 'booking.tasks.process_checkins',
+        'schedule': 300.0,  # Every 5 minutes
+        'options': {'queue': 'notifications'}
+    },
+    'index-system-logs': {
+        'task': 'booking.tasks.index_system_logs',
+        'schedule': 60.0,  # Every minute
+        'options': {'queue': 'maintenance'}
+    },
+    'escalate-overdue-issues': {
+        'task': 'booking.tasks.escalate_overdue_issues',
+        'schedule': 900.0,  # Every 15 minutes
+        'options': {'queue': 'maintenance'}
+    },
+    'expire-training-and-assessments': {
+        'task': 'booking.tasks.expire_training_and_assessments',
+        'schedule': 86400.0,  # Daily
+        'options': {'queue': 'maintenance'}
+    },
 }
 
 # Task configuration
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'booking.middleware.profiling.RequestProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'booking.middleware.security.SecurityHeadersMiddleware',
     'booking.middleware.security.SecurityEventMiddleware',
@@ -52,6 +53,7 @@ MIDDLEWARE = [
     'booking.middleware.security.ContentSanitizationMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'booking.middleware.audit.ActingUserMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'booking.middleware.security.RateLimitMiddleware',
@@ -230,6 +232,8 @@ GOOGLE_CALENDAR_SCOPES = [
     'https://www.googleapis.com/auth/calendar',
     'https://www.googleapis.com/auth/userinfo.email'
 ]
+GOOGLE_CALENDAR_API_URL = config('GOOGLE_CALENDAR_API_URL', default='https://www.googleapis.com')
+GOOGLE_CALENDAR_SYNC_MAX_RETRIES = config('GOOGLE_CALENDAR_SYNC_MAX_RETRIES', default=5, cast=int)
 
 # Rate Limiting Configuration
 RATELIMIT_ENABLE = config('RATELIMIT_ENABLE', default=True, cast=bool)
@@ -344,7 +348,98 @@ CLAMAV_ENABLED = config('CLAMAV_ENABLED', default=False, cast=bool)
 CLAMAV_SOCKET_PATH = config('CLAMAV_SOCKET_PATH', default='/var/run/clamav/clamd.ctl')
 CLAMAV_TCP_HOST = config('CLAMAV_TCP_HOST', default='localhost')
 CLAMAV_TCP_PORT = config('CLAMAV_TCP_PORT', default=3310, cast=int)
+CLAMAV_TIMEOUT = config('CLAMAV_TIMEOUT', default=30, cast=int)  # Seconds per socket operation
+CLAMAV_POOL_SIZE = config('CLAMAV_POOL_SIZE', default=4, cast=int)  # Idle clamd sessions kept per process
+CLAMAV_IDLE_TIMEOUT = config('CLAMAV_IDLE_TIMEOUT', default=20, cast=int)  # Keep below clamd's IdleTimeout
+CLAMAV_CHUNK_SIZE = config('CLAMAV_CHUNK_SIZE', default=64 * 1024, cast=int)  # INSTREAM chunk size
+CLAMAV_VERDICT_CACHE_TIMEOUT = config('CLAMAV_VERDICT_CACHE_TIMEOUT', default=86400, cast=int)
 
 # File storage organization
 FILE_UPLOAD_TEMP_DIR = config('FILE_UPLOAD_TEMP_DIR', default=None)
-FILE_UPLOAD_PERMISSIONS = 0o644
\ No newline at end of file
+FILE_UPLOAD_PERMISSIONS = 0o644
+
+# =============================================================================
+# SYSTEM LOG INDEX SETTINGS
+# =============================================================================
+
+# Parsed system logs for the admin log viewer, filled by the index_system_logs task
+LOG_INDEX_ENABLED = config('LOG_INDEX_ENABLED', default=True, cast=bool)
+LOG_INDEX_PATH = config('LOG_INDEX_PATH', default=str(LOG_DIR / 'log_index.sqlite3'))
+LOG_INDEX_RETENTION_DAYS = config('LOG_INDEX_RETENTION_DAYS', default=90, cast=int)
+LOG_INDEX_BACKFILL_BYTES = config('LOG_INDEX_BACKFILL_BYTES', default=16 * 1024 * 1024, cast=int)  # Read on first sight of a file
+LOG_INDEX_REFRESH_INTERVAL = config('LOG_INDEX_REFRESH_INTERVAL', default=60, cast=int)  # Seconds between on-request catch-ups
+
+# =============================================================================
+# MAINTENANCE ANALYSIS SETTINGS
+# =============================================================================
+
+# analyze_all_resources runs batches of resources on a thread pool; each
+# worker holds one database connection while it runs
+MAINTENANCE_ANALYSIS_WORKERS = config('MAINTENANCE_ANALYSIS_WORKERS', default=4, cast=int)
+MAINTENANCE_ANALYSIS_BATCH_SIZE = config('MAINTENANCE_ANALYSIS_BATCH_SIZE', default=50, cast=int)
+# Schedule generation loads history and existing maintenance per batch of resources
+MAINTENANCE_SCHEDULE_BATCH_SIZE = config('MAINTENANCE_SCHEDULE_BATCH_SIZE', default=200, cast=int)
+
+# =============================================================================
+# API REQUEST SIGNING SETTINGS
+# =============================================================================
+
+# Accepted clock skew for signed requests; nonces are remembered for twice this
+HMAC_MAX_AGE = config('HMAC_MAX_AGE', default=300, cast=int)
+# Resolved signing keys are cached per process for seconds, then in the shared cache
+HMAC_KEY_LRU_SIZE = config('HMAC_KEY_LRU_SIZE', default=256, cast=int)
+HMAC_KEY_LRU_TTL = config('HMAC_KEY_LRU_TTL', default=5, cast=int)
+HMAC_KEY_CACHE_TIMEOUT = config('HMAC_KEY_CACHE_TIMEOUT', default=300, cast=int)
+# Minimum seconds between last_used_at writes for a key
+HMAC_KEY_USAGE_INTERVAL = config('HMAC_KEY_USAGE_INTERVAL', default=60, cast=int)
+
+# =============================================================================
+# ACADEMIC HIERARCHY SETTINGS
+# =============================================================================
+
+# The faculty/college/department tree is cached until a hierarchy or profile
+# change drops it; the timeout bounds drift from bulk updates that skip signals
+HIERARCHY_CACHE_TIMEOUT = config('HIERARCHY_CACHE_TIMEOUT', default=3600, cast=int)
+
+# =============================================================================
+# ADMIN PERFORMANCE SETTINGS
+# =============================================================================
+
+# With DEBUG on, an admin changelist page that runs more queries than this
+# raises QueryBudgetExceeded, catching per-row queries before they ship
+ADMIN_CHANGELIST_QUERY_BUDGET = config('ADMIN_CHANGELIST_QUERY_BUDGET', default=12, cast=int)
+
+# =============================================================================
+# REQUEST PROFILING SETTINGS
+# =============================================================================
+
+# Share of requests profiled by RequestProfilingMiddleware (0.0 disables it)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.01, cast=float)
+# Expose timings to clients in a Server-Timing header
+PROFILING_SERVER_TIMING = config('PROFILING_SERVER_TIMING', default=False, cast=bool)
+# Profiled requests above their budget are logged as warnings
+PROFILING_DEFAULT_QUERY_BUDGET = config('PROFILING_DEFAULT_QUERY_BUDGET', default=50, cast=int)
+PROFILING_QUERY_BUDGETS = {
+    # 'booking:dashboard': 25,
+}
+
+# =============================================================================
+# AUDIT LOGGING SETTINGS
+# =============================================================================
+
+# How audit/security events are written: 'sync' (immediately, in the caller's
+# transaction), 'redis' (durable list drained by the flush_audit_events task)
+# or 'memory' (batched per thread; lost if the process crashes)
+AUDIT_BUFFER_BACKEND = config('AUDIT_BUFFER_BACKEND', default='sync')
+AUDIT_BUFFER_MAX_SIZE = config('AUDIT_BUFFER_MAX_SIZE', default=100, cast=int)  # events
+AUDIT_BUFFER_FLUSH_INTERVAL = config('AUDIT_BUFFER_FLUSH_INTERVAL', default=5, cast=int)  # seconds
+AUDIT_BUFFER_REDIS_URL = config('AUDIT_BUFFER_REDIS_URL', default=config('REDIS_URL', default='redis://127.0.0.1:6379/1'))
+
+# Retention in days per audit table (0 disables pruning for that table)
+AUDIT_RETENTION_DAYS = {
+    'booking.AuditLog': config('AUDIT_RETENTION_AUDITLOG_DAYS', default=365, cast=int),
+    'booking.DataAccessLog': config('AUDIT_RETENTION_DATAACCESS_DAYS', default=365, cast=int),
+    'booking.AdminAction': config('AUDIT_RETENTION_ADMINACTION_DAYS', default=730, cast=int),
+    'booking.SecurityEvent': config('AUDIT_RETENTION_SECURITYEVENT_DAYS', default=365, cast=int),
+    'booking.LoginAttempt': config('AUDIT_RETENTION_LOGINATTEMPT_DAYS', default=180, cast=int),
+}
@@ -254,15 +254,21 @@ LOGGING = {
 # Development-specific middleware additions
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'booking.middleware.profiling.RequestProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'booking.middleware.audit.ActingUserMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Profile every request and show timings in the browser
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=1.0, cast=float)
+PROFILING_SERVER_TIMING = True
+
 # Allow weaker security settings for development
 SECURE_SSL_REDIRECT = False
 SECURE_HSTS_SECONDS = 0
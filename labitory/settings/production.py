@@ -105,6 +105,9 @@ SESSION_SAVE_EVERY_REQUEST = False
 SESSION_REDIS_URL = config('REDIS_URL', default='redis://127.0.0.1:6379/2')
 SESSION_REDIS_PREFIX = 'labitory:session:'
 
+# Batch audit events through Redis where it is available (drained by Celery)
+AUDIT_BUFFER_BACKEND = config('AUDIT_BUFFER_BACKEND', default='redis' if CACHE_BACKEND == 'redis' else 'sync')
+
 # Email configuration - Real email backend for production
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST')